@@ -0,0 +1,276 @@
+"""
+Parallel APF to binary (bpf) conversion.
+This module is pure Python and does not require Maya, so it can be run from a shell:
+    python -m glTools.data.apfConvert <srcDir> [-j processes] [-f]
+"""
+import array
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+import glTools.data.fileFormat
+
+# Converted file data type/version (stored in the root of the binary data file)
+DATA_TYPE = 'ApfData'
+DATA_VERSION = 1
+
+
+def readApf(apfFile):
+    """
+    Read an apf file to a {character: {object: values}} dictionary, with values stored as double arrays.
+    @param apfFile: Apf file to read.
+    @type apfFile: str
+    """
+    # Check File
+    if not os.path.isfile(apfFile):
+        raise Exception('Apf file "' + apfFile + '" is not a valid path!')
+
+    # Read File
+    f = open(apfFile, 'r')
+    apfData = _parseApf(f)
+    f.close()
+
+    # Return Result
+    return apfData
+
+
+def packApf(apfData):
+    """
+    Pack {character: {object: values}} apf data to compact per character tables.
+    Each character is stored as a sorted object name list, an int offsets array and a flat double values array,
+    where the values of object "n" are values[offsets[n]:offsets[n+1]].
+    @param apfData: Apf data to pack. See readApf().
+    @type apfData: dict
+    """
+    packed = {}
+    for char, objData in apfData.iteritems():
+        objects = sorted(objData.keys())
+        offsets = array.array('i', [0])
+        values = array.array('d')
+        for obj in objects:
+            values.extend(objData[obj])
+            offsets.append(len(values))
+        packed[char] = {'objects': objects, 'offsets': offsets, 'values': values}
+    return packed
+
+
+def unpackApf(packed):
+    """
+    Unpack compact per character tables (see packApf()) to {character: {object: values}} apf data.
+    @param packed: Packed apf data.
+    @type packed: dict
+    """
+    apfData = {}
+    for char, table in packed.iteritems():
+        offsets = table['offsets']
+        values = table['values']
+        apfData[char] = dict([(obj, values[offsets[n]:offsets[n + 1]]) for n, obj in enumerate(table['objects'])])
+    return apfData
+
+
+def isConverted(apfFile, bpfFile):
+    """
+    Check if the specified bpf file is an up to date conversion of the source apf file.
+    The source file is considered unchanged if its modification time and size match the values stored
+    at conversion. If not, the source file content hash is compared.
+    @param apfFile: Source apf file.
+    @type apfFile: str
+    @param bpfFile: Converted bpf file.
+    @type bpfFile: str
+    """
+    # Check Files
+    if not os.path.isfile(bpfFile): return False
+    if not glTools.data.fileFormat.isBinaryFile(bpfFile): return False
+
+    # Read Source Info
+    f = open(bpfFile, 'rb')
+    try:
+        version, meta, start = glTools.data.fileFormat.readHeader(f)
+    except Exception:
+        return False
+    finally:
+        f.close()
+    root = meta['root']
+    if not isinstance(root, dict) or root.get('dataType') != DATA_TYPE: return False
+
+    # Check Modification Time and Size
+    stat = os.stat(apfFile)
+    if root.get('sourceMtime') == stat.st_mtime and root.get('sourceSize') == stat.st_size: return True
+
+    # Check Content Hash
+    return root.get('sourceHash') == _fileHash(apfFile)
+
+
+def convertFile(apfFile, bpfFile='', force=False):
+    """
+    Convert an apf file to a binary (glTools.data.fileFormat) bpf file.
+    Returns the bpf file path and True if the file was converted, False if it was skipped.
+    @param apfFile: Source apf file.
+    @type apfFile: str
+    @param bpfFile: Target bpf file. If empty, use the source path with a .bpf extension.
+    @type bpfFile: str
+    @param force: Convert even if the bpf file is up to date.
+    @type force: bool
+    """
+    # Check Target
+    if not bpfFile: bpfFile = os.path.splitext(apfFile)[0] + '.bpf'
+    if not force and isConverted(apfFile, bpfFile): return bpfFile, False
+
+    # Read Source
+    stat = os.stat(apfFile)
+    f = open(apfFile, 'rb')
+    content = f.read()
+    f.close()
+
+    # Write Binary Data
+    root = {'dataType': DATA_TYPE,
+            'version': DATA_VERSION,
+            'source': apfFile,
+            'sourceMtime': stat.st_mtime,
+            'sourceSize': stat.st_size,
+            'sourceHash': hashlib.md5(content).hexdigest(),
+            'data': packApf(_parseApf(content.splitlines()))}
+    glTools.data.fileFormat.writeFile(bpfFile, root)
+
+    # Return Result
+    return bpfFile, True
+
+
+def readBpf(bpfFile):
+    """
+    Read a converted bpf file to a {character: {object: values}} dictionary.
+    @param bpfFile: Converted bpf file.
+    @type bpfFile: str
+    """
+    root = glTools.data.fileFormat.readFile(bpfFile)
+    if not isinstance(root, dict) or root.get('dataType') != DATA_TYPE:
+        raise Exception('File "' + bpfFile + '" is not a converted apf file!')
+    return unpackApf(root['data'])
+
+
+def processDir(srcDir, processes=None, force=False, verbose=True):
+    """
+    Convert all apf files in a specified directory to binary bpf files, using a pool of worker processes.
+    Files with an up to date conversion are skipped. Returns the list of bpf files, in apf file order.
+    NOTE: Worker processes are started from the calling process. On Windows, run this module from a shell
+    (or mayapy) instead of calling it from an interactive Maya session.
+    @param srcDir: Source directory to process apf files for.
+    @type srcDir: str
+    @param processes: Number of worker processes. If None, use the number of CPUs.
+    @type processes: int or None
+    @param force: Convert all files, even if the bpf file is up to date.
+    @type force: bool
+    @param verbose: Print per file and total conversion throughput.
+    @type verbose: bool
+    """
+    # Check Source Directory
+    if not os.path.isdir(srcDir):
+        raise Exception('Source directory "' + srcDir + '" is not a valid path!')
+
+    # Find all APF files
+    apfFiles = sorted([os.path.join(srcDir, i) for i in os.listdir(srcDir) if i.endswith('.apf')])
+    if not apfFiles: return []
+
+    # Convert Files
+    startTime = time.time()
+    results = {}
+    jobs = [(apfFile, force) for apfFile in apfFiles]
+    if processes == 1 or len(apfFiles) == 1:
+        resultIter = (_convertWorker(job) for job in jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        resultIter = pool.imap_unordered(_convertWorker, jobs)
+    try:
+        for apfFile, bpfFile, converted, size, seconds in resultIter:
+            results[apfFile] = (bpfFile, converted, size)
+            if verbose:
+                if converted:
+                    print(os.path.basename(apfFile) + ' : ' + _throughput(size, seconds))
+                else:
+                    print(os.path.basename(apfFile) + ' : up to date, skipped')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    # Print Result
+    if verbose:
+        totalTime = time.time() - startTime
+        converted = [i for i in results.itervalues() if i[1]]
+        totalSize = sum([i[2] for i in converted])
+        print('Converted ' + str(len(converted)) + ' of ' + str(len(apfFiles)) + ' files in ' +
+              ('%.2f' % totalTime) + 's (' + _throughput(totalSize, totalTime) + ')')
+
+    # Return Result
+    return [results[apfFile][0] for apfFile in apfFiles]
+
+
+def _parseApf(lines):
+    """
+    Parse apf file lines to a {character: {object: values}} dictionary.
+    """
+    apfData = {}
+    charData = None
+    for line in lines:
+
+        # Get Line Data
+        lineData = line.split()
+
+        # Skip Empty Lines
+        if not lineData: continue
+
+        # Check BEGIN
+        if lineData[0] == 'BEGIN':
+            charData = apfData[lineData[1]] = {}
+            continue
+
+        # Check Character
+        if charData is None: continue
+
+        # Parse Line Data
+        charData[lineData[0]] = array.array('d', [float(i) for i in lineData[1:]])
+
+    # Return Result
+    return apfData
+
+
+def _convertWorker(job):
+    """
+    Worker process conversion function. Returns (apfFile, bpfFile, converted, sourceSize, seconds).
+    """
+    apfFile, force = job
+    startTime = time.time()
+    bpfFile, converted = convertFile(apfFile, force=force)
+    return apfFile, bpfFile, converted, os.path.getsize(apfFile), time.time() - startTime
+
+
+def _fileHash(filePath):
+    """
+    Return the md5 hex digest of the specified file contents.
+    """
+    f = open(filePath, 'rb')
+    digest = hashlib.md5(f.read()).hexdigest()
+    f.close()
+    return digest
+
+
+def _throughput(size, seconds):
+    """
+    Return a formatted size/time throughput string.
+    """
+    mb = size / 1048576.0
+    return ('%.2f' % mb) + 'MB in ' + ('%.3f' % seconds) + 's (' + ('%.2f' % (mb / max(seconds, 0.000001))) + 'MB/s)'
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert apf files to binary bpf files.')
+    parser.add_argument('srcDir', help='Directory containing apf files to convert')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('-f', '--force', action='store_true', help='Convert up to date files')
+    args = parser.parse_args()
+    processDir(args.srcDir, processes=args.processes, force=args.force)
+    sys.exit(0)
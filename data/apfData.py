@@ -1,6 +1,8 @@
 import maya.cmds as cmds
 import os
 import data
+import glTools.data.apfConvert
+import glTools.data.fileFormat
 
 
 class ApfData(data.Data):
@@ -30,76 +32,41 @@ class ApfData(data.Data):
         @param apfFile: Apf file to load.
         @type apfFile: str
         """
-        # Check File
-        if not os.path.isfile(apfFile):
-            raise Exception('Apf file "' + apfFile + '" is not a valid path!')
+        self._data = glTools.data.apfConvert.readApf(apfFile)
 
-        # Read File
-        f = open(apfFile, 'r')
-
-        # Sort Data
-        char = ''
-        for line in f:
-
-            # Get Line Data
-            lineData = line.split()
-
-            # Skip Empty Lines
-            if not lineData:
-                continue
-
-            # Check BEGIN
-            if lineData[0] == 'BEGIN':
-                char = lineData[1]
-                self._data[char] = {}
-                continue
-
-            # Check Character
-            if not char:
-                continue
+    def load(self, filePath='', lazy=False):
+        """
+        Load apf data from file. Supports converted bpf files (glTools.data.apfConvert) and pickled ApfData files.
+        @param filePath: Target file path
+        @type filePath: str
+        @param lazy: Memory map binary data files. Has no effect for converted or pickled files.
+        @type lazy: bool
+        """
+        # Converted BPF File
+        if filePath and glTools.data.fileFormat.isBinaryFile(filePath):
+            root = glTools.data.fileFormat.readFile(filePath)
+            if isinstance(root, dict) and root.get('dataType') == glTools.data.apfConvert.DATA_TYPE:
+                apfData = ApfData()
+                apfData._data = glTools.data.apfConvert.unpackApf(root['data'])
+                return apfData
 
-            # Parse Line Data
-            lineObj = lineData[0]
-            lineVal = [float(i) for i in lineData[1:]]
-            self._data[char][lineObj] = lineVal
+        # Data File
+        return super(ApfData, self).load(filePath, lazy)
 
 
-def processDir(srcDir):
+def processDir(srcDir, processes=None, force=False):
     """
-    Convert all apf files in a specified directory to ApfData object files (*.bpf)
+    Convert all apf files in a specified directory to binary apf data files (*.bpf).
+    Files are converted in parallel using a pool of worker processes (glTools.data.apfConvert),
+    and files with an up to date conversion are skipped.
     @param srcDir: Source directory to process apf files for.
     @type srcDir: str
+    @param processes: Number of worker processes. If None, use the number of CPUs.
+    @type processes: int or None
+    @param force: Convert all files, even if the bpf file is up to date.
+    @type force: bool
     """
-    # Check Source Directory
-    if not os.path.isdir(srcDir):
-        raise Exception('Source directory "' + srcDir + '" is not a valid path!')
-
-    # Start Timer
-    timer = cmds.timerX()
-
-    # Find all APF files
-    apfFiles = [i for i in os.listdir(srcDir) if i.endswith('.apf')]
-    apfFiles.sort()
-    bpfFiles = []
-    for apfFile in apfFiles:
-
-        # Check File
-        srcFile = srcDir + '/' + apfFile
-        if not os.path.isfile(srcFile):
-            raise Exception('Apf file "' + srcFile + '" is not a valid path!')
-
-        print apfFile
-
-        apfData = ApfData(srcFile)
-        bpfFile = apfData.save(srcFile.replace('.apf', '.bpf'))
-        bpfFiles.append(bpfFile)
-
-    # Print Result
-    totalTime = cmds.timerX(st=timer)
-    print 'Total time: ' + str(totalTime)
-
-    # Return Result
-    return bpfFiles
+    return glTools.data.apfConvert.processDir(srcDir, processes=processes, force=force)
 
 
 def loadAnim(srcDir, agentNS):
@@ -1,15 +1,17 @@
 import maya.cmds as cmds
 import os.path
 import cPickle
+import fileFormat
 
 
-# import json
-
 class Data(object):
     """
     Base Data Object Class
     Contains functions to save and load standard rig data.
     """
+    # Save data using the binary data file format (glTools.data.fileFormat)
+    # Subclasses with large array payloads should opt in by overriding this attribute.
+    binaryFormat = False
 
     def __init__(self):
         """
@@ -24,13 +26,15 @@ class Data(object):
         # File Filter
         self.fileFilter = "All Files (*.*)"
 
-    def save(self, filePath, force=False):
+    def save(self, filePath, force=False, binary=None):
         """
         Save data object to file.
         @param filePath: Target file path.
         @type filePath: str
         @param force: Force save if file already exists. (Overwrite).
         @type force: bool
+        @param binary: Save using the binary data file format. If None, use the class binaryFormat setting.
+        @type binary: bool or None
         """
         # Check Directory Path
         dirpath = os.path.dirname(filePath)
@@ -41,9 +45,13 @@ class Data(object):
             raise Exception('File "' + filePath + '" already exists! Use "force=True" to overwrite the existing file.')
 
         # Save File
-        fileOut = open(filePath, 'wb')
-        cPickle.dump(self, fileOut)
-        fileOut.close()
+        if binary is None: binary = self.binaryFormat
+        if binary:
+            fileFormat.writeFile(filePath, self)
+        else:
+            fileOut = open(filePath, 'wb')
+            cPickle.dump(self, fileOut)
+            fileOut.close()
 
         # Print Message
         print('Saved ' + self.__class__.__name__ + ': "' + filePath + '"')
@@ -69,11 +77,15 @@ class Data(object):
         # Return Result
         return filePath
 
-    def load(self, filePath=''):
+    def load(self, filePath='', lazy=False):
         """
         Load data object from file.
+        Both binary data files and (legacy) pickled data files are supported.
         @param filePath: Target file path
         @type filePath: str
+        @param lazy: Memory map binary data files and return stored arrays as read-only views that are only
+                     read from disk when accessed. Has no effect for pickled data files.
+        @type lazy: bool
         """
         # Check File Path
         if not filePath:
@@ -85,9 +97,13 @@ class Data(object):
             if not os.path.isfile(filePath):
                 raise Exception('File "' + filePath + '" does not exist!')
 
-        # Open File
-        fileIn = open(filePath, 'rb')
-        dataIn = cPickle.load(fileIn)
+        # Load File
+        if fileFormat.isBinaryFile(filePath):
+            dataIn = fileFormat.readFile(filePath, lazy=lazy)
+        else:
+            fileIn = open(filePath, 'rb')
+            dataIn = cPickle.load(fileIn)
+            fileIn.close()
 
         # Print Message
         dataType = dataIn.__class__.__name__
@@ -5,8 +5,10 @@ import glTools.utils.arrayUtils
 import glTools.utils.deformer
 import glTools.utils.mesh
 import glTools.utils.progressBar
+import glTools.utils.weightTransfer
 import data
 import meshData
+import array
 import copy
 
 
@@ -15,6 +17,8 @@ class DeformerData(data.Data):
     DeformerData class object.
     Contains functions to save, load and rebuild basic deformer data.
     """
+    # Store membership and weight lists as binary array chunks
+    binaryFormat = True
 
     def __init__(self, deformer=''):
         """
@@ -92,7 +96,11 @@ class DeformerData(data.Data):
             self._data[geo]['index'] = affectedGeo[geo]
             self._data[geo]['geometryType'] = str(cmds.objectType(geoShape))
             self._data[geo]['membership'] = glTools.utils.deformer.getDeformerSetMemberIndices(deformer, geo)
-            self._data[geo]['weights'] = glTools.utils.deformer.getWeights(deformer, geo)
+            self._data[geo]['weights'] = array.array('f', glTools.utils.deformer.getWeights(deformer, geo))
+
+            # Store Single Index Membership as Compact Array
+            if ['mesh', 'nurbsCurve', 'particle'].count(self._data[geo]['geometryType']):
+                self._data[geo]['membership'] = array.array('i', self._data[geo]['membership'])
 
             if self._data[geo]['geometryType'] == 'mesh':
                 self._data[geo]['mesh'] = meshData.MeshData(geo)
@@ -425,7 +433,7 @@ class DeformerData(data.Data):
         @type sourceGeo: str
         @param targetGeo: Geometry to rebuild world space deformer data for. If empty, use sourceGeo.
         @type targetGeo: str
-        @param method: Method for worldSpace transfer. Valid options are "closestPoint" and "normalProject".
+        @param method: Method for worldSpace transfer. Only "closestPoint" is currently supported.
         @type method: str
         """
         # Start timer
@@ -441,6 +449,10 @@ class DeformerData(data.Data):
         # Target Geometry
         if not targetGeo: targetGeo = sourceGeo
 
+        # Check Method
+        if method != 'closestPoint':
+            raise Exception('Unsupported world space transfer method "' + method + '"!')
+
         # Check Deformer Data
         if not self._data.has_key(sourceGeo):
             raise Exception('No deformer data stored for geometry "' + sourceGeo + '"!')
@@ -466,8 +478,8 @@ class DeformerData(data.Data):
         numPolygons = len(meshData['polyCounts'])
         polygonCounts = OpenMaya.MIntArray()
         polygonConnects = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(meshData['polyCounts'], polygonCounts)
-        meshUtil.createIntArrayFromList(meshData['polyConnects'], polygonConnects)
+        meshUtil.createIntArrayFromList(list(meshData['polyCounts']), polygonCounts)
+        meshUtil.createIntArrayFromList(list(meshData['polyConnects']), polygonConnects)
 
         # Rebuild Vertex Array
         vertexArray = OpenMaya.MFloatPointArray(numVertices, OpenMaya.MFloatPoint.origin)
@@ -479,83 +491,33 @@ class DeformerData(data.Data):
         meshDataFn = OpenMaya.MFnMeshData().create()
         meshObj = meshFn.create(numVertices, numPolygons, vertexArray, polygonCounts, polygonConnects, meshDataFn)
 
-        # Create Mesh Intersector
-        meshPt = OpenMaya.MPointOnMesh()
-        meshIntersector = OpenMaya.MMeshIntersector()
-        if method == 'closestPoint': meshIntersector.create(meshObj)
-
         # ========================================
         # - Rebuild Weights and Membership List -
         # ========================================
 
-        # Initialize Influence Weights and Membership
-        new_weights = []
-        new_membership = []
-
-        # Get Target Mesh Data
+        # Get Target Mesh Points
         targetMeshFn = glTools.utils.mesh.getMeshFn(targetGeo)
-        targetMeshPts = targetMeshFn.getRawPoints()
-        numTargetVerts = targetMeshFn.numVertices()
-        targetPtUtil = OpenMaya.MScriptUtil()
-
-        # Initialize Float Pointers for Barycentric Coords
-        uUtil = OpenMaya.MScriptUtil()
-        vUtil = OpenMaya.MScriptUtil()
-        uPtr = uUtil.asFloatPtr()
-        vPtr = vUtil.asFloatPtr()
-
-        # Get Progress Step
-        progressInd = int(numTargetVerts * 0.01)
-
-        for i in range(numTargetVerts):
-
-            # Get Target Point
-            targetPt = OpenMaya.MPoint(targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 0),
-                                       targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 1),
-                                       targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 2))
-
-            # Get Closest Point Data
-            meshIntersector.getClosestPoint(targetPt, meshPt)
-
-            # Get Barycentric Coords
-            meshPt.getBarycentricCoords(uPtr, vPtr)
-            u = OpenMaya.MScriptUtil(uPtr).asFloat()
-            v = OpenMaya.MScriptUtil(vPtr).asFloat()
-            baryWt = [u, v, 1.0 - (u + v)]
-
-            # Get Triangle Vertex IDs
-            idUtil = OpenMaya.MScriptUtil()
-            idPtr = idUtil.asIntPtr()
-            meshFn.getPolygonTriangleVertices(meshPt.faceIndex(), meshPt.triangleIndex(), idPtr)
-
-            # Calculate Weight and Membership
-            wt = 0.0
-            isMember = False
-            for n in range(3):
-
-                # Get Triangle Vertex ID
-                triId = OpenMaya.MScriptUtil().getIntArrayItem(idPtr, n)
-
-                # Check Against Source Membership
-                if self._data[sourceGeo]['membership'].count(triId):
-                    wtId = self._data[sourceGeo]['membership'].index(triId)
-                    wt += self._data[sourceGeo]['weights'][wtId] * baryWt[n]
-                    isMember = True
-
-            # Check Weight
-            if isMember:
-                new_weights.append(wt)
-                new_membership.append(i)
-
-            # Update Progress Bar
-            if not i % progressInd: glTools.utils.progressBar.update(step=1)
+        targetPts = OpenMaya.MPointArray()
+        targetMeshFn.getPoints(targetPts)
+        glTools.utils.progressBar.update(step=10)
+
+        # Get Closest Source Triangles
+        triVertexIds, baryCoords = glTools.utils.weightTransfer.getClosestTriangles(meshObj, targetPts)
+        glTools.utils.progressBar.update(step=60)
+
+        # Blend Weights
+        new_membership, new_weights = glTools.utils.weightTransfer.blendWeights(triVertexIds,
+                                                                                baryCoords,
+                                                                                self._data[sourceGeo]['membership'],
+                                                                                self._data[sourceGeo]['weights'])
+        glTools.utils.progressBar.update(step=30)
 
         # ========================
         # - Update Deformer Data -
         # ========================
 
-        self._data[sourceGeo]['membership'] = new_membership
-        self._data[sourceGeo]['weights'] = new_weights
+        self._data[sourceGeo]['membership'] = array.array('i', new_membership)
+        self._data[sourceGeo]['weights'] = array.array('f', new_weights)
 
         # =================
         # - Return Result -
@@ -0,0 +1,429 @@
+import array
+import cPickle
+import json
+import mmap
+import os.path
+import struct
+import sys
+
+# ==========
+# - Format -
+# ==========
+#
+# Binary data file layout (all values little-endian):
+#   Header   : magic(8s), version(H), flags(H), metadata size(I), chunk count(I)
+#   Metadata : UTF-8 JSON document describing the encoded object graph and the chunk table
+#   Chunks   : Contiguous typed arrays, each aligned to CHUNK_ALIGN bytes from the start of the data block
+
+MAGIC = 'GLTDATA\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sHHII')
+CHUNK_ALIGN = 16
+
+# Minimum list length to be stored as an array chunk (shorter lists stay inline in the metadata)
+MIN_ARRAY_LENGTH = 16
+
+# Chunk Types - {typecode: itemsize}
+CHUNK_TYPES = {'i': 4, 'f': 4, 'd': 8, 'B': 1}
+
+# Integer range for 'i' (int32) chunks
+INT_MIN = -2147483648
+INT_MAX = 2147483647
+
+
+def isBinaryFile(filePath):
+    """
+    Check if the specified file is a binary data file.
+    @param filePath: File path to check.
+    @type filePath: str
+    """
+    # Check File
+    if not os.path.isfile(filePath): return False
+
+    # Check Magic
+    f = open(filePath, 'rb')
+    magic = f.read(len(MAGIC))
+    f.close()
+
+    # Return Result
+    return magic == MAGIC
+
+
+def writeFile(filePath, dataObj):
+    """
+    Write a data object to the specified file path in binary data file format.
+    @param filePath: Target file path.
+    @type filePath: str
+    @param dataObj: Data object to write.
+    @type dataObj: object
+    """
+    # Encode Object Graph
+    chunks = []
+    meta = {'root': _encode(dataObj, chunks), 'chunks': []}
+
+    # Build Chunk Table
+    offset = 0
+    for chunk in chunks:
+        size = len(chunk) * CHUNK_TYPES[chunk.typecode]
+        meta['chunks'].append({'type': chunk.typecode, 'count': len(chunk), 'offset': offset})
+        offset += _align(size)
+
+    # Encode Metadata
+    metaStr = json.dumps(meta, separators=(',', ':'))
+    if isinstance(metaStr, unicode): metaStr = metaStr.encode('utf-8')
+
+    # Write File
+    f = open(filePath, 'wb')
+    try:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(metaStr), len(chunks)))
+        f.write(metaStr)
+        f.write('\x00' * (dataOffset(len(metaStr)) - HEADER.size - len(metaStr)))
+        for chunk in chunks:
+            if sys.byteorder == 'big': chunk.byteswap()
+            chunk.tofile(f)
+            if sys.byteorder == 'big': chunk.byteswap()
+            size = len(chunk) * CHUNK_TYPES[chunk.typecode]
+            f.write('\x00' * (_align(size) - size))
+    finally:
+        f.close()
+
+    # Return Result
+    return filePath
+
+
+def readHeader(f):
+    """
+    Read the header and metadata of a binary data file.
+    Returns the file version, metadata dictionary and the byte offset of the chunk data block.
+    @param f: Open file object, positioned at the start of the file.
+    @type f: file
+    """
+    # Read Header
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise Exception('Invalid binary data file! File header is incomplete.')
+    magic, version, flags, metaSize, chunkCount = HEADER.unpack(header)
+
+    # Check Header
+    if magic != MAGIC:
+        raise Exception('Invalid binary data file! Unrecognized file header.')
+    if version > VERSION:
+        raise Exception('Unsupported binary data file version (' + str(version) + ')!')
+
+    # Read Metadata
+    meta = json.loads(f.read(metaSize).decode('utf-8'))
+    if len(meta['chunks']) != chunkCount:
+        raise Exception('Invalid binary data file! Chunk table does not match file header.')
+
+    # Return Result
+    return version, meta, dataOffset(metaSize)
+
+
+def readFile(filePath, lazy=False):
+    """
+    Read a data object from the specified binary data file.
+    @param filePath: Source file path.
+    @type filePath: str
+    @param lazy: Memory map the file and return array chunks as read-only ArrayView objects.
+    @type lazy: bool
+    """
+    f = open(filePath, 'rb')
+    try:
+
+        # Read Header
+        version, meta, start = readHeader(f)
+
+        # Read Chunks
+        chunks = []
+        if lazy:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if meta['chunks'] else None
+            for chunkInfo in meta['chunks']:
+                chunks.append(ArrayView(buf, start + chunkInfo['offset'], str(chunkInfo['type']), chunkInfo['count']))
+        else:
+            for chunkInfo in meta['chunks']:
+                chunk = array.array(str(chunkInfo['type']))
+                f.seek(start + chunkInfo['offset'])
+                chunk.fromfile(f, chunkInfo['count'])
+                if sys.byteorder == 'big': chunk.byteswap()
+                chunks.append(chunk)
+
+    finally:
+        f.close()
+
+    # Decode Object Graph
+    return _decode(meta['root'], chunks)
+
+
+def convertFile(filePath, targetPath=''):
+    """
+    Convert a pickled data file to the binary data file format.
+    @param filePath: Pickled data file to convert.
+    @type filePath: str
+    @param targetPath: Target file path. If empty, the source file is overwritten.
+    @type targetPath: str
+    """
+    # Check File
+    if not os.path.isfile(filePath):
+        raise Exception('File "' + filePath + '" does not exist!')
+    if isBinaryFile(filePath):
+        print('File "' + filePath + '" is already a binary data file! Skipping...')
+        return filePath
+
+    # Load Pickled Data
+    f = open(filePath, 'rb')
+    dataObj = cPickle.load(f)
+    f.close()
+
+    # Write Binary Data
+    if not targetPath: targetPath = filePath
+    return writeFile(targetPath, dataObj)
+
+
+def dataOffset(metaSize):
+    """
+    Return the byte offset of the chunk data block for the given metadata size.
+    @param metaSize: Size of the encoded metadata in bytes.
+    @type metaSize: int
+    """
+    return _align(HEADER.size + metaSize)
+
+
+def _align(size):
+    """
+    Round a byte size up to the chunk alignment.
+    @param size: Byte size to align.
+    @type size: int
+    """
+    return (size + CHUNK_ALIGN - 1) // CHUNK_ALIGN * CHUNK_ALIGN
+
+
+def _arrayType(value):
+    """
+    Return the chunk typecode for a list, or None if the list should be stored inline.
+    @param value: List to check.
+    @type value: list
+    """
+    if len(value) < MIN_ARRAY_LENGTH: return None
+
+    itemType = type(value[0])
+    if itemType is float:
+        if all(type(i) is float for i in value): return 'd'
+    elif itemType is int:
+        if all(type(i) is int for i in value) and INT_MIN <= min(value) and max(value) <= INT_MAX: return 'i'
+    return None
+
+
+def _encode(value, chunks):
+    """
+    Encode a value as a JSON compatible object, appending bulk numeric lists to the chunk list.
+    @param value: Value to encode.
+    @param chunks: Chunk list to append encoded arrays to.
+    @type chunks: list
+    """
+    # Basic Types
+    if value is None or isinstance(value, (bool, int, long, float, basestring)):
+        return value
+
+    # List
+    if isinstance(value, list):
+        typecode = _arrayType(value)
+        if typecode:
+            chunks.append(array.array(typecode, value))
+            return {'__type__': 'array', 'chunk': len(chunks) - 1}
+        return [_encode(i, chunks) for i in value]
+
+    # Array
+    if isinstance(value, array.array) and CHUNK_TYPES.has_key(value.typecode):
+        chunks.append(value)
+        return {'__type__': 'array', 'chunk': len(chunks) - 1, 'keep': True}
+    if isinstance(value, ArrayView):
+        chunks.append(value.toarray())
+        return {'__type__': 'array', 'chunk': len(chunks) - 1, 'keep': value.keep}
+
+    # Tuple / Set
+    if isinstance(value, tuple):
+        return {'__type__': 'tuple', 'items': [_encode(i, chunks) for i in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'__type__': 'set', 'items': [_encode(i, chunks) for i in value]}
+
+    # Dictionary
+    if isinstance(value, dict):
+        if all(isinstance(k, basestring) for k in value.iterkeys()) and not value.has_key('__type__'):
+            return dict([(k, _encode(v, chunks)) for k, v in value.iteritems()])
+        return {'__type__': 'dict', 'items': [[_encode(k, chunks), _encode(v, chunks)] for k, v in value.iteritems()]}
+
+    # Object (new-style class instance with default pickle state)
+    if type(value) is value.__class__ and hasattr(value, '__dict__') and not hasattr(value, '__getstate__'):
+        cls = value.__class__
+        return {'__type__': 'object',
+                'class': cls.__module__ + '.' + cls.__name__,
+                'state': _encode(value.__dict__, chunks)}
+
+    # Fallback - Pickle
+    chunks.append(array.array('B', cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)))
+    return {'__type__': 'pickle', 'chunk': len(chunks) - 1}
+
+
+def _decode(value, chunks):
+    """
+    Decode a JSON compatible object (as returned by _encode()).
+    @param value: Value to decode.
+    @param chunks: Chunk list referenced by encoded arrays.
+    @type chunks: list
+    """
+    # String
+    if isinstance(value, unicode):
+        try:
+            return str(value)
+        except UnicodeEncodeError:
+            return value
+
+    # List
+    if isinstance(value, list):
+        return [_decode(i, chunks) for i in value]
+
+    # Basic Types
+    if not isinstance(value, dict):
+        return value
+
+    # Dictionary
+    valueType = value.get('__type__')
+    if not valueType:
+        return dict([(_decode(k, chunks), _decode(v, chunks)) for k, v in value.iteritems()])
+
+    # Encoded Types
+    if valueType == 'array':
+        chunk = chunks[value['chunk']]
+        if isinstance(chunk, ArrayView):
+            chunk.keep = bool(value.get('keep'))
+            return chunk
+        if value.get('keep'): return chunk
+        return chunk.tolist()
+    if valueType == 'tuple':
+        return tuple([_decode(i, chunks) for i in value['items']])
+    if valueType == 'set':
+        return set([_decode(i, chunks) for i in value['items']])
+    if valueType == 'dict':
+        return dict([(_decode(k, chunks), _decode(v, chunks)) for k, v in value['items']])
+    if valueType == 'object':
+        cls = _getClass(value['class'])
+        obj = cls.__new__(cls)
+        obj.__dict__.update(_decode(value['state'], chunks))
+        return obj
+    if valueType == 'pickle':
+        return cPickle.loads(chunks[value['chunk']].tostring())
+
+    raise Exception('Unsupported encoded value type "' + valueType + '"!')
+
+
+def _getClass(className):
+    """
+    Import and return a class from its full module path.
+    @param className: Full class path (module.Class).
+    @type className: str
+    """
+    moduleName, name = className.rsplit('.', 1)
+    __import__(moduleName)
+    return getattr(sys.modules[moduleName], name)
+
+
+class ArrayView(object):
+    """
+    Read-only sequence view of an array chunk in a memory mapped binary data file.
+    Values are only read (paged in) from the file when accessed.
+    """
+    # Number of items converted per block during iteration
+    BLOCK_SIZE = 4096
+
+    def __init__(self, buf, offset, typecode, count):
+        """
+        ArrayView class initializer.
+        @param buf: Memory mapped file buffer.
+        @type buf: mmap.mmap
+        @param offset: Byte offset of the chunk in the buffer.
+        @type offset: int
+        @param typecode: Array typecode of the chunk.
+        @type typecode: str
+        @param count: Number of items in the chunk.
+        @type count: int
+        """
+        self.buf = buf
+        self.offset = offset
+        self.typecode = typecode
+        self.itemsize = CHUNK_TYPES[typecode]
+        self.length = count
+        self.keep = False
+        self._item = struct.Struct('<' + typecode)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        # Slice
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1: return self.toarray(start, stop)[::step].tolist()
+            return self.toarray(start, stop).tolist()
+
+        # Index
+        if index < 0: index += self.length
+        if index < 0 or index >= self.length: raise IndexError('ArrayView index out of range')
+        return self._item.unpack_from(self.buf, self.offset + index * self.itemsize)[0]
+
+    def __iter__(self):
+        for start in xrange(0, self.length, self.BLOCK_SIZE):
+            for value in self.toarray(start, min(start + self.BLOCK_SIZE, self.length)):
+                yield value
+
+    def __reduce__(self):
+        # Pickle (and deepcopy) as a fully loaded list or array
+        if self.keep: return (array.array, (self.typecode, self.tolist()))
+        return (list, (self.tolist(),))
+
+    def __repr__(self):
+        return 'ArrayView(' + repr(self.typecode) + ', ' + str(self.length) + ' items)'
+
+    def index(self, value):
+        """
+        Return the index of the first occurance of the specified value.
+        @param value: Value to find.
+        """
+        for i, item in enumerate(self):
+            if item == value: return i
+        raise ValueError('ArrayView.index(x): x not in view')
+
+    def count(self, value):
+        """
+        Return the number of occurances of the specified value.
+        @param value: Value to count.
+        """
+        return self.toarray().count(value)
+
+    def tostring(self, start=0, stop=None):
+        """
+        Return the raw (little-endian) bytes for the specified item range.
+        @param start: Start item index.
+        @type start: int
+        @param stop: End item index (exclusive). If None, use the end of the chunk.
+        @type stop: int or None
+        """
+        if stop is None: stop = self.length
+        return self.buf[self.offset + start * self.itemsize:self.offset + stop * self.itemsize]
+
+    def toarray(self, start=0, stop=None):
+        """
+        Return a copy of the specified item range as an array.
+        @param start: Start item index.
+        @type start: int
+        @param stop: End item index (exclusive). If None, use the end of the chunk.
+        @type stop: int or None
+        """
+        result = array.array(self.typecode, self.tostring(start, stop))
+        if sys.byteorder == 'big': result.byteswap()
+        return result
+
+    def tolist(self):
+        """
+        Return a copy of the full chunk as a list.
+        """
+        return self.toarray().tolist()
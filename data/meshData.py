@@ -11,6 +11,8 @@ class MeshData(data.Data):
     MeshData class object.
     Contains functions to save, load and rebuild maya mesh data.
     """
+    # Store vertex, polygon and UV lists as binary array chunks
+    binaryFormat = True
 
     def __init__(self, mesh=''):
         """
@@ -116,18 +118,18 @@ class MeshData(data.Data):
         numPolygons = len(self._data['polyCounts'])
         polygonCounts = OpenMaya.MIntArray()
         polygonConnects = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(self._data['polyCounts'], polygonCounts)
-        meshUtil.createIntArrayFromList(self._data['polyConnects'], polygonConnects)
+        meshUtil.createIntArrayFromList(list(self._data['polyCounts']), polygonCounts)
+        meshUtil.createIntArrayFromList(list(self._data['polyConnects']), polygonConnects)
 
         # Rebuild UV Data
         uvCounts = OpenMaya.MIntArray()
         uvIds = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(self._data['uvCounts'], uvCounts)
-        meshUtil.createIntArrayFromList(self._data['uvIds'], uvIds)
+        meshUtil.createIntArrayFromList(list(self._data['uvCounts']), uvCounts)
+        meshUtil.createIntArrayFromList(list(self._data['uvIds']), uvIds)
         uArray = OpenMaya.MFloatArray()
         vArray = OpenMaya.MFloatArray()
-        meshUtil.createFloatArrayFromList(self._data['uArray'], uArray)
-        meshUtil.createFloatArrayFromList(self._data['vArray'], vArray)
+        meshUtil.createFloatArrayFromList(list(self._data['uArray']), uArray)
+        meshUtil.createFloatArrayFromList(list(self._data['vArray']), vArray)
 
         # Rebuild Vertex Array
         vertexArray = OpenMaya.MFloatPointArray(numVertices, OpenMaya.MFloatPoint.origin)
@@ -174,18 +176,18 @@ class MeshData(data.Data):
         numPolygons = len(self._data['polyCounts'])
         polygonCounts = OpenMaya.MIntArray()
         polygonConnects = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(self._data['polyCounts'], polygonCounts)
-        meshUtil.createIntArrayFromList(self._data['polyConnects'], polygonConnects)
+        meshUtil.createIntArrayFromList(list(self._data['polyCounts']), polygonCounts)
+        meshUtil.createIntArrayFromList(list(self._data['polyConnects']), polygonConnects)
 
         # Rebuild UV Data
         uArray = OpenMaya.MFloatArray()
         vArray = OpenMaya.MFloatArray()
-        meshUtil.createFloatArrayFromList(self._data['uArray'], uArray)
-        meshUtil.createFloatArrayFromList(self._data['vArray'], vArray)
+        meshUtil.createFloatArrayFromList(list(self._data['uArray']), uArray)
+        meshUtil.createFloatArrayFromList(list(self._data['vArray']), vArray)
         uvCounts = OpenMaya.MIntArray()
         uvIds = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(self._data['uvCounts'], uvCounts)
-        meshUtil.createIntArrayFromList(self._data['uvIds'], uvIds)
+        meshUtil.createIntArrayFromList(list(self._data['uvCounts']), uvCounts)
+        meshUtil.createIntArrayFromList(list(self._data['uvIds']), uvIds)
 
         # Rebuild Vertex Array
         vertexArray = OpenMaya.MFloatPointArray(numVertices, OpenMaya.MFloatPoint.origin)
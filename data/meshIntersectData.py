@@ -27,10 +27,6 @@ class MeshIntersectData(meshData.MeshData):
         # Start timer
         timer = cmds.timerX()
 
-        # Display Progress
-        glTools.utils.progressBar.init(status=('Building Closest Point Coord Array...'),
-                                       maxValue=int(len(ptList) * 0.1))
-
         # Rebuild Mesh Data
         meshUtil = OpenMaya.MScriptUtil()
         numVertices = len(self._data['vertexList']) / 3
@@ -58,26 +54,25 @@ class MeshIntersectData(meshData.MeshData):
         # Get Closest Point Data
         ptCount = len(ptList)
         pntList = [(0, 0, 0) for i in range(ptCount)]
-        for i in range(ptCount):
+        with glTools.utils.progressBar.Progress(status='Building Closest Point Coord Array...',
+                                                maxValue=ptCount) as progress:
+            for i in range(ptCount):
 
-            # Get Closest Point
-            mpt = glTools.utils.base.getMPoint(ptList[i])
-            meshIntersector.getClosestPoint(mpt, meshPt, self.maxDist)
+                # Get Closest Point
+                mpt = glTools.utils.base.getMPoint(ptList[i])
+                meshIntersector.getClosestPoint(mpt, meshPt, self.maxDist)
 
-            # Get Mesh Point Data
-            pt = meshPt.getPoint()
-            pntList[i] = (pt[0], pt[1], pt[2])
+                # Get Mesh Point Data
+                pt = meshPt.getPoint()
+                pntList[i] = (pt[0], pt[1], pt[2])
 
-            # Update Progress Bar (Every 10th Iteration)
-            if not i % 10: glTools.utils.progressBar.update(step=1)
+                # Update Progress Bar
+                progress.step()
 
         # =================
         # - Return Result -
         # =================
 
-        # End Progress
-        if showProgress: glTools.utils.progressBar.end()
-
         # Print timer result
         buildTime = cmds.timerX(st=timer)
         print('MeshIntersectData: Closest Point search time for mesh "' + self._data['name'] + '": ' + str(buildTime))
@@ -91,10 +86,6 @@ class MeshIntersectData(meshData.MeshData):
         # Start timer
         timer = cmds.timerX()
 
-        # Display Progress
-        glTools.utils.progressBar.init(status=('Building Closest Point Coord Array...'),
-                                       maxValue=int(len(ptList) * 0.1))
-
         # =====================
         # - Rebuild Mesh Data -
         # =====================
@@ -128,36 +119,35 @@ class MeshIntersectData(meshData.MeshData):
 
         ptCount = len(ptList)
         baryCoords = [[(0, 0), (0, 0), (0, 0)] for i in range(ptCount)]
-        for i in range(ptCount):
-
-            # Get Closest Point
-            mpt = glTools.utils.base.getMPoint(ptList[i])
-            meshIntersector.getClosestPoint(mpt, meshPt, self.maxDist)
-
-            # Get Barycentric Coords
-            uPtr = OpenMaya.MScriptUtil().asFloatPtr()
-            vPtr = OpenMaya.MScriptUtil().asFloatPtr()
-            meshPt.getBarycentricCoords(uPtr, vPtr)
-            u = OpenMaya.MScriptUtil(uPtr).asFloat()
-            v = OpenMaya.MScriptUtil(vPtr).asFloat()
-            w = 1.0 - (u + v)
-            # Get Triangle Vertex IDs
-            idPtr = OpenMaya.MScriptUtil().asIntPtr()
-            meshFn.getPolygonTriangleVertices(meshPt.faceIndex(), meshPt.triangleIndex(), idPtr)
-            baryCoords[i] = [(OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 0), u),
-                             (OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 1), v),
-                             (OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 2), w)]
-
-            # Update Progress Bar (Every 10th Iteration)
-            if not i % 10: glTools.utils.progressBar.update(step=1)
+        with glTools.utils.progressBar.Progress(status='Building Closest Point Coord Array...',
+                                                maxValue=ptCount) as progress:
+            for i in range(ptCount):
+
+                # Get Closest Point
+                mpt = glTools.utils.base.getMPoint(ptList[i])
+                meshIntersector.getClosestPoint(mpt, meshPt, self.maxDist)
+
+                # Get Barycentric Coords
+                uPtr = OpenMaya.MScriptUtil().asFloatPtr()
+                vPtr = OpenMaya.MScriptUtil().asFloatPtr()
+                meshPt.getBarycentricCoords(uPtr, vPtr)
+                u = OpenMaya.MScriptUtil(uPtr).asFloat()
+                v = OpenMaya.MScriptUtil(vPtr).asFloat()
+                w = 1.0 - (u + v)
+                # Get Triangle Vertex IDs
+                idPtr = OpenMaya.MScriptUtil().asIntPtr()
+                meshFn.getPolygonTriangleVertices(meshPt.faceIndex(), meshPt.triangleIndex(), idPtr)
+                baryCoords[i] = [(OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 0), u),
+                                 (OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 1), v),
+                                 (OpenMaya.MScriptUtil().getIntArrayItem(idPtr, 2), w)]
+
+                # Update Progress Bar
+                progress.step()
 
         # =================
         # - Return Result -
         # =================
 
-        # End Progress
-        if showProgress: glTools.utils.progressBar.end()
-
         # Print timer result
         buildTime = cmds.timerX(st=timer)
         print('MeshIntersectData: Data search time for mesh "' + self._data['name'] + '": ' + str(buildTime))
@@ -1,8 +1,12 @@
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
 import maya.OpenMayaAnim as OpenMayaAnim
+import glTools.utils.component
 import glTools.utils.deformer
+import glTools.utils.selection
 import glTools.utils.skinCluster
+import glTools.utils.sparseWeights
+import glTools.utils.weightTransfer
 import data
 import deformerData
 import meshData
@@ -38,6 +42,42 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         if not glTools.utils.skinCluster.isSkinCluster(skinCluster):
             raise Exception('Object "' + skinCluster + '" is not a valid skinCluster!')
 
+    def getWeightData(self):
+        """
+        Return the sparse weight data (glTools.utils.sparseWeights.SparseWeights) for the skinCluster geometry.
+        Dense per influence weight lists stored by older versions of SkinClusterData are converted on first access.
+        """
+        # Get Skin Geometry Data
+        skinGeo = self._data['affectedGeometry'][0]
+        if not self._data.has_key(skinGeo):
+            raise Exception('SkinClusterData: No skin geometry data for affected geometry "' + skinGeo + '"!')
+        weights = self._data[skinGeo].get('weights')
+
+        # Convert Legacy Influence Weights
+        if not isinstance(weights, glTools.utils.sparseWeights.SparseWeights):
+            influenceList = [inf for inf in self._influenceData.keys() if self._influenceData[inf].has_key('wt')]
+            weights = glTools.utils.sparseWeights.SparseWeights.fromInfluenceWeights(
+                [self._influenceData[inf].pop('wt') for inf in influenceList], influenceList)
+            self._data[skinGeo]['weights'] = weights
+
+        # Return Result
+        return weights
+
+    def getInfluenceWeights(self, influence):
+        """
+        Return a dense list of stored weight values (one per component) for the specified influence.
+        @param influence: Influence to get weights for.
+        @type influence: str
+        """
+        # Check Influence
+        if not self._influenceData.has_key(influence):
+            raise Exception('No influence data stored for "' + influence + '"!')
+
+        # Get Weights
+        weights = self.getWeightData()
+        if not weights.hasInfluence(influence): return [0.0] * weights.pointCount()
+        return weights.getInfluenceWeights(influence)
+
     def buildData(self, skinCluster):
         """
         Build skinCluster data and store as class object dictionary entries
@@ -95,8 +135,15 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         if not influenceList: raise Exception(
             'Unable to determine influence list for skinCluster "' + skinCluster + '"!')
 
-        # Get Influence Wieghts
-        weights = glTools.utils.skinCluster.getInfluenceWeightsAll(skinCluster)
+        # Get Influence Weights (physical influence order)
+        skinFn = glTools.utils.skinCluster.getSkinClusterFn(skinCluster)
+        componentSel = glTools.utils.selection.getSelectionElement(
+            glTools.utils.component.getComponentStrList(skinGeo), 0)
+        weightList = OpenMaya.MDoubleArray()
+        infCountUtil = OpenMaya.MScriptUtil(0)
+        infCountPtr = infCountUtil.asUintPtr()
+        skinFn.getWeights(componentSel[0], componentSel[1], weightList, infCountPtr)
+        physicalInfluenceList = [None] * OpenMaya.MScriptUtil(infCountPtr).asUint()
 
         # For each influence
         for influence in influenceList:
@@ -127,9 +174,13 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
             else:
                 self._influenceData[influence]['type'] = 0
 
-            # Get Influence Weights
+            # Get Influence Physical Index
             pInd = glTools.utils.skinCluster.getInfluencePhysicalIndex(skinCluster, influence)
-            self._influenceData[influence]['wt'] = weights[pInd]
+            physicalInfluenceList[pInd] = influence
+
+        # Store Sparse Weights
+        self._data[skinGeo]['weights'] = glTools.utils.sparseWeights.SparseWeights.fromWeightArray(weightList,
+                                                                                                  physicalInfluenceList)
 
         # =========================
         # - Custom Attribute Data -
@@ -316,12 +367,7 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # Build master weight array
         wtArray = OpenMaya.MDoubleArray()
         oldWtArray = OpenMaya.MDoubleArray()
-        for c in componentIndexList:
-            for i in range(len(influenceList)):
-                if self._influenceData.has_key(influenceList[i]):
-                    wtArray.append(self._influenceData[influenceList[i]]['wt'][c])
-                else:
-                    wtArray.append(0.0)
+        [wtArray.append(wt) for wt in self.getWeightData().toWeightArray(influenceList, componentIndexList)]
 
         # Get skinCluster function set
         skinFn = glTools.utils.skinCluster.getSkinClusterFn(skinCluster)
@@ -400,12 +446,7 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # Build Weight Array
         wtArray = OpenMaya.MDoubleArray()
         oldWtArray = OpenMaya.MDoubleArray()
-        for c in componentIndexList:
-            for i in range(len(influenceList)):
-                if self._influenceData.has_key(influenceList[i]):
-                    wtArray.append(self._influenceData[influenceList[i]]['wt'][c])
-                else:
-                    wtArray.append(0.0)
+        [wtArray.append(wt) for wt in self.getWeightData().toWeightArray(influenceList, componentIndexList)]
 
         # Get skinCluster function set
         skinFn = glTools.utils.skinCluster.getSkinClusterFn(skinCluster)
@@ -434,8 +475,10 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
             raise Exception('No influence data for "' + inf2 + '"! Unable to swap weights...')
 
         # Swap Weights
-        self._influenceData[inf1]['wt'][:], self._influenceData[inf2]['wt'][:] = self._influenceData[inf2]['wt'][:], \
-                                                                                 self._influenceData[inf1]['wt'][:]
+        weights = self.getWeightData()
+        weights.addInfluence(inf1)
+        weights.addInfluence(inf2)
+        weights.swapInfluences(inf1, inf2)
 
         # Return Result
         print('SkinClusterData: Swap Weights Complete - "' + inf1 + '" <> "' + inf2 + '"')
@@ -461,13 +504,9 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
             raise Exception('Invalid mode value ("' + mode + '")!')
 
         # Move Weights
-        sourceWt = self._influenceData[sourceInf]['wt']
-        targetWt = self._influenceData[targetInf]['wt']
-        if mode == 'add':
-            self._influenceData[targetInf]['wt'] = [i[0] + i[1] for i in zip(sourceWt, targetWt)]
-        elif mode == 'replace':
-            self._influenceData[targetInf]['wt'] = [i for i in sourceWt]
-        self._influenceData[sourceInf]['wt'] = [0.0 for i in sourceWt]
+        weights = self.getWeightData()
+        weights.addInfluence(sourceInf)
+        weights.moveInfluence(sourceInf, targetInf, mode=mode)
 
         # Return Result
         print('SkinClusterData: Move Weights Complete - "' + sourceInf + '" >> "' + targetInf + '"')
@@ -488,8 +527,13 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # raise Exception('No data stored for influence "'+oldInfluence+'" in skinCluster "'+self._data['name']+'"!')
 
         # Update influence data
+        weights = self.getWeightData()
         self._influenceData[newInfluence] = self._influenceData[oldInfluence]
         self._influenceData.pop(oldInfluence)
+        if weights.hasInfluence(oldInfluence):
+            weights.renameInfluence(oldInfluence, newInfluence)
+        elif weights.hasInfluence(newInfluence):
+            weights.removeInfluence(newInfluence)
 
         # Print message
         print('Remapped influence "' + oldInfluence + '" to "' + newInfluence + '" for skinCluster "' + self._data[
@@ -509,6 +553,7 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # - Check Source Influences -
         # ===========================
 
+        weights = self.getWeightData()
         skipSource = []
         for i in range(len(sourceInfluenceList)):
 
@@ -532,7 +577,6 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # - Combine Influence Data -
         # ==========================
 
-        wtList = []
         for i in range(len(sourceInfluenceList)):
 
             # Get Source Influence
@@ -566,25 +610,12 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
                     if self._influenceData[targetInfluence].has_key('nurbsSamples'):
                         self._influenceData[targetInfluence].pop('nurbsSamples')
 
-                # Get Source Influence Weights
-                wtList = self._influenceData[sourceInfluence]['wt']
-
-            else:
-
-                if wtList:
-
-                    # Combine Source Influence Weights
-                    wtList = [(x + y) for x, y in zip(wtList, self._influenceData[sourceInfluence]['wt'])]
-
-                else:
-
-                    wtList = self._influenceData[sourceInfluence]['wt']
-
         # ==================================
         # - Assign Combined Source Weights -
         # ==================================
 
-        self._influenceData[targetInfluence]['wt'] = wtList
+        sourceList = [inf for inf in sourceInfluenceList if not skipSource.count(inf) and weights.hasInfluence(inf)]
+        weights.combineInfluences(sourceList, targetInfluence)
 
         # =======================================
         # - Remove Unused Source Influence Data -
@@ -602,6 +633,7 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
                 if sourceInfluence != targetInfluence:
                     # Remove Unused Source Influence
                     self._influenceData.pop(sourceInfluence)
+                    if weights.hasInfluence(sourceInfluence): weights.removeInfluence(sourceInfluence)
 
     def remapGeometry(self, geometry):
         """
@@ -636,7 +668,7 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         Rebuild the skinCluster deformer membership and weight arrays for the specified geometry using the stored world space geometry data.
         @param targetGeo: Geometry to rebuild world space deformer data for. If empty, use sourceGeo.
         @type targetGeo: str
-        @param method: Method for worldSpace transfer. Valid options are "closestPoint" and "normalProject".
+        @param method: Method for worldSpace transfer. Only "closestPoint" is currently supported.
         @type method: str
         """
         # Start timer
@@ -655,6 +687,11 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         # Target Geometry
         if not targetGeo: targetGeo = sourceGeo
 
+        # Check Method
+        if method != 'closestPoint':
+            glTools.utils.progressBar.end()
+            raise Exception('Unsupported world space transfer method "' + method + '"!')
+
         # Check Deformer Data
         if not self._data.has_key(sourceGeo):
             glTools.utils.progressBar.end()
@@ -684,8 +721,8 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         numPolygons = len(meshData['polyCounts'])
         polygonCounts = OpenMaya.MIntArray()
         polygonConnects = OpenMaya.MIntArray()
-        meshUtil.createIntArrayFromList(meshData['polyCounts'], polygonCounts)
-        meshUtil.createIntArrayFromList(meshData['polyConnects'], polygonConnects)
+        meshUtil.createIntArrayFromList(list(meshData['polyCounts']), polygonCounts)
+        meshUtil.createIntArrayFromList(list(meshData['polyConnects']), polygonConnects)
 
         # Rebuild Vertex Array
         vertexArray = OpenMaya.MFloatPointArray(numVertices, OpenMaya.MFloatPoint.origin)
@@ -697,82 +734,26 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
         meshDataFn = OpenMaya.MFnMeshData().create()
         meshObj = meshFn.create(numVertices, numPolygons, vertexArray, polygonCounts, polygonConnects, meshDataFn)
 
-        # Create Mesh Intersector
-        meshPt = OpenMaya.MPointOnMesh()
-        meshIntersector = OpenMaya.MMeshIntersector()
-        if method == 'closestPoint': meshIntersector.create(meshObj)
-
         # ========================================
         # - Rebuild Weights and Membership List -
         # ========================================
 
-        # Initialize Influence Weights and Membership
-        influenceList = self._influenceData.keys()
-        influenceWt = [[] for inf in influenceList]
-        membership = set([])
-
-        # Get Target Mesh Data
+        # Get Target Mesh Points
         targetMeshFn = glTools.utils.mesh.getMeshFn(targetGeo)
-        targetMeshPts = targetMeshFn.getRawPoints()
-        numTargetVerts = targetMeshFn.numVertices()
-        targetPtUtil = OpenMaya.MScriptUtil()
-
-        # Initialize Float Pointers for Barycentric Coords
-        uUtil = OpenMaya.MScriptUtil(0.0)
-        vUtil = OpenMaya.MScriptUtil(0.0)
-        uPtr = uUtil.asFloatPtr()
-        vPtr = vUtil.asFloatPtr()
-
-        # Get Progress Step
-        progressInd = int(numTargetVerts * 0.01)
-        if progressInd < 1: progressInd = 1
-
-        for i in range(numTargetVerts):
-
-            # Get Target Point
-            targetPt = OpenMaya.MPoint(targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 0),
-                                       targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 1),
-                                       targetPtUtil.getFloatArrayItem(targetMeshPts, (i * 3) + 2))
-
-            # Get Closest Point Data
-            meshIntersector.getClosestPoint(targetPt, meshPt)
-
-            # Get Barycentric Coords
-            meshPt.getBarycentricCoords(uPtr, vPtr)
-            u = OpenMaya.MScriptUtil(uPtr).asFloat()
-            v = OpenMaya.MScriptUtil(vPtr).asFloat()
-            baryWt = [u, v, 1.0 - (u + v)]
-
-            # Get Triangle Vertex IDs
-            idUtil = OpenMaya.MScriptUtil([0, 1, 2])
-            idPtr = idUtil.asIntPtr()
-            meshFn.getPolygonTriangleVertices(meshPt.faceIndex(), meshPt.triangleIndex(), idPtr)
-            triId = [OpenMaya.MScriptUtil().getIntArrayItem(idPtr, n) for n in range(3)]
-            memId = [self._data[sourceGeo]['membership'].count(t) for t in triId]
-            wtId = [self._data[sourceGeo]['membership'].index(t) for t in triId]
-
-            # For Each Influence
-            for inf in range(len(influenceList)):
-
-                # Calculate Weight and Membership
-                wt = 0.0
-                isMember = False
-                for n in range(3):
-
-                    # Check Against Source Membership
-                    if memId[n]:
-                        wt += self._influenceData[influenceList[inf]]['wt'][wtId[n]] * baryWt[n]
-                        isMember = True
-
-                # Check Member
-                if isMember:
-                    # Append Weight Value
-                    influenceWt[inf].append(wt)
-                    # Append Membership
-                    membership.add(i)
-
-            # Update Progress Bar
-            if not i % progressInd: glTools.utils.progressBar.update(step=1)
+        targetPts = OpenMaya.MPointArray()
+        targetMeshFn.getPoints(targetPts)
+        glTools.utils.progressBar.update(step=10)
+
+        # Get Closest Source Triangles
+        triVertexIds, baryCoords = glTools.utils.weightTransfer.getClosestTriangles(meshObj, targetPts)
+        glTools.utils.progressBar.update(step=60)
+
+        # Blend Weights (all influences)
+        membership, weights = glTools.utils.weightTransfer.blendSparseWeights(triVertexIds,
+                                                                              baryCoords,
+                                                                              self._data[sourceGeo]['membership'],
+                                                                              self.getWeightData())
+        glTools.utils.progressBar.update(step=30)
 
         # ========================
         # - Update Deformer Data -
@@ -790,9 +771,8 @@ class SkinClusterData(deformerData.MultiInfluenceDeformerData):
             self._data['name'] = prefix + '_skinCluster'
 
         # Update Membership and Weights
-        self._data[sourceGeo]['membership'] = list(membership)
-        for inf in range(len(influenceList)):
-            self._influenceData[influenceList[inf]]['wt'] = influenceWt[inf]
+        self._data[targetGeo]['membership'] = membership
+        self._data[targetGeo]['weights'] = weights
 
         # =================
         # - Return Result -
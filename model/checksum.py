@@ -1,10 +1,31 @@
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
+import glTools.utils.batchJob
 import glTools.utils.mesh
 import glTools.utils.shader
+import array
 import hashlib
+import json
+import os
 import os.path
+import shutil
+import sys
+import tempfile
+import time
 
+# Checksum index version. Increment to re-index all files indexed with buildChecksumIndex().
+CHECKSUM_INDEX_VERSION = 1
+
+# Default point/UV position quantization tolerance
+DEFAULT_TOLERANCE = 0.0001
+
+# Per mesh checksum keys
+CHECKSUM_KEYS = ('topology', 'points', 'uvs', 'shading')
+
+
+# =============
+# - Checksums -
+# =============
 
 def checksum_mesh(mesh):
     """
@@ -16,74 +37,102 @@ def checksum_mesh(mesh):
     if not glTools.utils.mesh.isMesh(mesh):
         raise Exception('Object ' + mesh + ' is not a valid polygon mesh!')
 
-    # Get Mesh Face Vertices
-    vtxCnt = OpenMaya.MIntArray()
-    vtxList = OpenMaya.MIntArray()
-    glTools.utils.mesh.getMeshFn(mesh).getVertices(vtxCnt, vtxList)
-
     # Generate Checksum
     m = hashlib.md5()
-    m.update(str(list(vtxList)))
-    hexVal = m.hexdigest()
+    _hashTopology(m, glTools.utils.mesh.getMeshFn(mesh))
 
     # Return Checksum Hash
-    return hexVal
+    return m.hexdigest()
 
 
-def checksum_meshPointPositions(mesh):
+def checksum_meshPointPositions(mesh, tolerance=DEFAULT_TOLERANCE):
     """
-    Generate a checksum based n mesh raw point positions
+    Generate a checksum based on mesh point positions (object space).
+    Positions are quantized to the specified tolerance before hashing.
     @param mesh: Input mesh to generate checksum for
+    @type mesh: str
+    @param tolerance: Point position quantization tolerance
+    @type tolerance: float
     """
-    pts = glTools.utils.mesh.getPoints(mesh)
-    print pts
+    # Check Mesh
+    if not glTools.utils.mesh.isMesh(mesh):
+        raise Exception('Object ' + mesh + ' is not a valid polygon mesh!')
 
     # Generate Checksum
     m = hashlib.md5()
-    m.update(str(pts))
-    hexVal = m.hexdigest()
+    _hashPoints(m, mesh, tolerance)
 
     # Return Checksum Hash
-    return hexVal
+    return m.hexdigest()
 
 
-def checksum_meshUV(mesh):
+def checksum_meshUV(mesh, tolerance=DEFAULT_TOLERANCE):
     """
-    Generate a checksum string basd upon uv positions of the specified mesh
-    @param mesh:Polygon mesh to return uv checksum
+    Generate a checksum string based upon the UV positions and assignments of all UV sets of the specified mesh.
+    UV positions are quantized to the specified tolerance before hashing.
+    @param mesh: Polygon mesh to return uv checksum
     @type mesh: str
+    @param tolerance: UV position quantization tolerance
+    @type tolerance: float
     """
     # Check Mesh
     if not glTools.utils.mesh.isMesh(mesh):
         raise Exception('Object ' + mesh + ' is not a valid polygon mesh!')
 
-    # Get U and V positions as lists
-    uvArrays=glTools.utils.mesh.getUVs(mesh)
-
-
     # Generate Checksum
     m = hashlib.md5()
-    m.update(str(list(uvArrays[0]+uvArrays[1])))
-    hexVal = m.hexdigest()
+    _hashUVs(m, glTools.utils.mesh.getMeshFn(mesh), tolerance)
 
     # Return Checksum Hash
-    return hexVal
+    return m.hexdigest()
+
 
 def checksum_shadingGrpup(mesh):
     """
-    Create a checksum dictionary from SG of specified mesh
+    Generate a checksum string based upon the per face shading group assignments of the specified mesh.
     @param mesh: mesh to get SG hash form
+    @type mesh: str
     """
-    sg=glTools.utils.shader.getSG(mesh)
-    print sg
+    # Check Mesh
+    if not glTools.utils.mesh.isMesh(mesh):
+        raise Exception('Object ' + mesh + ' is not a valid polygon mesh!')
 
     # Generate Checksum
     m = hashlib.md5()
-    m.update(sg[0])
-    hexVal = m.hexdigest()
+    _hashShading(m, glTools.utils.mesh.getMeshFn(mesh))
 
     # Return Checksum Hash
-    return hexVal
+    return m.hexdigest()
+
+
+def checksum_meshAll(mesh, tolerance=DEFAULT_TOLERANCE):
+    """
+    Generate a checksum dictionary for the specified mesh, containing topology, point, uv and shading checksums
+    as well as the mesh vertex and face counts.
+    @param mesh: Polygon mesh to return checksums for
+    @type mesh: str
+    @param tolerance: Point and UV position quantization tolerance
+    @type tolerance: float
+    """
+    # Check Mesh
+    if not glTools.utils.mesh.isMesh(mesh):
+        raise Exception('Object ' + mesh + ' is not a valid polygon mesh!')
+
+    # Get MFnMesh
+    meshFn = glTools.utils.mesh.getMeshFn(mesh)
+
+    # Generate Checksums
+    checksums = {'vertexCount': meshFn.numVertices(), 'faceCount': meshFn.numPolygons()}
+    for key, hashFn, args in [('topology', _hashTopology, (meshFn,)),
+                              ('points', _hashPoints, (mesh, tolerance)),
+                              ('uvs', _hashUVs, (meshFn, tolerance)),
+                              ('shading', _hashShading, (meshFn,))]:
+        m = hashlib.md5()
+        hashFn(m, *args)
+        checksums[key] = m.hexdigest()
+
+    # Return Result
+    return checksums
 
 
 def checksum_meshDict(meshList):
@@ -119,6 +168,19 @@ def checksum_meshDict(meshList):
     return checksum_dict
 
 
+def checksum_sceneDict(tolerance=DEFAULT_TOLERANCE):
+    """
+    Create a {meshTransform: checksums} dictionary of all non intermediate meshes in the current scene.
+    See checksum_meshAll().
+    @param tolerance: Point and UV position quantization tolerance
+    @type tolerance: float
+    """
+    checksum_dict = {}
+    for meshShape in cmds.ls(type='mesh', ni=True, l=True) or []:
+        meshTransform = cmds.listRelatives(meshShape, p=True, pa=True)[0]
+        checksum_dict[meshTransform] = checksum_meshAll(meshShape, tolerance=tolerance)
+    return checksum_dict
+
 
 def checksum_meshDict_fromFile(filePath):
     """
@@ -143,17 +205,391 @@ def checksum_meshDict_fromFile(filePath):
     return checksum_dict
 
 
-def checksum_meshDict_compare(fileList):
+# ==================
+# - Checksum Index -
+# ==================
+
+def buildChecksumIndex(fileList, indexFile, processes=4, tolerance=DEFAULT_TOLERANCE, force=False,
+                       executable='mayapy', logDir='', verbose=True):
     """
-    Create a checksum dictionary from the specified maya file.
+    Incrementally index the mesh checksums (see checksum_sceneDict()) of a list of maya files.
+    Results are stored in a persistent JSON index keyed by file path, and only files that are new or have a changed
+    modification time or size (or were indexed with a different tolerance) are re-indexed.
+    Files are indexed using multiple headless maya worker processes.
+    This function does not use the current maya session, and can be called from a standalone python session.
+    Returns the index file entries ({filePath: {'mtime', 'size', 'meshes', 'error'}}) for the specified files.
+    @param fileList: List of maya files to index.
+    @type fileList: list
+    @param indexFile: Checksum index file.
+    @type indexFile: str
+    @param processes: Maximum number of concurrent worker processes.
+    @type processes: int
+    @param tolerance: Point and UV position quantization tolerance
+    @type tolerance: float
+    @param force: Re-index all files, even if they are up to date.
+    @type force: bool
+    @param executable: Worker python executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param logDir: Worker log directory. If empty, use a "<indexFile>_logs" directory next to the index file.
+    @type logDir: str
+    @param verbose: Print index status.
+    @type verbose: bool
+    """
+    # ==========
+    # - Checks -
+    # ==========
+
+    fileList = [os.path.abspath(i) for i in fileList]
+    for filePath in fileList:
+        if not os.path.isfile(filePath):
+            raise Exception('No valid file at location "' + filePath + '"!')
+
+    # ==========================
+    # - Find Out Of Date Files -
+    # ==========================
+
+    index = readChecksumIndex(indexFile)
+    if index.get('tolerance') != tolerance: index['files'] = {}
+    index['tolerance'] = tolerance
+
+    indexList = []
+    fileInfo = {}
+    for filePath in fileList:
+        stat = os.stat(filePath)
+        fileInfo[filePath] = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        entry = index['files'].get(filePath)
+        if not force and entry and not entry.get('error'):
+            if entry.get('mtime') == stat.st_mtime and entry.get('size') == stat.st_size: continue
+        if not filePath in indexList: indexList.append(filePath)
+
+    if verbose:
+        print('Checksum index: ' + str(len(indexList)) + ' of ' + str(len(fileInfo)) + ' files out of date')
+
+    # ===============
+    # - Index Files -
+    # ===============
+
+    results = {}
+    if indexList:
+        if not logDir:
+            logDir = os.path.join(os.path.splitext(indexFile)[0] + '_logs', time.strftime('%Y%m%d_%H%M%S'))
+        results = indexChecksumFiles(indexList, processes=processes, tolerance=tolerance,
+                                     executable=executable, logDir=logDir)
+
+    # ================
+    # - Update Index -
+    # ================
+
+    for filePath in indexList:
+        result = results.get(filePath) or {'meshes': {}, 'error': 'No result from worker process'}
+        if result['error'] and verbose:
+            print('ERROR: File "' + filePath + '" failed! ' + result['error'])
+        entry = dict(fileInfo[filePath])
+        entry['meshes'] = result['meshes']
+        entry['error'] = result['error']
+        index['files'][filePath] = entry
+
+    writeChecksumIndex(indexFile, index)
+
+    # =================
+    # - Return Result -
+    # =================
+
+    return dict([(filePath, index['files'][filePath]) for filePath in fileInfo])
+
+
+def indexChecksumFiles(fileList, processes=4, tolerance=DEFAULT_TOLERANCE, executable='mayapy', logDir=''):
+    """
+    Generate mesh checksums for a list of maya files using multiple headless maya worker processes.
+    Files are distributed across workers by file size. Returns a {filePath: result} dictionary,
+    where each result is a dictionary with "meshes" and "error" keys.
+    @param fileList: List of maya files to index.
+    @type fileList: list
+    @param processes: Maximum number of concurrent worker processes.
+    @type processes: int
+    @param tolerance: Point and UV position quantization tolerance
+    @type tolerance: float
+    @param executable: Worker python executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param logDir: Worker job, result and log directory.
+    @type logDir: str
+    """
+    # Check Log Directory
+    if not logDir: raise Exception('No worker log directory specified!')
+    if not os.path.isdir(logDir): os.makedirs(logDir)
+    if isinstance(executable, basestring): executable = [executable]
+
+    # Distribute Files (largest first, to the worker with the least work)
+    workerCount = max(1, min(processes, len(fileList)))
+    workerFiles = [[] for i in range(workerCount)]
+    workerSize = [0] * workerCount
+    for filePath in sorted(fileList, key=os.path.getsize, reverse=True):
+        n = workerSize.index(min(workerSize))
+        workerFiles[n].append(filePath)
+        workerSize[n] += os.path.getsize(filePath)
+
+    # Build Worker Jobs
+    jobList = []
+    resultFiles = []
+    for n, files in enumerate(workerFiles):
+        name = 'checksumWorker' + str(n).zfill(2)
+        jobFile = os.path.join(logDir, name + '.job.json')
+        resultFile = os.path.join(logDir, name + '.result.json')
+        f = open(jobFile, 'w')
+        json.dump({'tolerance': tolerance, 'resultFile': resultFile, 'files': files}, f, indent=2)
+        f.close()
+        if os.path.isfile(resultFile): os.remove(resultFile)
+        cmd = executable + ['-m', 'glTools.model.checksum', jobFile]
+        jobList.append(glTools.utils.batchJob.Job(name, cmd))
+        resultFiles.append(resultFile)
+
+    # Run Workers
+    backend = glTools.utils.batchJob.LocalBackend(slots=workerCount)
+    scheduler = glTools.utils.batchJob.Scheduler(jobList, backend=backend, logDir=logDir,
+                                                 reportFile=os.path.join(logDir, 'report.json'))
+    scheduler.run()
+
+    # Collect Results
+    results = {}
+    for resultFile in resultFiles:
+        if not os.path.isfile(resultFile): continue
+        f = open(resultFile, 'r')
+        results.update(json.load(f))
+        f.close()
+
+    # Return Result
+    return results
+
+
+def readChecksumIndex(indexFile):
+    """
+    Read a checksum index file. Returns an empty index if the file does not exist or is out of date.
+    @param indexFile: Checksum index file to read.
+    @type indexFile: str
+    """
+    index = {'version': CHECKSUM_INDEX_VERSION, 'tolerance': None, 'files': {}}
+    if not os.path.isfile(indexFile): return index
+    f = open(indexFile, 'r')
+    try:
+        data = json.load(f)
+    except ValueError:
+        print('Invalid checksum index "' + indexFile + '"! Re-indexing all files...')
+        data = {}
+    f.close()
+    if data.get('version') != CHECKSUM_INDEX_VERSION: return index
+    index.update(data)
+    return index
+
+
+def writeChecksumIndex(indexFile, index):
+    """
+    Write a checksum index file.
+    @param indexFile: Checksum index file to write.
+    @type indexFile: str
+    @param index: Checksum index data.
+    @type index: dict
+    """
+    indexDir = os.path.dirname(os.path.abspath(indexFile))
+    if not os.path.isdir(indexDir): os.makedirs(indexDir)
+    tmpFile = indexFile + '.tmp'
+    f = open(tmpFile, 'w')
+    json.dump(index, f, indent=2, sort_keys=True)
+    f.close()
+    if os.path.isfile(indexFile): os.remove(indexFile)
+    os.rename(tmpFile, indexFile)
+
+
+# ===========
+# - Compare -
+# ===========
+
+def checksum_compare(meshDictA, meshDictB, keys=CHECKSUM_KEYS):
+    """
+    Compare two {mesh: checksums} dictionaries (see checksum_sceneDict()), and return a diff dictionary:
+        {'added': [mesh, ...], 'removed': [mesh, ...], 'changed': {mesh: [key, ...]}, 'unchanged': [mesh, ...]}
+    @param meshDictA: Source mesh checksum dictionary.
+    @type meshDictA: dict
+    @param meshDictB: Target mesh checksum dictionary.
+    @type meshDictB: dict
+    @param keys: Checksum keys to compare.
+    @type keys: list
+    """
+    diff = {'added': sorted([i for i in meshDictB if not i in meshDictA]),
+            'removed': sorted([i for i in meshDictA if not i in meshDictB]),
+            'changed': {},
+            'unchanged': []}
+    for mesh in sorted([i for i in meshDictA if i in meshDictB]):
+        checksumA = meshDictA[mesh]
+        checksumB = meshDictB[mesh]
+        changed = [key for key in keys if checksumA.get(key) != checksumB.get(key)]
+        if changed:
+            diff['changed'][mesh] = changed
+        else:
+            diff['unchanged'].append(mesh)
+    return diff
+
+
+def checksum_meshDict_compare(fileList, indexFile='', processes=4, tolerance=DEFAULT_TOLERANCE,
+                              executable='mayapy', logDir='', verbose=True):
+    """
+    Generate and compare mesh checksum dictionaries for a list of maya files (ie. versions of the same asset).
+    Each file is compared to the previous file in the list. Returns a list of (fileA, fileB, diff) items.
+    See checksum_compare().
     @param fileList: List of file paths to generate and compare checksum dictionaries for.
     @type fileList: list
+    @param indexFile: Checksum index file. If empty, a temporary index is used.
+    @type indexFile: str
+    @param processes: Maximum number of concurrent worker processes.
+    @type processes: int
+    @param tolerance: Point and UV position quantization tolerance
+    @type tolerance: float
+    @param executable: Worker python executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param logDir: Worker log directory.
+    @type logDir: str
+    @param verbose: Print index status.
+    @type verbose: bool
+    """
+    # Check File List
+    if len(fileList) < 2: return []
+
+    # Index Files
+    tmpDir = ''
+    if not indexFile:
+        tmpDir = tempfile.mkdtemp(prefix='checksum_')
+        indexFile = os.path.join(tmpDir, 'checksumIndex.json')
+    try:
+        entries = buildChecksumIndex(fileList, indexFile, processes=processes, tolerance=tolerance,
+                                     executable=executable, logDir=logDir, verbose=verbose)
+    finally:
+        if tmpDir: shutil.rmtree(tmpDir, ignore_errors=True)
+
+    # Compare Files
+    fileList = [os.path.abspath(i) for i in fileList]
+    result = []
+    for n in range(1, len(fileList)):
+        fileA = fileList[n - 1]
+        fileB = fileList[n]
+        for filePath in (fileA, fileB):
+            if entries[filePath]['error']:
+                raise Exception('Unable to compare "' + filePath + '"! ' + entries[filePath]['error'])
+        result.append((fileA, fileB, checksum_compare(entries[fileA]['meshes'], entries[fileB]['meshes'])))
+
+    # Return Result
+    return result
+
+
+# ===========
+# - Hashing -
+# ===========
+
+def _hashArray(m, values):
+    """
+    Update a hash object with the raw (little-endian) bytes of a typed array.
+    """
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    m.update(values)
+
+
+def _quantize(values, tolerance):
+    """
+    Quantize a list of float values to the specified tolerance, as a double array of integral values.
     """
-    pass
+    scale = 1.0 / tolerance
+    return array.array('d', [round(v * scale) + 0.0 for v in values])
 
-mesh= cmds.ls(sl = True)
-sum1 = checksum_meshPointPositions(mesh[0])
-print sum1
 
-checksum_shadingGrpup(mesh[0])
+def _hashTopology(m, meshFn):
+    """
+    Update a hash object with the face vertex counts and indices of a mesh.
+    """
+    vtxCnt = OpenMaya.MIntArray()
+    vtxList = OpenMaya.MIntArray()
+    meshFn.getVertices(vtxCnt, vtxList)
+    _hashArray(m, array.array('i', [meshFn.numVertices()]))
+    _hashArray(m, array.array('i', vtxCnt))
+    _hashArray(m, array.array('i', vtxList))
+
+
+def _hashPoints(m, mesh, tolerance):
+    """
+    Update a hash object with the quantized object space point positions of a mesh.
+    """
+    pts = []
+    if glTools.utils.mesh.getMeshFn(mesh).numVertices():
+        pts = cmds.xform(mesh + '.vtx[*]', q=True, os=True, t=True) or []
+    _hashArray(m, _quantize(pts, tolerance))
+
+
+def _hashUVs(m, meshFn, tolerance):
+    """
+    Update a hash object with the quantized UV positions and face UV assignments of all UV sets of a mesh.
+    """
+    uvSets = []
+    meshFn.getUVSetNames(uvSets)
+    for uvSet in uvSets:
+        uArray = OpenMaya.MFloatArray()
+        vArray = OpenMaya.MFloatArray()
+        uvCounts = OpenMaya.MIntArray()
+        uvIds = OpenMaya.MIntArray()
+        meshFn.getUVs(uArray, vArray, uvSet)
+        meshFn.getAssignedUVs(uvCounts, uvIds, uvSet)
+        m.update(uvSet + '\0')
+        _hashArray(m, _quantize(uArray, tolerance))
+        _hashArray(m, _quantize(vArray, tolerance))
+        _hashArray(m, array.array('i', uvCounts))
+        _hashArray(m, array.array('i', uvIds))
+
+
+def _hashShading(m, meshFn):
+    """
+    Update a hash object with the shading group names and per face shading group indices of a mesh.
+    """
+    shaders = OpenMaya.MObjectArray()
+    indices = OpenMaya.MIntArray()
+    meshFn.getConnectedShaders(meshFn.dagPath().instanceNumber(), shaders, indices)
+    for i in range(shaders.length()):
+        m.update(OpenMaya.MFnDependencyNode(shaders[i]).name() + '\0')
+    _hashArray(m, array.array('i', indices))
+
+
+# ==========
+# - Worker -
+# ==========
+
+def _runWorker(jobFile):
+    """
+    Headless worker process entry. Generate mesh checksums for all files listed in the job file, writing per file
+    results to the job result file. Returns the process exit code.
+    """
+    # Read Job
+    f = open(jobFile, 'r')
+    job = json.load(f)
+    f.close()
+
+    # Initialize Maya
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    # Index Files
+    results = {}
+    for filePath in job['files']:
+        try:
+            cmds.file(filePath, o=True, prompt=False, force=True)
+            results[filePath] = {'meshes': checksum_sceneDict(tolerance=job['tolerance']), 'error': ''}
+        except Exception, e:
+            results[filePath] = {'meshes': {}, 'error': str(e)}
+
+        # Write Results
+        f = open(job['resultFile'], 'w')
+        json.dump(results, f)
+        f.close()
+
+    # Return Result
+    return int(not all([not i['error'] for i in results.values()]))
+
 
+if __name__ == '__main__':
+    sys.exit(_runWorker(sys.argv[1]))
@@ -1,5 +1,7 @@
 import maya.mel as mel
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import glTools.model.validate
 import glTools.utils.attribute
 import glTools.utils.cleanup
 import glTools.utils.mesh
@@ -50,50 +52,137 @@ def getMeshList(meshList=[]):
     return meshList
 
 
-# ==========
-# - Checks -
-# ==========
+# =============
+# - Snapshots -
+# =============
+
+def getMeshSnapshot(meshShape, name='', mesh='', fields=None):
+    """
+    Extract the topology, vertex tweak, UV and locked normal data of a mesh shape to a MeshSnapshot.
+    See glTools.model.validate.
+    @param meshShape: Mesh shape to extract data from.
+    @type meshShape: str
+    @param name: Snapshot node name, used to build component names. If empty, use the mesh shape name.
+    @type name: str
+    @param mesh: Mesh transform name. If empty, use the snapshot node name.
+    @type mesh: str
+    @param fields: Optional data to extract (see glTools.model.validate.SNAPSHOT_FIELDS). The topology is always
+        extracted. If None, extract all data. Partial snapshots are only valid for the checks they were extracted for.
+    @type fields: list or None
+    """
+    if fields is None: fields = glTools.model.validate.SNAPSHOT_FIELDS
+
+    # Get MFnMesh
+    meshFn = glTools.utils.mesh.getMeshFn(meshShape)
+
+    # Get Topology
+    faceCounts = OpenMaya.MIntArray()
+    faceConnects = OpenMaya.MIntArray()
+    meshFn.getVertices(faceCounts, faceConnects)
+    vertexCount = meshFn.numVertices()
+
+    # Get Vertex Tweaks
+    tweaks = []
+    if vertexCount and 'tweaks' in fields:
+        tweaks = [i for tweak in cmds.getAttr(meshShape + '.pnts[*]') or [] for i in tweak]
+
+    # Get UVs
+    uvSets = []
+    if 'uvSets' in fields or 'uvs' in fields:
+        uvSets = cmds.polyUVSet(meshShape, q=True, allUVSets=True) or []
+    uvCounts = {}
+    uvIds = {}
+    if 'uvs' in fields:
+        for uvSet in uvSets:
+            uvCountArray = OpenMaya.MIntArray()
+            uvIdArray = OpenMaya.MIntArray()
+            meshFn.getAssignedUVs(uvCountArray, uvIdArray, uvSet)
+            uvCounts[uvSet] = [uvCountArray[i] for i in xrange(uvCountArray.length())]
+            uvIds[uvSet] = [uvIdArray[i] for i in xrange(uvIdArray.length())]
+
+    # Get Locked Normals
+    lockedNormals = []
+    if vertexCount and 'lockedNormals' in fields:
+        lockedNormals = cmds.polyNormalPerVertex(meshShape + '.vtx[*]', q=True, fn=True) or []
+
+    # Build Snapshot
+    snapshot = glTools.model.validate.MeshSnapshot(name=name or meshShape,
+                                                   mesh=mesh,
+                                                   vertexCount=vertexCount,
+                                                   faceCounts=[faceCounts[i] for i in xrange(faceCounts.length())],
+                                                   faceConnects=[faceConnects[i] for i in xrange(faceConnects.length())],
+                                                   tweaks=tweaks,
+                                                   uvSets=uvSets,
+                                                   uvCounts=uvCounts,
+                                                   uvIds=uvIds,
+                                                   lockedNormals=lockedNormals)
 
-def triangles(meshList=[]):
+    # Return Result
+    return snapshot
+
+
+def getMeshSnapshots(meshList=[], fields=None):
     """
-    Return a list of all 3-sided polygon faces in a specified mesh list.
-    @param meshList: List of meshes to check for triangles
+    Extract a MeshSnapshot for each non intermediate shape of the specified meshes.
+    @param meshList: List of meshes to extract snapshots for. If empty, use all mesh objects in the scene.
     @type meshList: list
+    @param fields: Optional data to extract. If None, extract all data. See getMeshSnapshot().
+    @type fields: list or None
     """
     # Check Mesh List
     meshList = getMeshList(meshList)
     if not meshList: return []
 
-    # Find Triangles
-    cmds.select(meshList)
-    cmds.polySelectConstraint(mode=3, type=0x0008, size=1)
-    cmds.polySelectConstraint(disable=True)
-    tris = cmds.filterExpand(ex=True, sm=34) or []
-    cmds.select(meshList)
+    # Get Snapshots
+    snapshots = []
+    for mesh in meshList:
+        meshShapes = cmds.listRelatives(mesh, s=True, ni=True, pa=True, type='mesh') or []
+        for meshShape in meshShapes:
+            name = mesh if len(meshShapes) == 1 else meshShape
+            snapshots.append(getMeshSnapshot(meshShape, name=name, mesh=mesh, fields=fields))
 
     # Return Result
-    return tris
+    return snapshots
 
 
-def nGons(meshList=[]):
+def validateMeshes(meshList=[], checks=None, options=None, snapshots=None):
     """
-    Return a list of all polygon faces with more than 4 sides in a specified list of meshes.
+    Run model checks against the specified meshes, extracting the mesh data only once per mesh.
+    Only the mesh data used by the specified checks is extracted.
+    Returns a validation report dictionary. See glTools.model.validate.validate().
+    @param meshList: List of meshes to check. If empty, check all mesh objects in the scene.
+    @type meshList: list
+    @param checks: List of check names to run. If None, run all checks.
+    @type checks: list or None
+    @param options: Check keyword arguments, per check name. ie. {'uvShells': {'faceCountTol': 2}}
+    @type options: dict or None
+    @param snapshots: Existing mesh snapshots to check. If None, extract snapshots from the mesh list.
+    @type snapshots: list or None
+    """
+    if snapshots is None: snapshots = getMeshSnapshots(meshList, fields=glTools.model.validate.checkFields(checks))
+    return glTools.model.validate.validate(snapshots, checks=checks, options=options)
+
+
+# ==========
+# - Checks -
+# ==========
+
+def triangles(meshList=[]):
+    """
+    Return a list of all 3-sided polygon faces in a specified mesh list.
     @param meshList: List of meshes to check for triangles
     @type meshList: list
     """
-    # Check Mesh List
-    meshList = getMeshList(meshList)
-    if not meshList: return []
+    return validateMeshes(meshList, checks=['triangles'])['components']['triangles']
 
-    # Find N-Gons
-    cmds.select(meshList)
-    cmds.polySelectConstraint(mode=3, type=0x0008, size=3)
-    cmds.polySelectConstraint(disable=True)
-    ngon = cmds.filterExpand(ex=True, sm=34) or []
-    cmds.select(meshList)
 
-    # Return Result
-    return ngon
+def nGons(meshList=[]):
+    """
+    Return a list of all polygon faces with more than 4 sides in a specified list of meshes.
+    @param meshList: List of meshes to check for triangles
+    @type meshList: list
+    """
+    return validateMeshes(meshList, checks=['nGons'])['components']['nGons']
 
 
 def nonQuads(meshList=[]):
@@ -102,8 +191,7 @@ def nonQuads(meshList=[]):
     @param meshList: List of meshes to check for non quads
     @type meshList: list
     """
-    # Return Result
-    return triangles(meshList) + nGons(meshList)
+    return validateMeshes(meshList, checks=['nonQuads'])['components']['nonQuads']
 
 
 def nonManifold(meshList=[]):
@@ -112,19 +200,7 @@ def nonManifold(meshList=[]):
     @param meshList: List of meshes to check for non manifold topology. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check Mesh List
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Non Manifold
-    cmds.select(meshList)
-    cmds.polySelectConstraint(mode=3, type=0x0001, nm=1)
-    cmds.polySelectConstraint(disable=True)
-    nonManifoldList = cmds.filterExpand(ex=True, sm=31) or []
-    cmds.select(meshList)
-
-    # Return result
-    return nonManifoldList
+    return validateMeshes(meshList, checks=['nonManifold'])['components']['nonManifold']
 
 
 def lamina(meshList=[]):
@@ -133,19 +209,7 @@ def lamina(meshList=[]):
     @param meshList: List of meshes to check for lamina faces. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check Mesh List
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Lamina
-    cmds.select(meshList)
-    cmds.polySelectConstraint(mode=3, type=0x0008, topology=2)
-    cmds.polySelectConstraint(disable=True)
-    laminaList = cmds.filterExpand(ex=True, sm=34) or []
-    cmds.select(meshList)
-
-    # Return result
-    return laminaList
+    return validateMeshes(meshList, checks=['lamina'])['components']['lamina']
 
 
 def checkLockedVertexNormals(meshList=[]):
@@ -154,26 +218,7 @@ def checkLockedVertexNormals(meshList=[]):
     @param meshList: List of meshes to check for locked normals. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check meshList
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Locked Normals
-    lockedNormalList = []
-    for mesh in meshList:
-
-        # Shapes
-        meshShapes = cmds.listRelatives(mesh, s=True, ni=True, pa=True)
-        if not meshShapes: continue
-        for meshShape in meshShapes:
-
-            # Check Normals
-            if True in cmds.polyNormalPerVertex(meshShape + '.vtx[*]', q=True, fn=True):
-                lockedNormalList.append(mesh)
-                continue
-
-    # Return Result
-    return lockedNormalList
+    return validateMeshes(meshList, checks=['lockedVertexNormals'])['failed']['lockedVertexNormals']
 
 
 def checkVertexTransforms(meshList=[]):
@@ -182,39 +227,7 @@ def checkVertexTransforms(meshList=[]):
     @param meshList: List of meshes to check for vertex transforms. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check meshList
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Vertex Transforms
-    vtxTransformList = []
-    for mesh in meshList:
-
-        # Shapes
-        meshShapes = cmds.listRelatives(mesh, s=True, ni=True, pa=True) or []
-        for meshShape in meshShapes:
-
-            # Avoid Redundant Checks
-            if vtxTransformList.count(mesh): break
-
-            # Check Shape Type
-            if cmds.objectType(meshShape) != 'mesh': continue
-
-            # Check NonZero Values
-            # if [i for sublist in cmds.getAttr(meshShape+'.pnts[*]') for i in sublist if abs(i) > 0.0000000001]:
-            try:
-                for tweak in cmds.getAttr(meshShape + '.pnts[*]'):
-                    for i in tweak:
-                        if abs(i) > 0.0000000001:
-                            # Append Result
-                            vtxTransformList.append(mesh)
-                            raise RecursiveBreak
-
-            except RecursiveBreak:
-                pass
-
-    # Return Result
-    return vtxTransformList
+    return validateMeshes(meshList, checks=['vertexTransforms'])['failed']['vertexTransforms']
 
 
 def checkMultipleUVsets(meshList=[]):
@@ -223,19 +236,7 @@ def checkMultipleUVsets(meshList=[]):
     @param meshList: List of meshes to check for UV sets. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check meshList
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Multiple UV Sets
-    multipleUVsets = []
-    for mesh in meshList:
-        UVsets = cmds.polyUVSet(mesh, q=True, allUVSets=True)
-        if not UVsets: continue
-        if len(UVsets) > 1: multipleUVsets.append(mesh)
-
-    # Return Result
-    return multipleUVsets
+    return validateMeshes(meshList, checks=['multipleUVsets'])['failed']['multipleUVsets']
 
 
 def checkMissingUVsets(meshList=[]):
@@ -244,18 +245,7 @@ def checkMissingUVsets(meshList=[]):
     @param meshList: List of meshes to check for UV sets. If empty, check all mesh objects in the scene.
     @type meshList: list
     """
-    # Check meshList
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Missing UV Sets
-    missingUVsets = []
-    for mesh in meshList:
-        UVsets = cmds.polyUVSet(mesh, q=True, allUVSets=True)
-        if not UVsets: missingUVsets.append(mesh)
-
-    # Return Result
-    return missingUVsets
+    return validateMeshes(meshList, checks=['missingUVsets'])['failed']['missingUVsets']
 
 
 def checkUvShells(meshList=[], faceCountTol=1):
@@ -267,38 +257,8 @@ def checkUvShells(meshList=[], faceCountTol=1):
     @param faceCountTol: Only consider mesh objects that have a face count greater this number.
     @type faceCountTol: int
     """
-    # Check meshList
-    meshList = getMeshList(meshList)
-    if not meshList: return []
-
-    # Check Multiple UV Sets
-    meshUVshells = []
-    for mesh in meshList:
-
-        # Shapes
-        meshShapes = cmds.listRelatives(mesh, s=True, ni=True, pa=True)
-        if not meshShapes: continue
-        for meshShape in meshShapes:
-
-            # Get Face Count
-            faceCount = cmds.polyEvaluate(meshShape, f=True)
-            if faceCount <= faceCountTol: continue
-
-            # Get UV Sets
-            uvSets = cmds.polyUVSet(meshShape, q=True, allUVSets=True)
-            if not uvSets: continue
-
-            # For Each UV Set
-            for uvSet in uvSets:
-
-                # Get Num UV Shells
-                UVshells = glTools.utils.mesh.numUvShells(meshShape, uvSet=uvSet)
-                if UVshells == faceCount:
-                    meshUVshells.append(mesh)
-                    break
-
-    # Return Result
-    return meshUVshells
+    options = {'uvShells': {'faceCountTol': faceCountTol}}
+    return validateMeshes(meshList, checks=['uvShells'], options=options)['failed']['uvShells']
 
 
 def checkCreaseSets():
@@ -0,0 +1,466 @@
+"""
+Model validation engine.
+Mesh topology, vertex tweak, UV and locked normal data is extracted once per mesh to a MeshSnapshot
+(see glTools.model.cleanup.getMeshSnapshots()), and all model checks run as passes over the snapshot arrays.
+This module is pure Python and does not require Maya, so snapshots can be saved and re-checked offline.
+"""
+import array
+import glTools.data.fileFormat
+
+# Snapshot file data type/version (stored in the root of the binary data file)
+DATA_TYPE = 'MeshSnapshot'
+DATA_VERSION = 1
+
+# Vertex tweak tolerance
+TWEAK_TOLERANCE = 0.0000000001
+
+
+class MeshSnapshot(object):
+    """
+    Mesh data arrays used by the model checks.
+    Faces are stored as per face vertex counts and a flat face vertex list (MFnMesh.getVertices() layout).
+    UVs are stored per UV set as per face UV counts and a flat face vertex UV id list (MFnMesh.getAssignedUVs() layout).
+    """
+
+    def __init__(self, name, mesh='', vertexCount=0, faceCounts=None, faceConnects=None, tweaks=None,
+                 uvSets=None, uvCounts=None, uvIds=None, lockedNormals=None):
+        """
+        MeshSnapshot class initializer.
+        @param name: Mesh node name, used to build component names.
+        @type name: str
+        @param mesh: Mesh transform name, reported by mesh level checks. If empty, use the node name.
+        @type mesh: str
+        @param vertexCount: Mesh vertex count.
+        @type vertexCount: int
+        @param faceCounts: Vertex count for each face.
+        @type faceCounts: list
+        @param faceConnects: Flat face vertex index list.
+        @type faceConnects: list
+        @param tweaks: Flat vertex tweak (pnts) value list.
+        @type tweaks: list
+        @param uvSets: Ordered list of UV set names.
+        @type uvSets: list
+        @param uvCounts: UV count for each face, per UV set.
+        @type uvCounts: dict
+        @param uvIds: Flat face vertex UV id list, per UV set.
+        @type uvIds: dict
+        @param lockedNormals: Locked normal flag for each face vertex.
+        @type lockedNormals: list
+        """
+        self.name = name
+        self.mesh = mesh or name
+        self.vertexCount = vertexCount
+        self.faceCounts = array.array('i', faceCounts or [])
+        self.faceConnects = array.array('i', faceConnects or [])
+        self.tweaks = array.array('d', tweaks or [])
+        self.uvSets = list(uvSets or [])
+        self.uvCounts = dict([(uvSet, array.array('i', uvCounts[uvSet])) for uvSet in uvCounts or {}])
+        self.uvIds = dict([(uvSet, array.array('i', uvIds[uvSet])) for uvSet in uvIds or {}])
+        self.lockedNormals = array.array('B', lockedNormals or [])
+
+        # Derived data cache - shared between checks
+        self._cache = {}
+
+    def faceCount(self):
+        """
+        Return the mesh face count.
+        """
+        return len(self.faceCounts)
+
+    def faceOffsets(self):
+        """
+        Return the face vertex list offsets, where the vertices of face "n" are faceConnects[offsets[n]:offsets[n+1]].
+        """
+        if not 'faceOffsets' in self._cache:
+            self._cache['faceOffsets'] = _offsets(self.faceCounts)
+        return self._cache['faceOffsets']
+
+    def edges(self):
+        """
+        Return the mesh edge data as a tuple of ({(vtxA, vtxB): edgeId}, edge face counts, face vertex edge ids).
+        The face vertex edge id array stores the edge from each face vertex to the next vertex of the face.
+        """
+        if not 'edges' in self._cache:
+            edgeMap = {}
+            edgeFaces = array.array('i')
+            cornerEdges = array.array('i', [0] * len(self.faceConnects))
+            connects = self.faceConnects
+            offsets = self.faceOffsets()
+            for f in xrange(len(self.faceCounts)):
+                start = offsets[f]
+                end = offsets[f + 1]
+                for i in xrange(start, end):
+                    a = connects[i]
+                    b = connects[i + 1] if i + 1 < end else connects[start]
+                    key = (a, b) if a < b else (b, a)
+                    edgeId = edgeMap.get(key)
+                    if edgeId is None:
+                        edgeId = edgeMap[key] = len(edgeFaces)
+                        edgeFaces.append(0)
+                    edgeFaces[edgeId] += 1
+                    cornerEdges[i] = edgeId
+            self._cache['edges'] = (edgeMap, edgeFaces, cornerEdges)
+        return self._cache['edges']
+
+    def data(self):
+        """
+        Return the snapshot as a dictionary of lists and arrays.
+        """
+        return {'name': self.name,
+                'mesh': self.mesh,
+                'vertexCount': self.vertexCount,
+                'faceCounts': self.faceCounts,
+                'faceConnects': self.faceConnects,
+                'tweaks': self.tweaks,
+                'uvSets': self.uvSets,
+                'uvCounts': self.uvCounts,
+                'uvIds': self.uvIds,
+                'lockedNormals': self.lockedNormals}
+
+    @classmethod
+    def fromData(cls, data):
+        """
+        Build a snapshot from a dictionary. See data().
+        @param data: Snapshot data dictionary.
+        @type data: dict
+        """
+        return cls(**dict([(str(key), value) for key, value in data.iteritems()]))
+
+
+# ==========
+# - Checks -
+# ==========
+
+def triangles(snapshot):
+    """
+    Return the ids of all 3-sided faces.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return [i for i, count in enumerate(snapshot.faceCounts) if count == 3]
+
+
+def nGons(snapshot):
+    """
+    Return the ids of all faces with more than 4 sides.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return [i for i, count in enumerate(snapshot.faceCounts) if count > 4]
+
+
+def nonQuads(snapshot):
+    """
+    Return the ids of all non 4-sided faces.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return [i for i, count in enumerate(snapshot.faceCounts) if count != 4]
+
+
+def nonManifold(snapshot):
+    """
+    Return the ids of all non manifold vertices.
+    A vertex is non manifold if it is connected to an edge shared by more than 2 faces, or if its faces
+    form more than one connected fan (bowtie vertices).
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    edgeMap, edgeFaces, cornerEdges = snapshot.edges()
+    nonManifoldVerts = set()
+
+    # Check Edges
+    for (a, b), edgeId in edgeMap.iteritems():
+        if edgeFaces[edgeId] > 2:
+            nonManifoldVerts.add(a)
+            nonManifoldVerts.add(b)
+
+    # Build Vertex Fans - Each (vertex, edge) pair is a node (edgeId*2 for the lower vertex id, edgeId*2+1 for the higher).
+    # Each face vertex joins the node of its incoming edge to the node of its outgoing edge.
+    edgeVerts = [None] * len(edgeFaces)
+    for key, edgeId in edgeMap.iteritems(): edgeVerts[edgeId] = key
+    parent = array.array('i', xrange(len(edgeFaces) * 2))
+    connects = snapshot.faceConnects
+    offsets = snapshot.faceOffsets()
+    for f in xrange(len(snapshot.faceCounts)):
+        start = offsets[f]
+        end = offsets[f + 1]
+        for i in xrange(start, end):
+            vtx = connects[i]
+            inEdge = cornerEdges[i - 1] if i > start else cornerEdges[end - 1]
+            outEdge = cornerEdges[i]
+            nodeA = inEdge * 2 + (edgeVerts[inEdge][0] != vtx)
+            nodeB = outEdge * 2 + (edgeVerts[outEdge][0] != vtx)
+            _union(parent, nodeA, nodeB)
+
+    # Check Vertex Fans
+    vtxFan = {}
+    for key, edgeId in edgeMap.iteritems():
+        for n in (0, 1):
+            vtx = key[n]
+            root = _find(parent, edgeId * 2 + n)
+            fan = vtxFan.setdefault(vtx, root)
+            if fan != root: nonManifoldVerts.add(vtx)
+
+    # Return Result
+    return sorted(nonManifoldVerts)
+
+
+def lamina(snapshot):
+    """
+    Return the ids of all lamina faces (faces that share all of their vertices with another face).
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    connects = snapshot.faceConnects
+    offsets = snapshot.faceOffsets()
+    faceMap = {}
+    for f in xrange(len(snapshot.faceCounts)):
+        key = tuple(sorted(connects[offsets[f]:offsets[f + 1]]))
+        faceMap.setdefault(key, []).append(f)
+    return sorted([f for faceList in faceMap.itervalues() if len(faceList) > 1 for f in faceList])
+
+
+def lockedVertexNormals(snapshot):
+    """
+    Check for locked vertex normals.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return any(snapshot.lockedNormals)
+
+
+def vertexTransforms(snapshot, tolerance=TWEAK_TOLERANCE):
+    """
+    Check for vertex transforms (tweaks).
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    @param tolerance: Tweak values below this tolerance are ignored.
+    @type tolerance: float
+    """
+    if not snapshot.tweaks: return False
+    return max(max(snapshot.tweaks), -min(snapshot.tweaks)) > tolerance
+
+
+def multipleUVsets(snapshot):
+    """
+    Check for multiple UV sets.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return len(snapshot.uvSets) > 1
+
+
+def missingUVsets(snapshot):
+    """
+    Check for missing UV sets.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    """
+    return not snapshot.uvSets
+
+
+def uvShells(snapshot, faceCountTol=1):
+    """
+    Check for UV sets that have as many UV shells as faces.
+    @param snapshot: Mesh snapshot to check.
+    @type snapshot: MeshSnapshot
+    @param faceCountTol: Only consider meshes that have a face count greater this number.
+    @type faceCountTol: int
+    """
+    faceCount = snapshot.faceCount()
+    if faceCount <= faceCountTol: return False
+    for uvSet in snapshot.uvSets:
+        if numUvShells(snapshot, uvSet) == faceCount: return True
+    return False
+
+
+def numUvShells(snapshot, uvSet=''):
+    """
+    Return the number of UV shells for the specified UV set.
+    @param snapshot: Mesh snapshot to query UV shells for.
+    @type snapshot: MeshSnapshot
+    @param uvSet: UV set to query UV shells for. If empty, use the first UV set.
+    @type uvSet: str
+    """
+    # Check UV Set
+    if not snapshot.uvSets: return 0
+    if not uvSet: uvSet = snapshot.uvSets[0]
+    if not uvSet in snapshot.uvIds:
+        raise Exception('Mesh snapshot "' + snapshot.name + '" has no UVset "' + uvSet + '"!')
+
+    # Cached Result
+    cacheKey = ('uvShells', uvSet)
+    if cacheKey in snapshot._cache: return snapshot._cache[cacheKey]
+
+    # Join Face UVs
+    uvIds = snapshot.uvIds[uvSet]
+    uvCounts = snapshot.uvCounts[uvSet]
+    offsets = _offsets(uvCounts)
+    parent = array.array('i', xrange(max(uvIds) + 1 if uvIds else 0))
+    used = set(uvIds)
+    for f in xrange(len(uvCounts)):
+        start = offsets[f]
+        for i in xrange(start + 1, offsets[f + 1]):
+            _union(parent, uvIds[start], uvIds[i])
+
+    # Count Shells
+    shells = len(set([_find(parent, uv) for uv in used]))
+    snapshot._cache[cacheKey] = shells
+
+    # Return Result
+    return shells
+
+
+# Check registry - (name, check function, result component type)
+# Component checks return a list of component ids, mesh level checks (component type None) return True on failure.
+CHECKS = [('triangles', triangles, 'f'),
+          ('nGons', nGons, 'f'),
+          ('nonQuads', nonQuads, 'f'),
+          ('nonManifold', nonManifold, 'vtx'),
+          ('lamina', lamina, 'f'),
+          ('lockedVertexNormals', lockedVertexNormals, None),
+          ('vertexTransforms', vertexTransforms, None),
+          ('multipleUVsets', multipleUVsets, None),
+          ('missingUVsets', missingUVsets, None),
+          ('uvShells', uvShells, None)]
+
+
+# Optional snapshot data used by each check - checks not listed only use the mesh topology.
+# Fields: 'tweaks', 'lockedNormals', 'uvSets' (UV set names) and 'uvs' (assigned UVs, per UV set)
+CHECK_FIELDS = {'lockedVertexNormals': ('lockedNormals',),
+                'vertexTransforms': ('tweaks',),
+                'multipleUVsets': ('uvSets',),
+                'missingUVsets': ('uvSets',),
+                'uvShells': ('uvSets', 'uvs')}
+
+# All optional snapshot fields
+SNAPSHOT_FIELDS = ('tweaks', 'lockedNormals', 'uvSets', 'uvs')
+
+
+def checkNames():
+    """
+    Return the list of registered check names.
+    """
+    return [i[0] for i in CHECKS]
+
+
+def checkFields(checks=None):
+    """
+    Return the set of optional snapshot fields used by the specified checks. See CHECK_FIELDS.
+    @param checks: List of check names. If None, use all registered checks.
+    @type checks: list or None
+    """
+    if checks is None: checks = checkNames()
+    fields = set()
+    for check in checks: fields.update(CHECK_FIELDS.get(check, ()))
+    return fields
+
+
+# ==============
+# - Validation -
+# ==============
+
+def validate(snapshots, checks=None, options=None):
+    """
+    Run model checks against a list of mesh snapshots, and return a validation report dictionary:
+        {'checks': [checkName, ...],
+         'meshes': {snapshotName: {'mesh': meshName, 'results': {checkName: result}}},
+         'failed': {checkName: [meshName, ...]},
+         'components': {checkName: [componentName, ...]}}
+    Only failed results are stored. Component check results are component id lists, mesh level check results are True.
+    @param snapshots: List of mesh snapshots to check.
+    @type snapshots: list
+    @param checks: List of check names to run. If None, run all registered checks.
+    @type checks: list or None
+    @param options: Check keyword arguments, per check name. ie. {'uvShells': {'faceCountTol': 2}}
+    @type options: dict or None
+    """
+    # Check Checks
+    checkMap = dict([(i[0], i) for i in CHECKS])
+    if checks is None: checks = checkNames()
+    for check in checks:
+        if not check in checkMap:
+            raise Exception('Invalid model check "' + check + '"!')
+    options = options or {}
+
+    # Initialize Report
+    report = {'checks': list(checks),
+              'meshes': {},
+              'failed': dict([(check, []) for check in checks]),
+              'components': dict([(check, []) for check in checks if checkMap[check][2]])}
+
+    # Run Checks
+    for snapshot in snapshots:
+        results = {}
+        for check in checks:
+            name, func, component = checkMap[check]
+            result = func(snapshot, **options.get(check, {}))
+            if not result: continue
+            results[check] = result
+            if not snapshot.mesh in report['failed'][check]:
+                report['failed'][check].append(snapshot.mesh)
+            if component:
+                report['components'][check].extend([snapshot.name + '.' + component + '[' + str(i) + ']' for i in result])
+        report['meshes'][snapshot.name] = {'mesh': snapshot.mesh, 'results': results}
+
+    # Return Result
+    return report
+
+
+def writeSnapshots(filePath, snapshots):
+    """
+    Write a list of mesh snapshots to a binary data file.
+    @param filePath: Target file path.
+    @type filePath: str
+    @param snapshots: List of mesh snapshots to write.
+    @type snapshots: list
+    """
+    root = {'dataType': DATA_TYPE,
+            'version': DATA_VERSION,
+            'snapshots': [snapshot.data() for snapshot in snapshots]}
+    glTools.data.fileFormat.writeFile(filePath, root)
+    return filePath
+
+
+def readSnapshots(filePath):
+    """
+    Read a list of mesh snapshots from a binary data file.
+    @param filePath: Snapshot file path.
+    @type filePath: str
+    """
+    root = glTools.data.fileFormat.readFile(filePath)
+    if not isinstance(root, dict) or root.get('dataType') != DATA_TYPE:
+        raise Exception('File "' + filePath + '" is not a mesh snapshot file!')
+    return [MeshSnapshot.fromData(data) for data in root['snapshots']]
+
+
+def _offsets(counts):
+    """
+    Return the running offsets of a count array, with a leading 0.
+    """
+    offsets = array.array('i', [0] * (len(counts) + 1))
+    total = 0
+    for n, count in enumerate(counts):
+        total += count
+        offsets[n + 1] = total
+    return offsets
+
+
+def _find(parent, i):
+    """
+    Union find - Return the root of the specified element (with path halving).
+    """
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent, a, b):
+    """
+    Union find - Join the sets of the specified elements.
+    """
+    rootA = _find(parent, a)
+    rootB = _find(parent, b)
+    if rootA != rootB: parent[rootB] = rootA
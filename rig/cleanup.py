@@ -6,6 +6,7 @@ import glTools.utils.defaultAttrState
 import glTools.utils.deformer
 import glTools.utils.reference
 import glTools.utils.namespace
+import glTools.utils.progressBar
 import glTools.utils.skinCluster
 import glTools.rig.utils
 
@@ -165,12 +166,14 @@ def reorderShapes():
     print('# Clean Rig: Reorder Shapes - ' + str(cmds.timerX(st=timer)))
 
 
-def cleanDeformers(eightThreshold=0.001, showProgress=False):
+def cleanDeformers(weightThreshold=0.001, showProgress=False):
     """
     Cleaning all deformers
     Prune small weights and membership
-    @param eightThreshold:
-    @param showProgress:
+    @param weightThreshold: Weight values below this threshold are pruned.
+    @type weightThreshold: float
+    @param showProgress: Show operation progress using the main progress bar
+    @type showProgress: bool
     """
     print('# Clean Rig: Cleaning Deformers (prune weights and membership)')
 
@@ -179,27 +182,20 @@ def cleanDeformers(eightThreshold=0.001, showProgress=False):
 
     deformerList = glTools.utils.deformer.getDeformerList(nodeType='weightGeometryFilter')
 
-    if showProgress and interactive:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Cleaning Deformers...'), maxValue=len(deformerList))
-
-    # For Each Deformer
-    for deformer in deformerList:
+    with glTools.utils.progressBar.Progress(status='Cleaning Deformers...', maxValue=len(deformerList),
+                                            show=showProgress) as progress:
 
-        # Clean Deformers
-        try:
-            glTools.utils.deformer.clean(deformer, threshold=weightThreshold)
-        except:
-            print('# Clean Rig: XXXXXXXXX ======== Unable to clean deformer "' + deformer + '"! ======== XXXXXXXXX')
+        # For Each Deformer
+        for deformer in deformerList:
 
-        # Update Progress Bar
-        if showProgress and interactive:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
+            # Clean Deformers
+            try:
+                glTools.utils.deformer.clean(deformer, threshold=weightThreshold)
+            except:
+                print('# Clean Rig: XXXXXXXXX ======== Unable to clean deformer "' + deformer + '"! ======== XXXXXXXXX')
 
-    if showProgress and interactive:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+            # Update Progress Bar
+            progress.step()
 
     # Print Timed Result
     print('# Clean Rig: Clean Deformers - ' + str(cmds.timerX(st=timer)))
@@ -215,26 +211,17 @@ def cleanSkinClusters(showProgress=False):
     # Clean SkinClusters
     skinClusterList = cmds.ls(type='skinCluster')
 
-    if showProgress and interactive:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Cleaning SkinClusters...'),
-                       maxValue=len(skinClusterList))
-
-    for skinCluster in skinClusterList:
-        try:
-            glTools.utils.skinCluster.clean(skinCluster, tolerance=0.001)
-        except:
-            print(
-            '# Clean Rig: XXXXXXXXX ======== Unable to clean skinCluster "' + skinCluster + '"! ======== XXXXXXXXX')
-
-        # Update Progress Bar
-        if showProgress and interactive:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-    if showProgress and interactive:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+    with glTools.utils.progressBar.Progress(status='Cleaning SkinClusters...', maxValue=len(skinClusterList),
+                                            show=showProgress) as progress:
+        for skinCluster in skinClusterList:
+            try:
+                glTools.utils.skinCluster.clean(skinCluster, tolerance=0.001)
+            except:
+                print(
+                '# Clean Rig: XXXXXXXXX ======== Unable to clean skinCluster "' + skinCluster + '"! ======== XXXXXXXXX')
+
+            # Update Progress Bar
+            progress.step()
 
     # Print Timed Result
     print('# Clean Rig: Clean SkinClusters - ' + str(cmds.timerX(st=timer)))
@@ -0,0 +1,105 @@
+"""
+Offline tests for glTools.utils.batchJob, running "python -c" stand-in jobs through the scheduler.
+The module is loaded by file path, since importing the glTools.utils package requires Maya.
+Run with: python -m unittest discover -s tests
+"""
+import imp
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+batchJob = imp.load_source('batchJob', os.path.join(os.path.dirname(__file__), '..', 'utils', 'batchJob.py'))
+
+
+def pythonJob(name, code, **kwargs):
+    """
+    Return a job that runs a python code string with the current interpreter.
+    """
+    return batchJob.Job(name, [sys.executable, '-c', code], **kwargs)
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.logDir = os.path.join(self.tmpDir, 'logs')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def scheduler(self, jobs, slots=2, **kwargs):
+        return batchJob.Scheduler(jobs, backend=batchJob.LocalBackend(slots=slots), logDir=self.logDir,
+                                  interval=0.01, **kwargs)
+
+    def test_run(self):
+        jobs = [pythonJob('job' + str(i), 'print(%d)' % i) for i in range(4)]
+        self.assertTrue(self.scheduler(jobs).run())
+        for i, job in enumerate(jobs):
+            self.assertEqual(job.state, batchJob.SUCCEEDED)
+            self.assertEqual(job.returncode, 0)
+            self.assertEqual(open(job.stdoutLog).read().strip(), str(i))
+
+    def test_dependencies(self):
+        outFile = os.path.join(self.tmpDir, 'out.txt')
+        write = 'import time; time.sleep(0.2); open(%r, "a").write("a")' % outFile
+        append = 'open(%r, "a").write("b")' % outFile
+        jobs = [pythonJob('b', append, dependencies=['a']), pythonJob('a', write)]
+        self.assertTrue(self.scheduler(jobs).run())
+        self.assertEqual(open(outFile).read(), 'ab')
+
+    def test_failure(self):
+        jobs = [pythonJob('fail', 'import sys; sys.stderr.write("error"); sys.exit(3)', retries=1),
+                pythonJob('skip', 'pass', dependencies=['fail']),
+                pythonJob('ok', 'pass')]
+        self.assertFalse(self.scheduler(jobs).run())
+        self.assertEqual(jobs[0].state, batchJob.FAILED)
+        self.assertEqual(jobs[0].returncode, 3)
+        self.assertEqual(jobs[0].attempts, 2)
+        self.assertEqual(open(jobs[0].stderrLog).read(), 'error')
+        self.assertEqual(jobs[1].state, batchJob.SKIPPED)
+        self.assertEqual(jobs[2].state, batchJob.SUCCEEDED)
+
+    def test_missingExecutable(self):
+        job = batchJob.Job('missing', [os.path.join(self.tmpDir, 'missing')])
+        self.assertFalse(self.scheduler([job]).run())
+        self.assertEqual(job.state, batchJob.FAILED)
+
+    def test_cancel(self):
+        jobs = [pythonJob('sleep' + str(i), 'import time; time.sleep(30)') for i in range(3)]
+        scheduler = self.scheduler(jobs)
+        scheduler.start()
+        while not [job for job in jobs if job.state == batchJob.RUNNING]: time.sleep(0.01)
+        scheduler.cancel()
+        self.assertFalse(scheduler.wait())
+        self.assertEqual([job.state for job in jobs], [batchJob.CANCELLED] * 3)
+
+    def test_validate(self):
+        cycle = [pythonJob('a', 'pass', dependencies=['b']), pythonJob('b', 'pass', dependencies=['a'])]
+        self.assertRaises(Exception, self.scheduler(cycle).run)
+        unknown = [pythonJob('a', 'pass', dependencies=['c'])]
+        self.assertRaises(Exception, self.scheduler(unknown).run)
+        self.assertRaises(Exception, self.scheduler, [pythonJob('a', 'pass'), pythonJob('a', 'pass')])
+
+    def test_logNames(self):
+        # Job names that map to the same file name still get separate log files
+        jobs = [pythonJob('a/b', 'print("1")'), pythonJob('a:b', 'print("2")')]
+        self.assertTrue(self.scheduler(jobs).run())
+        self.assertNotEqual(jobs[0].stdoutLog, jobs[1].stdoutLog)
+        self.assertEqual([open(job.stdoutLog).read().strip() for job in jobs], ['1', '2'])
+
+    def test_report(self):
+        reportFile = os.path.join(self.tmpDir, 'report.json')
+        jobs = [pythonJob('a', 'pass'), pythonJob('b', 'import sys; sys.exit(1)')]
+        self.scheduler(jobs, reportFile=reportFile).run()
+        report = json.load(open(reportFile))
+        self.assertEqual(report['summary'][batchJob.SUCCEEDED], 1)
+        self.assertEqual(report['summary'][batchJob.FAILED], 1)
+        self.assertEqual([job['state'] for job in report['jobs']], [batchJob.SUCCEEDED, batchJob.FAILED])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Offline tests for glTools.utils.meshTopology, building topology from stored mesh data.
+The module is loaded by file path, since importing the glTools.utils package requires Maya.
+Run with: python -m unittest discover -s tests
+"""
+import imp
+import os
+import unittest
+
+meshTopology = imp.load_source('meshTopology', os.path.join(os.path.dirname(__file__), '..', 'utils', 'meshTopology.py'))
+
+
+class MeshData(object):
+    """
+    Stand-in for glTools.data.meshData.MeshData (which requires Maya), with the same stored data layout.
+    """
+
+    def __init__(self, vertexList, polyCounts, polyConnects):
+        self._data = {'vertexList': vertexList, 'polyCounts': polyCounts, 'polyConnects': polyConnects}
+
+
+def grid():
+    """
+    Return mesh data for a 2x1 quad grid (6 vertices, 2 faces).
+        0 - 1 - 2
+        |   |   |
+        3 - 4 - 5
+    """
+    vertexList = [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 2.0, 0.0, 0.0,
+                  0.0, 0.0, 1.0, 1.0, 0.0, 1.0, 2.0, 0.0, 1.0]
+    return MeshData(vertexList, [4, 4], [0, 1, 4, 3, 1, 2, 5, 4])
+
+
+class TestMeshTopology(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = meshTopology.MeshTopology.fromMeshData(grid())
+
+    def test_counts(self):
+        self.assertEqual(self.topology.numVertices(), 6)
+        self.assertEqual(self.topology.numFaces(), 2)
+        self.assertEqual(self.topology.numEdges(), 7)
+
+    def test_faceVertices(self):
+        self.assertEqual(self.topology.faceVertexList(), [[0, 1, 4, 3], [1, 2, 5, 4]])
+        self.assertEqual(list(self.topology.faceOffsets), [0, 4, 8])
+
+    def test_vertexFaces(self):
+        result = [self.topology.getVertexFaces(i) for i in range(6)]
+        self.assertEqual(result, [[0], [0, 1], [1], [0], [0, 1], [1]])
+
+    def test_edges(self):
+        # Edge IDs follow the order of first occurance in the face vertex lists
+        result = [self.topology.getEdgeVertices(i) for i in range(self.topology.numEdges())]
+        self.assertEqual(result, [(0, 3), (0, 1), (1, 4), (3, 4), (1, 2), (2, 5), (4, 5)])
+
+    def test_edgeAdjacency(self):
+        self.assertEqual(self.topology.vertexConnectivityList(),
+                         [[1, 3], [0, 2, 4], [1, 5], [0, 4], [1, 3, 5], [2, 4]])
+        offsets, indices = self.topology.getAdjacency()
+        self.assertEqual(list(offsets), [0, 2, 5, 7, 9, 12, 14])
+
+    def test_faceAdjacency(self):
+        self.assertEqual(self.topology.vertexConnectivityList(faceConnectivity=True),
+                         [[1, 3, 4], [0, 2, 3, 4, 5], [1, 4, 5], [0, 1, 4], [0, 1, 2, 3, 5], [1, 2, 4]])
+
+    def test_unusedVertex(self):
+        # The vertex count comes from the stored vertex list, so unused vertices have empty tables
+        meshData = grid()
+        meshData._data['vertexList'] = meshData._data['vertexList'] + [3.0, 0.0, 0.0]
+        topology = meshTopology.MeshTopology.fromMeshData(meshData)
+        self.assertEqual(topology.numVertices(), 7)
+        self.assertEqual(topology.getConnectedVertices(6), [])
+        self.assertEqual(topology.getVertexFaces(6), [])
+
+    def test_invalidCounts(self):
+        self.assertRaises(Exception, meshTopology.MeshTopology, [4, 4], [0, 1, 4, 3, 1, 2, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
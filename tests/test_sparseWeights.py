@@ -0,0 +1,79 @@
+"""
+Offline tests for glTools.utils.sparseWeights.
+The module is loaded by file path, since importing the glTools.utils package requires Maya.
+Run with: python -m unittest discover -s tests
+"""
+import imp
+import os
+import unittest
+
+sparseWeights = imp.load_source('sparseWeights', os.path.join(os.path.dirname(__file__), '..', 'utils', 'sparseWeights.py'))
+
+INFLUENCES = ['jntA', 'jntB', 'jntC']
+# Flat (point major) weights for 4 points
+WEIGHTS = [1.0, 0.0, 0.0,
+           0.5, 0.5, 0.0,
+           0.0, 0.25, 0.75,
+           0.2, 0.0, 0.8]
+
+
+class TestSparseWeights(unittest.TestCase):
+
+    def setUp(self):
+        self.weights = sparseWeights.SparseWeights.fromWeightArray(WEIGHTS, INFLUENCES)
+
+    def assertWeights(self, weights, rows):
+        self.assertEqual(weights.pointCount(), len(rows))
+        self.assertEqual(weights.getRows(), rows)
+        for pt in range(weights.pointCount()):
+            cols = list(weights.indices[weights.offsets[pt]:weights.offsets[pt + 1]])
+            self.assertEqual(cols, sorted(cols))
+
+    def test_fromWeightArray(self):
+        self.assertEqual(self.weights.entryCount(), 7)
+        self.assertEqual(list(self.weights.toWeightArray()), WEIGHTS)
+        self.assertEqual(self.weights.getInfluenceWeights('jntC'), [0.0, 0.0, 0.75, 0.8])
+        self.assertRaises(Exception, sparseWeights.SparseWeights.fromWeightArray, WEIGHTS[:-1], INFLUENCES)
+
+    def test_removeInfluence(self):
+        self.weights.removeInfluence('jntB')
+        self.assertEqual(self.weights.influenceList, ['jntA', 'jntC'])
+        self.assertWeights(self.weights, [{0: 1.0}, {0: 0.5}, {1: 0.75}, {0: 0.2, 1: 0.8}])
+
+    def test_setInfluenceWeights(self):
+        self.weights.setInfluenceWeights('jntB', [0.1, 0.0, 0.0, 0.3])
+        self.assertWeights(self.weights, [{0: 1.0, 1: 0.1}, {0: 0.5}, {2: 0.75}, {0: 0.2, 1: 0.3, 2: 0.8}])
+        self.weights.setInfluenceWeights('jntD', [0.0, 1.0, 0.0, 0.0])
+        self.assertEqual(self.weights.getInfluenceIndex('jntD'), 3)
+        self.assertEqual(self.weights.getPointWeights(1), {'jntA': 0.5, 'jntD': 1.0})
+        self.assertRaises(Exception, self.weights.setInfluenceWeights, 'jntA', [1.0])
+
+    def test_moveInfluence(self):
+        self.weights.moveInfluence('jntA', 'jntC')
+        self.assertWeights(self.weights, [{2: 1.0}, {1: 0.5, 2: 0.5}, {1: 0.25, 2: 0.75}, {2: 1.0}])
+        self.weights.moveInfluence('jntB', 'jntA', mode='replace')
+        self.assertWeights(self.weights, [{2: 1.0}, {0: 0.5, 2: 0.5}, {0: 0.25, 2: 0.75}, {2: 1.0}])
+
+    def test_combineInfluences(self):
+        self.weights.combineInfluences(['jntA', 'jntB'], 'jntD')
+        self.assertEqual(self.weights.getInfluenceWeights('jntD'), [1.0, 1.0, 0.25, 0.2])
+        self.weights.combineInfluences(['jntB', 'jntC'], 'jntC', removeSource=True)
+        self.assertEqual(self.weights.influenceList, ['jntA', 'jntC', 'jntD'])
+        self.assertWeights(self.weights, [{0: 1.0, 2: 1.0}, {0: 0.5, 1: 0.5, 2: 1.0}, {1: 1.0, 2: 0.25},
+                                          {0: 0.2, 1: 0.8, 2: 0.2}])
+
+    def test_renameInfluence(self):
+        self.weights.renameInfluence('jntA', 'jntD')
+        self.assertEqual(self.weights.influenceList, ['jntD', 'jntB', 'jntC'])
+        self.weights.renameInfluence('jntD', 'jntB')
+        self.assertEqual(self.weights.influenceList, ['jntB', 'jntC'])
+        # Existing weights of the new influence name are replaced
+        self.assertEqual(self.weights.getInfluenceWeights('jntB'), [1.0, 0.5, 0.0, 0.2])
+
+    def test_prune(self):
+        self.weights.prune(0.3)
+        self.assertWeights(self.weights, [{0: 1.0}, {0: 0.5, 1: 0.5}, {2: 0.75}, {2: 0.8}])
+
+
+if __name__ == '__main__':
+    unittest.main()
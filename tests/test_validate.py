@@ -0,0 +1,146 @@
+"""
+Offline tests for glTools.model.validate. Snapshots are built by hand, so these tests don't require Maya.
+Run with: python -m unittest discover -s tests (with the glTools package on the python path)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import glTools.model.validate as validate
+
+
+def grid(name='grid', **kwargs):
+    """
+    Return a snapshot of a 2x2 quad grid (9 vertices, 4 faces).
+    """
+    faceConnects = [0, 1, 4, 3,
+                    1, 2, 5, 4,
+                    3, 4, 7, 6,
+                    4, 5, 8, 7]
+    return validate.MeshSnapshot(name, vertexCount=9, faceCounts=[4, 4, 4, 4], faceConnects=faceConnects, **kwargs)
+
+
+class TestFaceChecks(unittest.TestCase):
+
+    def setUp(self):
+        # Triangle, quad and pentagon
+        self.snapshot = validate.MeshSnapshot('mixed',
+                                              vertexCount=12,
+                                              faceCounts=[3, 4, 5],
+                                              faceConnects=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+
+    def test_triangles(self):
+        self.assertEqual(validate.triangles(self.snapshot), [0])
+
+    def test_nGons(self):
+        self.assertEqual(validate.nGons(self.snapshot), [2])
+
+    def test_nonQuads(self):
+        self.assertEqual(validate.nonQuads(self.snapshot), [0, 2])
+
+    def test_lamina(self):
+        snapshot = validate.MeshSnapshot('lamina', vertexCount=5, faceCounts=[4, 4, 3],
+                                         faceConnects=[0, 1, 2, 3, 3, 2, 1, 0, 0, 1, 4])
+        self.assertEqual(validate.lamina(snapshot), [0, 1])
+        self.assertEqual(validate.lamina(grid()), [])
+
+
+class TestNonManifold(unittest.TestCase):
+
+    def test_manifold(self):
+        self.assertEqual(validate.nonManifold(grid()), [])
+
+    def test_sharedEdge(self):
+        # Three faces share the edge (0, 1)
+        snapshot = validate.MeshSnapshot('fin', vertexCount=5, faceCounts=[3, 3, 3],
+                                         faceConnects=[0, 1, 2, 1, 0, 3, 0, 1, 4])
+        self.assertEqual(validate.nonManifold(snapshot), [0, 1])
+
+    def test_bowtie(self):
+        # Two triangles that only share vertex 0
+        snapshot = validate.MeshSnapshot('bowtie', vertexCount=5, faceCounts=[3, 3],
+                                         faceConnects=[0, 1, 2, 0, 3, 4])
+        self.assertEqual(validate.nonManifold(snapshot), [0])
+
+
+class TestMeshChecks(unittest.TestCase):
+
+    def test_vertexTransforms(self):
+        self.assertFalse(validate.vertexTransforms(grid(tweaks=[0.0] * 27)))
+        self.assertTrue(validate.vertexTransforms(grid(tweaks=[0.0] * 26 + [-0.5])))
+        self.assertFalse(validate.vertexTransforms(grid(tweaks=[0.0] * 26 + [0.5]), tolerance=1.0))
+
+    def test_lockedVertexNormals(self):
+        self.assertFalse(validate.lockedVertexNormals(grid(lockedNormals=[0] * 16)))
+        self.assertTrue(validate.lockedVertexNormals(grid(lockedNormals=[0] * 15 + [1])))
+
+    def test_uvSets(self):
+        self.assertTrue(validate.missingUVsets(grid()))
+        self.assertFalse(validate.multipleUVsets(grid(uvSets=['map1'])))
+        self.assertTrue(validate.multipleUVsets(grid(uvSets=['map1', 'map2'])))
+
+    def test_uvShells(self):
+        # Shared UVs - one shell
+        shared = {'map1': list(grid().faceConnects)}
+        # Separate UVs per face - one shell per face
+        split = {'map1': range(16)}
+        counts = {'map1': [4, 4, 4, 4]}
+        snapshot = grid(uvSets=['map1'], uvCounts=counts, uvIds=shared)
+        self.assertEqual(validate.numUvShells(snapshot), 1)
+        self.assertFalse(validate.uvShells(snapshot))
+        snapshot = grid(uvSets=['map1'], uvCounts=counts, uvIds=split)
+        self.assertEqual(validate.numUvShells(snapshot, 'map1'), 4)
+        self.assertTrue(validate.uvShells(snapshot))
+        self.assertFalse(validate.uvShells(snapshot, faceCountTol=4))
+        self.assertRaises(Exception, validate.numUvShells, snapshot, 'map2')
+
+
+class TestValidate(unittest.TestCase):
+
+    def test_report(self):
+        snapshots = [grid('good', uvSets=['map1']),
+                     validate.MeshSnapshot('tri', mesh='triMesh', vertexCount=3, faceCounts=[3], faceConnects=[0, 1, 2])]
+        report = validate.validate(snapshots, checks=['triangles', 'missingUVsets'])
+        self.assertEqual(report['checks'], ['triangles', 'missingUVsets'])
+        self.assertEqual(report['failed'], {'triangles': ['triMesh'], 'missingUVsets': ['triMesh']})
+        self.assertEqual(report['components'], {'triangles': ['tri.f[0]']})
+        self.assertEqual(report['meshes']['good']['results'], {})
+        self.assertEqual(report['meshes']['tri']['results'], {'triangles': [0], 'missingUVsets': True})
+
+    def test_options(self):
+        snapshot = grid(uvSets=['map1'], uvCounts={'map1': [4, 4, 4, 4]}, uvIds={'map1': range(16)})
+        report = validate.validate([snapshot], checks=['uvShells'], options={'uvShells': {'faceCountTol': 4}})
+        self.assertEqual(report['failed']['uvShells'], [])
+
+    def test_invalidCheck(self):
+        self.assertRaises(Exception, validate.validate, [grid()], checks=['invalid'])
+
+    def test_checkFields(self):
+        self.assertEqual(validate.checkFields(['triangles', 'nonManifold']), set())
+        self.assertEqual(validate.checkFields(['uvShells', 'vertexTransforms']), set(['uvSets', 'uvs', 'tweaks']))
+        self.assertEqual(validate.checkFields(), set(validate.SNAPSHOT_FIELDS))
+
+
+class TestSnapshotFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_roundTrip(self):
+        snapshot = grid('grid', mesh='gridMesh', tweaks=[0.5] * 27, uvSets=['map1'],
+                        uvCounts={'map1': [4, 4, 4, 4]}, uvIds={'map1': range(16)}, lockedNormals=[1] * 16)
+        filePath = validate.writeSnapshots(os.path.join(self.tmpDir, 'snapshots.bin'), [snapshot])
+        result = validate.readSnapshots(filePath)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].name, 'grid')
+        self.assertEqual(result[0].mesh, 'gridMesh')
+        for key, value in snapshot.data().iteritems():
+            self.assertEqual(result[0].data()[key], value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+Tests for glTools.utils.weightList.WeightArray. The module imports Maya, so these tests are skipped without it.
+Run with: python -m unittest discover -s tests (with the glTools package on the python path)
+"""
+import unittest
+
+try:
+    import glTools.utils.weightList as weightList
+except ImportError:
+    weightList = None
+
+
+@unittest.skipIf(weightList is None, 'glTools.utils.weightList requires Maya')
+class TestWeightArray(unittest.TestCase):
+
+    def test_operators(self):
+        wa = weightList.WeightArray([0.0, 0.5, 1.0])
+        self.assertEqual(list(wa + 1), [1.0, 1.5, 2.0])
+        self.assertEqual(list(wa * wa), [0.0, 0.25, 1.0])
+        self.assertEqual(list(2 - wa), [2.0, 1.5, 1.0])
+        self.assertEqual(list(wa + [1.0]), [1.0, 0.5, 1.0])
+
+    def test_slice(self):
+        # Slices are weight arrays, so operators stay element wise
+        wa = weightList.WeightArray([0.0, 0.5, 1.0, 2.0])
+        for result in (wa[0:2], wa[:2], wa[::2], wa[slice(0, 2)]):
+            self.assertTrue(isinstance(result, weightList.WeightArray))
+        self.assertEqual(list(wa[0:2] + wa[2:4]), [1.0, 2.5])
+        self.assertEqual(list(wa[1:3] * 2), [1.0, 2.0])
+        self.assertEqual(list(wa[::2] * wa[1::2]), [0.0, 2.0])
+        self.assertEqual(wa[1], 0.5)
+        self.assertEqual(wa[-1], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Offline tests for the barycentric weight blend functions of glTools.utils.weightTransfer.
+The modules are loaded by file path, since importing the glTools.utils package requires Maya.
+Run with: python -m unittest discover -s tests
+"""
+import imp
+import os
+import unittest
+
+utilsDir = os.path.join(os.path.dirname(__file__), '..', 'utils')
+sparseWeights = imp.load_source('sparseWeights', os.path.join(utilsDir, 'sparseWeights.py'))
+weightTransfer = imp.load_source('weightTransfer', os.path.join(utilsDir, 'weightTransfer.py'))
+
+# Closest triangles for 3 target points. The second triangle has no source member vertices.
+TRI_VERTEX_IDS = [5, 1, 2,
+                  3, 4, 6,
+                  1, 3, 4]
+BARY_COORDS = [0.5, 0.25, 0.25,
+               0.2, 0.3, 0.5,
+               0.4, 0.3, 0.3]
+# Source membership - the weight lists are in membership (not vertex ID) order
+MEMBERSHIP = [5, 1, 2]
+
+
+class TestBlendWeights(unittest.TestCase):
+
+    def test_blend(self):
+        membership, weights = weightTransfer.blendWeights(TRI_VERTEX_IDS, BARY_COORDS, MEMBERSHIP, [1.0, 0.5, 0.2])
+        self.assertEqual(membership, [0, 2])
+        # 1.0 * 0.5 + 0.5 * 0.25 + 0.2 * 0.25
+        self.assertAlmostEqual(weights[0], 0.675)
+        # Only vertex 1 is a member: 0.5 * 0.4
+        self.assertAlmostEqual(weights[1], 0.2)
+
+    def test_noMembers(self):
+        membership, weights = weightTransfer.blendWeights(TRI_VERTEX_IDS, BARY_COORDS, [0], [1.0])
+        self.assertEqual(membership, [])
+        self.assertEqual(weights, [])
+
+
+class TestBlendSparseWeights(unittest.TestCase):
+
+    def setUp(self):
+        self.weights = sparseWeights.SparseWeights.fromRows([{0: 1.0}, {0: 0.5, 1: 0.5}, {1: 1.0}], ['jntA', 'jntB'])
+
+    def test_blend(self):
+        membership, result = weightTransfer.blendSparseWeights(TRI_VERTEX_IDS, BARY_COORDS, MEMBERSHIP, self.weights)
+        self.assertEqual(membership, [0, 2])
+        self.assertEqual(result.influenceList, ['jntA', 'jntB'])
+        self.assertEqual(result.pointCount(), 2)
+        rows = result.getRows()
+        # jntA: 1.0 * 0.5 + 0.5 * 0.25, jntB: 0.5 * 0.25 + 1.0 * 0.25
+        self.assertAlmostEqual(rows[0][0], 0.625)
+        self.assertAlmostEqual(rows[0][1], 0.375)
+        # Only vertex 1 is a member: 0.5 * 0.4 each
+        self.assertAlmostEqual(rows[1][0], 0.2)
+        self.assertAlmostEqual(rows[1][1], 0.2)
+
+    def test_matchesSingleInfluence(self):
+        # Blending all influences at once matches blending each influence separately
+        membership, result = weightTransfer.blendSparseWeights(TRI_VERTEX_IDS, BARY_COORDS, MEMBERSHIP, self.weights)
+        for influence in self.weights.influenceList:
+            infMembership, infWeights = weightTransfer.blendWeights(TRI_VERTEX_IDS, BARY_COORDS, MEMBERSHIP,
+                                                                    self.weights.getInfluenceWeights(influence))
+            self.assertEqual(infMembership, membership)
+            for a, b in zip(result.getInfluenceWeights(influence), infWeights):
+                self.assertAlmostEqual(a, b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,225 @@
 import maya.cmds as cmds
 import maya.cmds as mm
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
 import glTools.utils.reference
+import array
 import os
 import datetime
 
+# Tangent Types (stored as indices into this list)
+TANGENT_TYPES = ['global', 'fixed', 'linear', 'flat', 'smooth', 'step', 'slow', 'fast',
+                 'clamped', 'plateau', 'stepnext', 'auto', 'spline']
+
+# Boolean anim file values
+TRUE_VALUES = ('1', 'True', 'true')
+
+# Infinity Types
+INFINITY_TYPES = ['constant', 'linear', 'cycle', 'cycleRelative', 'oscillate']
+
+# Parsed Anim File Cache - {filePath: (modifiedTime, AnimFile)}
+_animFileCache = {}
+
+
+class AnimChannel(object):
+    """
+    Key table for a single animated channel parsed from an anim file.
+    Per key values are stored as parallel arrays.
+    """
+
+    def __init__(self, node, attr, offset=0, line=0):
+        """
+        AnimChannel class initializer.
+        @param node: Source node name.
+        @type node: str
+        @param attr: Source attribute name.
+        @type attr: str
+        @param offset: Byte offset of the channel header line in the anim file.
+        @type offset: int
+        @param line: Line number of the channel header line in the anim file.
+        @type line: int
+        """
+        self.node = node
+        self.attr = attr
+        self.offset = offset
+        self.line = line
+
+        # Curve Settings
+        self.weighted = False
+        self.preInfinity = 'constant'
+        self.postInfinity = 'constant'
+
+        # Key Table
+        self.times = array.array('d')
+        self.values = array.array('d')
+        self.inTangents = array.array('B')
+        self.outTangents = array.array('B')
+        self.locks = array.array('B')
+        self.weightLocks = array.array('B')
+        self.breakdowns = array.array('B')
+        self.inAngles = array.array('d')
+        self.inWeights = array.array('d')
+        self.outAngles = array.array('d')
+        self.outWeights = array.array('d')
+        self.inTangentData = array.array('B')
+        self.outTangentData = array.array('B')
+
+    def keyCount(self):
+        return len(self.times)
+
+    def setKeys(self, keyData):
+        """
+        Set the key table from the split items of the anim file key lines of this channel.
+        @param keyData: List of key line items - time value inTangent outTangent lock weightLock breakdown [angles/weights]
+        @type keyData: list
+        """
+        tangentIndex = _tangentIndexMap()
+        self.times = array.array('d', [float(k[0]) for k in keyData])
+        self.values = array.array('d', [float(k[1]) for k in keyData])
+        self.inTangents = array.array('B', [tangentIndex.get(k[2], 0) for k in keyData])
+        self.outTangents = array.array('B', [tangentIndex.get(k[3], 0) for k in keyData])
+        self.locks = array.array('B', [k[4] in TRUE_VALUES for k in keyData])
+        self.weightLocks = array.array('B', [k[5] in TRUE_VALUES for k in keyData])
+        self.breakdowns = array.array('B', [k[6][0] in TRUE_VALUES for k in keyData])
+
+        # Fixed Tangent Angles/Weights
+        count = len(keyData)
+        self.inAngles = array.array('d', [0.0]) * count
+        self.inWeights = array.array('d', [0.0]) * count
+        self.outAngles = array.array('d', [0.0]) * count
+        self.outWeights = array.array('d', [0.0]) * count
+        self.inTangentData = array.array('B', [0]) * count
+        self.outTangentData = array.array('B', [0]) * count
+        fixed = tangentIndex['fixed']
+        for n, k in enumerate(keyData):
+            if len(k) == 11:
+                self.inAngles[n], self.inWeights[n] = float(k[7]), float(k[8])
+                self.outAngles[n], self.outWeights[n] = float(k[9]), float(k[10])
+                self.inTangentData[n] = self.outTangentData[n] = 1
+            elif len(k) == 9:
+                if self.inTangents[n] == fixed:
+                    self.inAngles[n], self.inWeights[n] = float(k[7]), float(k[8])
+                    self.inTangentData[n] = 1
+                else:
+                    self.outAngles[n], self.outWeights[n] = float(k[7]), float(k[8])
+                    self.outTangentData[n] = 1
+
+    def hasTangentData(self, key):
+        """
+        Check if explicit tangent angles/weights were stored for the specified key.
+        @param key: Key index.
+        @type key: int
+        """
+        return bool(self.inTangentData[key] or self.outTangentData[key])
+
+
+class AnimFile(object):
+    """
+    Anim file contents, parsed in a single pass.
+    """
+
+    def __init__(self, filePath):
+        """
+        AnimFile class initializer.
+        @param filePath: Anim file path.
+        @type filePath: str
+        """
+        self.filePath = filePath
+        self.channels = []
+        self.static = []
+        self.index = {}
+        self._offsetChannels = {}
+        self.firstKeyTime = None
+        self.parse()
+
+    def parse(self):
+        """
+        Read the anim file into per channel key tables.
+        A byte offset index ({node.attr: offset}) of the channel header lines is built while reading.
+        """
+        # Check File
+        if not os.path.isfile(self.filePath):
+            raise Exception('Invalid file path! No file at location - ' + self.filePath)
+
+        channel = None
+        keyData = None
+        offset = 0
+        f = open(self.filePath, 'rb')
+        for i, line in enumerate(iter(f.readline, '')):
+            lineOffset = offset
+            offset += len(line)
+
+            # Key Data
+            if keyData is not None:
+                if '}' in line:
+                    channel.setKeys(keyData)
+                    keyData = None
+                    channel = None
+                else:
+                    keyData.append(line.replace(';', '').split())
+                continue
+
+            lineItem = line.replace(';', ' ').split()
+            if not lineItem: continue
+
+            # Channel Header
+            if lineItem[0] == 'anim':
+                channel = AnimChannel(lineItem[3], lineItem[2], lineOffset, i)
+                self.channels.append(channel)
+                self.index[channel.node + '.' + channel.attr] = lineOffset
+                self._offsetChannels[lineOffset] = channel
+            elif lineItem[0] == 'static':
+                self.static.append((lineItem[3], lineItem[2], float(lineItem[5])))
+            elif lineItem[0] == 'firstKeyTime':
+                self.firstKeyTime = float(lineItem[1])
+
+            # Curve Settings
+            elif channel:
+                if lineItem[0] == 'weighted':
+                    channel.weighted = lineItem[1] in TRUE_VALUES
+                elif lineItem[0] == 'preInfinity':
+                    channel.preInfinity = lineItem[1]
+                elif lineItem[0] == 'postInfinity':
+                    channel.postInfinity = lineItem[1]
+                elif lineItem[0] == 'keys':
+                    keyData = []
+
+        f.close()
+
+    def getChannel(self, node, attr):
+        """
+        Return the channel key table for the specified node and attribute.
+        @param node: Source node name.
+        @type node: str
+        @param attr: Source attribute name.
+        @type attr: str
+        """
+        return self._offsetChannels.get(self.index.get(node + '.' + attr))
+
+
+def parseAnimFile(animFile):
+    """
+    Return the parsed contents of an anim file.
+    Parsed files are cached until the file is modified.
+    @param animFile: Anim file path
+    @type animFile: str
+    """
+    # Check File
+    if not os.path.isfile(animFile):
+        raise Exception('Invalid file path! No file at location - ' + animFile)
+
+    # Check Cache
+    mtime = os.path.getmtime(animFile)
+    if animFile in _animFileCache and _animFileCache[animFile][0] == mtime:
+        return _animFileCache[animFile][1]
+
+    # Parse File
+    animData = AnimFile(animFile)
+    _animFileCache[animFile] = (mtime, animData)
+
+    # Return Result
+    return animData
+
 
 def getNodes(filePath, stripNS=False):
     """
@@ -126,29 +342,22 @@ def loadAnim(animFile, targetNS, frameOffset=0, infinityOverride=None, applyEule
     @param applyEulerFilter: Apply euler filter to rotation channels in targetNS.
     @type applyEulerFilter: bool
     """
-    # Check File
-    if not os.path.isfile(animFile):
-        raise Exception('Invalid file path! No file at location - ' + animFile)
-
-    # Read Files
-    f = open(animFile, 'r')
-
-    # Read Lines
-    for i, line in enumerate(f):
+    # Parse Anim File
+    animData = parseAnimFile(animFile)
 
-        # Get Channel Mode
-        lineItem = line.split()
-        if not lineItem: continue
-        if lineItem[0] == 'static': loadStaticData(line, targetNS)
-        if lineItem[0] == 'anim': loadAnimData(animFile, i, targetNS, frameOffset, infinityOverride)
+    # Apply Static Data
+    for node, attr, value in animData.static:
+        setStaticValue(targetNS + ':' + node.split(':')[-1] + '.' + attr, value)
 
-    # Close File
-    f.close()
+    # Apply Anim Data
+    for channel in animData.channels:
+        attrPath = targetNS + ':' + channel.node.split(':')[-1] + '.' + channel.attr
+        applyAnimChannel(channel, attrPath, frameOffset, infinityOverride)
 
     # Filter Rotation Anim
     if applyEulerFilter:
-        rotateChannels = cmds.ls(targetNS + ':*', type='anicmdsurveTA')
-        cmds.filterCurve(rotateChannels)
+        rotateChannels = cmds.ls(targetNS + ':*', type='animCurveTA')
+        if rotateChannels: cmds.filterCurve(rotateChannels)
 
     # Return Result
     return True
@@ -169,6 +378,18 @@ def loadStaticData(line, targetNS):
     attrPath = targetNS + ':' + obj + '.' + attr
     value = float(lineItem[5])
 
+    # Apply Static Value
+    return setStaticValue(attrPath, value)
+
+
+def setStaticValue(attrPath, value):
+    """
+    Apply a static anim value to the specified attribute
+    @param attrPath: Attribute to apply the static value to
+    @type attrPath: str
+    @param value: Static value to apply
+    @type value: float
+    """
     # Check Target Attribute
     if not cmds.objExists(attrPath):
         print('Attribute "' + attrPath + '" does not exist!! Skipping...')
@@ -202,99 +423,118 @@ def loadAnimData(animFile, lineID, targetNS, frameOffset=0, infinityOverride=Non
     @param infinityOverride: Force infinity mode override for loaded animation data.
     @type infinityOverride: str or None
     """
-    # Initialize Target Attribute
-    attrPath = ''
-    animData = []
+    # Get Channel Data
+    channels = [i for i in parseAnimFile(animFile).channels if i.line == lineID]
+    if not channels:
+        raise Exception('No anim data at line ' + str(lineID) + ' of anim file "' + animFile + '"!')
+    channel = channels[0]
 
-    # =============
-    # - Read File -
-    # =============
+    # Apply Anim Data
+    attrPath = targetNS + ':' + channel.node.split(':')[-1] + '.' + channel.attr
+    return applyAnimChannel(channel, attrPath, frameOffset, infinityOverride)
 
-    f = open(animFile, 'r')
-    for i, line in enumerate(f):
 
-        # Skip to relevant line items
-        if i < lineID: continue
-
-        # Get Anim Data Header
-        if i == lineID:
-
-            lineItem = line.split()
-            attr = lineItem[2]
-            obj = lineItem[3].split(':')[-1]
-            attrPath = targetNS + ':' + obj + '.' + attr
-
-            # Check Target Attribute
-            if not cmds.objExists(attrPath):
-                print('Attribute "' + attrPath + '" does not exist!! Skipping...')
-                return False
-            if not cmds.getAttr(attrPath, se=True):
-                print('Attribute "' + attrPath + '" is not settable!! Skipping...')
-                return False
-
-            # Proceed to Next Line
-            continue
-
-        # Check Anim Data End
-        if '}' in line: break
-
-        # Build Anim Data
-        animData.append(line)
-
-    # ===================
-    # - Apply Anim Data -
-    # ===================
-
-    # Get Curve Data
-    weighted = bool(animData[1].split()[-1][:-1])
-    preInf = animData[2].split()[-1][:-1]
-    postInf = animData[3].split()[-1][:-1]
+def applyAnimChannel(channel, attrPath, frameOffset=0, infinityOverride=None):
+    """
+    Apply parsed channel anim data to the specified attribute.
+    All keys are added to the attribute anim curve in a single MFnAnimCurve.addKeys() call.
+    @param channel: Parsed channel anim data
+    @type channel: AnimChannel
+    @param attrPath: Attribute to apply the anim data to
+    @type attrPath: str
+    @param frameOffset: Frame offset to apply to the loaded animation data
+    @type frameOffset: int or float
+    @param infinityOverride: Force infinity mode override for loaded animation data.
+    @type infinityOverride: str or None
+    """
+    # Check Target Attribute
+    if not cmds.objExists(attrPath):
+        print('Attribute "' + attrPath + '" does not exist!! Skipping...')
+        return False
+    if not cmds.getAttr(attrPath, se=True):
+        print('Attribute "' + attrPath + '" is not settable!! Skipping...')
+        return False
+    if not channel.keyCount(): return True
 
     # Check Infinity Mode Override
+    preInf = channel.preInfinity
+    postInf = channel.postInfinity
     if infinityOverride:
-
-        # Check Valid Infinity Mode
-        if not infinityOverride in ['constant', 'linear', 'cycle', 'cycleRelative', 'oscillate']:
+        if not infinityOverride in INFINITY_TYPES:
             print('Invalid infinity mode "' + infinityOverride + '"! Using stored values...')
         else:
             preInf = infinityOverride
             postInf = infinityOverride
 
-    # Load Animation Data
-    for data in animData[5:]:
-
-        # Clean Data Line
-        data = data.replace(';', '')
-
-        # Split Data Items
-        dataItem = data.split()
-
-        # Apply Time Offset
-        time = float(dataItem[0]) + frameOffset
-        value = float(dataItem[1])
-        ittype = dataItem[2]
-        ottype = dataItem[3]
-        lock = bool(dataItem[4])
-        bd = bool(int(dataItem[6][0]))
-
-        cmds.setKeyframe(attrPath, t=time, v=value)
-        cmds.keyTangent(attrPath, e=True, weightedTangents=weighted)
-        cmds.keyTangent(attrPath, e=True, t=(time, time), lock=lock, itt=ittype, ott=ottype)
-        cmds.keyframe(attrPath, e=True, t=(time, time), breakdown=bd)
-        if weighted: cmds.keyTangent(attrPath, weightLock=1)
-
-        if len(dataItem) == 11:
-            inAn = float(dataItem[7])
-            inWt = float(dataItem[8])
-            otAn = float(dataItem[9])
-            otWt = float(dataItem[10])
-            cmds.keyTangent(attrPath,
-                          e=True,
-                          t=(time, time),
-                          inAngle=inAn,
-                          inWeight=inWt,
-                          outAngle=otAn,
-                          outWeight=otWt)
+    # ==================
+    # - Get Anim Curve -
+    # ==================
+
+    sel = OpenMaya.MSelectionList()
+    sel.add(attrPath)
+    plug = OpenMaya.MPlug()
+    sel.getPlug(0, plug)
+
+    # Use existing anim curve, or create a new one
+    curveFn = OpenMayaAnim.MFnAnimCurve()
+    curveObjs = OpenMaya.MObjectArray()
+    keepExistingKeys = OpenMayaAnim.MAnimUtil.findAnimation(plug, curveObjs)
+    if keepExistingKeys:
+        curveFn.setObject(curveObjs[0])
+    else:
+        curveFn.create(plug)
+
+    # Value Conversion (anim file values are stored in UI units)
+    convert = None
+    if curveFn.animCurveType() == OpenMayaAnim.MFnAnimCurve.kAnimCurveTA:
+        convert = lambda v: OpenMaya.MAngle(v, OpenMaya.MAngle.uiUnit()).asRadians()
+    elif curveFn.animCurveType() == OpenMayaAnim.MFnAnimCurve.kAnimCurveTL:
+        convert = lambda v: OpenMaya.MDistance(v, OpenMaya.MDistance.uiUnit()).asCentimeters()
+
+    # ============
+    # - Add Keys -
+    # ============
+
+    timeUnit = OpenMaya.MTime.uiUnit()
+    timeArray = OpenMaya.MTimeArray()
+    valueArray = OpenMaya.MDoubleArray()
+    for t in channel.times: timeArray.append(OpenMaya.MTime(t + frameOffset, timeUnit))
+    for v in channel.values: valueArray.append(convert(v) if convert else v)
+
+    curveFn.setIsWeighted(channel.weighted)
+    curveFn.addKeys(timeArray, valueArray,
+                    OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                    OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                    keepExistingKeys)
+
+    # ================
+    # - Set Key Data -
+    # ================
+
+    breakdowns = []
+    for n in xrange(channel.keyCount()):
+
+        # Get Key Index
+        key = _findKey(curveFn, timeArray[n]) if keepExistingKeys else n
+
+        # Tangents
+        curveFn.setTangentsLocked(key, bool(channel.locks[n]))
+        curveFn.setInTangentType(key, _tangentType(channel.inTangents[n]))
+        curveFn.setOutTangentType(key, _tangentType(channel.outTangents[n]))
+        if channel.hasTangentData(n):
+            if channel.inTangentData[n]:
+                curveFn.setTangent(key, OpenMaya.MAngle(channel.inAngles[n], OpenMaya.MAngle.kDegrees),
+                                   channel.inWeights[n], True)
+            if channel.outTangentData[n]:
+                curveFn.setTangent(key, OpenMaya.MAngle(channel.outAngles[n], OpenMaya.MAngle.kDegrees),
+                                   channel.outWeights[n], False)
+        if channel.weighted: curveFn.setWeightsLocked(key, True)
+
+        # Breakdowns
+        if channel.breakdowns[n]: breakdowns.append(channel.times[n] + frameOffset)
+
+    # Set Breakdowns
+    if breakdowns: cmds.keyframe(attrPath, e=True, t=[(t, t) for t in breakdowns], breakdown=True)
 
     # Set Curve Infinity
     cmds.setInfinity(attrPath, pri=preInf, poi=postInf)
@@ -812,3 +1052,35 @@ def writeNotes(noteFile, note=None):
 
     # Close File
     f.close()
+
+
+def _tangentIndexMap():
+    """
+    Return a {tangentTypeName: TANGENT_TYPES index} dictionary.
+    """
+    return dict([(name, i) for i, name in enumerate(TANGENT_TYPES)])
+
+
+def _tangentType(tangentIndex):
+    """
+    Return the MFnAnimCurve tangent type enum for the specified TANGENT_TYPES index.
+    """
+    name = TANGENT_TYPES[tangentIndex]
+    if name == 'stepnext': name = 'stepNext'
+    return getattr(OpenMayaAnim.MFnAnimCurve, 'kTangent' + name[0].upper() + name[1:],
+                   OpenMayaAnim.MFnAnimCurve.kTangentGlobal)
+
+
+def _findKey(curveFn, time):
+    """
+    Return the index of the key at the specified time.
+    @param curveFn: Anim curve function set.
+    @type curveFn: OpenMayaAnim.MFnAnimCurve
+    @param time: Key time.
+    @type time: OpenMaya.MTime
+    """
+    indexUtil = OpenMaya.MScriptUtil()
+    indexUtil.createFromInt(0)
+    indexPtr = indexUtil.asUintPtr()
+    if curveFn.find(time, indexPtr): return OpenMaya.MScriptUtil.getUint(indexPtr)
+    return curveFn.findClosest(time)
@@ -1,12 +1,13 @@
 import maya.mel as mel
 import maya.cmds as cmds
 import glTools.utils.component
+import glTools.utils.progressBar
 import glTools.utils.selection
 import glTools.utils.skinCluster
 import gl_globals
 
 
-class UserInterupted(Exception): pass
+UserInterupted = glTools.utils.progressBar.UserInterupted
 
 
 def copyPasteWeightsUI():
@@ -90,52 +91,42 @@ def pasteWeights(showProgress=True):
     sel = cmds.filterExpand(ex=True, sm=[28, 31, 46])
     if not sel: return
 
-    # Begin Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Pasting Skin Weights...'),
-                       maxValue=len(sel))
-
+    # Group Components by Object
     selComp = glTools.utils.selection.componentListByObject(sel)
-    for objComp in selComp:
-
-        # Get Object from Component
-        geo = cmds.ls(objComp[0], o=True)[0]
-
-        # Get SkinCluster from Geometry
-        skin = glTools.utils.skinCluster.findRelatedSkinCluster(geo)
-        if not skin: raise Exception('Geometry "' + geo + '" is not attached to a valid skinCluster!')
-        # Disable Weight Normalization
-        cmds.setAttr(skin + '.normalizeWeights', 0)
-
-        # For Each Component
-        for cv in objComp:
-
-            # Update skinPercent Command
-            cmd = wt.replace('###', skin)
-
-            # Evaluate skinPercent Command
-            try:
-                mel.eval(cmd)
-            # print(cmd)
-            except Exception, e:
-                if showProgress: cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise Exception(str(s))
-
-            # Update Progress Bar
-            cvLen = len(cmds.ls(cv, fl=True))
-            if showProgress:
-                if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                    cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                    raise UserInterupted('Operation cancelled by user!')
-                cmds.progressBar(gMainProgressBar, e=True, step=cvLen)
-
-        # Normalize Weights
-        cmds.setAttr(skin + '.normalizeWeights', 1)
-        cmds.skinPercent(skin, normalize=True)
-
-    # End Current Progress Bar
-    if showProgress: cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+
+    # Begin Progress Bar (one step per component range)
+    with glTools.utils.progressBar.Progress(status='Pasting Skin Weights...', maxValue=sum(map(len, selComp)),
+                                            show=showProgress) as progress:
+        for objComp in selComp:
+
+            # Get Object from Component
+            geo = cmds.ls(objComp[0], o=True)[0]
+
+            # Get SkinCluster from Geometry
+            skin = glTools.utils.skinCluster.findRelatedSkinCluster(geo)
+            if not skin: raise Exception('Geometry "' + geo + '" is not attached to a valid skinCluster!')
+            # Disable Weight Normalization
+            cmds.setAttr(skin + '.normalizeWeights', 0)
+
+            # For Each Component
+            for cv in objComp:
+
+                # Update skinPercent Command
+                cmd = wt.replace('###', skin)
+
+                # Evaluate skinPercent Command
+                try:
+                    mel.eval(cmd)
+                # print(cmd)
+                except Exception, e:
+                    raise Exception(str(e))
+
+                # Update Progress Bar
+                progress.step()
+
+            # Normalize Weights
+            cmds.setAttr(skin + '.normalizeWeights', 1)
+            cmds.skinPercent(skin, normalize=True)
 
 
 def averageWeights(tol=0.000001):
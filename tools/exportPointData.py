@@ -1,11 +1,19 @@
 import maya.mel as mel
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
-import math
 import os.path
-import glTools.utils.base
+import array
+import json
+import struct
+import sys
 import glTools.utils.mesh
 import glTools.utils.matrix
+import glTools.utils.timeSample
+
+# Binary Track File Header - magic(8s), version(H), JSON header size(I)
+TRACK_MAGIC = 'GLTTRACK'
+TRACK_VERSION = 1
+TRACK_HEADER = struct.Struct('<8sHI')
 
 
 def export2DPointData(path, pt, cam, start, end, width=2348, height=1152):
@@ -37,24 +45,8 @@ def export2DPointData(path, pt, cam, start, end, width=2348, height=1152):
     # - Write Position Data -
     # -----------------------
 
-    # Cycle through frame range
-    for f in range(start, end + 1):
-        # Set current frame
-        cmds.currentTime(f)
-
-        # Get point world space position
-        pos = glTools.utils.base.getMPoint(pt)
-
-        # Get camera details
-        cam_hfv = cmds.camera(cam, q=True, hfv=True)
-        cam_vfv = cmds.camera(cam, q=True, vfv=True)
-        cam_mat = glTools.utils.matrix.getMatrix(cam).inverse()
-
-        # Calculate 2D point
-        ssPt = pos * cam_mat
-        ptx = (((ssPt.x / -ssPt.z) / math.tan(math.radians(cam_hfv / 2))) / 2.0) + 0.5
-        pty = (((ssPt.y / -ssPt.z) / math.tan(math.radians(cam_vfv / 2))) / 2.0) + 0.5
-
+    # Sample screen space positions for the frame range
+    for ptx, pty in getScreenSpaceTrack(pt, cam, range(start, end + 1)):
         # Write data to file
         file.write(str(ptx * width) + ' ' + str(pty * height) + '\n')
 
@@ -99,44 +91,14 @@ def export2DOffsetData(path, pt, cam, start, end, width=1, height=1, refFrame=1)
     # - Get Base Position -
     # ---------------------
 
-    # Set current frame
-    cmds.currentTime(refFrame)
-
-    # Get point world space position
-    pos = glTools.utils.base.getMPoint(pt)
-
-    # Get camera data
-    cam_hfv = cmds.camera(cam, q=True, hfv=True)
-    cam_vfv = cmds.camera(cam, q=True, vfv=True)
-    cam_mat = glTools.utils.matrix.getMatrix(cam).inverse()
-
-    # Calculate 2D point
-    ssPt = pos * cam_mat
-    basex = (((ssPt.x / -ssPt.z) / math.tan(math.radians(cam_hfv / 2))) / 2.0) + 0.5
-    basey = (((ssPt.y / -ssPt.z) / math.tan(math.radians(cam_vfv / 2))) / 2.0) + 0.5
+    basex, basey = getScreenSpaceTrack(pt, cam, [refFrame])[0]
 
     # ---------------------
     # - Write Offset Data -
     # ---------------------
 
-    # Cycle through frame range
-    for f in range(start, end + 1):
-        # Set current frame
-        cmds.currentTime(f)
-
-        # Get point world space position
-        pos = glTools.utils.base.getMPoint(pt)
-
-        # Get camera details
-        cam_hfv = cmds.camera(cam, q=True, hfv=True)
-        cam_vfv = cmds.camera(cam, q=True, vfv=True)
-        cam_mat = glTools.utils.matrix.getMatrix(cam).inverse()
-
-        # Calculate 2D point
-        ssPt = pos * cam_mat
-        ptx = (((ssPt.x / -ssPt.z) / math.tan(math.radians(cam_hfv / 2))) / 2.0) + 0.5
-        pty = (((ssPt.y / -ssPt.z) / math.tan(math.radians(cam_vfv / 2))) / 2.0) + 0.5
-
+    # Sample screen space positions for the frame range
+    for ptx, pty in getScreenSpaceTrack(pt, cam, range(start, end + 1)):
         # Write data to file
         file.write(str((ptx - basex) * width) + ' ' + str((pty - basey) * height) + '\n')
 
@@ -173,14 +135,11 @@ def export3DPointData(path, pt, start, end):
     # - Write Position Data -
     # -----------------------
 
-    # Cycle through frame range
-    for f in range(start, end + 1):
-        # Set current frame
-        cmds.currentTime(f)
-
-        # Get point world space position
-        pos = glTools.utils.base.getPosition(pt)
-
+    # Sample point world space positions for the frame range
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addPoint(pt)
+    sampler.sample(range(start, end + 1))
+    for pos in sampler.getPointTrack(0):
         # Write data to file
         file.write(str(pos[0]) + ' ' + str(pos[1]) + ' ' + str(pos[2]) + '\n')
 
@@ -295,3 +254,268 @@ def getRotation(obj, upVec=(0, 1, 0), rotateOrder='xyz'):
 
     # Return result
     return rot
+
+
+def exportTracks2D(path, ptList, camList, start, end, width=2348, height=1152, binary=False):
+    """
+    Export 2D (screen space) track data for a list of points, as seen through each camera in a list of cameras,
+    to a single columnar track file. All points and cameras are sampled in a single pass over the frame range,
+    and the file is written with a single buffered write.
+    Track columns are named "<camera>/<point>.x" and "<camera>/<point>.y".
+    @param path: Track file path to write to
+    @type path: str
+    @param ptList: List of points to export 2D track data for
+    @type ptList: list
+    @param camList: List of cameras used to calculate the 2D screen space from
+    @type camList: list
+    @param start: The first frame of the data sequence
+    @type start: int
+    @param end: The last frame of the data sequence
+    @type end: int
+    @param width: Maximum output screen space width
+    @type width: int
+    @param height: Maximum output screen space height
+    @type height: int
+    @param binary: Write a binary track file instead of a CSV file
+    @type binary: bool
+    """
+    # Check Lists
+    if isinstance(ptList, basestring): ptList = [ptList]
+    if isinstance(camList, basestring): camList = [camList]
+    if not ptList: raise Exception('No points specified for export!')
+    if not camList: raise Exception('No cameras specified for export!')
+
+    # Sample Tracks
+    frameList = range(start, end + 1)
+    data = sampleScreenSpaceTracks(ptList, camList, frameList)
+
+    # Scale to Output Resolution
+    data[0::2] = array.array('d', [x * width for x in data[0::2]])
+    data[1::2] = array.array('d', [y * height for y in data[1::2]])
+
+    # Write Track File
+    columns = [cam + '/' + pt + '.' + axis for cam in camList for pt in ptList for axis in 'xy']
+    writeTrackFile(path, frameList, columns, data, binary=binary)
+
+    # Print result
+    print('2D track data (' + str(len(columns) // 2) + ' tracks) exported to ' + path)
+
+    # Return Result
+    return path
+
+
+def exportTracks3D(path, ptList, start, end, binary=False):
+    """
+    Export 3D (world space) track data for a list of points to a single columnar track file.
+    All points are sampled in a single pass over the frame range, and the file is written with a single buffered write.
+    Track columns are named "<point>.x", "<point>.y" and "<point>.z".
+    @param path: Track file path to write to
+    @type path: str
+    @param ptList: List of points to export 3D track data for
+    @type ptList: list
+    @param start: The first frame of the data sequence
+    @type start: int
+    @param end: The last frame of the data sequence
+    @type end: int
+    @param binary: Write a binary track file instead of a CSV file
+    @type binary: bool
+    """
+    # Check List
+    if isinstance(ptList, basestring): ptList = [ptList]
+    if not ptList: raise Exception('No points specified for export!')
+
+    # Sample Tracks
+    frameList = range(start, end + 1)
+    data = glTools.utils.timeSample.samplePoints(ptList, frameList)
+
+    # Write Track File
+    columns = [pt + '.' + axis for pt in ptList for axis in 'xyz']
+    writeTrackFile(path, frameList, columns, data, binary=binary)
+
+    # Print result
+    print('3D track data (' + str(len(ptList)) + ' tracks) exported to ' + path)
+
+    # Return Result
+    return path
+
+
+def writeTrackFile(path, frameList, columns, data, binary=False):
+    """
+    Write columnar track data to file. One row per frame, one column per track value.
+    CSV files have a "frame,<column>,..." header line. Binary files store a JSON header (frames and column names)
+    followed by frame major float32 values.
+    @param path: Track file path to write to
+    @type path: str
+    @param frameList: List of frames, one per data row
+    @type frameList: list
+    @param columns: List of column names
+    @type columns: list
+    @param data: Flat, frame major (frames * columns) track values
+    @type data: list
+    @param binary: Write a binary track file instead of a CSV file
+    @type binary: bool
+    """
+    # Check Data
+    if len(data) != len(frameList) * len(columns):
+        raise Exception('Track data size (' + str(len(data)) + ') does not match the number of frames and columns!')
+
+    # Check Path
+    dirpath = os.path.dirname(path)
+    if dirpath and not os.path.isdir(dirpath): os.makedirs(dirpath)
+
+    # Build File Data
+    if binary:
+        header = json.dumps({'frames': list(frameList), 'columns': list(columns)})
+        values = array.array('f', data)
+        if sys.byteorder == 'big': values.byteswap()
+        fileData = TRACK_HEADER.pack(TRACK_MAGIC, TRACK_VERSION, len(header)) + header + values.tostring()
+    else:
+        colCount = len(columns)
+        lines = ['frame,' + ','.join(columns)]
+        for n, f in enumerate(frameList):
+            lines.append(','.join([str(f)] + [repr(v) for v in data[n * colCount:(n + 1) * colCount]]))
+        fileData = '\n'.join(lines) + '\n'
+
+    # Write File
+    f = open(path, 'wb')
+    f.write(fileData)
+    f.close()
+
+    # Return Result
+    return path
+
+
+def readTrackFile(path):
+    """
+    Read a columnar track file written by writeTrackFile().
+    Returns the frame list (as floats, for both binary and CSV files), the column name list and the flat,
+    frame major (frames * columns) track values.
+    @param path: Track file path to read
+    @type path: str
+    """
+    # Check Path
+    if not os.path.isfile(path):
+        raise Exception('Track file "' + path + '" does not exist!')
+
+    # Read File
+    f = open(path, 'rb')
+    fileData = f.read()
+    f.close()
+
+    # Binary Track File
+    if fileData.startswith(TRACK_MAGIC):
+        magic, version, headerSize = TRACK_HEADER.unpack_from(fileData, 0)
+        pos = TRACK_HEADER.size
+        header = json.loads(fileData[pos:pos + headerSize])
+        data = array.array('f')
+        data.fromstring(fileData[pos + headerSize:])
+        if sys.byteorder == 'big': data.byteswap()
+        return [float(frame) for frame in header['frames']], header['columns'], data
+
+    # CSV Track File
+    lines = fileData.splitlines()
+    columns = lines[0].split(',')[1:]
+    frames = []
+    data = array.array('d')
+    for line in lines[1:]:
+        if not line: continue
+        row = line.split(',')
+        frames.append(float(row[0]))
+        data.extend([float(v) for v in row[1:]])
+    return frames, columns, data
+
+
+def sampleScreenSpaceTracks(ptList, camList, frameList):
+    """
+    Return the normalized (0.0 - 1.0) 2D screen space positions of a list of points, as seen through each camera
+    in a list of cameras, for each frame in the frame list. Returns a flat (frames * cameras * points * 2) array.
+    All points and cameras are sampled in a single pass, without changing the current time. Points behind
+    a camera return NaN values for that camera.
+    @param ptList: List of points to calculate 2D screen space positions for
+    @type ptList: list
+    @param camList: List of cameras used to calculate the 2D screen space from
+    @type camList: list
+    @param frameList: List of frames to sample
+    @type frameList: list
+    """
+    # Sample Points and Cameras
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addPoints(ptList)
+    for cam in camList:
+        camShape = _getCameraShape(cam)
+        sampler.addMatrix(camShape)
+        sampler.addPlug(camShape + '.horizontalFilmAperture')
+        sampler.addPlug(camShape + '.verticalFilmAperture')
+        sampler.addPlug(camShape + '.focalLength')
+    sampler.sample(frameList)
+
+    # Project Points
+    ptCount = len(ptList)
+    data = array.array('d')
+    for f in xrange(sampler.frameCount()):
+        pts = sampler.points[f * ptCount * 3:(f + 1) * ptCount * 3]
+        for c in xrange(len(camList)):
+            # Camera field of view - tan(fov / 2) = (aperture(inches) * 25.4 / 2) / focalLength(mm)
+            hfa, vfa, fl = [sampler.getValue(f, c * 3 + i) for i in xrange(3)]
+            camMatrix = glTools.utils.matrix.asList(sampler.getMatrix(f, c).inverse())
+            data.extend(projectPoints(pts, camMatrix, hfa * 12.7 / fl, vfa * 12.7 / fl))
+
+    # Return Result
+    return data
+
+
+def projectPoints(pts, camMatrix, tanHfv, tanVfv):
+    """
+    Project a flat (x, y, z per point) world space point list to normalized (0.0 - 1.0) 2D screen space.
+    Returns a flat (x, y per point) array. Points behind the camera return NaN values.
+    @param pts: Flat (x, y, z per point) world space point list
+    @type pts: list
+    @param camMatrix: Inverse camera world matrix, as a 16 value (row major) list
+    @type camMatrix: list
+    @param tanHfv: Tangent of half the camera horizontal field of view
+    @type tanHfv: float
+    @param tanVfv: Tangent of half the camera vertical field of view
+    @type tanVfv: float
+    """
+    m = camMatrix
+    nan = float('nan')
+    xScale = 0.5 / tanHfv
+    yScale = 0.5 / tanVfv
+    result = array.array('d')
+    for x, y, z in zip(pts[0::3], pts[1::3], pts[2::3]):
+        # Camera Space Point
+        cz = x * m[2] + y * m[6] + z * m[10] + m[14]
+        if cz >= 0.0:
+            result.extend((nan, nan))
+            continue
+        cx = x * m[0] + y * m[4] + z * m[8] + m[12]
+        cy = x * m[1] + y * m[5] + z * m[9] + m[13]
+        # Screen Space Point
+        result.extend(((cx / -cz) * xScale + 0.5, (cy / -cz) * yScale + 0.5))
+    return result
+
+
+def getScreenSpaceTrack(pt, cam, frameList):
+    """
+    Return the normalized (0.0 - 1.0) 2D screen space positions of a point, as seen through the specified camera,
+    for each frame in the frame list. The point and camera are sampled without changing the current time.
+    @param pt: The point to calculate 2D screen space positions for
+    @type pt: str
+    @param cam: The camera used to calculate the 2D screen space from
+    @type cam: str
+    @param frameList: List of frames to sample
+    @type frameList: list
+    """
+    data = sampleScreenSpaceTracks([pt], [cam], frameList)
+    return [(data[i * 2], data[i * 2 + 1]) for i in xrange(len(data) // 2)]
+
+
+def _getCameraShape(cam):
+    """
+    Return the camera shape for the specified camera transform or shape.
+    """
+    if not cmds.objExists(cam): raise Exception('Camera "' + cam + '" does not exist!')
+    if cmds.objectType(cam) == 'camera': return cam
+    camShape = cmds.listRelatives(cam, s=True, type='camera', pa=True)
+    if not camShape: raise Exception('Object "' + cam + '" is not a valid camera!')
+    return camShape[0]
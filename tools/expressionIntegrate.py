@@ -1,9 +1,11 @@
 import maya.mel as mel
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
 import glTools.utils.blendShape
 import glTools.utils.dnpublish
 import glTools.utils.mesh
 import glTools.utils.skinCluster
+import glTools.utils.timeSample
 import glTools.tools.shapeExtract
 import glTools.tools.measureMeshDistance
 import glTools.tools.barycentricPointWeight
@@ -294,14 +296,16 @@ def rebuildExpressionsWithLatestRig(char, rigHighDetail=True):
     rigBaseList = []
     animResultList = []
 
+    # Sample expression keyframes
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addGeometry(faceMesh, worldSpace=False)
+    sampler.sample([20 * (i + 1) for i in range(len(expressionList))])
+
     # Duplicate and layout expression results
     for i in range(len(expressionList)):
 
-        # Go to expression keyframe
-        cmds.currentTime(20 * (i + 1))
-
         # Duplicate expression result
-        rigBaseNew = cmds.duplicate(faceMesh, rr=True, n=expressionList[i] + '_rigBaseNEW')[0]
+        rigBaseNew = duplicateSample(faceMesh, sampler, i, expressionList[i] + '_rigBaseNEW')
 
         # Shift expression mesh along the X axis
         cmds.move(width * (i + 1), 0, 0, rigBaseNew)
@@ -355,13 +359,15 @@ def rebuildExpressionsWithLatestRig(char, rigHighDetail=True):
     expressionSculptList = []
     expressionConceptList = []
 
+    # Sample expression keyframes
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addGeometry(faceMesh, worldSpace=False)
+    sampler.sample([20 * (i + 1) for i in range(len(deltaList))])
+
     # Duplicate and layout expression results
     for i in range(len(deltaList)):
-        # Go to expression keyframe
-        cmds.currentTime(20 * (i + 1))
-
         # Duplicate expression result
-        expressionResult = cmds.duplicate(faceMesh, rr=True, n=expressionList[i] + '_sculptNEW')[0]
+        expressionResult = duplicateSample(faceMesh, sampler, i, expressionList[i] + '_sculptNEW')
 
         # Shift expression mesh along the X axis
         cmds.move(width * (i + 1), 0, 0, expressionResult)
@@ -407,6 +413,32 @@ def rebuildExpressionsWithLatestRig(char, rigHighDetail=True):
     print('COMPLETED: ' + char.upper() + ' Expression Update')
 
 
+def duplicateSample(mesh, sampler, frame, name):
+    """
+    Duplicate a mesh, and apply the (object space) mesh points sampled at the specified sample frame index.
+    Avoids changing the current time to duplicate the mesh at a specific frame.
+    @param mesh: Mesh to duplicate
+    @type mesh: str
+    @param sampler: Time sampler holding the sampled object space mesh points
+    @type sampler: glTools.utils.timeSample.TimeSampler
+    @param frame: Sample frame index to apply
+    @type frame: int
+    @param name: Name of the duplicate mesh
+    @type name: str
+    """
+    # Duplicate Mesh
+    dup = cmds.duplicate(mesh, rr=True, n=name)[0]
+
+    # Apply Sampled Points
+    ptArray = OpenMaya.MPointArray()
+    for i in xrange(sampler.pointCount):
+        ptArray.append(OpenMaya.MPoint(*sampler.getPoint(frame, i)))
+    glTools.utils.mesh.getMeshFn(dup).setPoints(ptArray)
+
+    # Return Result
+    return dup
+
+
 def replaceExpressionDeltaMesh(namespace='TARSFACEa01:'):
     """
     Override expression delta connection to new input mesh.
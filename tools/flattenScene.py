@@ -1,9 +1,24 @@
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
 import glTools.tools.fixNonReferenceInputShape
 import glTools.utils.namespace
 import glTools.utils.reference
 import glTools.utils.shape
 import os.path
+import time
+
+# Flatten tag attributes (deleted on cleanup)
+FLATTEN_ATTRS = ['encodeReferenceFilePath',
+                 'renameOnFlatten',
+                 'reparentOnFlatten',
+                 'deleteHistoryOnFlatten',
+                 'fixNonReferenceInputsRoot']
+
+# Flatten info attributes (locked on cleanup)
+FLATTEN_INFO_ATTRS = ['referenceFilePath']
+
+# Nodes to delete set
+DELETE_SET = 'nodesToDelete'
 
 
 def flatten(verbose=True):
@@ -16,6 +31,8 @@ def flatten(verbose=True):
     - Delete specified nodes (selection set based)
     - Rename shape nodes
     - Rename specified nodes (selection set based)
+    Flatten tagged nodes are collected in a single scene scan after references are imported (see buildFlattenPlan()),
+    and the flatten operations are run in batches. Returns a list of (phase, seconds) timings.
     @param verbose: Print progress messages
     @type verbose: bool
     """
@@ -25,33 +42,30 @@ def flatten(verbose=True):
         print('- Flatten Scene -')
         print('=================')
 
+    timings = []
+
     # Encode Reference File Path to Nodes
-    encodeReferenceFilePath(verbose)
+    _timed(timings, 'Encode Reference File Path', encodeReferenceFilePath, verbose)
 
     # Fix NonReference Inputs
-    fixNonReferenceInputs(verbose)
+    _timed(timings, 'Fix NonReference Inputs', fixNonReferenceInputs, verbose)
 
     # Import References
-    importAllReferences(verbose)
+    _timed(timings, 'Import References', importAllReferences, verbose)
 
     # Delete Namespaces
-    deleteAllNS(verbose)
-
-    # Delete History
-    deleteHistory(verbose)
-
-    # Delete Nodes
-    deleteNodes(verbose)
+    _timed(timings, 'Delete Namespaces', deleteAllNS, verbose)
 
-    # Reparent Nodes
-    reparentOnFlatten(verbose)
+    # Build Flatten Plan
+    plan = _timed(timings, 'Build Flatten Plan', buildFlattenPlan)
 
-    # Renames Nodes
-    renameShapes(verbose)
-    renameOnFlatten(verbose)
+    # Delete History, Delete Nodes, Reparent Nodes, Rename Nodes, Cleanup
+    executeFlattenPlan(plan, verbose=verbose, timings=timings)
 
-    # Cleanup - Delete and Lock FlattenScene Attributes
-    cleanup(verbose)
+    # Print Timings
+    if verbose:
+        for phase, seconds in timings: print(phase.ljust(28) + ('%.3f' % seconds) + 's')
+        print('Total'.ljust(28) + ('%.3f' % sum([i[1] for i in timings])) + 's')
 
     # Print Header
     if verbose:
@@ -59,60 +73,133 @@ def flatten(verbose=True):
         print('- Flatten Scene Complete! -')
         print('===========================')
 
+    # Return Result
+    return timings
+
 
-def cleanup(verbose=True):
+class FlattenPlan(object):
     """
-    Flatten scene cleanup. Delete unused attributes and lock info attributes
-    @param verbose: Print progress messages
-    @type verbose: bool
+    Flatten scene operations, collected from flatten tagged nodes in a single scene scan. See buildFlattenPlan().
+    Nodes are stored as MObjectHandles, so node names are resolved at execution time, after earlier
+    operations (deletes, reparents and renames) have changed the scene.
     """
+
+    def __init__(self):
+        """
+        FlattenPlan class initializer.
+        """
+        # Nodes to delete construction history for
+        self.deleteHistory = []
+        # Nodes (and components) to delete - stored by name, as deleting history doesn't rename nodes
+        self.deleteNodes = []
+        # (node, parent) pairs to reparent
+        self.reparent = []
+        # Shape nodes to check for "Deformed" naming
+        self.shapes = []
+        # (node, name) pairs to rename
+        self.rename = []
+        # (node, attr) pairs to delete/lock on cleanup
+        self.deleteAttrs = []
+        self.lockAttrs = []
+
+
+def buildFlattenPlan():
+    """
+    Scan the scene for flatten tagged nodes (attributes and the nodesToDelete set), and return a FlattenPlan.
+    """
+    plan = FlattenPlan()
+
     # =====================
-    # - Delete Attributes -
+    # - Scan Tagged Nodes -
     # =====================
 
-    # For Each Attribute
-    attrList = ['encodeReferenceFilePath',
-                'renameOnFlatten',
-                'reparentOnFlatten',
-                'deleteHistoryOnFlatten',
-                'fixNonReferenceInputsRoot']
+    attrNodes = dict([(attr, []) for attr in FLATTEN_ATTRS + FLATTEN_INFO_ATTRS])
+    for plug in cmds.ls(['*.' + attr for attr in FLATTEN_ATTRS + FLATTEN_INFO_ATTRS], r=True) or []:
+        node, attr = plug.split('.', 1)
+        if attr in attrNodes: attrNodes[attr].append(node)
 
-    for attr in attrList:
+    # ==================
+    # - Delete History -
+    # ==================
 
-        # For Each Node
-        attrNodes = cmds.ls('*.' + attr, o=True, r=True)
-        for node in attrNodes:
+    # Tagged nodes and their DAG descendants
+    histNodes = attrNodes['deleteHistoryOnFlatten']
+    if histNodes: plan.deleteHistory = [_nodeHandle(i) for i in cmds.ls(histNodes, dag=True, l=True) or []]
 
-            # Print Msg
-            if verbose: print ('Deleting Attribute "' + node + '.' + attr + '"')
+    # ================
+    # - Delete Nodes -
+    # ================
 
-            # Delete Attribute
-            cmds.setAttr(node + '.' + attr, l=False)
-            cmds.deleteAttr(node + '.' + attr)
+    if cmds.objExists(DELETE_SET):
+        for node in cmds.sets(DELETE_SET, q=True) or []:
+            if not cmds.objExists(node):
+                raise Exception('Object "' + node + '" does not exist! Unable to delete')
+            plan.deleteNodes.append(node)
 
-    # ===================
-    # - Lock Attributes -
-    # ===================
+    # ============
+    # - Reparent -
+    # ============
 
-    # For Each Attribute
-    attrList = ['referenceFilePath']
-    for attr in attrList:
+    reparentNodes = attrNodes['reparentOnFlatten']
+    if reparentNodes:
+        conns = cmds.listConnections([i + '.reparentOnFlatten' for i in reparentNodes], s=True, d=False, c=True) or []
+        for i in range(0, len(conns), 2):
+            plan.reparent.append((_nodeHandle(conns[i].split('.')[0]), _nodeHandle(conns[i + 1])))
 
-        # For Each Node
-        attrNodes = cmds.ls('*.' + attr, o=True, r=True)
-        for node in attrNodes:
+    # ==========
+    # - Rename -
+    # ==========
 
-            # Print Msg
-            if verbose: print ('Locking Attribute "' + node + '.' + attr + '"')
+    # Shapes - Checked for intermediate shapes at execution time (after construction history is deleted)
+    plan.shapes = [_nodeHandle(i) for i in cmds.ls('*Deformed', type='shape', ni=True, r=True, l=True) or []]
 
-            # Lock Attribute
-            cmds.setAttr(node + '.' + attr, l=True)
+    # Nodes
+    for node in attrNodes['renameOnFlatten']:
+        renameStr = cmds.getAttr(node + '.renameOnFlatten')
+        if renameStr: plan.rename.append((_nodeHandle(node), renameStr))
+
+    # ===========
+    # - Cleanup -
+    # ===========
+
+    plan.deleteAttrs = [(_nodeHandle(node), tag) for tag in FLATTEN_ATTRS for node in attrNodes[tag]]
+    plan.lockAttrs = [(_nodeHandle(node), tag) for tag in FLATTEN_INFO_ATTRS for node in attrNodes[tag]]
 
     # =================
     # - Return Result -
     # =================
 
-    return
+    return plan
+
+
+def executeFlattenPlan(plan, verbose=True, timings=None):
+    """
+    Run the flatten operations of a FlattenPlan - delete history, delete nodes, reparent nodes, rename shapes,
+    rename nodes and cleanup flatten attributes. Returns a list of (phase, seconds) timings.
+    @param plan: Flatten plan to execute. See buildFlattenPlan().
+    @type plan: FlattenPlan
+    @param verbose: Print progress messages
+    @type verbose: bool
+    @param timings: Timing list to append phase timings to. If None, start a new list.
+    @type timings: list or None
+    """
+    if timings is None: timings = []
+    _timed(timings, 'Delete History', _executeDeleteHistory, plan, verbose)
+    _timed(timings, 'Delete Nodes', _executeDeleteNodes, plan, verbose)
+    _timed(timings, 'Reparent Nodes', _executeReparent, plan, verbose)
+    _timed(timings, 'Rename Shapes', _executeRenameShapes, plan, verbose)
+    _timed(timings, 'Rename Nodes', _executeRename, plan, verbose)
+    _timed(timings, 'Cleanup', _executeCleanup, plan, verbose)
+    return timings
+
+
+def cleanup(verbose=True):
+    """
+    Flatten scene cleanup. Delete unused attributes and lock info attributes
+    @param verbose: Print progress messages
+    @type verbose: bool
+    """
+    _executeCleanup(buildFlattenPlan(), verbose)
 
 
 def importAllReferences(verbose=True):
@@ -154,55 +241,7 @@ def renameShapes(verbose=True):
     @param verbose: Print progress messages
     @type verbose: bool
     """
-    # List all scene transforms
-    xformList = cmds.ls(type='transform')
-
-    # Iterate over transforms
-    for xform in xformList:
-
-        # Get Xform Short Name
-        xformSN = xform.split('|')[-1]
-
-        # List all shapes
-        allShapeList = cmds.listRelatives(xform, s=True, pa=True)
-        if not allShapeList: continue
-
-        # List all non-intermediate shape children
-        shapeList = cmds.listRelatives(xform, s=True, ni=True, pa=True)
-        if not shapeList: continue
-
-        # List all intermediate shapes
-        if len(allShapeList) == len(shapeList): continue
-        intShapeList = list(set(allShapeList) - set(shapeList))
-
-        # Check shape naming
-        for shape in shapeList:
-
-            # Get Shape Short Name
-            shapeSN = shape.split('|')[-1]
-
-            # Check for ShapeDeformed naming
-            if shapeSN.endswith('Deformed'):
-
-                # Find input shape
-                try:
-                    inputShape = glTools.utils.shape.findInputShape(shape)
-                except:
-                    inputShape = glTools.utils.shape.findInputShape2(shape)
-
-                # Get InputShape Short Name
-                inputShapeSN = inputShape.split('|')[-1]
-
-                # Check Input Shape
-                if inputShapeSN != shapeSN:
-                    # Rename input shape
-                    if verbose: print('Renaming: ' + inputShapeSN + ' -> ' + xformSN + 'IntermediateShape')
-                    inputShape = cmds.rename(inputShape, xformSN + 'IntermediateShape')
-
-                # Rename current shape
-                if verbose: print('Renaming: ' + shapeSN + ' -> ' + xformSN + 'Shape')
-                shape = cmds.rename(shape, xformSN + 'Shape')
-                cmds.reorder(shape, f=True)
+    return _executeRenameShapes(buildFlattenPlan(), verbose)
 
 
 def deleteNodes(verbose=True):
@@ -211,45 +250,7 @@ def deleteNodes(verbose=True):
     @param verbose: Print progress messages
     @type verbose: bool
     """
-    # ==========
-    # - Checks -
-    # ==========
-
-    # Check Set Exists
-    if not cmds.objExists('nodesToDelete'): return []
-
-    # Check Nodes
-    nodesToDelete = cmds.sets('nodesToDelete', q=True)
-    for node in nodesToDelete:
-        if not cmds.objExists(node):
-            raise Exception('Object "" does not exist! Unable to delete')
-
-    # ================
-    # - Delete Nodes -
-    # ================
-
-    deletedNodes = []
-    for node in nodesToDelete:
-
-        try:
-            # Delete Node
-            cmds.delete(node)
-        except:
-            # Unable to Delete Node
-            if verbose:
-                print('Unable to delete object "' + node + '"! Skipping')
-        else:
-            # Node Deleted
-            if verbose:
-                print ('Object "' + node + '" successfully delete!')
-            # Append Return List
-            deletedNodes.append(node)
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return deletedNodes
+    return _executeDeleteNodes(buildFlattenPlan(), verbose)
 
 
 def renameOnFlatten(verbose=True):
@@ -258,42 +259,7 @@ def renameOnFlatten(verbose=True):
     @param verbose: Print progress messages
     @type verbose: bool
     """
-    # ==========
-    # - Checks -
-    # ==========
-
-    nodeList = cmds.ls('*.renameOnFlatten', o=True)
-    if not nodeList: return []
-
-    # ================
-    # - Rename Nodes -
-    # ================
-
-    renameList = []
-    for node in nodeList:
-
-        # Get Rename String
-        renameStr = cmds.getAttr(node + '.renameOnFlatten')
-        # Check Empty String
-        if not renameStr: continue
-        if cmds.objExists(renameStr):
-            raise Exception(
-                'RenameOnFlatten: Object "' + node + '" cant be renamed to "' + renameStr + '"! Object of that name already exists...')
-
-        # Rename Node
-        renamed = cmds.rename(node, renameStr)
-
-        # Print Msg
-        if verbose: print ('Renaming "' + node + '" -> "' + renamed + '"')
-
-        # Append Result
-        renameList.append(renamed)
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return renameList
+    return _executeRename(buildFlattenPlan(), verbose)
 
 
 def reparentOnFlatten(verbose):
@@ -302,44 +268,7 @@ def reparentOnFlatten(verbose):
     @param verbose: Print progress messages
     @type verbose: bool
     """
-    # ==========
-    # - Checks -
-    # ==========
-
-    nodeList = cmds.ls('*.reparentOnFlatten', o=True)
-    if not nodeList: return []
-
-    # ==================
-    # - Reparent Nodes -
-    # ==================
-
-    reparentList = []
-    for node in nodeList:
-
-        # Get Parent
-        parentConn = cmds.listConnections(node + '.reparentOnFlatten', s=True, d=False)
-        if not parentConn: continue
-        parent = parentConn[0]
-
-        # Check Parent
-        if not cmds.objExists(parent):
-            raise Exception('Target parent node "' + parent + '" does not exist!')
-
-        # Reparent Node
-        reparented = cmds.parent(node, parent)[0]
-
-        # Print Msg
-        if verbose:
-            print ('Reparenting "' + node + '" -> "' + parent + '"')
-
-        # Append Result
-        reparentList.append(reparented)
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return reparentList
+    return _executeReparent(buildFlattenPlan(), verbose)
 
 
 def deleteHistory(verbose):
@@ -348,33 +277,7 @@ def deleteHistory(verbose):
     @param verbose: Print progress messages
     @type verbose: bool
     """
-    # ==========
-    # - Checks -
-    # ==========
-
-    nodeList = cmds.ls('*.deleteHistoryOnFlatten', o=True, dag=True)
-    if not nodeList: return []
-
-    # ==================
-    # - Delete History -
-    # ==================
-
-    for node in nodeList:
-
-        # Print Msg
-        if verbose: print ('Deleting Construction History for "' + node + '"')
-
-        # Delete History
-        try:
-            cmds.delete(node, ch=True)
-        except:
-            print('Problem deleting construction history on node "' + node + '" during flattenScene!')
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return nodeList
+    return _executeDeleteHistory(buildFlattenPlan(), verbose)
 
 
 def fixNonReferenceInputs(verbose=False):
@@ -671,3 +574,231 @@ def addReparentAttrFromSel():
     # Add Reparent Attr
     for obj in sel[:-1]:
         addReparentAttr(node=obj, parent=sel[-1])
+
+
+def _executeDeleteHistory(plan, verbose=True):
+    """
+    Delete construction history for all flatten plan history nodes, in a single delete call.
+    """
+    # Get Nodes
+    nodeList = [_nodeName(i) for i in plan.deleteHistory if i.isValid()]
+    if not nodeList: return []
+
+    # Print Msg
+    if verbose: print ('Deleting Construction History for ' + str(len(nodeList)) + ' nodes')
+
+    # Delete History
+    try:
+        cmds.delete(nodeList, ch=True)
+    except:
+        for node in nodeList:
+            try:
+                cmds.delete(node, ch=True)
+            except:
+                print('Problem deleting construction history on node "' + node + '" during flattenScene!')
+
+    # Return Result
+    return nodeList
+
+
+def _executeDeleteNodes(plan, verbose=True):
+    """
+    Delete all flatten plan delete nodes, in a single delete call.
+    Falls back to deleting nodes individually if the batched delete fails.
+    """
+    # Get Existing Nodes
+    if not plan.deleteNodes: return []
+    nodeList = cmds.ls(plan.deleteNodes) or []
+    if not nodeList: return []
+
+    # Delete Nodes
+    try:
+        cmds.delete(nodeList)
+    except:
+        pass
+    else:
+        if verbose:
+            for node in nodeList: print ('Object "' + node + '" successfully delete!')
+        return nodeList
+
+    # Delete Nodes Individually
+    deletedNodes = []
+    for node in nodeList:
+        if not cmds.objExists(node): continue
+        try:
+            cmds.delete(node)
+        except:
+            if verbose: print('Unable to delete object "' + node + '"! Skipping')
+        else:
+            if verbose: print ('Object "' + node + '" successfully delete!')
+            deletedNodes.append(node)
+
+    # Return Result
+    return deletedNodes
+
+
+def _executeReparent(plan, verbose=True):
+    """
+    Reparent all flatten plan reparent nodes, with one parent call per target parent.
+    """
+    # Group Nodes by Parent
+    groupList = []
+    groupIndex = {}
+    for node, parent in plan.reparent:
+        if not (node.isValid() and parent.isValid()): continue
+        key = _nodeName(parent)
+        if not key in groupIndex:
+            groupIndex[key] = len(groupList)
+            groupList.append((parent, []))
+        groupList[groupIndex[key]][1].append(node)
+
+    # Reparent Nodes - Names are resolved per group, as earlier groups can change node paths
+    reparentList = []
+    for parentHandle, nodeHandles in groupList:
+        parent = _nodeName(parentHandle)
+        nodeList = [_nodeName(i) for i in nodeHandles]
+        reparentList.extend(cmds.parent(nodeList, parent))
+        if verbose:
+            for node in nodeList: print ('Reparenting "' + node + '" -> "' + parent + '"')
+
+    # Return Result
+    return reparentList
+
+
+def _executeRenameShapes(plan, verbose=True):
+    """
+    Rename "Deformed" shapes (and their input shapes) of transforms with intermediate shapes.
+    """
+    renameList = []
+    for shapeHandle in plan.shapes:
+        if not shapeHandle.isValid(): continue
+        shape = _nodeName(shapeHandle)
+
+        # Check Intermediate Shapes
+        xform = cmds.listRelatives(shape, p=True, pa=True)[0]
+        allShapeList = cmds.listRelatives(xform, s=True, pa=True) or []
+        if not allShapeList or not cmds.ls(allShapeList, io=True): continue
+
+        # Get Short Names
+        xformSN = xform.split('|')[-1]
+        shapeSN = shape.split('|')[-1]
+
+        # Find input shape
+        try:
+            inputShape = glTools.utils.shape.findInputShape(shape)
+        except:
+            inputShape = glTools.utils.shape.findInputShape2(shape)
+
+        # Get InputShape Short Name
+        inputShapeSN = inputShape.split('|')[-1]
+
+        # Check Input Shape
+        if inputShapeSN != shapeSN:
+            # Rename input shape
+            if verbose: print('Renaming: ' + inputShapeSN + ' -> ' + xformSN + 'IntermediateShape')
+            inputShape = cmds.rename(inputShape, xformSN + 'IntermediateShape')
+
+        # Rename current shape
+        if verbose: print('Renaming: ' + shapeSN + ' -> ' + xformSN + 'Shape')
+        shape = cmds.rename(shape, xformSN + 'Shape')
+        cmds.reorder(shape, f=True)
+        renameList.append(shape)
+
+    # Return Result
+    return renameList
+
+
+def _executeRename(plan, verbose=True):
+    """
+    Rename all flatten plan rename nodes.
+    Renames are ordered so that a node can be renamed to a name that is freed up by another rename.
+    """
+    renameList = []
+    pending = [i for i in plan.rename if i[0].isValid()]
+    while pending:
+
+        remaining = []
+        for handle, renameStr in pending:
+
+            # Check Name
+            node = _nodeName(handle)
+            if node.split('|')[-1] == renameStr: continue
+            if cmds.objExists(renameStr):
+                remaining.append((handle, renameStr))
+                continue
+
+            # Rename Node
+            renamed = cmds.rename(node, renameStr)
+
+            # Print Msg
+            if verbose: print ('Renaming "' + node + '" -> "' + renamed + '"')
+
+            # Append Result
+            renameList.append(renamed)
+
+        # Check Name Conflicts
+        if len(remaining) == len(pending):
+            node = _nodeName(remaining[0][0])
+            raise Exception('RenameOnFlatten: Object "' + node + '" cant be renamed to "' + remaining[0][1] +
+                            '"! Object of that name already exists...')
+        pending = remaining
+
+    # Return Result
+    return renameList
+
+
+def _executeCleanup(plan, verbose=True):
+    """
+    Delete flatten tag attributes and lock flatten info attributes.
+    """
+    # Delete Attributes
+    for plug in _existingPlugs(plan.deleteAttrs):
+        if verbose: print ('Deleting Attribute "' + plug + '"')
+        cmds.setAttr(plug, l=False)
+        cmds.deleteAttr(plug)
+
+    # Lock Attributes
+    for plug in _existingPlugs(plan.lockAttrs):
+        if verbose: print ('Locking Attribute "' + plug + '"')
+        cmds.setAttr(plug, l=True)
+
+
+def _existingPlugs(nodeAttrs):
+    """
+    Return the current plug names for a list of (MObjectHandle, attr) pairs, skipping removed nodes and attributes.
+    """
+    plugs = [_nodeName(handle) + '.' + attr for handle, attr in nodeAttrs if handle.isValid()]
+    return [plug for plug in plugs if cmds.objExists(plug)]
+
+
+def _nodeHandle(node):
+    """
+    Return an MObjectHandle for the specified node.
+    """
+    selectionList = OpenMaya.MSelectionList()
+    selectionList.add(node)
+    mObject = OpenMaya.MObject()
+    selectionList.getDependNode(0, mObject)
+    return OpenMaya.MObjectHandle(mObject)
+
+
+def _nodeName(handle):
+    """
+    Return the current (unique partial path) name of the node of an MObjectHandle.
+    """
+    mObject = handle.object()
+    if mObject.hasFn(OpenMaya.MFn.kDagNode):
+        dagPath = OpenMaya.MDagPath()
+        OpenMaya.MDagPath.getAPathTo(mObject, dagPath)
+        return dagPath.partialPathName()
+    return OpenMaya.MFnDependencyNode(mObject).name()
+
+
+def _timed(timings, phase, func, *args):
+    """
+    Run a function, appending the (phase, seconds) run time to a timing list. Returns the function result.
+    """
+    startTime = time.time()
+    result = func(*args)
+    timings.append((phase, time.time() - startTime))
+    return result
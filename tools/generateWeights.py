@@ -1,11 +1,135 @@
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
 import glTools.utils.base
-import glTools.utils.mathUtils
 import glTools.utils.curve
+import glTools.utils.kdTree
 import glTools.utils.mesh
+from glTools.utils.weightList import WeightArray
+import array
+import itertools
+import math
+import operator
 
 
+# ===================
+# - Weight Pipeline -
+# ===================
+
+def getPointColumns(geometry, worldSpace=True):
+    """
+    Return the point positions of the specified geometry as separate x, y and z double arrays.
+    The geometry points are fetched once, so falloff functions can be evaluated over all points in array form.
+    @param geometry: The geometry to get point positions for
+    @type geometry: str
+    @param worldSpace: Return point positions in world or object space
+    @type worldSpace: bool
+    """
+    # Check geometry
+    if not cmds.objExists(geometry):
+        raise Exception('Object "' + geometry + '" does not exist!')
+
+    # Get Point Array
+    ptArray = glTools.utils.base.getMPointArray(geometry, worldSpace)
+    pts = [(ptArray[i].x, ptArray[i].y, ptArray[i].z) for i in xrange(ptArray.length())]
+    if not pts: return array.array('d'), array.array('d'), array.array('d')
+
+    # Return Result
+    return tuple([array.array('d', col) for col in zip(*pts)])
+
+
+def pointDistances(columns, point):
+    """
+    Return the distance from each point to a specified position.
+    @param columns: Point x, y and z arrays. See getPointColumns().
+    @type columns: tuple
+    @param point: Position to calculate distances to
+    @type point: list or tuple
+    """
+    px, py, pz = float(point[0]), float(point[1]), float(point[2])
+    dist = lambda x, y, z: math.sqrt((x - px) * (x - px) + (y - py) * (y - py) + (z - pz) * (z - pz))
+    return WeightArray(map(dist, columns[0], columns[1], columns[2]))
+
+
+def linearFalloff(distances, minDistance, maxDistance):
+    """
+    Map distance values to weights. Weights are 1.0 within minDistance, 0.0 beyond maxDistance,
+    and fall off linearly between.
+    @param distances: Distance values
+    @type distances: list
+    @param minDistance: Full weight distance
+    @type minDistance: float
+    @param maxDistance: Zero weight distance
+    @type maxDistance: float
+    """
+    if maxDistance <= minDistance:
+        return WeightArray(map(float, map(operator.le, distances, itertools.repeat(minDistance, len(distances)))))
+    scale = -1.0 / (maxDistance - minDistance)
+    return ((WeightArray(distances) - minDistance) * scale + 1.0).clamp()
+
+
+def smoothWeights(weights, smooth=0):
+    """
+    Apply a number of smoothStep iterations to a weight list.
+    @param weights: Weight values to smooth
+    @type weights: list
+    @param smooth: Number of smoothStep iterations
+    @type smooth: int
+    """
+    weights = WeightArray(weights)
+    for n in range(int(smooth)):
+        weights = WeightArray(map(_smoothStep, weights))
+    return weights
+
+
+def _smoothStep(value):
+    """
+    Hermite smoothStep of a 0-1 value. Equivalent to glTools.utils.mathUtils.smoothStep() with default arguments.
+    """
+    return value * value * (3.0 - 2.0 * value)
+
+
+def _rayDistance(meshFn, accelParams, source, direction, testBothDirections=False):
+    """
+    Return the distance from a source point to the closest mesh intersection along a ray, or None if there is no hit.
+    """
+    hitPt = OpenMaya.MFloatPoint()
+    hit = meshFn.closestIntersection(OpenMaya.MFloatPoint(source.x, source.y, source.z),
+                                     OpenMaya.MFloatVector(direction.x, direction.y, direction.z),
+                                     None, None, False, OpenMaya.MSpace.kWorld, 9999, testBothDirections,
+                                     accelParams, hitPt, None, None, None, None, None, 0.0001)
+    if not hit: return None
+    return (source - OpenMaya.MPoint(hitPt.x, hitPt.y, hitPt.z, 1.0)).length()
+
+
+def _segmentDistance(pt, a, b):
+    """
+    Return the distance from a point to the line segment (a, b).
+    """
+    abx, aby, abz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    apx, apy, apz = pt[0] - a[0], pt[1] - a[1], pt[2] - a[2]
+    lenSq = abx * abx + aby * aby + abz * abz
+    t = 0.0
+    if lenSq: t = max(0.0, min(1.0, (apx * abx + apy * aby + apz * abz) / float(lenSq)))
+    dx, dy, dz = apx - abx * t, apy - aby * t, apz - abz * t
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+
+def _boundingBoxIndices(columns, bbox):
+    """
+    Return the indices of all points inside a bounding box.
+    """
+    bbMin = bbox.min()
+    bbMax = bbox.max()
+    xs, ys, zs = columns
+    return [i for i in xrange(len(xs)) if bbMin.x <= xs[i] <= bbMax.x and
+                                          bbMin.y <= ys[i] <= bbMax.y and
+                                          bbMin.z <= zs[i] <= bbMax.z]
+
+
+# =====================
+# - Weight Generators -
+# =====================
+
 def gradientWeights(geometry, pnt1, pnt2, smooth=0):
     """
     Generate a gradient weight list for a specified geometry.
@@ -19,34 +143,26 @@ def gradientWeights(geometry, pnt1, pnt2, smooth=0):
     @param smooth: Number of smoothStep iterations
     @type smooth: int
     """
-    # Check geometry
-    if not cmds.objExists(geometry):
-        raise UserInputError('Object "' + geometry + '" does not exist!')
+    # Get Points
+    columns = getPointColumns(geometry)
 
     # Check points
-    pnt1 = glTools.utils.base.getMPoint(pnt1)
-    pnt2 = glTools.utils.base.getMPoint(pnt2)
-    # Calc offset vector
-    pntVec = pnt2 - pnt1
-    pntVecNorm = pntVec.normal()
-    pntLen = pntVec.length()
+    pnt1 = glTools.utils.base.getPosition(pnt1)
+    pnt2 = glTools.utils.base.getPosition(pnt2)
 
-    # Get points to generate weights from
-    pointList = glTools.utils.base.getMPointArray(geometry)
+    # Calc offset vector (scaled by the inverse squared length, for a 0-1 projection)
+    vx, vy, vz = pnt2[0] - pnt1[0], pnt2[1] - pnt1[1], pnt2[2] - pnt1[2]
+    lenSq = float(vx * vx + vy * vy + vz * vz)
+    if not lenSq: raise Exception('Gradient start and end points are coincident!')
+    vx, vy, vz = vx / lenSq, vy / lenSq, vz / lenSq
+    ox, oy, oz = pnt1[0], pnt1[1], pnt1[2]
 
     # Build weight array
-    wtList = []
-    for i in range(pointList.length()):
-        offsetVec = pointList[i] - pnt1
-        wt = ((pntVecNorm * offsetVec) / pntLen)
-        if wt < 0.0: wt = 0.0
-        if wt > 1.0: wt = 1.0
-        for i in range(int(smooth)):
-            wt = glTools.utils.mathUtils.smoothStep(wt)
-        wtList.append(wt)
+    project = lambda x, y, z: (x - ox) * vx + (y - oy) * vy + (z - oz) * vz
+    wtList = WeightArray(map(project, columns[0], columns[1], columns[2])).clamp()
 
     # Return result
-    return wtList
+    return smoothWeights(wtList, smooth)
 
 
 def gradientWeights3Point(geometry, inner, mid, outer, smooth=0):
@@ -70,11 +186,8 @@ def gradientWeights3Point(geometry, inner, mid, outer, smooth=0):
     # Get Outer Weight List
     outerWtList = gradientWeights(geometry, outer, mid, smooth)
 
-    # Calculate Final Weight List
-    wtList = [innerWtList[i] * outerWtList[i] for i in range(len(innerWtList))]
-
     # Return result
-    return wtList
+    return innerWtList * outerWtList
 
 
 def radialWeights(geometry, center, radius, innerRadius=0.0, smooth=0):
@@ -92,43 +205,23 @@ def radialWeights(geometry, center, radius, innerRadius=0.0, smooth=0):
     @param smooth: Number of smoothStep iterations
     @type smooth: int
     """
-    # Check geometry
-    if not cmds.objExists(geometry):
-        raise UserInputError('Object "' + geometry + '" does not exist!')
+    # Get Points
+    columns = getPointColumns(geometry)
 
     # Check center point
-    pnt = glTools.utils.base.getMPoint(center)
-
-    # Get points to generate weights from
-    pointList = glTools.utils.base.getMPointArray(geometry)
+    pnt = glTools.utils.base.getPosition(center)
 
     # Build weight array
-    wtList = []
-    for i in range(pointList.length()):
-
-        # Initialize zero weight value
-        wt = 0.0
-
-        # Calculate distance to radial center
-        dist = (pnt - pointList[i]).length()
-
-        # Generate weight value
-        if dist < radius:
-            wt = (radius - innerRadius - dist) / (radius - innerRadius)
-            for i in range(int(smooth)):
-                wt = glTools.utils.mathUtils.smoothStep(wt)
-
-        # Append weight value to weight list
-        wtList.append(wt)
+    wtList = linearFalloff(pointDistances(columns, pnt), innerRadius, radius)
 
     # Return result
-    return wtList
+    return smoothWeights(wtList, smooth)
 
 
 def volumeWeights(geometry, volumeCenter, volumeBoundary, volumeInterior='', smoothValue=0):
     """
     Generate a volume weight list for a specified geometry.
-    The volume is defined by the volumeBoundary geometry.
+    The volume is defined by the volumeBoundary geometry. See geometryVolumeWeights().
     @param geometry: The geometry to generate weights for
     @type geometry: str
     @param volumeCenter: Volume center for the weights
@@ -140,26 +233,11 @@ def volumeWeights(geometry, volumeCenter, volumeBoundary, volumeInterior='', smo
     @param smooth: Number of smoothStep iterations
     @type smooth: int
     """
-
-    # NOT IMPLEMENTED!!
-    raise Exception('NOT FULLY IMPLEMENTED!!')
-
-    # Check geometry
-    if not cmds.objExists(geometry):
-        raise UserInputError('Object "' + geometry + '" does not exist!')
-
-    # Check volumeBoundary
-    if not cmds.objExists(volumeBoundary):
-        raise UserInputError('Volume boundary "' + volumeBoundary + '" does not exist!')
-
-    # Check volume center point
-    volumeCenterPt = glTools.utils.base.getMPoint(volumeCenter)
-
-    # Get volume geometry bounding box
-    volumeBBox = glTools.utils.base.getMBoundingBox(volumeBoundary, worldSpace=True)
-
-    # Get geometry point array
-    geometryPtArray = glTools.utils.base.getMPointArray(geometry)
+    return geometryVolumeWeights(geometry,
+                                 volumeCenter,
+                                 volumeBoundary,
+                                 volumeInterior=volumeInterior,
+                                 smoothValue=smoothValue)
 
 
 def geometryVolumeWeights(geometry, volumeCenter, volumeBoundary, volumeCenterCurve='', volumeInterior='',
@@ -178,77 +256,67 @@ def geometryVolumeWeights(geometry, volumeCenter, volumeBoundary, volumeCenterCu
     @param smooth: Number of smoothStep iterations
     @type smooth: int
     """
-    # Check geometry
-    if not cmds.objExists(geometry):
-        raise UserInputError('Object "' + geometry + '" does not exist!')
+    # Get Points
+    columns = getPointColumns(geometry)
+    wtList = WeightArray(itertools.repeat(0.0, len(columns[0])))
 
     # Check volumeBoundary
     if not cmds.objExists(volumeBoundary):
-        raise UserInputError('Volume boundary "' + volumeBoundary + '" does not exist!')
+        raise Exception('Volume boundary "' + volumeBoundary + '" does not exist!')
 
     # Check volume center point
     volumeCenterPt = glTools.utils.base.getMPoint(volumeCenter)
 
-    # Get volume geometry bounding box
-    volumeBBox = glTools.utils.base.getMBoundingBox(volumeBoundary, worldSpace=True)
-
     # Check Volume Center Curve
     if volumeCenterCurve:
         if not cmds.objExists(volumeCenterCurve):
             raise Exception('Volume center curve "' + volumeCenterCurve + '" does not exist!')
         curveFn = glTools.utils.curve.getCurveFn(volumeCenterCurve)
 
-    # Get geometry point array
-    geometryPtArray = glTools.utils.base.getMPointArray(geometry)
-
-    # Iterate through geometry points
-    wtList = []
-    for i in range(geometryPtArray.length()):
-
-        # Volume Bounding Box test
-        if volumeBBox.contains(geometryPtArray[i]):
-
-            # Check volume center curve
-            if volumeCenterCurve:
-                volumeCenterPt = curveFn.closestPoint(geometryPtArray[i])
-
-            # Get offset from volume center
-            offsetVec = geometryPtArray[i] - volumeCenterPt
-            offsetDist = offsetVec.length()
-
-            # Get distance to volume boundary
-            boundaryPt = glTools.utils.mesh.intersect(volumeBoundary, volumeCenterPt, offsetVec, False)
-            boundaryDist = (volumeCenterPt - OpenMaya.MPoint(boundaryPt[0], boundaryPt[1], boundaryPt[2], 1.0)).length()
-
-            # Get distance to interior volume boundary
-            intBoundaryDist = 0.0
-            if volumeInterior:
-                intBoundaryPt = glTools.utils.mesh.intersect(volumeInterior, volumeCenterPt, offsetVec, False)
-                intBoundaryDist = (
-                volumeCenterPt - OpenMaya.MPoint(intBoundaryPt[0], intBoundaryPt[1], intBoundaryPt[2], 1.0)).length()
-
-            # Caluculate weight
-            wt = 1.0
-            if offsetDist > intBoundaryDist:
-                if offsetDist < boundaryDist:
-                    wt = 1.0 - (offsetDist - intBoundaryDist) / (boundaryDist - intBoundaryDist)
-                    for n in range(int(smoothValue)): wt = glTools.utils.mathUtils.smoothStep(wt)
-                else:
-                    wt = 0.0
-
-            # Append to weight list
-            wtList.append(wt)
+    # Get Intersection Function Sets
+    boundaryFn = glTools.utils.mesh.getMeshFn(volumeBoundary)
+    boundaryAccel = boundaryFn.autoUniformGridParams()
+    if volumeInterior:
+        interiorFn = glTools.utils.mesh.getMeshFn(volumeInterior)
+        interiorAccel = interiorFn.autoUniformGridParams()
 
+    # Get Points Inside Volume Bounding Box
+    volumeBBox = glTools.utils.base.getMBoundingBox(volumeBoundary, worldSpace=True)
+    indexList = _boundingBoxIndices(columns, volumeBBox)
+    if not indexList: return wtList
+
+    # Calculate Offset and Boundary Distances
+    offsetDist = array.array('d')
+    boundaryDist = array.array('d')
+    interiorDist = array.array('d')
+    for i in indexList:
+
+        # Get offset from volume center
+        pt = OpenMaya.MPoint(columns[0][i], columns[1][i], columns[2][i], 1.0)
+        if volumeCenterCurve:
+            volumeCenterPt = curveFn.closestPoint(pt, None, 0.0001, OpenMaya.MSpace.kWorld)
+        offsetVec = pt - volumeCenterPt
+        offsetDist.append(offsetVec.length())
+
+        # Get distance to volume boundary
+        boundaryDist.append(_rayDistance(boundaryFn, boundaryAccel, volumeCenterPt, offsetVec) or 0.0)
+
+        # Get distance to interior volume boundary
+        if volumeInterior:
+            interiorDist.append(_rayDistance(interiorFn, interiorAccel, volumeCenterPt, offsetVec) or 0.0)
         else:
+            interiorDist.append(0.0)
 
-            # Point is outside volume bounding box. Append zero weight
-            wtList.append(0.0)
+    # Calculate Weights
+    falloff = lambda o, i, b: 1.0 if o <= i else (0.0 if o >= b else 1.0 - (o - i) / (b - i))
+    volumeWt = smoothWeights(map(falloff, offsetDist, interiorDist, boundaryDist), smoothValue)
+    for n, i in enumerate(indexList): wtList[i] = volumeWt[n]
 
     # Return result
     return wtList
 
 
-def curveProximityWeights(geometry, curve, maxDistance, minDistance=0.0, smoothValue=0):
+def curveProximityWeights(geometry, curve, maxDistance, minDistance=0.0, smoothValue=0, samples=0):
     """
     Generate a curve proximity weight list for a specified geometry.
     @param geometry: The geometry to generate weights for
@@ -261,19 +329,17 @@ def curveProximityWeights(geometry, curve, maxDistance, minDistance=0.0, smoothV
     @type minDistance: str
     @param smooth: Number of smoothStep iterations
     @type smooth: int
+    @param samples: Number of curve polyline segments used to calculate distances. If 0, use 8 per curve CV (min 64).
+    @type samples: int
     """
-    # Check geometry
-    if not cmds.objExists(geometry):
-        raise UserInputError('Object "' + geometry + '" does not exist!')
+    # Get Points
+    columns = getPointColumns(geometry)
+    wtList = WeightArray(itertools.repeat(0.0, len(columns[0])))
 
     # Check curve
     if not glTools.utils.curve.isCurve(curve):
         raise Exception('Curve object "' + curve + '" is not a valid nurbs curve!')
 
-    # Get vertex array
-    geometryPtList = glTools.utils.base.getMPointArray(geometry)
-    geometryPtLen = geometryPtList.length()
-
     # Get curve function set
     curveFn = glTools.utils.curve.getCurveFn(curve)
 
@@ -283,32 +349,41 @@ def curveProximityWeights(geometry, curve, maxDistance, minDistance=0.0, smoothV
     curveBbox.expand(curveBbox.min() - OpenMaya.MVector(maxDistance, maxDistance, maxDistance))
     curveBbox.expand(curveBbox.max() + OpenMaya.MVector(maxDistance, maxDistance, maxDistance))
 
-    # Build weight list
-    wtList = []
-    for i in range(geometryPtLen):
-
-        # Check bounding box
-        if curveBbox.contains(geometryPtList[i]):
-
-            # Get distance to curve
-            dist = curveFn.distanceToPoint(geometryPtList[i], OpenMaya.MSpace.kWorld)
-
-            # Calculate weight value
-            if dist <= minDistance:
-                wt = 1.0
-            elif dist > maxDistance:
-                wt = 0.0
-            else:
-                wt = 1.0 - (dist - minDistance) / (maxDistance - minDistance)
-                for n in range(int(smoothValue)): wt = glTools.utils.mathUtils.smoothStep(wt)
-
-            # Append to weight list
-            wtList.append(wt)
-
-        else:
-
-            # Point is outside volume bounding box. Append zero weight
-            wtList.append(0.0)
+    # Get Points Inside Bounding Box
+    indexList = _boundingBoxIndices(columns, curveBbox)
+    if not indexList: return wtList
+    pts = [(columns[0][i], columns[1][i], columns[2][i]) for i in indexList]
+
+    # Sample Curve Polyline
+    if not samples: samples = max(64, curveFn.numCVs() * 8)
+    minUtil = OpenMaya.MScriptUtil(0.0)
+    minPtr = minUtil.asDoublePtr()
+    maxUtil = OpenMaya.MScriptUtil(0.0)
+    maxPtr = maxUtil.asDoublePtr()
+    curveFn.getKnotDomain(minPtr, maxPtr)
+    minU = OpenMaya.MScriptUtil(minPtr).asDouble()
+    maxU = OpenMaya.MScriptUtil(maxPtr).asDouble()
+    curvePts = []
+    samplePt = OpenMaya.MPoint()
+    for n in range(samples + 1):
+        curveFn.getPointAtParam(minU + (maxU - minU) * n / samples, samplePt, OpenMaya.MSpace.kWorld)
+        curvePts.append((samplePt.x, samplePt.y, samplePt.z))
+
+    # Find Nearest Polyline Vertex (batched kd-tree query)
+    tree = glTools.utils.kdTree.KdTree(curvePts)
+    nearest, nearestDist = tree.query(pts, 1)
+
+    # Get Distance To Adjacent Polyline Segments
+    lastId = len(curvePts) - 1
+    distList = array.array('d')
+    for pt, c in itertools.izip(pts, nearest):
+        dist = _segmentDistance(pt, curvePts[max(c - 1, 0)], curvePts[c])
+        dist = min(dist, _segmentDistance(pt, curvePts[c], curvePts[min(c + 1, lastId)]))
+        distList.append(dist)
+
+    # Calculate Weights
+    curveWt = smoothWeights(linearFalloff(distList, minDistance, maxDistance), smoothValue)
+    for n, i in enumerate(indexList): wtList[i] = curveWt[n]
 
     # Return result
     return wtList
@@ -336,46 +411,46 @@ def meshOffsetWeights(baseMesh, targetMesh, normalizeWeights=False, normalRayInt
         raise Exception('TargetMesh object "' + targetMesh + '" is not a valid mesh!')
 
     # Get vertex arrays
-    basePtList = glTools.utils.base.getMPointArray(baseMesh)
-    targetPtList = glTools.utils.base.getMPointArray(targetMesh)
-
-    basePtLen = basePtList.length()
-    targetPtLen = targetPtList.length()
-
-    if basePtLen != targetPtLen:
-        raise Exception('Vertex count between the base and target mesh does not match!!')
+    baseColumns = getPointColumns(baseMesh)
+    basePtLen = len(baseColumns[0])
+    if not normalRayIntersect:
+        targetColumns = getPointColumns(targetMesh)
+        if basePtLen != len(targetColumns[0]):
+            raise Exception('Vertex count between the base and target mesh does not match!!')
 
     # Get base normal array
     normalArray = glTools.utils.mesh.getNormals(baseMesh, worldSpace=False)
+    normals = [(normalArray[i].x, normalArray[i].y, normalArray[i].z) for i in xrange(normalArray.length())]
+    nx, ny, nz = [array.array('d', col) for col in zip(*normals)] if normals else ([], [], [])
 
     # Build offset list
-    maxDist = 0.0
-    distArray = []
-    for i in range(basePtLen):
-
-        # Determine target distance
-        if normalRayIntersect:
-            targetPt = glTools.utils.mesh.intersect(targetMesh, basePtList[i], normalArray[i], True)
-            targetPt = glTools.utils.base.getMPoint(targetPt)
-            dist = OpenMaya.MVector(normalArray[i]) * (targetPt - basePtList[i])
-        else:
-            offset = targetPtList[i] - basePtList[i]
-            dist = OpenMaya.MVector(normalArray[i]) * offset
-
-        # Smooth
-        if normalizeWeights and smoothValue:
-            for n in range(int(smoothValue)):
-                dist = glTools.utils.mathUtils.smoothStep(dist)
-
-        # Append to target distance array
-        distArray.append(dist)
-
-        # Check maxDistance
-        if abs(dist) > maxDist: maxDist = abs(dist)
+    if normalRayIntersect:
+        targetFn = glTools.utils.mesh.getMeshFn(targetMesh)
+        targetAccel = targetFn.autoUniformGridParams()
+        offsets = [[], [], []]
+        for i in xrange(basePtLen):
+            basePt = OpenMaya.MPoint(baseColumns[0][i], baseColumns[1][i], baseColumns[2][i], 1.0)
+            normal = OpenMaya.MVector(nx[i], ny[i], nz[i])
+            hitPt = OpenMaya.MFloatPoint()
+            targetFn.closestIntersection(OpenMaya.MFloatPoint(basePt.x, basePt.y, basePt.z),
+                                         OpenMaya.MFloatVector(normal.x, normal.y, normal.z),
+                                         None, None, False, OpenMaya.MSpace.kWorld, 9999, True,
+                                         targetAccel, hitPt, None, None, None, None, None, 0.0001)
+            offsets[0].append(hitPt.x - basePt.x)
+            offsets[1].append(hitPt.y - basePt.y)
+            offsets[2].append(hitPt.z - basePt.z)
+    else:
+        offsets = [map(operator.sub, targetColumns[n], baseColumns[n]) for n in range(3)]
+    dot = lambda ax, ay, az, bx, by, bz: ax * bx + ay * by + az * bz
+    distArray = WeightArray(map(dot, nx, ny, nz, offsets[0], offsets[1], offsets[2]))
+
+    # Check maxDistance
+    maxDist = max(map(abs, distArray)) if distArray else 0.0
 
     # Normalize distance array
     if normalizeWeights:
-        distArray = [i / maxDist for i in distArray]
+        if maxDist: distArray = distArray / maxDist
+        distArray = smoothWeights(distArray, smoothValue)
 
     # Return result
     return maxDist, distArray
@@ -1,19 +1,23 @@
 import maya.cmds as cmds
-import maya.mel as mel
+import maya.OpenMaya as OpenMaya
 import glTools.utils.base
-import glTools.utils.mathUtils
+import glTools.utils.kdTree
+import glTools.utils.selection
 import glTools.utils.skinCluster
-import glTools.utils.progressBar
+import array
 
 
 def buildPointWeights(points,
                       influenceList,
                       skinCluster,
-                      maxInfluences=3):
+                      maxInfluences=3,
+                      smoothInterp=True):
     """
-    Build and execute skinPercent commands to apply distance based weights given a list of deformed components and a list of influences.
+    Apply distance based weights given a list of deformed components and a list of influences.
     Weights are calculated using an inverse distance function using a set number of influences per point.
-    @param points: List of deformed points to calculate skin weights for
+    The nearest influences for all points are found using a kd-tree, and the resulting weights are applied
+    to the skinCluster with one bulk weight set per deformed geometry.
+    @param points: List of deformed points to calculate skin weights for. Points can span several geometries.
     @type points: list
     @param influenceList: List of skinCluster influences to calculate weights from
     @type influenceList: list
@@ -21,11 +25,17 @@ def buildPointWeights(points,
     @type skinCluster: str
     @param maxInfluences: Number of influences per component
     @type maxInfluences: int
+    @param smoothInterp: Smooth interpolation of weights.
+    @type smoothInterp: bool
     """
     # ==========
     # - Checks -
     # ==========
 
+    # Check SkinCluster
+    if not glTools.utils.skinCluster.isSkinCluster(skinCluster):
+        raise Exception('Invalid skinCluster "' + skinCluster + '" specified!')
+
     # Build Influence Points
     influencePts = [glTools.utils.base.getPosition(i) for i in influenceList]
 
@@ -41,27 +51,130 @@ def buildPointWeights(points,
     # - Build Point Weights -
     # =======================
 
-    # glTools.utils.progressBar.init('Beginning Weights', len(points)/10)
+    # Get Point Positions (grouped by geometry)
+    pts = []
+    pointElements = []
+    for i in xrange(glTools.utils.selection.numSelectionElements(points)):
+        pointPath, pointComp = glTools.utils.selection.getSelectionElement(points, i)
+        ptArray = OpenMaya.MPointArray()
+        OpenMaya.MItGeometry(pointPath, pointComp).allPositions(ptArray, OpenMaya.MSpace.kWorld)
+        pointElements.append((pointPath, pointComp, len(pts), len(pts) + ptArray.length()))
+        pts.extend([(ptArray[n].x, ptArray[n].y, ptArray[n].z) for n in xrange(ptArray.length())])
 
-    cmd = ''
-    ptWts = {}
-    for i, pt in enumerate(points):
-        ptPos = glTools.utils.base.getPosition(pt)
-        wt, influenceID = calcPointWeights(ptPos, influencePts, maxInfluences)
-        ptWts[pt] = [influenceID, wt]
+    # Calculate Weights
+    infIndices, infWeights = calcWeights(pts, influencePts, maxInfluences, smoothInterp)
 
-    cmd += buildSkinPercentCmd(pt, influenceList, wt, skinCluster, ptWts)
+    # =================
+    # - Apply Weights -
+    # =================
 
-    # if not i%10: glTools.utils.progressBar.update(1,'Generating Weights')
+    k = min(maxInfluences, len(influencePts))
+    for pointPath, pointComp, start, end in pointElements:
+        setPointWeights(skinCluster, pointPath, pointComp, influenceList,
+                        infIndices[start * k:end * k], infWeights[start * k:end * k])
 
     # =================
     # - Return Result -
     # =================
 
-    # glTools.utils.progressBar.end()
+    return infIndices, infWeights
+
+
+def calcWeights(points,
+                influencePts,
+                maxInfluences=3,
+                smoothInterp=True):
+    """
+    Calculate inverse distance weights for a list of points.
+    The nearest influences for all points are found using a single kd-tree query.
+    Returns flat influence index and weight arrays, with one (nearest first) group of maxInfluences entries per point.
+    Smoothed weights are normalized again after the smooth step, so the weights of each point always sum to 1.0.
+    Previous versions applied the smooth step after normalizing and left the result un-normalized.
+    @param points: List of points (x, y, z) to calculate weights for
+    @type points: list
+    @param influencePts: List of influence points (x, y, z) to calculate weights from
+    @type influencePts: list
+    @param maxInfluences: Maximum number of influences per point. Clamped to the number of influences.
+    @type maxInfluences: int
+    @param smoothInterp: Smooth interpolation of weights. Smoothed weights are normalized to sum to 1.0.
+    @type smoothInterp: bool
+    """
+    # Check Influences
+    if not influencePts: raise Exception('No influence points specified!')
+    k = min(maxInfluences, len(influencePts))
+
+    # Find Nearest Influences
+    tree = glTools.utils.kdTree.KdTree(influencePts)
+    infIndices, distances = tree.query(points, k)
+
+    # Calculate Inverse Distance Weights
+    infWeights = array.array('d', distances)
+    for n in xrange(0, len(infIndices), k):
+        wt = [1.0 / max(d, 0.00001) for d in distances[n:n + k]]
+        total = sum(wt)
+        wt = [w / total for w in wt]
+        if smoothInterp:
+            wt = [w * w * (3.0 - 2.0 * w) for w in wt]
+            total = sum(wt)
+            wt = [w / total for w in wt]
+        infWeights[n:n + k] = array.array('d', wt)
 
-    # Run Cmd
-    mel.eval(cmd)
+    # Return Result
+    return infIndices, infWeights
+
+
+def setPointWeights(skinCluster,
+                    pointPath,
+                    pointComp,
+                    influenceList,
+                    infIndices,
+                    infWeights):
+    """
+    Apply per point influence weights (see calcWeights()) to a skinCluster using a single bulk weight set.
+    All other skinCluster influence weights for the specified points are set to zero.
+    @param skinCluster: SkinCluster to apply weights to
+    @type skinCluster: str
+    @param pointPath: Deformed geometry dag path
+    @type pointPath: OpenMaya.MDagPath
+    @param pointComp: Deformed geometry components, in point weight order
+    @type pointComp: OpenMaya.MObject
+    @param influenceList: Influence list that the influence indices refer to
+    @type influenceList: list
+    @param infIndices: Flat (k per point) influence index array
+    @type infIndices: array.array
+    @param infWeights: Flat (k per point) influence weight array
+    @type infWeights: array.array
+    """
+    # Get SkinCluster Influences
+    skinInfList = cmds.skinCluster(skinCluster, q=True, inf=True)
+    skinInfCount = len(skinInfList)
+    infIndexArray = OpenMaya.MIntArray()
+    for inf in skinInfList:
+        infIndexArray.append(glTools.utils.skinCluster.getInfluencePhysicalIndex(skinCluster, inf))
+
+    # Map Influences to SkinCluster Influence Columns
+    skinInfColumn = dict([(inf, n) for n, inf in enumerate(skinInfList)])
+    infColumn = []
+    for inf in influenceList:
+        if not inf in skinInfColumn:
+            raise Exception('Influence "' + inf + '" not connected to skinCluster "' + skinCluster + '"!')
+        infColumn.append(skinInfColumn[inf])
+
+    # Check Point Count
+    pointCount = OpenMaya.MItGeometry(pointPath, pointComp).count()
+    if not pointCount: return
+    k = len(infIndices) // pointCount
+    if k * pointCount != len(infIndices):
+        raise Exception('Point count and weight list miss-match!')
+
+    # Build Master Weight Array
+    wtArray = OpenMaya.MDoubleArray(pointCount * skinInfCount, 0.0)
+    for n in xrange(len(infIndices)):
+        wtArray.set(infWeights[n], (n // k) * skinInfCount + infColumn[infIndices[n]])
+
+    # Set SkinCluster Weights
+    skinFn = glTools.utils.skinCluster.getSkinClusterFn(skinCluster)
+    skinFn.setWeights(pointPath, pointComp, infIndexArray, wtArray, False)
 
 
 def calcPointWeights(pos,
@@ -69,7 +182,7 @@ def calcPointWeights(pos,
                      maxInfluences,
                      smoothInterp=True):
     """
-    Calculate inverse distance weights
+    Calculate inverse distance weights for a single point. See calcWeights() for calculating weights for many points.
     @param pos: Point to calculate weights for
     @type pos: str or list
     @param influencePts: List of influence points to calculate weights from
@@ -82,51 +195,11 @@ def calcPointWeights(pos,
     # Get Point Position
     pt = glTools.utils.base.getPosition(pos)
 
-    # Sort By Distance
-    dist = [glTools.utils.mathUtils.distanceBetween(pt, i) for i in influencePts]
-    distSorted = sorted(dist)
-    closestID = [dist.index(distSorted[i]) for i in range(maxInfluences)]
-
     # Calculate Inverse Distance Weight
-    ptArray = [influencePts[i] for i in closestID]
-    wt = glTools.utils.mathUtils.inverseDistanceWeight3D(ptArray, pt)
-    if smoothInterp:
-        wt = [glTools.utils.mathUtils.smoothStep(x) for x in wt]
+    closestID, wt = calcWeights([pt], influencePts, maxInfluences, smoothInterp)
+    closestID = list(closestID)
     infWt = [wt[closestID.index(i)] if i in closestID else 0.0 for i in range(len(influencePts))]
 
     # Return Result
     return infWt, closestID
 
-
-def buildSkinPercentCmd(pt,
-                        influenceList,
-                        wts,
-                        skinCluster,
-                        ptWts):
-    """
-    Build skinPercent command
-    @param pt: Deformed component to build weight command for
-    @type pt: str
-    @param influenceList: List of influences to apply weights for
-    @type influenceList: list
-    @param wts: List of weight values to apply
-    @type wts: list
-    @param skinCluster: SkinCluster to apply weight to
-    @type skinCluster: str
-    @param ptWts:
-    @type ptWts:
-    """
-    x = 0
-    cmd = ''
-    for vertex in ptWts:
-        transValues = ''
-        for i, n in enumerate(ptWts[vertex][0]):
-            transValues += '-transformValue "%s" %s ' % (influenceList[n], ptWts[vertex][1][n])
-        cmd += 'skinPercent %s "%s" "%s";\n' % (transValues, skinCluster, vertex)
-        x += 1
-
-    print "vertices :: %s " % len(ptWts)
-    print "influences :: %s" % len(influenceList)
-    print "generated %s skinPercent cmds" % x
-    print cmd
-    return cmd
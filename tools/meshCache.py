@@ -1,7 +1,9 @@
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
 import glTools.utils.mesh
+import glTools.utils.pointCache
 import glTools.utils.stringUtils
+import glTools.utils.timeSample
 import os
 import os.path
 import gzip
@@ -46,17 +48,15 @@ def writeGeoCache(path, name, mesh, startFrame, endFrame, pad=4, uvSet='', world
     else:
         uvSet = str(cmds.polyUVSet(mesh, q=True, cuv=True)[0])
 
-    # Determine Sample Space
-    if worldSpace:
-        sampleSpace = OpenMaya.MSpace.kWorld
-    else:
-        sampleSpace = OpenMaya.MSpace.kObject
+    # Sample mesh points and normals without changing the current time
+    frameList = range(startFrame, endFrame + 1)
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addGeometry(mesh, worldSpace=worldSpace, normals=True)
 
     # Write mesh cache
-    for f in range(startFrame, endFrame + 1):
+    for n, (pts, nrm, values, matrices) in enumerate(sampler.iterSamples(frameList)):
 
-        # Update frame
-        cmds.currentTime(f)
+        f = frameList[n]
 
         # -------------------------
         # - Open file for writing -
@@ -100,17 +100,10 @@ def writeGeoCache(path, name, mesh, startFrame, endFrame, pad=4, uvSet='', world
         FILE.write('PointAttrib\n')
         FILE.write('N 3 vector 0 0 0\n')
 
-        vtxArray = OpenMaya.MPointArray()
-        normArray = OpenMaya.MFloatVectorArray()
-        meshFn = glTools.utils.mesh.getMeshFn(mesh)
-        meshFn.getPoints(vtxArray, sampleSpace)
-        meshFn.getVertexNormals(False, normArray, sampleSpace)
-
         # Write vertex array
-        for i in range(vtxArray.length()):
-            FILE.write(str(vtxArray[i].x) + ' ' + str(vtxArray[i].y) + ' ' + str(vtxArray[i].z) + ' ' + str(
-                vtxArray[i].w) + ' (' + str(normArray[i].x) + ' ' + str(normArray[i].y) + ' ' + str(
-                normArray[i].z) + ')\n')
+        for i in range(numVerts):
+            FILE.write(str(pts[i * 3]) + ' ' + str(pts[i * 3 + 1]) + ' ' + str(pts[i * 3 + 2]) + ' 1.0 (' +
+                       str(nrm[i * 3]) + ' ' + str(nrm[i * 3 + 1]) + ' ' + str(nrm[i * 3 + 2]) + ')\n')
 
         # -------------------
         # - Write Face Data -
@@ -420,17 +413,16 @@ def writeObjCache(path, name, mesh, startFrame, endFrame, pad=4, uvSet='', world
     else:
         uvSet = str(cmds.polyUVSet(mesh, q=True, cuv=True)[0])
 
-    # Determine Sample Space
-    if worldSpace:
-        sampleSpace = OpenMaya.MSpace.kWorld
-    else:
-        sampleSpace = OpenMaya.MSpace.kObject
+    # Sample mesh points and normals without changing the current time
+    frameList = range(startFrame, endFrame + 1)
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addGeometry(mesh, worldSpace=worldSpace, normals=True)
+    numVerts = sampler.pointCount
 
     # Write mesh cache
-    for f in range(startFrame, endFrame + 1):
+    for n, (pts, nrm, values, matrices) in enumerate(sampler.iterSamples(frameList)):
 
-        # Update frame
-        cmds.currentTime(f)
+        f = frameList[n]
 
         # -------------------------
         # - Open file for writing -
@@ -457,10 +449,8 @@ def writeObjCache(path, name, mesh, startFrame, endFrame, pad=4, uvSet='', world
         meshFn = glTools.utils.mesh.getMeshFn(mesh)
 
         # Vertex Positions
-        vtxArray = OpenMaya.MPointArray()
-        meshFn.getPoints(vtxArray, sampleSpace)
-        for i in range(vtxArray.length()):
-            FILE.write('v ' + str(vtxArray[i].x) + ' ' + str(vtxArray[i].y) + ' ' + str(vtxArray[i].z) + '\n')
+        for i in range(numVerts):
+            FILE.write('v ' + str(pts[i * 3]) + ' ' + str(pts[i * 3 + 1]) + ' ' + str(pts[i * 3 + 2]) + '\n')
 
         # Vertex UVs
         uArray = OpenMaya.MFloatArray()
@@ -470,10 +460,8 @@ def writeObjCache(path, name, mesh, startFrame, endFrame, pad=4, uvSet='', world
             FILE.write('vt ' + str(uArray[i]) + ' ' + str(vArray[i]) + '\n')
 
         # Vertex Normals
-        normArray = OpenMaya.MFloatVectorArray()
-        meshFn.getVertexNormals(False, normArray, sampleSpace)
-        for i in range(vtxArray.length()):
-            FILE.write('vn ' + str(vtxArray[i].x) + ' ' + str(vtxArray[i].y) + ' ' + str(vtxArray[i].z) + '\n')
+        for i in range(numVerts):
+            FILE.write('vn ' + str(nrm[i * 3]) + ' ' + str(nrm[i * 3 + 1]) + ' ' + str(nrm[i * 3 + 2]) + '\n')
 
         FILE.write('g\n')
 
@@ -728,6 +716,101 @@ def writeObjCombineCache(path, name, meshList, startFrame, endFrame, pad=4, uvSe
     print 'Write OBJ cache completed!'
 
 
+def writeBinaryCache(path,
+                     name,
+                     meshList,
+                     startFrame,
+                     endFrame,
+                     worldSpace=True,
+                     normals=False,
+                     compress=False,
+                     encoding='float32'):
+    """
+    Write a single binary multi-frame point cache (glTools.utils.pointCache) for the specified list of mesh objects.
+    All meshes in the list will be combined to a single cache. Topology is written once, and point positions
+    (and optional normals) are streamed per frame.
+    @param path: Destination directory path for the cache file.
+    @type path: str
+    @param name: Cache file output name.
+    @type name: str
+    @param meshList: List of mesh objects to write cache for.
+    @type meshList: list
+    @param startFrame: Cache start frame
+    @type startFrame: float
+    @param endFrame: Cache end frame
+    @type endFrame: float
+    @param worldSpace: Export mesh in world space instead of local or object space.
+    @type worldSpace: bool
+    @param normals: Write per vertex normals for each frame.
+    @type normals: bool
+    @param compress: Compress each frame using zlib.
+    @type compress: bool
+    @param encoding: Position encoding. "float32" or "quantized" (16 bit per component).
+    @type encoding: str
+    """
+    # Check path
+    if not os.path.isdir(path): os.makedirs(path)
+
+    # Check mesh list
+    if isinstance(meshList, basestring): meshList = [meshList]
+    for mesh in meshList:
+        if not cmds.objExists(mesh): raise Exception('Mesh "' + mesh + '" does not exist!')
+        if not glTools.utils.mesh.isMesh(mesh): raise Exception('Object "' + mesh + '" is not a valid mesh!')
+
+    # ------------------
+    # - Write Topology -
+    # ------------------
+
+    meshFnList = [glTools.utils.mesh.getMeshFn(mesh) for mesh in meshList]
+    polyCounts = []
+    polyConnects = []
+    meshPointCounts = []
+    vertexOffset = 0
+    for meshFn in meshFnList:
+        counts = OpenMaya.MIntArray()
+        connects = OpenMaya.MIntArray()
+        meshFn.getVertices(counts, connects)
+        polyCounts.extend(counts)
+        polyConnects.extend([i + vertexOffset for i in connects])
+        meshPointCounts.append(meshFn.numVertices())
+        vertexOffset += meshFn.numVertices()
+
+    filename = path + '/' + name + '.pcache'
+    print 'Writing ' + filename
+    cache = glTools.utils.pointCache.PointCacheWriter(filename,
+                                                      vertexOffset,
+                                                      polyCounts=polyCounts,
+                                                      polyConnects=polyConnects,
+                                                      normals=normals,
+                                                      compress=compress,
+                                                      encoding=encoding,
+                                                      metadata={'meshList': meshList,
+                                                                'meshPointCounts': meshPointCounts,
+                                                                'worldSpace': worldSpace})
+
+    # ----------------
+    # - Write Frames -
+    # ----------------
+
+    # Sample all meshes together, without changing the current time
+    frameList = range(startFrame, endFrame + 1)
+    sampler = glTools.utils.timeSample.TimeSampler()
+    for mesh in meshList: sampler.addGeometry(mesh, worldSpace=worldSpace, normals=normals)
+
+    try:
+        for n, (pts, nrm, values, matrices) in enumerate(sampler.iterSamples(frameList)):
+            cache.writeFrame(frameList[n], pts, nrm if normals else None)
+
+    finally:
+        cache.close()
+
+    # Print result
+    print 'Write binary cache completed!'
+
+    # Return Result
+    return filename
+
+
 def gzipCache(path, name, deleteOriginal=False):
     """
     """
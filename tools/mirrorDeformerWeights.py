@@ -29,17 +29,18 @@ def mirrorWeights(mesh, deformer, axis='x', posToNeg=True, refMesh=''):
 
     # Get symmetry table
     axisIndex = {'x': 0, 'y': 1, 'z': 2}[axis]
-    sTable = glTools.tools.symmetryTable.SymmetryTable()
-    symTable = sTable.buildSymTable(refMesh, axisIndex)
+    sTable = glTools.tools.symmetryTable.getSymTable(refMesh, axisIndex)
+    symTable = sTable.symTable
 
     # Get current weights
     wt = glTools.utils.deformer.getWeights(deformer)
     mem = glTools.utils.deformer.getDeformerSetMemberIndices(deformer, mesh)
+    memIndex = dict([(vtx, n) for n, vtx in enumerate(mem)])
 
     # Mirror weights
     for i in [sTable.negativeIndexList, sTable.positiveIndexList][int(posToNeg)]:
-        if mem.count(i) and mem.count(symTable[i]):
-            wt[mem.index(symTable[i])] = wt[mem.index(i)]
+        if i in memIndex and symTable[i] in memIndex:
+            wt[memIndex[symTable[i]]] = wt[memIndex[i]]
 
     # Apply mirrored weights
     glTools.utils.deformer.setWeights(deformer, wt, mesh)
@@ -77,22 +78,19 @@ def flipWeights(mesh, sourceDeformer, targetDeformer='', axis='x', refMesh=''):
 
     # Get symmetry table
     axisIndex = {'x': 0, 'y': 1, 'z': 2}[axis]
-    symTable = glTools.tools.symmetryTable.SymmetryTable().buildSymTable(refMesh, axisIndex)
+    symTable = glTools.tools.symmetryTable.getSymTable(refMesh, axisIndex).symTable
 
     # Get current weights
     wt = glTools.utils.deformer.getWeights(sourceDeformer, mesh)
     sourceMem = glTools.utils.deformer.getDeformerSetMemberIndices(sourceDeformer, meshShape)
     targetMem = glTools.utils.deformer.getDeformerSetMemberIndices(targetDeformer, meshShape)
+    targetIndex = dict([(vtx, n) for n, vtx in enumerate(targetMem)])
     targetWt = [0.0 for i in range(len(targetMem))]
 
     # Mirror weights
-    for i in sourceMem:
-        if targetMem.count(symTable[i]):
-            try:
-                targetWt[targetMem.index(symTable[i])] = wt[sourceMem.index(i)]
-            except:
-                print('Error @: ' + str(symTable[i]))
-                pass
+    for n, i in enumerate(sourceMem):
+        if symTable[i] in targetIndex:
+            targetWt[targetIndex[symTable[i]]] = wt[n]
         else:
             print('Cant find sym index for ' + str(i))
 
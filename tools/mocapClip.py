@@ -1,12 +1,24 @@
 import maya.mel as mel
 import maya.cmds as cmds
-import glTools.nrig.rig.mocap
-import glTools.nrig.rig.bipedMocap
 import glTools.utils.characterSet
+import glTools.utils.batchJob
 import glTools.utils.clip
 import glTools.utils.reference
+import hashlib
+import json
 import os
 import os.path
+import sys
+import time
+
+# Clip generator version. Increment to regenerate all clips built with buildMocapClipLibrary().
+CLIP_GENERATOR_VERSION = 1
+
+# Clip library manifest file name
+CLIP_MANIFEST = 'clipManifest.json'
+
+# Source file extension to import type map
+CLIP_FILE_TYPES = {'fbx': 'FBX', 'ma': 'mayaAscii', 'mb': 'mayaBinary'}
 
 
 def createMocapClipsFromFbxWip(sourceDir, targetDir, skipUpToDate=False, skipExistsing=False):
@@ -87,6 +99,7 @@ def createMocapClipsFromFbxWip(sourceDir, targetDir, skipUpToDate=False, skipExi
         cmds.file(clipFile, i=True, type="FBX", defaultNamespace=True)
 
         # Create Character Set
+        import glTools.nrig.rig.bipedMocap
         mocap = glTools.nrig.rig.bipedMocap.BipedMocapRigRoll()
         try:
             charSet = mocap.createCharSet('char', '')
@@ -144,18 +157,10 @@ def createMocapClips(sourceDir, targetDir='', extList=['fbx'], skipUpToDate=Fals
     if not os.path.isdir(sourceDir):
         raise Exception('Source directory "' + sourceDir + '" does not exist!')
 
-    extTypeMap = {}
-    extTypeMap['fbx'] = 'FBX'
-    extTypeMap['ma'] = 'mayaAscii'
-    extTypeMap['mb'] = 'mayaBinary'
-
     # =================
     # - Process Clips -
     # =================
 
-    # New File
-    cmds.file(newFile=True, force=True, prompt=False)
-
     clipPathList = []
     clipFileList = os.listdir(sourceDir)
     clipFileList.sort()
@@ -193,31 +198,197 @@ def createMocapClips(sourceDir, targetDir='', extList=['fbx'], skipUpToDate=Fals
         # Print Status
         print ('Generating Clip "' + clipName + '"...')
 
-        # Import Clip File
-        cmds.file(sourceDir + '/' + clipFile, i=True, type="FBX", defaultNamespace=True)
-
-        # Create Character Set
-        mocap = glTools.nrig.rig.bipedMocap.BipedMocapRigRoll()
+        # Generate Clip
         try:
-            charSet = mocap.createCharSet('char', '')
-        except:
-            print('ERROR: Problem creating characterSet for clip "' + clipName + '"!')
+            createMocapClip(sourceDir + '/' + clipFile, clipPath)
+        except Exception, e:
+            print('ERROR: ' + str(e))
+            continue
 
-        # Create Character Clip
-        start = cmds.keyframe('Hips', q=True, tc=True)[0]
-        end = cmds.keyframe('Hips', q=True, tc=True)[-1]
-        clip = glTools.utils.clip.createClip(charSet, startTime=start, endTime=end, name=clipName)
-        if not clip: continue
+        # Update Result
+        clipPathList.append(clipPath)
 
-        # Export Clip
-        print 'Exporting: ' + clipName
-        export = glTools.utils.clip.exportClip(clip, clipPath, force=True)
+    # Clear Scene
+    cmds.file(newFile=True, force=True, prompt=False)
 
-        # Update Result
+    # =================
+    # - Return Result -
+    # =================
+
+    return clipPathList
+
+
+def createMocapClip(clipFile, clipPath, charSetName='char'):
+    """
+    Generate a trax clip from a mocap anim file, in the current maya session.
+    The current scene is cleared before the anim file is imported.
+    @param clipFile: Source mocap anim file.
+    @type clipFile: str
+    @param clipPath: Clip file destination path.
+    @type clipPath: str
+    @param charSetName: Character set name.
+    @type charSetName: str
+    """
+    # Check Source File
+    if not os.path.isfile(clipFile):
+        raise Exception('Source file "' + clipFile + '" does not exist!')
+
+    # Get Clip Name and File Type
+    clipName = os.path.splitext(os.path.basename(clipPath))[0]
+    fileType = CLIP_FILE_TYPES.get(os.path.splitext(clipFile)[1].lower()[1:], 'FBX')
+
+    # Clear Scene
+    cmds.file(newFile=True, force=True, prompt=False)
+
+    # Import Clip File
+    cmds.file(clipFile, i=True, type=fileType, defaultNamespace=True)
+
+    # Create Character Set
+    import glTools.nrig.rig.bipedMocap
+    mocap = glTools.nrig.rig.bipedMocap.BipedMocapRigRoll()
+    try:
+        charSet = mocap.createCharSet(charSetName, '')
+    except:
+        raise Exception('Problem creating characterSet for clip "' + clipName + '"!')
+
+    # Create Character Clip
+    keys = cmds.keyframe('Hips', q=True, tc=True)
+    if not keys:
+        raise Exception('No animation on Hips for clip "' + clipName + '"!')
+    clip = glTools.utils.clip.createClip(charSet, startTime=keys[0], endTime=keys[-1], name=clipName)
+    if not clip:
+        raise Exception('Unable to create clip "' + clipName + '"!')
+
+    # Export Clip
+    print 'Exporting: ' + clipName
+    glTools.utils.clip.exportClip(clip, clipPath, force=True)
+
+    # Return Result
+    return clipPath
+
+
+# ==========================
+# - Incremental Clip Build -
+# ==========================
+
+def buildMocapClipLibrary(sourceDir, targetDir, extList=['fbx'], processes=4, charSetName='char', force=False,
+                          removeStale=True, executable='mayapy', logDir='', verbose=True):
+    """
+    Incrementally generate trax clips from a directory of mocap anim files.
+    A manifest of source file content hashes and generation parameters is stored in the target directory,
+    and only clips with a new or changed source file (or changed parameters) are regenerated.
+    Clip generation is distributed across multiple headless maya worker processes, so the current maya
+    session is not modified. Manifest entries whose source file no longer exists are removed.
+    @param sourceDir: Source directory to generate clips from.
+    @type sourceDir: str
+    @param targetDir: Target clip directory to export processed clips to.
+    @type targetDir: str
+    @param extList: List of file extensions to generate clips from
+    @type extList: list
+    @param processes: Maximum number of concurrent worker processes.
+    @type processes: int
+    @param charSetName: Character set name.
+    @type charSetName: str
+    @param force: Regenerate all clips, even if they are up to date.
+    @type force: bool
+    @param removeStale: Delete the clip files of manifest entries whose source file no longer exists.
+    @type removeStale: bool
+    @param executable: Worker python executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param logDir: Worker log directory. If empty, use a "logs" directory in the target directory.
+    @type logDir: str
+    @param verbose: Print build status.
+    @type verbose: bool
+    """
+    # ==========
+    # - Checks -
+    # ==========
+
+    # Check Source Directory
+    if not os.path.isdir(sourceDir):
+        raise Exception('Source directory "' + sourceDir + '" does not exist!')
+
+    # Check Target Directory
+    if not os.path.isdir(targetDir): os.makedirs(targetDir)
+
+    # ==========================
+    # - Find Out Of Date Clips -
+    # ==========================
+
+    manifestFile = os.path.join(targetDir, CLIP_MANIFEST)
+    manifest = readClipManifest(manifestFile)
+    params = {'generatorVersion': CLIP_GENERATOR_VERSION, 'charSetName': charSetName}
+
+    clipList = []
+    sourceInfo = {}
+    for clipFile in sorted(os.listdir(sourceDir)):
+
+        # Check Source File
+        sourceFile = os.path.join(sourceDir, clipFile)
+        if os.path.isdir(sourceFile): continue
+        if not os.path.splitext(clipFile)[1].lower()[1:] in extList: continue
+
+        # Get Clip Name and Path
+        clipName = os.path.splitext(clipFile)[0]
+        clipPath = os.path.join(targetDir, clipName + '.mb')
+
+        # Get Source Info
+        entry = manifest.get(clipName)
+        info = _sourceInfo(sourceFile, entry)
+        sourceInfo[clipName] = info
+
+        # Check Up To Date
+        if not force and entry and os.path.isfile(clipPath):
+            if entry.get('hash') == info['hash'] and entry.get('params') == params:
+                entry.update(info)
+                continue
+
+        clipList.append((clipName, sourceFile, clipPath))
+
+    # Remove Stale Entries (source file removed)
+    for clipName, entry in manifest.items():
+        if clipName in sourceInfo or os.path.isfile(entry.get('source', '')): continue
+        manifest.pop(clipName)
+        clipPath = entry.get('clip', '')
+        if removeStale and os.path.isfile(clipPath):
+            os.remove(clipPath)
+            if verbose: print('Clip library: removed stale clip "' + clipPath + '"')
+
+    if verbose:
+        print('Clip library: ' + str(len(clipList)) + ' of ' + str(len(sourceInfo)) + ' clips out of date')
+
+    # ==================
+    # - Generate Clips -
+    # ==================
+
+    results = {}
+    if clipList:
+        if not logDir: logDir = os.path.join(targetDir, 'logs', time.strftime('%Y%m%d_%H%M%S'))
+        results = generateMocapClips(clipList, processes=processes, charSetName=charSetName,
+                                     executable=executable, logDir=logDir)
+
+    # ===================
+    # - Update Manifest -
+    # ===================
+
+    clipPathList = []
+    for clipName, sourceFile, clipPath in clipList:
+        result = results.get(clipName) or {'success': False, 'error': 'No result from worker process'}
+        if not result['success']:
+            if verbose: print('ERROR: Clip "' + clipName + '" failed! ' + result.get('error', ''))
+            manifest.pop(clipName, None)
+            continue
+        entry = dict(sourceInfo[clipName])
+        entry['source'] = sourceFile
+        entry['clip'] = clipPath
+        entry['params'] = params
+        manifest[clipName] = entry
         clipPathList.append(clipPath)
 
-        # Clear Scene
-        cmds.file(newFile=True, force=True, prompt=False)
+    writeClipManifest(manifestFile, manifest)
+
+    if verbose:
+        print('Clip library: generated ' + str(len(clipPathList)) + ' of ' + str(len(clipList)) + ' clips')
 
     # =================
     # - Return Result -
@@ -226,6 +397,152 @@ def createMocapClips(sourceDir, targetDir='', extList=['fbx'], skipUpToDate=Fals
     return clipPathList
 
 
+def generateMocapClips(clipList, processes=4, charSetName='char', executable='mayapy', logDir=''):
+    """
+    Generate trax clips using multiple headless maya worker processes.
+    Clips are distributed across workers by source file size. Returns a {clipName: result} dictionary,
+    where each result is a dictionary with "success" and "error" keys.
+    @param clipList: List of (clipName, sourceFile, clipPath) items to generate.
+    @type clipList: list
+    @param processes: Maximum number of concurrent worker processes.
+    @type processes: int
+    @param charSetName: Character set name.
+    @type charSetName: str
+    @param executable: Worker python executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param logDir: Worker job, result and log directory.
+    @type logDir: str
+    """
+    # Check Log Directory
+    if not logDir: raise Exception('No worker log directory specified!')
+    if not os.path.isdir(logDir): os.makedirs(logDir)
+    if isinstance(executable, basestring): executable = [executable]
+
+    # Distribute Clips (largest first, to the worker with the least work)
+    workerCount = max(1, min(processes, len(clipList)))
+    workerClips = [[] for i in range(workerCount)]
+    workerSize = [0] * workerCount
+    for clip in sorted(clipList, key=lambda i: os.path.getsize(i[1]), reverse=True):
+        n = workerSize.index(min(workerSize))
+        workerClips[n].append(clip)
+        workerSize[n] += os.path.getsize(clip[1])
+
+    # Build Worker Jobs
+    jobList = []
+    resultFiles = []
+    for n, clips in enumerate(workerClips):
+        name = 'mocapClipWorker' + str(n).zfill(2)
+        jobFile = os.path.join(logDir, name + '.job.json')
+        resultFile = os.path.join(logDir, name + '.result.json')
+        f = open(jobFile, 'w')
+        json.dump({'charSetName': charSetName, 'resultFile': resultFile, 'clips': clips}, f, indent=2)
+        f.close()
+        if os.path.isfile(resultFile): os.remove(resultFile)
+        cmd = executable + ['-m', 'glTools.tools.mocapClip', jobFile]
+        jobList.append(glTools.utils.batchJob.Job(name, cmd))
+        resultFiles.append(resultFile)
+
+    # Run Workers
+    backend = glTools.utils.batchJob.LocalBackend(slots=workerCount)
+    scheduler = glTools.utils.batchJob.Scheduler(jobList, backend=backend, logDir=logDir,
+                                                 reportFile=os.path.join(logDir, 'report.json'))
+    scheduler.run()
+
+    # Collect Results
+    results = {}
+    for resultFile in resultFiles:
+        if not os.path.isfile(resultFile): continue
+        f = open(resultFile, 'r')
+        results.update(json.load(f))
+        f.close()
+
+    # Return Result
+    return results
+
+
+def readClipManifest(manifestFile):
+    """
+    Read a clip library manifest file. Returns an empty manifest if the file does not exist.
+    @param manifestFile: Manifest file to read.
+    @type manifestFile: str
+    """
+    if not os.path.isfile(manifestFile): return {}
+    f = open(manifestFile, 'r')
+    try:
+        manifest = json.load(f)
+    except ValueError:
+        print('Invalid clip manifest "' + manifestFile + '"! Rebuilding all clips...')
+        manifest = {}
+    f.close()
+    return manifest.get('clips', {})
+
+
+def writeClipManifest(manifestFile, manifest):
+    """
+    Write a clip library manifest file.
+    @param manifestFile: Manifest file to write.
+    @type manifestFile: str
+    @param manifest: Clip manifest entries.
+    @type manifest: dict
+    """
+    tmpFile = manifestFile + '.tmp'
+    f = open(tmpFile, 'w')
+    json.dump({'generatorVersion': CLIP_GENERATOR_VERSION, 'clips': manifest}, f, indent=2, sort_keys=True)
+    f.close()
+    if os.path.isfile(manifestFile): os.remove(manifestFile)
+    os.rename(tmpFile, manifestFile)
+
+
+def _sourceInfo(sourceFile, entry=None):
+    """
+    Return the modification time, size and content hash of a source file.
+    The hash stored in the manifest entry is reused if the modification time and size are unchanged.
+    """
+    stat = os.stat(sourceFile)
+    info = {'mtime': stat.st_mtime, 'size': stat.st_size}
+    if entry and entry.get('mtime') == stat.st_mtime and entry.get('size') == stat.st_size:
+        info['hash'] = entry.get('hash')
+    else:
+        md5 = hashlib.md5()
+        f = open(sourceFile, 'rb')
+        for chunk in iter(lambda: f.read(1048576), ''): md5.update(chunk)
+        f.close()
+        info['hash'] = md5.hexdigest()
+    return info
+
+
+def _runWorker(jobFile):
+    """
+    Headless worker process entry. Generate all clips listed in the job file, writing per clip results
+    to the job result file. Returns the process exit code.
+    """
+    # Read Job
+    f = open(jobFile, 'r')
+    job = json.load(f)
+    f.close()
+
+    # Initialize Maya
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    # Generate Clips
+    results = {}
+    for clipName, sourceFile, clipPath in job['clips']:
+        try:
+            createMocapClip(sourceFile, clipPath, charSetName=job['charSetName'])
+            results[clipName] = {'success': True, 'error': ''}
+        except Exception, e:
+            results[clipName] = {'success': False, 'error': str(e)}
+
+        # Write Results
+        f = open(job['resultFile'], 'w')
+        json.dump(results, f, indent=2)
+        f.close()
+
+    # Return Result
+    return int(not all([i['success'] for i in results.values()]))
+
+
 def createSourceClipFile(sourceDir, setLatest=False):
     """
     """
@@ -281,3 +598,7 @@ def createSourceClipFile(sourceDir, setLatest=False):
     # =================
 
     return
+
+
+if __name__ == '__main__':
+    sys.exit(_runWorker(sys.argv[1]))
@@ -1,8 +1,8 @@
 import maya.mel as mel
 import maya.cmds as cmds
-import glTools.utils.base
 import glTools.utils.curve
 import glTools.utils.matrix
+import glTools.utils.timeSample
 
 
 def createCurve(pt, start=None, end=None, inc=1):
@@ -39,27 +39,15 @@ def createCurve(pt, start=None, end=None, inc=1):
     # - Build Motion Path -
     # =====================
 
-    hasEndPt = False
+    # Sample Motion (including end point)
+    sampler = glTools.utils.timeSample.TimeSampler()
+    sampler.addPoint(pt)
+    sampler.sample(glTools.utils.timeSample.frameRange(start, end, inc))
 
-    # Initialize Motion Paths
-    cmds.currentTime(start)
-    pos = glTools.utils.base.getPosition(pt)
-    crv = cmds.curve(p=[pos], d=1)
+    # Create Motion Path
+    crv = cmds.curve(p=sampler.getPointTrack(0), d=1)
     crv = cmds.rename(crv, pt + '_curve')
 
-    # Track Paths
-    for i in range(start + inc, end + 1, inc):
-        cmds.currentTime(i)
-        if i == end: hasEndPt = True
-        pos = glTools.utils.base.getPosition(pt)
-        cmds.curve(crv, a=True, p=pos)
-
-    # Ensure End Point
-    if not hasEndPt:
-        cmds.currentTime(end)
-        pos = glTools.utils.base.getPosition(pt)
-        cmds.curve(crv, a=True, p=pos)
-
     # Rebuild Motion Paths
     cmds.rebuildCurve(crv, ch=False, rpo=True, rt=0, end=1, kr=2, kcp=True, kep=True)
 
@@ -118,15 +106,16 @@ def createCurves(ptList, start=None, end=None, inc=1):
     # - Build Motion Paths -
     # ======================
 
-    hasEndPt = False
+    # Sample Motion (all points in a single pass)
+    sampler = glTools.utils.timeSample.TimeSampler()
+    columns = sampler.addPoints(ptList)
+    sampler.sample(glTools.utils.timeSample.frameRange(start, end, inc))
 
     # Initialize Motion Paths
     crvList = []
-    cmds.currentTime(start)
-    for pt in ptList:
+    for n, pt in enumerate(ptList):
         # Create Motion Path Curves
-        pos = glTools.utils.base.getPosition(pt)
-        crv = cmds.curve(p=[pos], d=1)
+        crv = cmds.curve(p=sampler.getPointTrack(columns[n]), d=1)
         crv = cmds.rename(crv, pt + '_curve')
         crvList.append(crv)
 
@@ -140,21 +129,6 @@ def createCurves(ptList, start=None, end=None, inc=1):
         cmds.addAttr(crv, ln='motionEnd')
         cmds.setAttr(crv + '.motionEnd', end)
 
-    # Track Paths
-    for i in range(start + inc, end + 1, inc):
-        cmds.currentTime(i)
-        if i == end: hasEndPt = True
-        for n in range(len(ptList)):
-            pos = glTools.utils.base.getPosition(ptList[n])
-            cmds.curve(crvList[n], a=True, p=pos)
-
-    # Ensure End Point
-    if not hasEndPt:
-        cmds.currentTime(end)
-        for n in range(len(ptList)):
-            pos = glTools.utils.base.getPosition(ptList[n])
-            cmds.curve(crvList[n], a=True, p=pos)
-
     # Rebuild Motion Paths
     for crv in crvList:
         cmds.rebuildCurve(crv, ch=False, rpo=True, rt=0, end=1, kr=2, kcp=True, kep=True)
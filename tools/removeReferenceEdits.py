@@ -64,6 +64,7 @@ def removeReferenceEditsUI():
 
     # Reference List
     cmds.popupMenu(parent=refListTSL)
+    cmds.menuItem('Refresh Edits', c=cmdPrefix + 'refreshEditIndexFromUI()')
     cmds.menuItem('Reload Reference', c=cmdPrefix + 'reloadReferenceFromUI()')
     cmds.menuItem('Unload Reference', c=cmdPrefix + 'unloadReferenceFromUI()')
     cmds.menuItem('Remove Reference', c=cmdPrefix + 'removeReferenceFromUI()')
@@ -155,6 +156,15 @@ def removeReferenceEditsUI():
     loadReferenceList()
 
 
+def refreshEditIndexFromUI():
+    """
+    Re-fetch the reference edits of the selected reference, and reload the node list.
+    """
+    refList = cmds.textScrollList('refEdits_refListTSL', q=True, si=True) or []
+    for ref in refList: glTools.utils.reference.getEditIndex(ref, refresh=True)
+    loadNodeList()
+
+
 def reloadReferenceFromUI():
     """
     Reload selected reference
@@ -239,92 +249,83 @@ def loadReferenceList():
     for ref in refList: cmds.textScrollList('refEdits_refListTSL', e=True, a=ref)
 
 
+def getEditFilters():
+    """
+    Return the reference edit display and filter options from the UI, as a dictionary.
+    """
+    return {'showNamespace': cmds.checkBoxGrp('refEdits_showNamespaceCBG', q=True, v1=True),
+            'showDagPath': cmds.checkBoxGrp('refEdits_showLongNamesCBG', q=True, v1=True),
+            'successfulEdits': cmds.checkBoxGrp('refEdits_showSuccessEditsCBG', q=True, v1=True),
+            'failedEdits': cmds.checkBoxGrp('refEdits_showFailedEditsCBG', q=True, v1=True),
+            'commands': glTools.utils.reference.editCommandList(
+                parent=cmds.checkBoxGrp('refEdits_parentCBG', q=True, v1=True),
+                setAttr=cmds.checkBoxGrp('refEdits_setAttrCBG', q=True, v1=True),
+                addAttr=cmds.checkBoxGrp('refEdits_addAttrCBG', q=True, v1=True),
+                deleteAttr=cmds.checkBoxGrp('refEdits_delAttrCBG', q=True, v1=True),
+                connectAttr=cmds.checkBoxGrp('refEdits_conAttrCBG', q=True, v1=True),
+                disconnectAttr=cmds.checkBoxGrp('refEdits_disconAttrCBG', q=True, v1=True))}
+
+
 def loadNodeList():
     """
+    Load the edited nodes of the selected reference to the UI node list.
+    Reference edits are queried from the cached reference edit index, so changing filters doesn't re-query the reference.
     """
+    # Clear Node List
+    cmds.textScrollList('refEdits_nodeListTSL', e=True, ra=True)
+
     # Get Selected Ref Node
     refNode = cmds.textScrollList('refEdits_refListTSL', q=True, si=True) or []
+    if not refNode: return
 
-    # Check Ref Node
-    if not refNode:
-        # No Reference Selected, Clear Node List
-        cmds.textScrollList('refEdits_nodeListTSL', e=True, ra=True)
-        return
-
-    # Get Show Details
-    showNamespace = cmds.checkBoxGrp('refEdits_showNamespaceCBG', q=True, v1=True)
-    showDagPath = cmds.checkBoxGrp('refEdits_showLongNamesCBG', q=True, v1=True)
-    successfulEdits = cmds.checkBoxGrp('refEdits_showSuccessEditsCBG', q=True, v1=True)
-    failedEdits = cmds.checkBoxGrp('refEdits_showFailedEditsCBG', q=True, v1=True)
-
-    # Get Edit Commands
-    editCmd_parent = cmds.checkBoxGrp('refEdits_parentCBG', q=True, v1=True)
-    editCmd_setAttr = cmds.checkBoxGrp('refEdits_setAttrCBG', q=True, v1=True)
-    editCmd_addAttr = cmds.checkBoxGrp('refEdits_addAttrCBG', q=True, v1=True)
-    editCmd_delAttr = cmds.checkBoxGrp('refEdits_delAttrCBG', q=True, v1=True)
-    editCmd_conAttr = cmds.checkBoxGrp('refEdits_conAttrCBG', q=True, v1=True)
-    editCmd_disconAttr = cmds.checkBoxGrp('refEdits_disconAttrCBG', q=True, v1=True)
-    if not (
-                        editCmd_parent or editCmd_setAttr or editCmd_addAttr or editCmd_delAttr or editCmd_conAttr or editCmd_disconAttr):
-        # No Edit Commands Checked, Clear Node List
-        cmds.textScrollList('refEdits_nodeListTSL', e=True, ra=True)
-        return
+    # Get Edit Filters
+    editFilters = getEditFilters()
+    if not editFilters['commands']: return
 
     # Get Reference Edit Nodes
-    nodeList = glTools.utils.reference.getEditNodes(refNode[0],
-                                                    showNamespace=showNamespace,
-                                                    showDagPath=showDagPath,
-                                                    successfulEdits=successfulEdits,
-                                                    failedEdits=failedEdits,
-                                                    parent=editCmd_parent,
-                                                    setAttr=editCmd_setAttr,
-                                                    addAttr=editCmd_addAttr,
-                                                    deleteAttr=editCmd_delAttr,
-                                                    connectAttr=editCmd_conAttr,
-                                                    disconnectAttr=editCmd_disconAttr)
-
-    # Remove Duplicates and Sort
-    nodeList = list(set([i for i in nodeList])) or []
-    nodeList.sort()
-
-    # Apply Node List
-    cmds.textScrollList('refEdits_nodeListTSL', e=True, ra=True)
-    for node in nodeList: cmds.textScrollList('refEdits_nodeListTSL', e=True, a=node)
+    nodeList = glTools.utils.reference.getEditIndex(refNode[0]).nodes(**editFilters)
 
     # Filter List
-    filterNodeList()
+    nodeSearchStr = cmds.textFieldButtonGrp('refEdits_nodeSearchTFG', q=True, text=True)
+    nodeList = searchNodeList(nodeList, nodeSearchStr)
+
+    # Apply Node List
+    if nodeList: cmds.textScrollList('refEdits_nodeListTSL', e=True, a=nodeList)
 
 
 def filterNodeList():
     """
+    Reload the UI node list using the current node search string.
     """
-    # Filter List
-    nodeSearchStr = cmds.textFieldButtonGrp('refEdits_nodeSearchTFG', q=True, text=True)
-    if not nodeSearchStr: return
+    loadNodeList()
 
-    # Get Node List
-    nodeList = cmds.textScrollList('refEdits_nodeListTSL', q=True, ai=True)
-    if not nodeList: return
+
+def searchNodeList(nodeList, nodeSearchStr):
+    """
+    Filter a node list using a search string.
+    Supports "prefix*" and "*suffix" wildcards, and a "!" prefix to exclude matching nodes.
+    @param nodeList: Node list to filter
+    @type nodeList: list
+    @param nodeSearchStr: Node search string. If empty, return the node list unchanged.
+    @type nodeSearchStr: str
+    """
+    # Check Search String
+    if not nodeSearchStr: return nodeList
 
     # Check Negative Filter
-    if nodeSearchStr.startswith('!'):
-        if nodeSearchStr.startswith('!*'):
-            nodeList = list(set([i for i in nodeList if not i.endswith(nodeSearchStr[2:])]))
-        elif nodeSearchStr.endswith('*'):
-            nodeList = list(set([i for i in nodeList if not i.startswith(nodeSearchStr[1:-1])]))
-        else:
-            nodeList = list(set([i for i in nodeList if not nodeSearchStr[1:] in i]))
+    exclude = nodeSearchStr.startswith('!')
+    if exclude: nodeSearchStr = nodeSearchStr[1:]
+
+    # Build Match Function
+    if nodeSearchStr.startswith('*'):
+        match = lambda i: i.endswith(nodeSearchStr[1:])
+    elif nodeSearchStr.endswith('*'):
+        match = lambda i: i.startswith(nodeSearchStr[:-1])
     else:
-        if nodeSearchStr.startswith('*'):
-            nodeList = list(set([i for i in nodeList if i.endswith(nodeSearchStr[1:])]))
-        elif nodeSearchStr.endswith('*'):
-            nodeList = list(set([i for i in nodeList if i.startswith(nodeSearchStr[:-1])]))
-        else:
-            nodeList = list(set([i for i in nodeList if nodeSearchStr in i]))
-
-    # Apply Filtered Node List
-    cmds.textScrollList('refEdits_nodeListTSL', e=True, ra=True)
-    for node in sorted(nodeList): cmds.textScrollList('refEdits_nodeListTSL', e=True, a=node)
+        match = lambda i: nodeSearchStr in i
+
+    # Return Result
+    return [i for i in nodeList if match(i) != exclude]
 
 
 def printNodeEditAttributes():
@@ -335,51 +336,20 @@ def printNodeEditAttributes():
     refList = cmds.textScrollList('refEdits_refListTSL', q=True, si=True) or []
     nodeList = cmds.textScrollList('refEdits_nodeListTSL', q=True, si=True) or []
 
-    # Get Show Details
-    showNamespace = cmds.checkBoxGrp('refEdits_showNamespaceCBG', q=True, v1=True)
-    showDagPath = cmds.checkBoxGrp('refEdits_showLongNamesCBG', q=True, v1=True)
-    successfulEdits = cmds.checkBoxGrp('refEdits_showSuccessEditsCBG', q=True, v1=True)
-    failedEdits = cmds.checkBoxGrp('refEdits_showFailedEditsCBG', q=True, v1=True)
-
-    # Get Edit Commands
-    editCmd_parent = cmds.checkBoxGrp('refEdits_parentCBG', q=True, v1=True)
-    editCmd_setAttr = cmds.checkBoxGrp('refEdits_setAttrCBG', q=True, v1=True)
-    editCmd_addAttr = cmds.checkBoxGrp('refEdits_addAttrCBG', q=True, v1=True)
-    editCmd_delAttr = cmds.checkBoxGrp('refEdits_delAttrCBG', q=True, v1=True)
-    editCmd_conAttr = cmds.checkBoxGrp('refEdits_conAttrCBG', q=True, v1=True)
-    editCmd_disconAttr = cmds.checkBoxGrp('refEdits_disconAttrCBG', q=True, v1=True)
+    # Get Edit Filters
+    editFilters = getEditFilters()
 
-    # Get Edit Commands
+    # Get Edit Attributes
     for refNode in refList:
-
-        # Get Reference Namespace
-        ns = ''
-        if showNamespace: ns = glTools.utils.reference.getNamespace(refNode) + ':'
-
+        editIndex = glTools.utils.reference.getEditIndex(refNode)
         for node in nodeList:
+            attrList = editIndex.attrs(node,
+                                       successfulEdits=editFilters['successfulEdits'],
+                                       failedEdits=editFilters['failedEdits'],
+                                       commands=editFilters['commands'])
 
-            # Get Edit Attributes
-            attrList = glTools.utils.reference.getEditAttrs(refNode,
-                                                            node,
-                                                            showNamespace=showNamespace,
-                                                            showDagPath=showDagPath,
-                                                            successfulEdits=successfulEdits,
-                                                            failedEdits=failedEdits,
-                                                            parent=editCmd_parent,
-                                                            setAttr=editCmd_setAttr,
-                                                            addAttr=editCmd_addAttr,
-                                                            deleteAttr=editCmd_delAttr,
-                                                            connectAttr=editCmd_conAttr,
-                                                            disconnectAttr=editCmd_disconAttr)
-
-            # Append Output List
+            # Print Result
             if attrList:
-
-                # Remove Duplicates and Sort
-                attrList = list(set(attrList))
-                attrList.sort()
-
-                # Print Result
                 print('\n=== Edit Attributes: ' + node + ' ===\n')
                 for attr in attrList: print attr
 
@@ -392,48 +362,22 @@ def printNodeEditCommands():
     refList = cmds.textScrollList('refEdits_refListTSL', q=True, si=True) or []
     nodeList = cmds.textScrollList('refEdits_nodeListTSL', q=True, si=True) or []
 
-    # Get Show Details
-    showNamespace = cmds.checkBoxGrp('refEdits_showNamespaceCBG', q=True, v1=True)
-    showDagPath = cmds.checkBoxGrp('refEdits_showLongNamesCBG', q=True, v1=True)
-    successfulEdits = cmds.checkBoxGrp('refEdits_showSuccessEditsCBG', q=True, v1=True)
-    failedEdits = cmds.checkBoxGrp('refEdits_showFailedEditsCBG', q=True, v1=True)
-
-    # Get Edit Commands
-    editCmd_parent = cmds.checkBoxGrp('refEdits_parentCBG', q=True, v1=True)
-    editCmd_setAttr = cmds.checkBoxGrp('refEdits_setAttrCBG', q=True, v1=True)
-    editCmd_addAttr = cmds.checkBoxGrp('refEdits_addAttrCBG', q=True, v1=True)
-    editCmd_delAttr = cmds.checkBoxGrp('refEdits_delAttrCBG', q=True, v1=True)
-    editCmd_conAttr = cmds.checkBoxGrp('refEdits_conAttrCBG', q=True, v1=True)
-    editCmd_disconAttr = cmds.checkBoxGrp('refEdits_disconAttrCBG', q=True, v1=True)
+    # Get Edit Filters
+    editFilters = getEditFilters()
 
     # Get Edit Commands
     for refNode in refList:
-
-        # Get Reference Namespace
-        ns = ''
-        if showNamespace: ns = glTools.utils.reference.getNamespace(refNode) + ':'
-
+        editIndex = glTools.utils.reference.getEditIndex(refNode)
         for node in nodeList:
-            cmdList = glTools.utils.reference.getEditCommands(refNode,
-                                                              ns + node,
-                                                              showNamespace=showNamespace,
-                                                              showDagPath=showDagPath,
-                                                              successfulEdits=successfulEdits,
-                                                              failedEdits=failedEdits,
-                                                              parent=editCmd_parent,
-                                                              setAttr=editCmd_setAttr,
-                                                              addAttr=editCmd_addAttr,
-                                                              deleteAttr=editCmd_delAttr,
-                                                              connectAttr=editCmd_conAttr,
-                                                              disconnectAttr=editCmd_disconAttr)
-
-            # Append Output List
+            cmdList = editIndex.editStrings(node,
+                                            showNamespace=editFilters['showNamespace'],
+                                            showDagPath=editFilters['showDagPath'],
+                                            successfulEdits=editFilters['successfulEdits'],
+                                            failedEdits=editFilters['failedEdits'],
+                                            commands=editFilters['commands'])
+
+            # Print Result
             if cmdList:
-
-                # Remove Duplicates and Sort
-                cmdList = list(set(cmdList))
-
-                # Print Result
                 print('\n=== Edit Commands: ' + node + ' ===\n')
                 for cmd in cmdList: print cmd
 
@@ -507,3 +451,6 @@ def removeReferenceEditsFromUI():
 
         # Reload Reference
         if refLoaded: cmds.file(loadReference=refNode)
+
+    # Reload Node List
+    loadNodeList()
@@ -2,19 +2,31 @@ import maya.mel as mel
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
 import glTools.utils.component
+import glTools.utils.deformer
+import glTools.utils.laplacianSmooth
 import glTools.utils.mesh
+import glTools.utils.progressBar
+import glTools.utils.meshTopology
 import glTools.utils.selection
 import glTools.utils.skinCluster
+import glTools.utils.sparseWeights
 
 
-class UserInterupted(Exception): pass
+UserInterupted = glTools.utils.progressBar.UserInterupted
 
 
-def smoothWeights(vtxList=[], faceConnectivity=False, showProgress=False, debug=False):
+def smoothWeights(vtxList=[],
+                  faceConnectivity=False,
+                  showProgress=False,
+                  debug=False,
+                  iterations=1,
+                  strength=1.0,
+                  mode='uniform',
+                  includeSelf=True):
     """
     Smooth skincluster weights for the specified vertex list.
     Only works for valid mesh vertices bound to an existing skinCluster.
-    Weights are smoothed by averaging the weight values of connected vertices.
+    Weights are smoothed by moving each vertex weight toward the average weight of the connected vertices.
     @param vtxList: Vertex list to smooth skinCluster weights for.
     @type vtxList: list
     @param faceConnectivity: Use face connectivity to determine connected vertices.
@@ -23,10 +35,15 @@ def smoothWeights(vtxList=[], faceConnectivity=False, showProgress=False, debug=
     @type showProgress: bool
     @param debug: Print debug messages to script editor
     @type debug: bool
+    @param iterations: Number of smooth iterations.
+    @type iterations: int
+    @param strength: Smooth strength. 1.0 replaces weights with the connected vertex average.
+    @type strength: float
+    @param mode: Neighbour weighting mode. Accepted values - "uniform", "distance" and "cotangent".
+    @type mode: str
+    @param includeSelf: Include each vertex in its own connected vertex average. If False, average the neighbours only.
+    @type includeSelf: bool
     """
-    # Get Main Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-
     # ==========================
     # - Check Vertex Selection -
     # ==========================
@@ -37,119 +54,41 @@ def smoothWeights(vtxList=[], faceConnectivity=False, showProgress=False, debug=
     vtxSelList = glTools.utils.selection.componentListByObject(vtxList)
     if not vtxSelList: raise Exception('No valid mesh vertices specified!')
 
-    # =====================================
-    # - For Each Selection Element (mesh) -
-    # =====================================
-
-    for vtxSel in vtxSelList:
-
-        vtxSel = cmds.ls(vtxSel, fl=True)
-
-        # Get Expanded Vertex Selection
-        expSel = glTools.utils.component.expandVertexSelection(vtxSel, useFace=faceConnectivity)
-        expSelComp = glTools.utils.selection.getSelectionElement(expSel, 0)
-
-        # Get Mesh and Connected SkinCluster
-        mesh = cmds.ls(vtxSel[0], o=True)[0]
-        skin = glTools.utils.skinCluster.findRelatedSkinCluster(mesh)
-        skinFn = glTools.utils.skinCluster.getSkinClusterFn(skin)
-
-        # Get Vertex IDs and Connectivity
-        vtxIDs = glTools.utils.component.singleIndexList(vtxSel)
-        expIDs = glTools.utils.component.singleIndexList(expSel)
-        vtxConnDict = glTools.utils.mesh.vertexConnectivityDict(mesh=mesh,
-                                                                vtxIDs=vtxIDs,
-                                                                faceConnectivity=faceConnectivity,
-                                                                showProgress=showProgress)
-
-        # Get SkinCluster Influence List
-        infList = OpenMaya.MIntArray()
-        influences = cmds.skinCluster(skin, q=True, inf=True)
-        for inf in influences:
-            infList.append(glTools.utils.skinCluster.getInfluenceIndex(skin, inf))
-        infCnt = infList.length()
-
-        # Get SkinCluster Weights
-        wtList = OpenMaya.MDoubleArray()
-        skinFn.getWeights(expSelComp[0], expSelComp[1], infList, wtList)
-
-        # DEBUG
-        if debug:
-            print('Skin Mesh: ' + mesh)
-            print('SkinCluster: ' + skin)
-            print('SkinCluster Influence Count: ' + str(infCnt))
-            print('SkinCluster Influence List:')
-            for inf in influences: print('\t' + inf)
+    # Begin Progress Bar
+    with glTools.utils.progressBar.Progress(status='Smoothing Weights...', maxValue=len(vtxSelList),
+                                            show=showProgress) as progress:
 
-        # ==================
-        # - Smooth Weights -
-        # ==================
+        # =====================================
+        # - For Each Selection Element (mesh) -
+        # =====================================
 
-        # Initialize Smooth Weights Array
-        sWtList = OpenMaya.MDoubleArray(wtList)
+        for vtxSel in vtxSelList:
 
-        # Begin Progress Bar
-        if showProgress:
-            cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True,
-                           status=('Smoothing Weights for "' + mesh + '" ...'), maxValue=len(vtxIDs))
+            vtxSel = cmds.ls(vtxSel, fl=True)
 
-        # For Each Vertex
-        for vtxID in vtxIDs:
+            # Get Mesh and Connected SkinCluster
+            mesh = cmds.ls(vtxSel[0], o=True)[0]
+            skin = glTools.utils.skinCluster.findRelatedSkinCluster(mesh)
+            vtxIDs = glTools.utils.component.singleIndexList(vtxSel)
 
-            # Get Vertex WeightList Index
-            vtxInd = expIDs.index(vtxID)
+            # DEBUG
+            if debug:
+                print('Skin Mesh: ' + mesh)
+                print('SkinCluster: ' + skin)
+                print('Smooth Vertex Count: ' + str(len(vtxIDs)))
 
-            # For Each Influence
-            for inf in range(infCnt):
-
-                # Initialize Debug String
-                debugStr = ''
-
-                # Get Current Influence Weight Value
-                wt = wtList[(vtxInd * infCnt) + inf]
-                if debug: debugStr += ('[' + str(vtxID) + '] - ' + influences[inf] + ': ' + str(wt) + '\n')
-
-                # For Each Connected Vertex
-                if debug: debugStr += ('[' + str(vtxID) + '] - connected vertex IDs:' + str(vtxConnDict[vtxID]) + '\n')
-                for connID in vtxConnDict[vtxID]:
-
-                    # Get Connected Vertex WeightList Index
-                    connInd = expIDs.index(connID)
-
-                    # Add Connected Vertex Weight
-                    wt += wtList[(connInd * infCnt) + inf]
-                    if debug: debugStr += ('\t[' + str(connID) + '] - ' + influences[inf] + ': ' + str(
-                        wtList[(connInd * infCnt) + inf]) + '\n')
-
-                # Normalize Weight Value
-                wt /= len(vtxConnDict[vtxID]) + 1
-
-                # Print Debug Message
-                if debug: debugStr += ('[' + str(vtxID) + '] - smoothed value: ' + str(wt) + '\n')
-                if wt > 0.00001: print(debugStr)
-
-                # Set Smoothed Weight
-                sWtList.set(wt, ((vtxInd * infCnt) + inf))
+            # Smooth Weights
+            smoothSkinWeights(skinCluster=skin,
+                              mesh=mesh,
+                              vtxIDs=vtxIDs,
+                              iterations=iterations,
+                              strength=strength,
+                              mode=mode,
+                              faceConnectivity=faceConnectivity,
+                              includeSelf=includeSelf)
 
             # Update Progress Bar
-            if showProgress:
-                if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                    cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                    raise UserInterupted('Operation cancelled by user!')
-                cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-        # End Current Progress Bar
-        if showProgress: cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-
-        # ==========================
-        # - Apply Smoothed Weights -
-        # ==========================
-
-        # Set SkinCluster Weights
-        try:
-            skinFn.setWeights(expSelComp[0], expSelComp[1], infList, sWtList, True, None)
-        except:
-            setWeights(vtxSel, skin, list(infList), list(sWtList))
+            progress.step()
 
     # =================
     # - Return Result -
@@ -158,6 +97,101 @@ def smoothWeights(vtxList=[], faceConnectivity=False, showProgress=False, debug=
     return
 
 
+def smoothSkinWeights(skinCluster,
+                      mesh,
+                      vtxIDs=None,
+                      iterations=1,
+                      strength=1.0,
+                      mode='uniform',
+                      faceConnectivity=False,
+                      includeSelf=True,
+                      lockList=None,
+                      normalize=True,
+                      maxInfluences=0):
+    """
+    Smooth skinCluster weights for a mesh using the Laplacian smoothing engine (glTools.utils.laplacianSmooth).
+    Weights are read and written in a single MFnSkinCluster call each, and smoothed in memory.
+    @param skinCluster: SkinCluster to smooth weights for.
+    @type skinCluster: str
+    @param mesh: SkinCluster mesh to smooth weights for.
+    @type mesh: str
+    @param vtxIDs: List of vertex IDs to smooth. If None, smooth all vertices.
+    @type vtxIDs: list or None
+    @param iterations: Number of smooth iterations.
+    @type iterations: int
+    @param strength: Smooth strength. 1.0 replaces weights with the connected vertex average.
+    @type strength: float
+    @param mode: Neighbour weighting mode. Accepted values - "uniform", "distance" and "cotangent".
+    @type mode: str
+    @param includeSelf: Include each vertex in its own connected vertex average. If False, average the neighbours only.
+    @type includeSelf: bool
+    @param faceConnectivity: Use face connectivity to determine connected vertices.
+    @type faceConnectivity: bool
+    @param lockList: List of influences whose weights are left unchanged.
+    @type lockList: list or None
+    @param normalize: Normalize smoothed weights.
+    @type normalize: bool
+    @param maxInfluences: Maximum number of influences per vertex. 0 means no limit.
+    @type maxInfluences: int
+    """
+    # Build Smoothing Matrix
+    topology = glTools.utils.meshTopology.getMeshTopology(mesh)
+    pointList = None
+    if mode != 'uniform': pointList = glTools.utils.laplacianSmooth.getPointList(mesh)
+    adjacency = glTools.utils.laplacianSmooth.buildAdjacencyWeights(topology,
+                                                                    pointList=pointList,
+                                                                    mode=mode,
+                                                                    faceConnectivity=faceConnectivity,
+                                                                    includeSelf=includeSelf)
+
+    # Get SkinCluster Influence List
+    skinFn = glTools.utils.skinCluster.getSkinClusterFn(skinCluster)
+    influences = cmds.skinCluster(skinCluster, q=True, inf=True)
+    infList = OpenMaya.MIntArray()
+    for inf in influences:
+        infList.append(glTools.utils.skinCluster.getInfluenceIndex(skinCluster, inf))
+
+    # Get SkinCluster Weights (all vertices)
+    meshPath = glTools.utils.mesh.getMeshFn(mesh).dagPath()
+    allVtxComp = OpenMaya.MFnSingleIndexedComponent().create(OpenMaya.MFn.kMeshVertComponent)
+    OpenMaya.MFnSingleIndexedComponent(allVtxComp).setCompleteData(topology.numVertices())
+    wtList = OpenMaya.MDoubleArray()
+    skinFn.getWeights(meshPath, allVtxComp, infList, wtList)
+    weights = glTools.utils.sparseWeights.SparseWeights.fromWeightArray(wtList, influences)
+
+    # Smooth Weights
+    weights = glTools.utils.laplacianSmooth.smoothWeights(weights,
+                                                          adjacency,
+                                                          iterations=iterations,
+                                                          strength=strength,
+                                                          pointList=vtxIDs,
+                                                          lockList=lockList,
+                                                          normalize=normalize,
+                                                          maxInfluences=maxInfluences)
+
+    # Build Smoothed Vertex Component
+    if vtxIDs is None:
+        vtxIDs = range(weights.pointCount())
+    else:
+        vtxIDs = sorted(set(vtxIDs))
+    vtxIdArray = OpenMaya.MIntArray()
+    [vtxIdArray.append(i) for i in vtxIDs]
+    vtxComp = OpenMaya.MFnSingleIndexedComponent().create(OpenMaya.MFn.kMeshVertComponent)
+    OpenMaya.MFnSingleIndexedComponent(vtxComp).addElements(vtxIdArray)
+
+    # Apply Smoothed Weights
+    sWtList = OpenMaya.MDoubleArray()
+    [sWtList.append(wt) for wt in weights.toWeightArray(influences, vtxIDs)]
+    try:
+        skinFn.setWeights(meshPath, vtxComp, infList, sWtList, normalize, None)
+    except:
+        vtxList = [mesh + '.vtx[' + str(i) + ']' for i in vtxIDs]
+        setWeights(vtxList, skinCluster, list(infList), list(sWtList))
+
+    # Return Result
+    return weights
+
+
 def setWeights(vtxList, skinCluster, infList, wtList):
     """
     Set skinCluster weights based on the incoming arguments.
@@ -207,51 +241,43 @@ def setWeights(vtxList, skinCluster, infList, wtList):
     return
 
 
-def smoothFlood(skinCluster, iterations=1):
+def smoothFlood(skinCluster, iterations=1, strength=1.0, mode='uniform', includeSelf=True, lockList=None, maxInfluences=0):
     """
-    Smooth flood all influences using artisan.
+    Smooth flood all influences of the specified skinCluster.
     @param skinCluster: The skinCluster to smooth flood influence weights on
     @type skinCluster: str
     @param iterations: Number of smooth iterations
     @type iterations: int
+    @param strength: Smooth strength. 1.0 replaces weights with the connected vertex average.
+    @type strength: float
+    @param mode: Neighbour weighting mode. Accepted values - "uniform", "distance" and "cotangent".
+    @type mode: str
+    @param includeSelf: Include each vertex in its own connected vertex average. If False, average the neighbours only.
+    @type includeSelf: bool
+    @param lockList: List of influences whose weights are left unchanged.
+    @type lockList: list or None
+    @param maxInfluences: Maximum number of influences per vertex. 0 means no limit.
+    @type maxInfluences: int
     """
     # Check zero iterations
     if not iterations: return
 
-    # Get current tool
-    currentTool = cmds.currentCtx()
-
-    # Select geometry
+    # Get geometry
     geometry = glTools.utils.deformer.getAffectedGeometry(skinCluster).keys()
-    cmds.select(geometry)
-
-    # Get skinCluster influence list
-    influenceList = cmds.skinCluster(skinCluster, q=True, inf=True)
-
-    # Unlock influence weights
-    for influence in influenceList: cmds.setAttr(influence + '.lockInfluenceWeights', 0)
-
-    # Initialize paint context
-    skinPaintTool = 'artAttrSkinContext'
-    if not cmds.artAttrSkinPaintCtx(skinPaintTool, ex=True):
-        cmds.artAttrSkinPaintCtx(skinPaintTool, i1='paintSkinWeights.xpm', whichTool='skinWeights')
-    cmds.setToolTo(skinPaintTool)
-    cmds.artAttrSkinPaintCtx(skinPaintTool, edit=True, sao='smooth')
+    for geo in geometry:
+        if not glTools.utils.mesh.isMesh(geo):
+            raise Exception('SkinCluster geometry "' + geo + '" is not a polygon mesh! Smooth flood only supports meshes.')
 
     # Smooth Weights
-    for i in range(iterations):
-        print(skinCluster + ': Smooth Iteration - ' + str(i + 1))
-        for influence in influenceList:
-            # Lock current influence weights
-            cmds.setAttr(influence + '.lockInfluenceWeights', 1)
-            # Smooth Flood
-            mel.eval('artSkinSelectInfluence artAttrSkinPaintCtx "' + influence + '" "' + influence + '"')
-            cmds.artAttrSkinPaintCtx(skinPaintTool, e=True, clear=True)
-            # Unlock current influence weights
-            cmds.setAttr(influence + '.lockInfluenceWeights', 0)
-
-    # Reset current tool
-    cmds.setToolTo(currentTool)
+    for geo in geometry:
+        smoothSkinWeights(skinCluster=skinCluster,
+                          mesh=geo,
+                          iterations=iterations,
+                          strength=strength,
+                          mode=mode,
+                          includeSelf=includeSelf,
+                          lockList=lockList,
+                          maxInfluences=maxInfluences)
 
 
 def hotkeySetup():
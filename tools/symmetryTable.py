@@ -1,20 +1,44 @@
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import glTools.data.fileFormat
+import glTools.model.checksum
+import glTools.utils.mesh
+import array
+import collections
 import copy
+import hashlib
+import math
+import os.path
+
+# Symmetry Table Cache - {(mesh, connectivityChecksum, pointChecksum, mid, axis, tol, usePivot): SymmetryTable}
+CACHE_SIZE = 16
+_symTableCache = collections.OrderedDict()
 
 
 class SymmetryTable(object):
     def __init__(self):
 
-        self.symTable = []
-        self.asymTable = []
+        self.symTable = array.array('i')
+        self.asymTable = array.array('i')
         self.positiveVertexList = []
-        self.positiveIndexList = []
+        self.positiveIndexList = array.array('i')
         self.negativeVertexList = []
-        self.negativeIndexList = []
+        self.negativeIndexList = array.array('i')
+
+        # Build Settings
+        self.mesh = ''
+        self.checksum = ''
+        self.pointChecksum = ''
+        self.mid = 0.0
+        self.axis = 0
+        self.tol = 0.001
+        self.usePivot = False
 
     def buildSymTable(self, mesh, axis=0, tol=0.001, usePivot=False):
         """
-        Build symmetry table for specified mesh
+        Build symmetry table for specified mesh.
+        World space points are read in one call, and mirrored pairs are matched through a spatial hash
+        with a cell size equal to the distance tolerance.
         @param mesh: Mesh to build symmetry table for
         @type mesh: str
         @param axis: Axis to check for symmetry across
@@ -24,108 +48,260 @@ class SymmetryTable(object):
         @param usePivot: Use the object pivot
         @type usePivot: bool
         """
-        # Initialize list variables
-        aNegVerts = []
-        aPosVerts = []
-        aNonSymVerts = []
-        aPosVertsInt = []
-        aNegVertsInt = []
-        aNegVertTrans = []
-        aPosVertTrans = []
-        aVtxTrans = []
-        aVtx2Trans = []
-
         # Set constants
         mAxisInd = axis
-        axis2Ind = (mAxisInd + 1) % 3
-        axis3Ind = (mAxisInd + 2) % 3
         midOffsetTol = -0.0000001
 
-        # Reset counter
-        vertCounter = 0
-
         # Check pivot
-        if usePivot:
-            aVtxTrans = cmds.xform(mesh, q=True, ws=True, rp=True)
-            mid = aVtxTrans[mAxisInd]
-        else:
-            meshParent = mesh
-            if cmds.objectType(meshParent) != 'transform':
-                meshParent = cmds.listRelatives(mesh, p=True)[0]
-            bBox = cmds.xform(meshParent, q=True, ws=True, boundingBox=True)
-            mid = bBox[mAxisInd] + ((bBox[mAxisInd + 3] - bBox[mAxisInd]) / 2)
-
-        # Get total verts
-        totVtx = cmds.polyEvaluate(mesh, v=True)
-        # Initialize abSymTable
-        abSymTable = range(int(totVtx))
-
-        # Determin pos and neg verts
-        for i in range(totVtx):
-            vtx = mesh + '.vtx[' + str(i) + ']'
-            aVtxTrans = cmds.xform(vtx, q=True, ws=True, translation=True)
-            midOffset = aVtxTrans[mAxisInd] - mid
-            # Check for pos/neg position
+        mid = symmetryMid(mesh, axis, usePivot)
+
+        # Get world space points
+        ptArray = worldPoints(mesh)
+        totVtx = len(ptArray) / 3
+        ptList = [tuple(ptArray[i * 3:i * 3 + 3]) for i in xrange(totVtx)]
+
+        # Initialize symmetry table
+        abSymTable = array.array('i', xrange(totVtx))
+        matched = array.array('B', [0]) * totVtx
+
+        # Determine pos and neg verts
+        aPosVertsInt = array.array('i')
+        aNegVertsInt = array.array('i')
+        for i in xrange(totVtx):
+            midOffset = ptList[i][mAxisInd] - mid
             if midOffset >= midOffsetTol:
-                aPosVerts.append(vtx)
                 aPosVertsInt.append(i)
-                aPosVertTrans.append(aVtxTrans[mAxisInd])
             else:
-                if midOffset < midOffsetTol:
-                    aNegVerts.append(vtx)
-                    aNegVertsInt.append(i)
-                    aNegVertTrans.append(aVtxTrans[mAxisInd])
+                aNegVertsInt.append(i)
 
         # Update class member variabels
-        self.positiveVertexList = copy.deepcopy(aPosVerts)
-        self.positiveIndexList = copy.deepcopy(aPosVertsInt)
-        self.negativeVertexList = copy.deepcopy(aNegVerts)
-        self.negativeIndexList = copy.deepcopy(aNegVertsInt)
-
-        # Find Non-Symmetrical verts
-        for i in range(len(aPosVerts)):
-            vtx = aPosVerts[i]
-            posOffset = aPosVertTrans[i] - mid
-            if posOffset < tol:
-                aPosVerts[i] = 'm'
-                vertCounter += 1
+        self.positiveIndexList = aPosVertsInt
+        self.negativeIndexList = aNegVertsInt
+        self.positiveVertexList = [mesh + '.vtx[' + str(i) + ']' for i in aPosVertsInt]
+        self.negativeVertexList = [mesh + '.vtx[' + str(i) + ']' for i in aNegVertsInt]
+
+        # ===========================
+        # - Hash Mirrored Positions -
+        # ===========================
+
+        # Mirror a point across the symmetry plane
+        def mirror(pt):
+            mPt = list(pt)
+            mPt[mAxisInd] = (2.0 * mid) - mPt[mAxisInd]
+            return mPt
+
+        # Hash positive verts at their mirrored position (middle verts map to themselves)
+        cellSize = tol if tol > 0.0 else 0.000001
+        grid = {}
+        for i in aPosVertsInt:
+            if ptList[i][mAxisInd] - mid < tol:
+                matched[i] = 1
+                continue
+            cell = tuple([int(math.floor(v / cellSize)) for v in mirror(ptList[i])])
+            grid.setdefault(cell, []).append(i)
+
+        # =========================
+        # - Match Negative Verts -
+        # =========================
+
+        for j in aNegVertsInt:
+
+            # Check middle vert
+            pt = ptList[j]
+            if mid - pt[mAxisInd] < tol:
+                matched[j] = 1
                 continue
 
-            for j in range(len(aNegVerts)):
-                if aNegVerts[j] == 'm': continue
-                negOffset = mid - aNegVertTrans[j]
-                if negOffset < tol:
-                    aNegVerts[j] = 'm'
-                    vertCounter += 1
-                    continue
-
-                if abs(posOffset - negOffset) <= tol:
-                    aVtxTrans = cmds.xform(vtx, q=True, ws=True, t=True)
-                    aVtx2Trans = cmds.xform(aNegVerts[j], q=True, ws=True, t=True)
-                    test1 = aVtxTrans[axis2Ind] - aVtx2Trans[axis2Ind]
-                    test2 = aVtxTrans[axis3Ind] - aVtx2Trans[axis3Ind];
-                    if (abs(test1) < tol) and (abs(test2) < tol):
-                        # match
-                        abSymTable[aNegVertsInt[j]] = aPosVertsInt[i]
-                        abSymTable[aPosVertsInt[i]] = aNegVertsInt[j]
-                        vertCounter += 2
-                        aPosVerts[i] = aNegVerts[j] = 'm'
-                        break
+            # Search neighbouring cells for the closest unmatched mirrored positive vert
+            cx, cy, cz = [int(math.floor(v / cellSize)) for v in pt]
+            best = -1
+            bestDist = None
+            for x in (cx - 1, cx, cx + 1):
+                for y in (cy - 1, cy, cy + 1):
+                    for z in (cz - 1, cz, cz + 1):
+                        for i in grid.get((x, y, z), ()):
+                            if matched[i]: continue
+                            mPt = mirror(ptList[i])
+                            if max([abs(mPt[n] - pt[n]) for n in xrange(3)]) > tol: continue
+                            dist = sum([(mPt[n] - pt[n]) ** 2 for n in xrange(3)])
+                            if bestDist is None or dist < bestDist:
+                                best = i
+                                bestDist = dist
+
+            # Store match
+            if best >= 0:
+                abSymTable[j] = best
+                abSymTable[best] = j
+                matched[j] = matched[best] = 1
 
         # Determine asymmetrical vertices
-        aNonSymVerts = []
-        [aNonSymVerts.append(i) for i in aPosVerts if i != 'm']
-        [aNonSymVerts.append(i) for i in aNegVerts if i != 'm']
+        aNonSymVerts = array.array('i', [i for i in aPosVertsInt if not matched[i]])
+        aNonSymVerts.extend([i for i in aNegVertsInt if not matched[i]])
 
-        if vertCounter != totVtx:
+        if aNonSymVerts:
             print 'Warning: Mesh object "' + mesh + '" is not symmetrical!'
 
         # Update class member variabels
         self.symTable = abSymTable
         self.asymTable = aNonSymVerts
+        self.mesh = mesh
+        self.checksum = glTools.model.checksum.checksum_mesh(mesh)
+        self.pointChecksum = pointChecksum(ptArray)
+        self.mid = mid
+        self.axis = axis
+        self.tol = tol
+        self.usePivot = usePivot
 
         # =================
         # - Return Result -
         # =================
 
         return self.symTable
+
+    def setMesh(self, mesh):
+        """
+        Return a copy of this symmetry table with the vertex lists relabelled for the specified mesh.
+        @param mesh: Mesh to relabel the symmetry table vertex lists for
+        @type mesh: str
+        """
+        sTable = copy.copy(self)
+        sTable.mesh = mesh
+        sTable.positiveVertexList = [mesh + '.vtx[' + str(i) + ']' for i in self.positiveIndexList]
+        sTable.negativeVertexList = [mesh + '.vtx[' + str(i) + ']' for i in self.negativeIndexList]
+        return sTable
+
+    def key(self):
+        """
+        Return the cache key of the mesh state and settings this symmetry table was built for (excluding the mesh).
+        """
+        return (self.checksum, self.pointChecksum, self.mid, self.axis, self.tol, self.usePivot)
+
+    def save(self, filePath):
+        """
+        Save the symmetry table to file, along with the mesh connectivity and point checksums it was built for.
+        @param filePath: File path to save the symmetry table to.
+        @type filePath: str
+        """
+        glTools.data.fileFormat.writeFile(filePath, self)
+        return filePath
+
+    def load(self, filePath):
+        """
+        Load a symmetry table from file into this object.
+        @param filePath: File path to load the symmetry table from.
+        @type filePath: str
+        """
+        if not glTools.data.fileFormat.isBinaryFile(filePath):
+            raise Exception('File "' + filePath + '" is not a valid symmetry table file!')
+        self.__dict__.update(glTools.data.fileFormat.readFile(filePath).__dict__)
+        return self
+
+
+def symmetryMid(mesh, axis=0, usePivot=False):
+    """
+    Return the world space position of the symmetry plane along the specified axis.
+    @param mesh: Mesh to get the symmetry plane for
+    @type mesh: str
+    @param axis: Axis to check for symmetry across
+    @type axis: int
+    @param usePivot: Use the object pivot. If False, use the bounding box center of the mesh transform.
+    @type usePivot: bool
+    """
+    if usePivot:
+        aVtxTrans = cmds.xform(mesh, q=True, ws=True, rp=True)
+        return aVtxTrans[axis]
+    meshParent = mesh
+    if cmds.objectType(meshParent) != 'transform':
+        meshParent = cmds.listRelatives(mesh, p=True)[0]
+    bBox = cmds.xform(meshParent, q=True, ws=True, boundingBox=True)
+    return bBox[axis] + ((bBox[axis + 3] - bBox[axis]) / 2)
+
+
+def worldPoints(mesh):
+    """
+    Return the world space points of the specified mesh as a flat double array.
+    @param mesh: Mesh to get world space points for
+    @type mesh: str
+    """
+    meshPts = OpenMaya.MPointArray()
+    glTools.utils.mesh.getMeshFn(mesh).getPoints(meshPts, OpenMaya.MSpace.kWorld)
+    ptArray = array.array('d')
+    for i in xrange(meshPts.length()):
+        pt = meshPts[i]
+        ptArray.extend((pt.x, pt.y, pt.z))
+    return ptArray
+
+
+def pointChecksum(ptArray):
+    """
+    Return a checksum of a flat (world space) point array.
+    @param ptArray: Flat point position array
+    @type ptArray: array.array
+    """
+    return hashlib.md5(ptArray.tostring()).hexdigest()
+
+
+def getSymTable(mesh, axis=0, tol=0.001, usePivot=False, cacheDir=''):
+    """
+    Return a symmetry table for the specified mesh, reusing a previously built table if available.
+    Tables are cached in memory, and optionally on disk, keyed by the mesh connectivity checksum, a checksum of the
+    world space point positions and the symmetry plane position. Memory cached tables are also keyed by mesh,
+    and tables loaded from disk are relabelled for the specified mesh. The memory cache keeps the CACHE_SIZE most
+    recently used tables.
+    @param mesh: Mesh to get symmetry table for
+    @type mesh: str
+    @param axis: Axis to check for symmetry across
+    @type axis: int
+    @param tol: Distance tolerance for finding symmetry pairs
+    @type tol: float
+    @param usePivot: Use the object pivot
+    @type usePivot: bool
+    @param cacheDir: Directory to load/save symmetry table files from/to. If empty, only cache in memory.
+    @type cacheDir: str
+    """
+    # Check Memory Cache
+    checksum = glTools.model.checksum.checksum_mesh(mesh)
+    ptChecksum = pointChecksum(worldPoints(mesh))
+    mid = symmetryMid(mesh, axis, usePivot)
+    tableKey = (checksum, ptChecksum, mid, axis, tol, usePivot)
+    meshPath = (cmds.ls(mesh, long=True) or [mesh])[0]
+    key = (meshPath,) + tableKey
+    if key in _symTableCache:
+        sTable = _symTableCache[key] = _symTableCache.pop(key)
+        return sTable if sTable.mesh == mesh else sTable.setMesh(mesh)
+
+    # Check File Cache
+    filePath = ''
+    if cacheDir:
+        fileKey = hashlib.md5(repr(tableKey)).hexdigest()
+        filePath = os.path.join(cacheDir, checksum + '_' + fileKey + '_' + 'xyz'[axis] + '.symTable')
+    if filePath and os.path.isfile(filePath):
+        sTable = SymmetryTable().load(filePath)
+        if sTable.key() == tableKey:
+            if sTable.mesh != mesh: sTable = sTable.setMesh(mesh)
+            _cacheSymTable(key, sTable)
+            return sTable
+
+    # Build Symmetry Table
+    sTable = SymmetryTable()
+    sTable.buildSymTable(mesh, axis, tol, usePivot)
+    if filePath: sTable.save(filePath)
+    _cacheSymTable(key, sTable)
+
+    # Return Result
+    return sTable
+
+
+def clearCache():
+    """
+    Clear all symmetry tables cached in memory.
+    """
+    _symTableCache.clear()
+
+
+def _cacheSymTable(key, sTable):
+    """
+    Add a symmetry table to the memory cache, removing the least recently used tables beyond CACHE_SIZE.
+    """
+    _symTableCache[key] = sTable
+    while len(_symTableCache) > CACHE_SIZE: _symTableCache.popitem(last=False)
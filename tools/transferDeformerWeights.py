@@ -5,6 +5,7 @@ import glTools.utils.component
 import glTools.utils.deformer
 import glTools.utils.mesh
 import glTools.utils.transform
+import glTools.tools.symmetryTable
 
 
 def closestPointWeights(pts, mesh, tol=0.001):
@@ -105,7 +106,8 @@ def mirrorWeights(wts,
                   flip=False,
                   posToNeg=True,
                   deformer=None,
-                  deformedGeo=None):
+                  deformedGeo=None,
+                  useSymTable=False):
     """
     Mirror weights values on a specified mesh.
     @param wts: Weight values to mirror
@@ -122,6 +124,8 @@ def mirrorWeights(wts,
     @type deformer: str on None
     @param deformedGeo: Deformed mesh to apply weights to
     @type deformedGeo: str on None
+    @param useSymTable: Mirror using the (cached) vertex symmetry table instead of closest point weights. Requires a symmetrical mesh.
+    @type useSymTable: bool
     """
     # ==========
     # - Checks -
@@ -154,12 +158,16 @@ def mirrorWeights(wts,
     # ==================
 
     m_wts = []
-    pt_wts = closestPointWeights(pts, mesh, tol=0.001)
+    if useSymTable:
+        symTable = glTools.tools.symmetryTable.getSymTable(mesh, 'xyz'.index(axis)).symTable
+        pt_wts = [{symTable[i]: 1.0} for i in range(len(wts))]
+    else:
+        pt_wts = closestPointWeights(pts, mesh, tol=0.001)
     for i in range(len(wts)):
 
         # Check Skipped Mirror Weights
         if not flip:
-            axisVal = pts['xyz'.index(axis)] * -1
+            axisVal = pts[i]['xyz'.index(axis)] * -1
             if posToNeg and (axisVal > 0):
                 m_wts.append(wts[i])
                 continue
@@ -1,5 +1,5 @@
 import maya.cmds as cmds
-from glTools.utils.weightList import WeightList
+from glTools.utils.weightList import WeightArray
 import glTools.tools.generateWeights
 import glTools.utils.deformer
 import glTools.utils.skinCluster
@@ -92,7 +92,7 @@ class VolumeWeights(object):
             self.weights[geometry] = {}
 
             for transform in self.weightTransforms:
-                self.weights[geometry][transform] = WeightList(
+                self.weights[geometry][transform] = WeightArray(
                     glTools.tools.generateWeights.radialWeights(geometry=geometry,
                                                                 center=transform,
                                                                 radius=cmds.getAttr(
@@ -104,9 +104,9 @@ class VolumeWeights(object):
 
     def calculateWeights(self, normalize=False, clamp=True):
 
-        addWeights = WeightList([])
-        subWeights = WeightList([])
-        mulWeights = WeightList([])
+        addWeights = WeightArray()
+        subWeights = WeightArray()
+        mulWeights = WeightArray()
         for geometry in self.weights.keys():
 
             for transform in self.weights[geometry].keys():
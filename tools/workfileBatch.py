@@ -1,7 +1,9 @@
 import maya.mel as mel
 import maya.cmds as cmds
 import glTools.ui.utils
+import glTools.utils.batchJob
 import os
+import time
 
 
 def workfileBatchUI():
@@ -150,19 +152,24 @@ def workfileBatchFromUI():
     publish = cmds.checkBoxGrp('wfBatch_publishCBG', q=True, v1=True)
     publishNote = cmds.scrollField('wfBatch_publishNoteSF', q=True, text=True)
 
-    # For Each Workfile
-    for workfile in workfileList:
-        workfileBatch(workfile=workfile,
-                      cmdsFile=cmdsFile,
-                      versionUp=versionUp,
-                      snapshot=snapshot,
-                      publish=publish,
-                      publishNote=publishNote)
+    # Batch Workfiles
+    scheduler = workfileBatch(workfileList=workfileList,
+                              cmdsFile=cmdsFile,
+                              versionUp=versionUp,
+                              snapshot=snapshot,
+                              publish=publish,
+                              publishNote=publishNote,
+                              wait=False)
+    print('Workfile batch started (' + str(len(workfileList)) + ' files). Logs: ' + scheduler.logDir)
 
+    # Return Result
+    return scheduler
 
-def workfileBatch(workfile, cmdsFile='', versionUp=False, snapshot=False, publish=False, publishNote=''):
+
+def workfileBatchCommand(workfile, cmdsFile='', versionUp=False, snapshot=False, publish=False, publishNote='',
+                         executable='workfileBatch'):
     """
-    Workfile batch.
+    Return the workfile batch command argument list for the specified workfile.
     @param workfile: Workfile to batch process
     @type workfile: str
     @param cmdsFile: Optional python command file to run on workfile
@@ -175,21 +182,84 @@ def workfileBatch(workfile, cmdsFile='', versionUp=False, snapshot=False, publis
     @type publish: bool
     @param publishNote: Snapshot/Publish notes
     @type publishNote: str
+    @param executable: Workfile batch executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
     """
-    # Build Workfile Batch Command
-    workfileBatchCmd = "workfileBatch"
-    workfileBatchCmd += " " + workfile
-    workfileBatchCmd += " " + cmdsFile
-    workfileBatchCmd += " " + str(int(versionUp))
-    workfileBatchCmd += " " + str(int(snapshot))
-    workfileBatchCmd += " " + str(int(publish))
-    workfileBatchCmd += " '" + publishNote + "'"
+    if isinstance(executable, basestring): executable = [executable]
+    return list(executable) + [workfile,
+                               cmdsFile,
+                               str(int(versionUp)),
+                               str(int(snapshot)),
+                               str(int(publish)),
+                               publishNote]
 
-    # Get Workfile Basename
-    fileName = os.path.basename(workfile)
 
-    # Execute Workfile Batch Command
-    os.system('xterm -hold -T "' + fileName + '" -e "' + workfileBatchCmd + '" &')
+def workfileBatch(workfileList, cmdsFile='', versionUp=False, snapshot=False, publish=False, publishNote='',
+                  slots=None, retries=0, logDir='', reportFile='', executable='workfileBatch', backend=None, wait=True):
+    """
+    Workfile batch.
+    Each workfile is processed as a separate job, running in parallel up to the number of available slots.
+    Job stdout/stderr is written to per job log files and job status to an optional JSON report file.
+    @param workfileList: Workfile or list of workfiles to batch process
+    @type workfileList: str or list
+    @param cmdsFile: Optional python command file to run on workfile
+    @type cmdsFile: str
+    @param versionUp: Version up workfile
+    @type versionUp: bool
+    @param snapshot: Snapshot workfile
+    @type snapshot: bool
+    @param publish: Publish workfile
+    @type publish: bool
+    @param publishNote: Snapshot/Publish notes
+    @type publishNote: str
+    @param slots: Maximum number of concurrent jobs for the local backend. If None, use the number of CPUs.
+    @type slots: int or None
+    @param retries: Number of times to re-run a failed job.
+    @type retries: int
+    @param logDir: Job log directory. If empty, use a "workfileBatch" directory in the user temp directory.
+    @type logDir: str
+    @param reportFile: JSON status report file. If empty, write "report.json" to the log directory.
+    @type reportFile: str
+    @param executable: Workfile batch executable. Can be replaced with a stand-in command for testing.
+    @type executable: str or list
+    @param backend: Job backend. If None, run jobs locally. See glTools.utils.batchJob.Backend.
+    @type backend: glTools.utils.batchJob.Backend or None
+    @param wait: Wait for all jobs to finish. If False, the jobs are run from a background thread.
+    @type wait: bool
+    """
+    # Check Workfile List
+    if isinstance(workfileList, basestring): workfileList = [workfileList]
+    if not workfileList: raise Exception('No workfiles specified!')
+
+    # Check Log Directory
+    if not logDir:
+        tmpDir = os.environ.get('TMPDIR') or os.environ.get('TEMP') or '/tmp'
+        logDir = os.path.join(tmpDir, 'workfileBatch', time.strftime('%Y%m%d_%H%M%S'))
+    if not reportFile: reportFile = os.path.join(logDir, 'report.json')
+
+    # Build Jobs
+    jobList = []
+    for n, workfile in enumerate(workfileList):
+        cmd = workfileBatchCommand(workfile=workfile,
+                                   cmdsFile=cmdsFile,
+                                   versionUp=versionUp,
+                                   snapshot=snapshot,
+                                   publish=publish,
+                                   publishNote=publishNote,
+                                   executable=executable)
+        name = str(n).zfill(3) + '_' + os.path.splitext(os.path.basename(workfile))[0]
+        jobList.append(glTools.utils.batchJob.Job(name, cmd, retries=retries))
+
+    # Run Jobs
+    if not backend: backend = glTools.utils.batchJob.LocalBackend(slots=slots)
+    scheduler = glTools.utils.batchJob.Scheduler(jobList, backend=backend, logDir=logDir, reportFile=reportFile)
+    if wait:
+        scheduler.run()
+    else:
+        scheduler.start()
+
+    # Return Result
+    return scheduler
 
 
 def workfileBatchSubmit(workfile, cmdsFile='', versionUp=False, snapshot=False, publish=False, publishNote=''):
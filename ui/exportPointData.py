@@ -35,6 +35,10 @@ def exportPointDataUI():
                           c='glTools.ui.exportPointData.export3DFromUI()')
     export3DRotB = cmds.button('exportPoint_export3DRotB', label='Export 3D Rotate Data',
                              c='glTools.ui.exportPointData.export3DRotationFromUI()')
+    export2DTracksB = cmds.button('exportPoint_export2DTracksB', label='Export 2D Tracks (Single File)',
+                                  c='glTools.ui.exportPointData.export2DTracksFromUI()')
+    export3DTracksB = cmds.button('exportPoint_export3DTracksB', label='Export 3D Tracks (Single File)',
+                                  c='glTools.ui.exportPointData.export3DTracksFromUI()')
     closeB = cmds.button('exportPoint_closeB', label='Close', c='cmds.deleteUI("' + window + '")')
 
     # Resolution presets
@@ -56,7 +60,7 @@ def exportPointDataUI():
         cmds.menuItem(l=camXform, c='cmds.textFieldButtonGrp("exportPoint_camTBG",e=True,text="' + camXform + '")')
 
     # Show Window
-    cmds.window(window, e=True, w=435, h=275)
+    cmds.window(window, e=True, w=435, h=327)
     cmds.showWindow(window)
 
 
@@ -263,6 +267,81 @@ def export3DRotationFromUI():
         setIsolateSelect(pt, 0)
 
 
+def export2DTracksFromUI():
+    """
+    exportTracks2D from UI. All selected points are exported to a single track file.
+    """
+    # Get selection
+    sel = cmds.ls(sl=True, fl=True)
+    if not sel:
+        print 'No points selected for export!!'
+        return
+
+    # Get UI data
+    path = cmds.textFieldButtonGrp('exportPoint_pathTBG', q=True, text=True)
+    cam = cmds.textFieldButtonGrp('exportPoint_camTBG', q=True, text=True)
+    start = cmds.intFieldGrp('exportPoint_rangeIFG', q=True, v1=True)
+    end = cmds.intFieldGrp('exportPoint_rangeIFG', q=True, v2=True)
+    xRes = cmds.intFieldGrp('exportPoint_resIFG', q=True, v1=True)
+    yRes = cmds.intFieldGrp('exportPoint_resIFG', q=True, v2=True)
+
+    # Check UI data
+    if not cam or not cmds.objExists(cam):
+        print('No valid camera specified!')
+        return
+    if start > end:
+        print('Invalid range specified!')
+        return
+    if not path.endswith('/'): path += '/'
+
+    # Generate export file path
+    filepath = path + cam.split(':')[-1] + '_2DTracks.csv'
+    if not checkOverwrite(filepath): return
+
+    # Export data
+    glTools.tools.exportPointData.exportTracks2D(filepath, sel, [cam], start, end, xRes, yRes)
+
+
+def export3DTracksFromUI():
+    """
+    exportTracks3D from UI. All selected points are exported to a single track file.
+    """
+    # Get selection
+    sel = cmds.ls(sl=True, fl=True)
+    if not sel:
+        print 'No points selected for export!!'
+        return
+
+    # Get UI data
+    path = cmds.textFieldButtonGrp('exportPoint_pathTBG', q=True, text=True)
+    start = cmds.intFieldGrp('exportPoint_rangeIFG', q=True, v1=True)
+    end = cmds.intFieldGrp('exportPoint_rangeIFG', q=True, v2=True)
+
+    # Check UI data
+    if start > end:
+        print('Invalid range specified!')
+        return
+    if not path.endswith('/'): path += '/'
+
+    # Generate export file path
+    filepath = path + '3DTracks.csv'
+    if not checkOverwrite(filepath): return
+
+    # Export data
+    glTools.tools.exportPointData.exportTracks3D(filepath, sel, start, end)
+
+
+def checkOverwrite(filepath):
+    """
+    Confirm overwriting an existing file. Returns True if the file does not exist, or can be overwritten.
+    """
+    if not os.path.isfile(filepath): return True
+    chk = cmds.confirmDialog(t='Warning: File exists',
+                             message='File "' + filepath + '" already exist! Overwrite?', button=['Yes', 'No'],
+                             defaultButton='Yes', cancelButton='No', dismissString='No')
+    return chk == 'Yes'
+
+
 def setIsolateSelect(pt, state):
     """
     """
@@ -34,13 +34,15 @@ def meshCacheUI():
     exportObjB = cmds.button('meshCache_exportObjB', label='Export OBJ', c='glTools.ui.meshCache.exportObjFromUI()')
     exportObjCombineB = cmds.button('meshCache_exportObjCombineB', label='Export OBJ Combined',
                                   c='glTools.ui.meshCache.exportObjCombinedFromUI()')
+    exportBinaryB = cmds.button('meshCache_exportBinaryB', label='Export Binary Cache',
+                                c='glTools.ui.meshCache.exportBinaryFromUI()')
     closeB = cmds.button('meshCache_closeB', label='Close', c='cmds.deleteUI("' + window + '")')
 
     # UI Callbacks
     cmds.textFieldButtonGrp(pathTBG, e=True, bc='glTools.ui.utils.exportFolderBrowser("' + pathTBG + '")')
 
     # Show Window
-    cmds.window(window, e=True, w=450, h=262)
+    cmds.window(window, e=True, w=450, h=288)
     cmds.showWindow(window)
 
 
@@ -168,3 +170,30 @@ def exportObjCombinedFromUI():
 
     # Write Combine Cache
     glTools.tools.meshCache.writeObjCombineCache(path, name, sel, start, end, pad, uvSet, worldSpace, gz)
+
+
+def exportBinaryFromUI():
+    """
+    writeBinaryCache from UI
+    """
+    # Get UI info
+    path = cmds.textFieldButtonGrp('meshCache_pathTBG', q=True, text=True)
+    name = cmds.textFieldGrp('meshCache_nameTFG', q=True, text=True)
+    start = cmds.intFieldGrp('meshCache_rangeIFG', q=True, v1=True)
+    end = cmds.intFieldGrp('meshCache_rangeIFG', q=True, v2=True)
+    worldSpace = bool(cmds.radioButtonGrp('meshCache_spaceRBG', q=True, sl=True) - 1)
+    compress = cmds.checkBoxGrp('meshCache_gzipCBG', q=True, v1=True)
+
+    # Check Name
+    if not name:
+        print 'Provide valid cache name and try again!'
+        return
+
+    # Get selection
+    sel = [i for i in cmds.ls(sl=True, fl=True, o=True) if glTools.utils.mesh.isMesh(i)]
+    if not sel:
+        print 'No valid mesh objects selected for export!!'
+        return
+
+    # Write Binary Cache
+    glTools.tools.meshCache.writeBinaryCache(path, name, sel, start, end, worldSpace, compress=compress)
@@ -384,7 +384,7 @@ def displayWeightList():
 
     # Check Weights
     if not skinData._influenceData.has_key(inf): return
-    wt = skinData._influenceData[inf]['wt']
+    wt = skinData.getInfluenceWeights(inf)
 
     # Display Weights
     for i in range(len(wt)): cmds.textScrollList('skinCluster_wtTSL', e=True, a='[' + str(i) + ']: ' + str(wt[i]))
@@ -0,0 +1,379 @@
+"""
+Local parallel batch job scheduler.
+Jobs are external commands (mayapy, shell scripts etc.) run through a pluggable backend.
+The default LocalBackend runs jobs as subprocesses in a bounded number of slots. A farm submitter
+can replace it by implementing the Backend start()/poll()/kill() interface.
+This module only uses the standard library, but importing it as glTools.utils.batchJob imports Maya
+(through glTools/utils/__init__.py). Outside of Maya, load the module by file path.
+"""
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import threading
+import time
+
+# Job States
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, SKIPPED, CANCELLED)
+
+
+class Job(object):
+    """
+    Batch job definition and status.
+    """
+
+    def __init__(self, name, cmd, dependencies=None, retries=0, cwd=None, env=None):
+        """
+        Job class initializer.
+        @param name: Unique job name. Also used (with the job index) to name the job log files.
+        @type name: str
+        @param cmd: Command argument list. The first item is the executable.
+        @type cmd: list
+        @param dependencies: Names of jobs that must succeed before this job can start.
+        @type dependencies: list
+        @param retries: Number of times to re-run the job if it fails.
+        @type retries: int
+        @param cwd: Job working directory. If None, use the current working directory.
+        @type cwd: str or None
+        @param env: Job environment. If None, inherit the current environment.
+        @type env: dict or None
+        """
+        # Check Command
+        if isinstance(cmd, basestring): cmd = [cmd]
+        if not cmd: raise Exception('Job "' + name + '" has no command!')
+
+        self.name = name
+        self.cmd = [str(i) for i in cmd]
+        self.dependencies = list(dependencies or [])
+        self.retries = retries
+        self.cwd = cwd
+        self.env = env
+
+        # Status
+        self.state = PENDING
+        self.attempts = 0
+        self.returncode = None
+        self.startTime = None
+        self.endTime = None
+        self.stdoutLog = ''
+        self.stderrLog = ''
+
+    def report(self):
+        """
+        Return the job status as a JSON compatible dictionary.
+        """
+        duration = None
+        if self.startTime is not None and self.endTime is not None:
+            duration = self.endTime - self.startTime
+        return {'name': self.name,
+                'cmd': self.cmd,
+                'dependencies': self.dependencies,
+                'state': self.state,
+                'attempts': self.attempts,
+                'returncode': self.returncode,
+                'startTime': self.startTime,
+                'endTime': self.endTime,
+                'duration': duration,
+                'stdoutLog': self.stdoutLog,
+                'stderrLog': self.stderrLog}
+
+
+# ============
+# - Backends -
+# ============
+
+class Backend(object):
+    """
+    Batch job backend interface.
+    start() launches a job and returns a backend specific handle, poll() returns the job exit code
+    (or None if the job is still running) and kill() stops a running job.
+    """
+    slots = 1
+
+    def start(self, job):
+        raise NotImplementedError('Backend.start() not implemented!')
+
+    def poll(self, handle):
+        raise NotImplementedError('Backend.poll() not implemented!')
+
+    def kill(self, handle):
+        raise NotImplementedError('Backend.kill() not implemented!')
+
+
+class LocalBackend(Backend):
+    """
+    Run jobs as local subprocesses, writing stdout and stderr to the job log files.
+    """
+
+    def __init__(self, slots=None):
+        """
+        LocalBackend class initializer.
+        @param slots: Maximum number of concurrent jobs. If None, use the number of CPUs.
+        @type slots: int or None
+        """
+        self.slots = max(1, slots or multiprocessing.cpu_count())
+
+    def start(self, job):
+        stdout = open(job.stdoutLog, 'w')
+        stderr = open(job.stderrLog, 'w')
+        try:
+            proc = subprocess.Popen(job.cmd, stdout=stdout, stderr=stderr, cwd=job.cwd, env=job.env)
+        except OSError, e:
+            stderr.write('Unable to start job "' + job.name + '": ' + str(e) + '\n')
+            stdout.close()
+            stderr.close()
+            return (None, None, None)
+        return (proc, stdout, stderr)
+
+    def poll(self, handle):
+        proc, stdout, stderr = handle
+        if proc is None: return -1
+        returncode = proc.poll()
+        if returncode is not None:
+            stdout.close()
+            stderr.close()
+        return returncode
+
+    def kill(self, handle):
+        proc, stdout, stderr = handle
+        if proc is None: return
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        stdout.close()
+        stderr.close()
+
+
+# =============
+# - Scheduler -
+# =============
+
+class Scheduler(object):
+    """
+    Run batch jobs in dependency order, limited to the number of backend slots.
+    """
+
+    def __init__(self, jobs=None, backend=None, logDir='', reportFile='', interval=0.1):
+        """
+        Scheduler class initializer.
+        @param jobs: List of jobs to schedule.
+        @type jobs: list
+        @param backend: Job backend. If None, use a LocalBackend with one slot per CPU.
+        @type backend: Backend or None
+        @param logDir: Job log directory. If empty, a "batchLogs" directory is created in the current directory.
+        @type logDir: str
+        @param reportFile: JSON status report file, updated whenever a job changes state. Optional.
+        @type reportFile: str
+        @param interval: Job poll interval in seconds.
+        @type interval: float
+        """
+        self.jobs = []
+        self.backend = backend or LocalBackend()
+        self.logDir = logDir or os.path.join(os.getcwd(), 'batchLogs')
+        self.reportFile = reportFile
+        self.interval = interval
+
+        self._jobMap = {}
+        self._jobIndex = {}
+        self._handles = {}
+        self._cancel = False
+        self._thread = None
+
+        for job in jobs or []: self.addJob(job)
+
+    def addJob(self, job):
+        """
+        Add a job to the scheduler.
+        @param job: Job to add.
+        @type job: Job
+        """
+        if job.name in self._jobMap:
+            raise Exception('Job "' + job.name + '" already exists!')
+        self._jobIndex[job.name] = len(self.jobs)
+        self.jobs.append(job)
+        self._jobMap[job.name] = job
+        return job
+
+    def getJob(self, name):
+        """
+        Return the job with the specified name.
+        @param name: Job name.
+        @type name: str
+        """
+        if not name in self._jobMap:
+            raise Exception('Job "' + name + '" does not exist!')
+        return self._jobMap[name]
+
+    def validate(self):
+        """
+        Check that all job dependencies exist and that there are no dependency cycles.
+        """
+        # Check Dependencies
+        for job in self.jobs:
+            for dep in job.dependencies:
+                if not dep in self._jobMap:
+                    raise Exception('Job "' + job.name + '" depends on unknown job "' + dep + '"!')
+
+        # Check Cycles
+        visited = set()
+        for job in self.jobs:
+            stack = [(job.name, iter(job.dependencies))]
+            path = [job.name]
+            while stack:
+                name, deps = stack[-1]
+                dep = next(deps, None)
+                if dep is None:
+                    visited.add(name)
+                    stack.pop()
+                    path.pop()
+                    continue
+                if dep in path:
+                    raise Exception('Dependency cycle found: ' + ' -> '.join(path + [dep]))
+                if dep in visited: continue
+                stack.append((dep, iter(self._jobMap[dep].dependencies)))
+                path.append(dep)
+
+    def run(self):
+        """
+        Run all jobs and wait for them to finish. Returns True if all jobs succeeded.
+        """
+        # Validate Jobs
+        self.validate()
+
+        # Check Log Directory
+        if not os.path.isdir(self.logDir): os.makedirs(self.logDir)
+
+        # Run Jobs
+        self._cancel = False
+        self.writeReport()
+        while True:
+
+            changed = False
+
+            # Check Cancel
+            if self._cancel:
+                self._cancelJobs()
+                break
+
+            # Poll Running Jobs
+            for job in [i for i in self.jobs if i.state == RUNNING]:
+                returncode = self.backend.poll(self._handles[job.name])
+                if returncode is None: continue
+                del self._handles[job.name]
+                job.returncode = returncode
+                job.endTime = time.time()
+                if returncode == 0:
+                    job.state = SUCCEEDED
+                elif job.attempts <= job.retries:
+                    job.state = PENDING
+                else:
+                    job.state = FAILED
+                changed = True
+
+            # Start Ready Jobs
+            for job in [i for i in self.jobs if i.state == PENDING]:
+                depStates = [self._jobMap[dep].state for dep in job.dependencies]
+                if [i for i in depStates if i in (FAILED, SKIPPED, CANCELLED)]:
+                    job.state = SKIPPED
+                    changed = True
+                    continue
+                if [i for i in depStates if i != SUCCEEDED]: continue
+                if len(self._handles) >= self.backend.slots: continue
+                self._startJob(job)
+                changed = True
+
+            # Update Report
+            if changed: self.writeReport()
+
+            # Check Finished
+            if not [i for i in self.jobs if not i.state in FINISHED_STATES]: break
+
+            time.sleep(self.interval)
+
+        # Write Final Report
+        self.writeReport()
+
+        # Return Result
+        return not [i for i in self.jobs if i.state != SUCCEEDED]
+
+    def start(self):
+        """
+        Run all jobs in a background thread. Use wait() to block until all jobs are finished.
+        """
+        if self._thread and self._thread.is_alive():
+            raise Exception('Scheduler is already running!')
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self._thread
+
+    def wait(self):
+        """
+        Wait for a scheduler started with start() to finish. Returns True if all jobs succeeded.
+        """
+        if self._thread: self._thread.join()
+        return not [i for i in self.jobs if i.state != SUCCEEDED]
+
+    def cancel(self):
+        """
+        Cancel the scheduler. Running jobs are killed and pending jobs are marked as cancelled.
+        """
+        self._cancel = True
+
+    def report(self):
+        """
+        Return the scheduler status as a JSON compatible dictionary.
+        """
+        summary = dict([(state, 0) for state in (PENDING, RUNNING) + FINISHED_STATES])
+        for job in self.jobs: summary[job.state] += 1
+        return {'logDir': self.logDir,
+                'slots': self.backend.slots,
+                'summary': summary,
+                'jobs': [job.report() for job in self.jobs]}
+
+    def writeReport(self, reportFile=''):
+        """
+        Write the scheduler status report to a JSON file.
+        @param reportFile: Report file path. If empty, use the scheduler report file.
+        @type reportFile: str
+        """
+        reportFile = reportFile or self.reportFile
+        if not reportFile: return
+        tmpFile = reportFile + '.tmp'
+        f = open(tmpFile, 'w')
+        json.dump(self.report(), f, indent=2)
+        f.close()
+        if os.path.isfile(reportFile): os.remove(reportFile)
+        os.rename(tmpFile, reportFile)
+
+    def _startJob(self, job):
+        """
+        Start the specified job using the scheduler backend.
+        """
+        job.attempts += 1
+        logName = str(self._jobIndex[job.name]) + '_' + re.sub('[^\w.-]', '_', job.name) + '.' + str(job.attempts)
+        job.stdoutLog = os.path.join(self.logDir, logName + '.stdout.log')
+        job.stderrLog = os.path.join(self.logDir, logName + '.stderr.log')
+        job.returncode = None
+        job.startTime = time.time()
+        job.endTime = None
+        job.state = RUNNING
+        self._handles[job.name] = self.backend.start(job)
+
+    def _cancelJobs(self):
+        """
+        Kill running jobs and mark all unfinished jobs as cancelled.
+        """
+        for name, handle in self._handles.items():
+            self.backend.kill(handle)
+            self._jobMap[name].endTime = time.time()
+        self._handles = {}
+        for job in self.jobs:
+            if not job.state in FINISHED_STATES: job.state = CANCELLED
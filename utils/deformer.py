@@ -6,6 +6,7 @@ import glTools.utils.arrayUtils
 import glTools.utils.base
 import glTools.utils.geometry
 import glTools.utils.selection
+import glTools.utils.weightList
 import re
 
 
@@ -566,8 +567,7 @@ def setWeights(deformer, weights, geometry=None):
     deformerSetMem = getDeformerSetMembers(deformer, geoShape)
 
     # Build weight array
-    weightList = OpenMaya.MFloatArray()
-    [weightList.append(i) for i in weights]
+    weightList = glTools.utils.weightList.WeightArray(weights).toMFloatArray()
 
     # Set weights
     deformerFn.setWeight(deformerSetMem[0], deformerSetMem[1], weightList)
@@ -59,7 +59,7 @@ def setPaintAttr(paintAttr, attrValue):
     else:
 
         # Set array attribute values
-        cmds.setAttr(paintNode + '.' + paintAttr, attrValue, type='doubleArray')
+        cmds.setAttr(paintNode + '.' + paintAttr, list(attrValue), type='doubleArray')
 
 
 def copyPaintAttr(mesh, attr, sourceAttr, attrType='doubleArray'):
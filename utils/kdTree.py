@@ -1,5 +1,7 @@
 from math import sqrt
 from copy import deepcopy
+import array
+import heapq
 
 
 class Pt(object):
@@ -13,131 +15,166 @@ class Pt(object):
         self.ind = ind
 
 
-class _Node(list):
+class KdTree(object):
     """
-    Simple wrapper around tree nodes - mainly to make the code a little more readable (although
-    members are generally accessed via indices because its faster)
-    """
-
-    @property
-    def point(self):
-        return self[0]
-
-    @property
-    def left(self):
-        return self[1]
-
-    @property
-    def right(self):
-        return self[2]
-
-    def is_leaf(self):
-        return self[1] is None and self[2] is None
-
-
-class ExactMatch(Exception): pass
-
-
-class KdTree():
-    """
-    simple, fast python kd-tree implementation
+    Array backed 3D kd-tree.
+    Nodes are stored in flat arrays (split axis, split value, child IDs and point ranges) and point
+    coordinates in a single flat double array. Leaf nodes hold up to LEAF_SIZE points.
+    Batched queries (query/queryRadius) return point indices, while getClosest/getWithin/
+    getDistanceRatioWeightedVector return the original data items.
     """
     DIMENSION = 3  # dimensions of points in the tree
+    LEAF_SIZE = 8  # maximum number of points per leaf node
 
     def __init__(self, data=()):
         """
+        KdTree class initializer.
+        @param data: List of points (x, y, z) to build the tree from.
+        @type data: list
         """
         self.performPopulate(data)
 
     def performPopulate(self, data):
         """
+        Build the tree from a list of points.
+        @param data: List of points (x, y, z) to build the tree from.
+        @type data: list
         """
-        dimension = self.DIMENSION
-
-        def populateTree(points, depth):
-            """
-            """
-            if not points: return None
-
-            axis = depth % dimension
-
-            # NOTE: this is slower than a DSU sort, but its a bit more readable, and the difference is only a few percent...
-            points.sort(key=lambda point: point[axis])
-
-            # find the half way point
-            half = len(points) / 2
+        coords = array.array('d')
+        for pt in data: coords.extend((pt[0], pt[1], pt[2]))
+        self.buildTree(list(data), coords)
 
-            node = _Node([points[half],
-                          populateTree(points[:half], depth + 1),
-                          populateTree(points[half + 1:], depth + 1)])
+    def buildTree(self, items, coords):
+        """
+        Build the tree nodes from a flat (x, y, z per point) coordinate list.
+        Point indices are sorted once per axis. Each split takes the median from the index list of the split
+        axis, and stably partitions the index lists of the other axes, so no sorting is done per node.
+        @param items: Data items returned by getClosest/getWithin, one per point.
+        @type items: list
+        @param coords: Flat (x, y, z per point) coordinate list.
+        @type coords: array.array
+        """
+        self.items = items
+        self.coords = coords
+        count = len(coords) // 3
+
+        # Initialize Node Arrays
+        self.nodeAxis = array.array('i')
+        self.nodeSplit = array.array('d')
+        self.nodeLeft = array.array('i')
+        self.nodeRight = array.array('i')
+        self.nodeStart = array.array('i')
+        self.nodeEnd = array.array('i')
+
+        # Build Nodes
+        axisIds = [range(count)]
+        if count:
+            axisCoords = [coords[a::3] for a in xrange(self.DIMENSION)]
+            axisIds = [sorted(xrange(count), key=axisCoords[a].__getitem__) for a in xrange(self.DIMENSION)]
+            isLeft = bytearray(count)
+            stack = [(0, count, -1, False, 0)]
+            while stack:
+                start, end, parent, isRight, depth = stack.pop()
+
+                # Add Node
+                node = len(self.nodeAxis)
+                self.nodeStart.append(start)
+                self.nodeEnd.append(end)
+                self.nodeLeft.append(-1)
+                self.nodeRight.append(-1)
+                if parent >= 0:
+                    if isRight:
+                        self.nodeRight[parent] = node
+                    else:
+                        self.nodeLeft[parent] = node
+
+                # Leaf Node
+                if end - start <= self.LEAF_SIZE:
+                    self.nodeAxis.append(-1)
+                    self.nodeSplit.append(0.0)
+                    continue
+
+                # Split at Median
+                axis = depth % self.DIMENSION
+                mid = (start + end) // 2
+                ids = axisIds[axis]
+                self.nodeAxis.append(axis)
+                self.nodeSplit.append(axisCoords[axis][ids[mid]])
+
+                # Partition Other Axes (stable)
+                for i in ids[start:mid]: isLeft[i] = 1
+                for i in ids[mid:end]: isLeft[i] = 0
+                for a in xrange(self.DIMENSION):
+                    if a == axis: continue
+                    seg = axisIds[a][start:end]
+                    axisIds[a][start:end] = [i for i in seg if isLeft[i]] + [i for i in seg if not isLeft[i]]
+
+                stack.append((mid, end, node, True, depth + 1))
+                stack.append((start, mid, node, False, depth + 1))
+
+        self.perm = array.array('i', axisIds[0])
+
+    def size(self):
+        """
+        Return the number of points in the tree.
+        """
+        return len(self.perm)
 
-            return node
+    # ===================
+    # - Batched Queries -
+    # ===================
 
-        self.root = populateTree(data, 0)
+    def query(self, points, k=1):
+        """
+        Find the k nearest tree points for each query point.
+        Returns flat (k per query point, nearest first) point index and distance arrays.
+        @param points: List of query points (x, y, z).
+        @type points: list
+        @param k: Number of nearest points to return per query point. Clamped to the tree size.
+        @type k: int
+        """
+        k = min(k, self.size())
+        indices = array.array('i')
+        distances = array.array('d')
+        for pt in points:
+            for sd, i in self._nearest(pt[0], pt[1], pt[2], k):
+                indices.append(i)
+                distances.append(sqrt(sd))
+        return indices, distances
+
+    def queryRadius(self, points, radius):
+        """
+        Find all tree points within a radius of each query point.
+        Returns (offsets, indices, distances) arrays. The results for query point "n" are found at
+        indices/distances[offsets[n]:offsets[n+1]], sorted nearest first.
+        @param points: List of query points (x, y, z).
+        @type points: list
+        @param radius: Search radius.
+        @type radius: float
+        """
+        offsets = array.array('i', [0])
+        indices = array.array('i')
+        distances = array.array('d')
+        for pt in points:
+            for sd, i in self._within(pt[0], pt[1], pt[2], radius):
+                indices.append(i)
+                distances.append(sqrt(sd))
+            offsets.append(len(indices))
+        return offsets, indices, distances
+
+    # ================
+    # - Item Queries -
+    # ================
 
     def getClosest(self, queryPoint, returnDistances=False):
         """
         Returns the closest point in the tree to the given point
         NOTE: see the docs for getWithin for info on the returnDistances arg
         """
-        dimension = self.DIMENSION
-
-        distBest = ((self.root[0][0] - queryPoint[0]) ** 2) + ((self.root[0][1] - queryPoint[1]) ** 2) + (
-        (self.root[0][2] - queryPoint[2]) ** 2)
-
-        # distBest = (self.root[0] - queryPoint).get_magnitude() ** 2
-        bestList = [(distBest, self.root[0])]
-
-        def search(node, depth):
-            """
-            """
-            nodePoint = node[0]
-
-            axis = depth % dimension
-
-            if queryPoint[axis] < nodePoint[axis]:
-                nearNode = node[1]
-                farNode = node[2]
-            else:
-                nearNode = node[2]
-                farNode = node[1]
-
-            # start the search
-            if nearNode is not None:
-                search(nearNode, depth + 1)
-
-            # get the squared distance
-            sd = 0
-            for v1, v2 in zip(nodePoint, queryPoint):
-                sd += (v1 - v2) ** 2
-
-            curBest = bestList[0][0]
-
-            # if the point is closer than the currently stored one, insert it at the head
-            if sd < curBest:
-                bestList.insert(0, (sd, nodePoint))
-
-                # if its an exact match, bail
-                if not sd:
-                    raise ExactMatch
-            else:
-                bestList.append((sd, nodePoint))
-
-            # check whether there could be any points on the other side of the
-            # splitting plane that are closer to the query point than the current best
-            if farNode is not None:
-                if (nodePoint[axis] - queryPoint[axis]) ** 2 < curBest:
-                    search(farNode, depth + 1)
-
-        try:
-            search(self.root, 0)
-        except ExactMatch:
-            pass
-
-        if returnDistances:
-            return bestList[0]
-
-        return bestList[0][1]
+        if not self.size(): raise Exception('KdTree is empty!')
+        sd, i = self._nearest(queryPoint[0], queryPoint[1], queryPoint[2], 1)[0]
+        if returnDistances: return sd, self.items[i]
+        return self.items[i]
 
     def getWithin(self, queryPoint, threshold=1e-6, returnDistances=False):
         """
@@ -150,56 +187,9 @@ class KdTree():
         This can be useful if you need to do more work on the results afterwards - just be aware that the distances
         in the list are squares of the actual distance between the points
         """
-        dimension = self.DIMENSION
-        axisRanges = axRangeX, axRangeY, axRangeZ = ((queryPoint[0] - threshold, queryPoint[0] + threshold),
-                                                     (queryPoint[1] - threshold, queryPoint[1] + threshold),
-                                                     (queryPoint[2] - threshold, queryPoint[2] + threshold))
-
-        sqThreshold = threshold ** 2
-
-        matches = []
-
-        def search(node, depth):
-            """
-            """
-            nodePoint = node[0]
-            axis = depth % dimension
-
-            if queryPoint[axis] < nodePoint[axis]:
-                nearNode = node[1]
-                farNode = node[2]
-            else:
-                nearNode = node[2]
-                farNode = node[1]
-
-            # Start Search
-            if nearNode is not None:
-                search(nearNode, depth + 1)
-
-            # Test Point
-            if axRangeX[0] <= nodePoint[0] <= axRangeX[1]:
-                if axRangeY[0] <= nodePoint[1] <= axRangeY[1]:
-                    if axRangeZ[0] <= nodePoint[2] <= axRangeZ[1]:
-                        sd = 0
-                        for v1, v2 in zip(nodePoint, queryPoint):
-                            sd += (v1 - v2) ** 2
-
-                        if sd <= sqThreshold:
-                            matches.append((sd, nodePoint))
-
-            if farNode is not None:
-                if (nodePoint[axis] - queryPoint[axis]) ** 2 < sqThreshold:
-                    search(farNode, depth + 1)
-
-        search(self.root, 0)
-
-        # The best is guaranteed to be at the head of the list
-        # But consequent points might be out of order - so order them now
-        matches.sort()
-
-        # Return Result
-        if returnDistances: return matches
-        return [m[1] for m in matches]
+        matches = self._within(queryPoint[0], queryPoint[1], queryPoint[2], threshold)
+        if returnDistances: return [(sd, self.items[i]) for sd, i in matches]
+        return [self.items[i] for sd, i in matches]
 
     def getDistanceRatioWeightedVector(self, queryPoint, ratio=2, returnDistances=False):
         """
@@ -231,3 +221,94 @@ class KdTree():
 
         # Return Result
         return self.getWithin(queryPoint, maxDist, returnDistances=returnDistances)
+
+    # ==================
+    # - Tree Traversal -
+    # ==================
+
+    def _nearest(self, x, y, z, k):
+        """
+        Return a sorted list of (squaredDistance, pointIndex) for the k nearest points.
+        """
+        if not k or not self.size(): return []
+        coords, perm = self.coords, self.perm
+        nodeAxis, nodeSplit = self.nodeAxis, self.nodeSplit
+        nodeLeft, nodeRight = self.nodeLeft, self.nodeRight
+        nodeStart, nodeEnd = self.nodeStart, self.nodeEnd
+        query = (x, y, z)
+
+        # Max heap of (-squaredDistance, pointIndex)
+        best = []
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]: continue
+
+            # Leaf Node
+            axis = nodeAxis[node]
+            if axis < 0:
+                for n in xrange(nodeStart[node], nodeEnd[node]):
+                    i = perm[n]
+                    dx = coords[i * 3] - x
+                    dy = coords[i * 3 + 1] - y
+                    dz = coords[i * 3 + 2] - z
+                    sd = dx * dx + dy * dy + dz * dz
+                    if len(best) < k:
+                        heapq.heappush(best, (-sd, i))
+                    elif sd < -best[0][0]:
+                        heapq.heapreplace(best, (-sd, i))
+                continue
+
+            # Branch Node - visit near side first
+            diff = query[axis] - nodeSplit[node]
+            if diff < 0:
+                near, far = nodeLeft[node], nodeRight[node]
+            else:
+                near, far = nodeRight[node], nodeLeft[node]
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+
+        # Return Result
+        return sorted([(-negDist, pt) for negDist, pt in best])
+
+    def _within(self, x, y, z, radius):
+        """
+        Return a sorted list of (squaredDistance, pointIndex) for all points within the search radius.
+        """
+        if not self.size(): return []
+        coords, perm = self.coords, self.perm
+        nodeAxis, nodeSplit = self.nodeAxis, self.nodeSplit
+        nodeLeft, nodeRight = self.nodeLeft, self.nodeRight
+        nodeStart, nodeEnd = self.nodeStart, self.nodeEnd
+        query = (x, y, z)
+        sqRadius = radius * radius
+
+        matches = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+
+            # Leaf Node
+            axis = nodeAxis[node]
+            if axis < 0:
+                for n in xrange(nodeStart[node], nodeEnd[node]):
+                    i = perm[n]
+                    dx = coords[i * 3] - x
+                    dy = coords[i * 3 + 1] - y
+                    dz = coords[i * 3 + 2] - z
+                    sd = dx * dx + dy * dy + dz * dz
+                    if sd <= sqRadius: matches.append((sd, i))
+                continue
+
+            # Branch Node
+            diff = query[axis] - nodeSplit[node]
+            if diff < 0:
+                stack.append(nodeLeft[node])
+                if diff * diff <= sqRadius: stack.append(nodeRight[node])
+            else:
+                stack.append(nodeRight[node])
+                if diff * diff <= sqRadius: stack.append(nodeLeft[node])
+
+        # Return Result
+        matches.sort()
+        return matches
@@ -0,0 +1,220 @@
+import maya.OpenMaya as OpenMaya
+import glTools.utils.mesh
+import glTools.utils.sparseWeights
+import array
+import math
+
+
+def getPointList(mesh):
+    """
+    Return a flat (x, y, z per vertex) object space point list for the specified mesh.
+    @param mesh: Polygon mesh to get points for.
+    @type mesh: str
+    """
+    pts = OpenMaya.MPointArray()
+    glTools.utils.mesh.getMeshFn(mesh).getPoints(pts)
+    pointList = array.array('d', [0.0]) * (pts.length() * 3)
+    for i in xrange(pts.length()):
+        pt = pts[i]
+        pointList[i * 3], pointList[i * 3 + 1], pointList[i * 3 + 2] = pt.x, pt.y, pt.z
+    return pointList
+
+
+def buildAdjacencyWeights(topology, pointList=None, mode='uniform', faceConnectivity=False, includeSelf=False):
+    """
+    Build a row normalized sparse smoothing matrix from mesh topology.
+    Returns (offsets, indices, weights) arrays, where the neighbour weights of vertex "i" are found at
+    weights[offsets[i]:offsets[i+1]], for the neighbour vertices indices[offsets[i]:offsets[i+1]].
+    @param topology: Mesh topology to build the smoothing matrix from.
+    @type topology: glTools.utils.meshTopology.MeshTopology
+    @param pointList: Flat (x, y, z per vertex) point list. Required for "distance" and "cotangent" modes.
+    @type pointList: list or None
+    @param mode: Neighbour weighting mode. Accepted values - "uniform", "distance" and "cotangent".
+    @type mode: str
+    @param faceConnectivity: Use face connectivity instead of edge connectivity. Not supported for "cotangent" mode.
+    @type faceConnectivity: bool
+    @param includeSelf: Count each vertex as one of its own neighbours, weighted as the mean of its neighbour weights.
+        Each row then sums to n/(n+1), so a full strength uniform smooth averages the vertex with its neighbours.
+    @type includeSelf: bool
+    """
+    # Check Mode
+    if not mode in ['uniform', 'distance', 'cotangent']:
+        raise Exception('Invalid smooth mode ("' + mode + '")!')
+    if mode != 'uniform' and pointList is None:
+        raise Exception('A point list is required for "' + mode + '" smoothing!')
+    if mode == 'cotangent' and faceConnectivity:
+        raise Exception('Cotangent smoothing is only supported for edge connectivity!')
+
+    # Get Adjacency
+    offsets, indices = topology.getAdjacency(faceConnectivity)
+    weights = array.array('d', [1.0]) * len(indices)
+
+    # Distance Weights
+    if mode == 'distance':
+        for i in xrange(topology.numVertices()):
+            x, y, z = pointList[i * 3], pointList[i * 3 + 1], pointList[i * 3 + 2]
+            for e in xrange(offsets[i], offsets[i + 1]):
+                j = indices[e] * 3
+                dist = math.sqrt((pointList[j] - x) ** 2 + (pointList[j + 1] - y) ** 2 + (pointList[j + 2] - z) ** 2)
+                weights[e] = (1.0 / dist) if dist > 0.0 else 0.0
+
+    # Cotangent Weights
+    if mode == 'cotangent':
+        edgeCot = _edgeCotangents(topology, pointList)
+        for i in xrange(topology.numVertices()):
+            for e in xrange(offsets[i], offsets[i + 1]):
+                j = indices[e]
+                weights[e] = max(edgeCot.get((i, j) if i < j else (j, i), 0.0), 0.0)
+
+    # Normalize Rows (fall back to uniform weights if all weights are zero)
+    for i in xrange(topology.numVertices()):
+        start, end = offsets[i], offsets[i + 1]
+        if start == end: continue
+        total = sum(weights[start:end])
+        if total <= 0.0:
+            for e in xrange(start, end): weights[e] = 1.0
+            total = float(end - start)
+        if includeSelf: total += total / (end - start)
+        for e in xrange(start, end):
+            weights[e] = weights[e] / total
+
+    # Return Result
+    return offsets, indices, weights
+
+
+def smoothWeights(weights,
+                  adjacency,
+                  iterations=1,
+                  strength=1.0,
+                  pointList=None,
+                  lockList=None,
+                  normalize=True,
+                  maxInfluences=0,
+                  tolerance=0.00001):
+    """
+    Apply Laplacian smoothing to sparse multi influence weights.
+    Each iteration moves the weights of every smoothed point toward the weighted average of its neighbours:
+        w[i] = w[i] + strength * sum(a[i][j] * (w[j] - w[i]))
+    Returns a new SparseWeights object. The input weights are not modified.
+    @param weights: Weights to smooth, with one row per mesh vertex.
+    @type weights: glTools.utils.sparseWeights.SparseWeights
+    @param adjacency: Sparse (offsets, indices, weights) smoothing matrix, with rows summing to 1.0 or less. See buildAdjacencyWeights().
+    @type adjacency: tuple
+    @param iterations: Number of smooth iterations.
+    @type iterations: int
+    @param strength: Smooth strength. 1.0 replaces weights with the neighbour average.
+    @type strength: float
+    @param pointList: List of point indices to smooth. If None, smooth all points.
+    @type pointList: list or None
+    @param lockList: List of influences whose weights are left unchanged.
+    @type lockList: list or None
+    @param normalize: Normalize smoothed weights so each point sums to 1.0.
+    @type normalize: bool
+    @param maxInfluences: Maximum number of influences per point. 0 means no limit.
+    @type maxInfluences: int
+    @param tolerance: Smoothed weight values less than or equal to this are discarded.
+    @type tolerance: float
+    """
+    # Check Adjacency
+    offsets, indices, nbrWeights = adjacency
+    if len(offsets) - 1 != weights.pointCount():
+        raise Exception('Smoothing matrix size (' + str(len(offsets) - 1) + ') does not match the weight point count (' + str(weights.pointCount()) + ')!')
+
+    # Get Locked Columns
+    locked = set([weights.getInfluenceIndex(inf) for inf in lockList or [] if weights.hasInfluence(inf)])
+
+    # Get Smooth Points
+    if pointList is None: pointList = xrange(weights.pointCount())
+
+    # ==================
+    # - Smooth Weights -
+    # ==================
+
+    rows = weights.getRows()
+    for it in xrange(iterations):
+
+        newRows = list(rows)
+        for pt in pointList:
+
+            # Accumulate Neighbour Weights
+            row = rows[pt]
+            result = {}
+            for e in xrange(offsets[pt], offsets[pt + 1]):
+                wt = nbrWeights[e] * strength
+                for col, val in rows[indices[e]].iteritems():
+                    result[col] = result.get(col, 0.0) + val * wt
+
+            # Add Remaining Self Weight
+            selfWt = 1.0 - strength * sum(nbrWeights[offsets[pt]:offsets[pt + 1]])
+            if selfWt:
+                for col, val in row.iteritems(): result[col] = result.get(col, 0.0) + val * selfWt
+
+            # Restore Locked Weights
+            for col in locked:
+                result.pop(col, None)
+                if col in row: result[col] = row[col]
+
+            newRows[pt] = _cleanRow(result, locked, normalize, maxInfluences, tolerance)
+
+        rows = newRows
+
+    # Return Result
+    return glTools.utils.sparseWeights.SparseWeights.fromRows(rows, weights.influenceList)
+
+
+def _cleanRow(row, locked, normalize, maxInfluences, tolerance):
+    """
+    Prune, limit and normalize a single {column: value} weight row.
+    Locked column weights are preserved and only unlocked weights are scaled during normalization.
+    """
+    # Prune Weights
+    row = dict([(col, val) for col, val in row.iteritems() if val > tolerance or col in locked])
+
+    # Limit Influences
+    if maxInfluences and len(row) > maxInfluences:
+        order = sorted(row, key=lambda col: (col in locked, row[col]), reverse=True)
+        row = dict([(col, row[col]) for col in order[:maxInfluences]])
+
+    # Normalize Weights
+    if normalize:
+        lockedTotal = sum([row[col] for col in locked if col in row])
+        unlockedTotal = sum([val for col, val in row.iteritems() if not col in locked])
+        if unlockedTotal > 0.0:
+            scale = max(1.0 - lockedTotal, 0.0) / unlockedTotal
+            for col in row:
+                if not col in locked: row[col] *= scale
+
+    # Return Result
+    return row
+
+
+def _edgeCotangents(topology, pointList):
+    """
+    Return a {(vtxA, vtxB): weight} dictionary of cotangent edge weights.
+    Polygons are fan triangulated. Only edges in the topology edge table are weighted.
+    """
+    edgeCot = {}
+    for face in xrange(topology.numFaces()):
+        verts = topology.getFaceVertices(face)
+        for n in xrange(1, len(verts) - 1):
+            tri = (verts[0], verts[n], verts[n + 1])
+            for k in xrange(3):
+
+                # Get Triangle Corner and Opposite Edge
+                a, b, c = tri[k], tri[k - 2], tri[k - 1]
+                ab = [pointList[b * 3 + d] - pointList[a * 3 + d] for d in xrange(3)]
+                ac = [pointList[c * 3 + d] - pointList[a * 3 + d] for d in xrange(3)]
+
+                # Calculate Corner Cotangent
+                dot = ab[0] * ac[0] + ab[1] * ac[1] + ab[2] * ac[2]
+                cross = math.sqrt((ab[1] * ac[2] - ab[2] * ac[1]) ** 2 +
+                                  (ab[2] * ac[0] - ab[0] * ac[2]) ** 2 +
+                                  (ab[0] * ac[1] - ab[1] * ac[0]) ** 2)
+                if not cross: continue
+
+                # Accumulate Opposite Edge Weight
+                key = (b, c) if b < c else (c, b)
+                edgeCot[key] = edgeCot.get(key, 0.0) + 0.5 * dot / cross
+
+    # Return Result
+    return edgeCot
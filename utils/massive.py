@@ -4,7 +4,14 @@ import maya.OpenMaya as OpenMaya
 import maya.OpenMayaAnim as OpenMayaAnim
 import glTools.utils.base
 import glTools.utils.matrix
+import array
 import ast
+import math
+import os.path
+import string
+
+# Matrix cache list characters, replaced with spaces for fast numeric parsing
+_MATRIX_CHARS = string.maketrans('[](),', '     ')
 
 
 def buildMatrix(mat):
@@ -27,76 +34,187 @@ def buildMatrix(mat):
     return matrix
 
 
-def loadMatrixCache(cacheFile, agent='', targetNS=''):
+def readMatrixCache(cacheFile):
     """
+    Read a Massive matrix cache file as a stream.
+    Returns a {segment: (times, matrices)} dictionary, where times is an array of frame times and matrices is a
+    flat (frames * 16) array of row major matrix values for each segment.
+    @param cacheFile: Matrix cache file path
+    @type cacheFile: str
     """
-    # Initialize Frame No.
-    frame = 0
-
-    # Check NS
-    if targetNS: targetNS += ':'
+    # Check File
+    if not os.path.isfile(cacheFile):
+        raise Exception('Matrix cache file "' + cacheFile + '" does not exist!')
 
-    # Open File
+    # Read Cache
+    cache = {}
+    frame = 0.0
     f = open(cacheFile, 'r')
-    lines = f.readlines()
-
-    # Load Cache
-    for line in lines:
+    for line in f:
 
         # Get Frame
-        if line.startswith('# frame'):
-            frame = line.split(' ')[-1]
-            print frame
+        if line.startswith('#'):
+            if line.startswith('# frame'): frame = float(line.split()[-1])
             continue
 
-        # Get Matrix
-        seg = line.split(' ')[0]
-        mat = ast.literal_eval(line.replace(seg + ' ', ''))
-        matrix = buildMatrix(mat)
+        # Get Segment
+        lineItem = line.split(' ', 1)
+        if len(lineItem) < 2: continue
+        seg = lineItem[0]
 
-        # Check Agent
-        if agent and seg == 'Agent': seg = agent
+        # Get Matrix - rows of 3 (w column implied) or 4 values
+        values = [float(i) for i in lineItem[1].translate(_MATRIX_CHARS).split()]
+        if len(values) == 12:
+            values = values[0:3] + [0.0] + values[3:6] + [0.0] + values[6:9] + [0.0] + values[9:12] + [1.0]
+        elif len(values) != 16:
+            raise Exception('Invalid matrix for segment "' + seg + '" at frame ' + str(frame) + '!')
 
-        # ===================
-        # - Get Translation -
-        # ===================
+        # Append Segment Data
+        if not seg in cache: cache[seg] = (array.array('d'), array.array('d'))
+        cache[seg][0].append(frame)
+        cache[seg][1].extend(values)
 
-        pos = OpenMaya.MTransformationMatrix(matrix).getTranslation(OpenMaya.MSpace.kTransform)
-        t = [pos[0], pos[1], pos[2]]
+    # Close File
+    f.close()
+
+    # Return Result
+    return cache
+
+
+def decomposeMatrices(matrices, orientInverse=None):
+    """
+    Decompose a flat (frames * 16) array of row major matrices to translate and rotate (xyz euler, radians) values.
+    Returns flat (frames * 3) translate and rotate arrays.
+    @param matrices: Flat (frames * 16) array of row major matrix values
+    @type matrices: list
+    @param orientInverse: Inverse joint orientation (row major 3x3) to factor out of the rotation. Optional.
+    @type orientInverse: list or None
+    """
+    translate = array.array('d')
+    rotate = array.array('d')
+    for n in xrange(len(matrices) // 16):
+        m = matrices[n * 16:n * 16 + 16]
+
+        # Translation
+        translate.extend((m[12], m[13], m[14]))
 
-        # ================
-        # - Get Rotation -
-        # ================
+        # Rotation Rows (scale removed)
+        rows = []
+        for r in xrange(3):
+            row = m[r * 4:r * 4 + 3]
+            length = math.sqrt(row[0] * row[0] + row[1] * row[1] + row[2] * row[2]) or 1.0
+            rows.append([row[0] / length, row[1] / length, row[2] / length])
 
         # Factor in Joint Orientation
-        if cmds.objectType(seg) == 'joint':
-            segObj = glTools.utils.base.getMObject(seg)
-            segFn = OpenMayaAnim.MFnIkJoint(segObj)
+        if orientInverse:
+            o = orientInverse
+            rows = [[v[0] * o[c] + v[1] * o[3 + c] + v[2] * o[6 + c] for c in xrange(3)] for v in rows]
+
+        # Euler Rotation (xyz)
+        cy = math.sqrt(rows[0][0] * rows[0][0] + rows[0][1] * rows[0][1])
+        ry = math.atan2(-rows[0][2], cy)
+        if cy > 0.000001:
+            rx = math.atan2(rows[1][2], rows[2][2])
+            rz = math.atan2(rows[0][1], rows[0][0])
+        else:
+            rx = math.atan2(math.sin(ry) * rows[1][0], rows[1][1])
+            rz = 0.0
+        rotate.extend((rx, ry, rz))
+
+    # Return Result
+    return translate, rotate
+
+
+def loadMatrixCache(cacheFile, agent='', targetNS=''):
+    """
+    Load a Massive matrix cache as keyframe animation.
+    The cache is read as a stream into per segment matrix arrays, which are decomposed per segment and keyed with
+    a single anim curve update per channel.
+    @param cacheFile: Matrix cache file path
+    @type cacheFile: str
+    @param agent: Node to apply the "Agent" segment animation to. If empty, use the "Agent" node.
+    @type agent: str
+    @param targetNS: Target namespace to apply the animation to
+    @type targetNS: str
+    """
+    # Check NS
+    if targetNS: targetNS += ':'
+
+    # Read Cache
+    cache = readMatrixCache(cacheFile)
+
+    # Get Linear Unit Conversion (cache translation is in UI units, keys are set in internal units)
+    linearScale = OpenMaya.MDistance.uiToInternal(1.0)
+
+    # Load Cache
+    for seg in sorted(cache.keys()):
+        times, matrices = cache[seg]
+
+        # Check Agent
+        node = seg
+        if agent and seg == 'Agent': node = agent
+        node = targetNS + node
+        if not cmds.objExists(node):
+            print('Segment "' + node + '" does not exist!! Skipping...')
+            continue
+
+        # Get Joint Orientation Inverse (once per segment)
+        orientInverse = None
+        if cmds.objectType(node) == 'joint':
             segOri = OpenMaya.MQuaternion()
-            segFn.getOrientation(segOri)
-            matrix *= segOri.asMatrix().inverse()
+            OpenMayaAnim.MFnIkJoint(glTools.utils.base.getMObject(node)).getOrientation(segOri)
+            oriMatrix = segOri.asMatrix().inverse()
+            orientInverse = [oriMatrix(r, c) for r in xrange(3) for c in xrange(3)]
 
-        # Get Rotation
-        rot = OpenMaya.MTransformationMatrix(matrix).eulerRotation()
-        rad = mel.eval('rad_to_deg(1)')
-        r = [rot.x * rad, rot.y * rad, rot.z * rad]
+        # Decompose Matrices
+        translate, rotate = decomposeMatrices(matrices, orientInverse)
+        if linearScale != 1.0: translate = array.array('d', [t * linearScale for t in translate])
 
-        # =================
-        # - Set Keyframes -
-        # =================
+        # Set Keyframes
+        for i, axis in enumerate('xyz'):
+            setChannelKeys(node + '.t' + axis, times, translate[i::3])
+            setChannelKeys(node + '.r' + axis, times, rotate[i::3])
 
-        cmds.setKeyframe(targetNS + seg, at='tx', v=t[0], t=float(frame))
-        cmds.setKeyframe(targetNS + seg, at='ty', v=t[1], t=float(frame))
-        cmds.setKeyframe(targetNS + seg, at='tz', v=t[2], t=float(frame))
-        cmds.setKeyframe(targetNS + seg, at='rx', v=r[0], t=float(frame))
-        cmds.setKeyframe(targetNS + seg, at='ry', v=r[1], t=float(frame))
-        cmds.setKeyframe(targetNS + seg, at='rz', v=r[2], t=float(frame))
 
-    # ==============
-    # - Close File -
-    # ==============
+def setChannelKeys(attrPath, times, values):
+    """
+    Set keyframes for an attribute from lists of times and (internal unit) values, using a single
+    MFnAnimCurve.addKeys() call. Existing keys at matching times are replaced.
+    @param attrPath: Attribute to set keyframes for
+    @type attrPath: str
+    @param times: List of key times (UI units)
+    @type times: list
+    @param values: List of key values (internal units - radians/centimeters)
+    @type values: list
+    """
+    # Get Plug
+    sel = OpenMaya.MSelectionList()
+    sel.add(attrPath)
+    plug = OpenMaya.MPlug()
+    sel.getPlug(0, plug)
+
+    # Use existing anim curve, or create a new one
+    curveFn = OpenMayaAnim.MFnAnimCurve()
+    curveObjs = OpenMaya.MObjectArray()
+    keepExistingKeys = OpenMayaAnim.MAnimUtil.findAnimation(plug, curveObjs)
+    if keepExistingKeys:
+        curveFn.setObject(curveObjs[0])
+    else:
+        curveFn.create(plug)
+
+    # Add Keys
+    timeUnit = OpenMaya.MTime.uiUnit()
+    timeArray = OpenMaya.MTimeArray()
+    valueArray = OpenMaya.MDoubleArray()
+    for t in times: timeArray.append(OpenMaya.MTime(t, timeUnit))
+    for v in values: valueArray.append(v)
+    curveFn.addKeys(timeArray, valueArray,
+                    OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                    OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                    keepExistingKeys)
 
-    f.close()
+    # Return Result
+    return curveFn.name()
 
 
 def loadAgentData(dataFile):
@@ -5,6 +5,7 @@ import glTools.utils.base
 import glTools.utils.component
 import glTools.utils.mathUtils
 import glTools.utils.matrix
+import glTools.utils.meshTopology
 import math
 
 
@@ -1693,112 +1694,40 @@ def getCornerVertexIds(mesh):
 
 def vertexConnectivityList(mesh, faceConnectivity=False, showProgress=False):
     """
-    Return a vertex connectivity list for the specified mesh
+    Return a vertex connectivity list for the specified mesh.
+    Connectivity is read from the cached mesh topology (glTools.utils.meshTopology).
     @param mesh: Polygon mesh to return vertex connectivity list for
     @type mesh: str
     @param faceConnectivity: Use face connectivity instead of edge connectivity
     @type faceConnectivity: str
-    @param showProgress: Show operation progress using the main progress bar
+    @param showProgress: Unused. Kept for backward compatibility.
     @type showProgress: bool
     """
-    # Check Mesh
-    if not glTools.utils.mesh.isMesh(mesh):
-        raise Exception('Object "' + mesh + '" is not a valid mesh!!')
-
-    # =========================
-    # - Iterate Over Vertices -
-    # =========================
-
-    # Begin Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    if showProgress:
-        vtxCount = cmds.polyEvaluate(mesh, v=True)
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Building Vertex Connectivity Array...'),
-                         maxValue=vtxCount)
-
-    # Initialize Connectivity List
-    vtxConnectList = []
-    vtxCount = glTools.utils.component.getComponentCount(mesh)
-
-    # Iterate over vertices
-    for i in range(vtxCount):
-
-        # Get Connected Vertex IDs
-        connSel = glTools.utils.component.expandVertexSelection(mesh + '.vtx[' + str(i) + ']', useFace=faceConnectivity)
-        connIDs = glTools.utils.component.singleIndexList(connSel)
-        connIDs.remove(i)
-
-        # Append Return Value
-        vtxConnectList.append(connIDs)
-
-        # Update Progress Bar
-        if showProgress:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-    # End Current Progress Bar
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+    # Get Mesh Topology
+    topology = glTools.utils.meshTopology.getMeshTopology(mesh)
 
     # Return Result
-    return vtxConnectList
+    return topology.vertexConnectivityList(faceConnectivity)
 
 
 def vertexConnectivityDict(mesh, vtxIDs, faceConnectivity=False, showProgress=False):
     """
-    Return a vertex connectivity list for the specified mesh and vertex IDs
+    Return a vertex connectivity list for the specified mesh and vertex IDs.
+    Connectivity is read from the cached mesh topology (glTools.utils.meshTopology).
     @param mesh: Polygon mesh to return vertex connectivity list for
     @type mesh: str
     @param vtxIDs: Vertex IDs to get connectivity lists for
     @type vtxIDs: list
     @param faceConnectivity: Use face connectivity instead of edge connectivity
     @type faceConnectivity: bool
-    @param showProgress: Show operation progress using the main progress bar
+    @param showProgress: Unused. Kept for backward compatibility.
     @type showProgress: bool
     """
-    # Check Mesh
-    if not glTools.utils.mesh.isMesh(mesh):
-        raise Exception('Object "' + mesh + '" is not a valid mesh!!')
-
-    # =========================
-    # - Iterate Over Vertices -
-    # =========================
-
-    # Begin Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Building Vertex Connectivity Array...'),
-                         maxValue=len(vtxIDs))
-
-    # Initialize Connectivity List
-    vtxConnectDict = {}
-
-    for vtxID in vtxIDs:
-
-        # Get Connected Vertex IDs
-        connSel = glTools.utils.component.expandVertexSelection(mesh + '.vtx[' + str(vtxID) + ']',
-                                                                useFace=faceConnectivity)
-        connIDs = glTools.utils.component.singleIndexList(connSel)
-        connIDs.remove(vtxID)
-
-        # Append Return Value
-        vtxConnectDict[vtxID] = connIDs
-
-        # Update Progress Bar
-        if showProgress:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-    # End Current Progress Bar
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+    # Get Mesh Topology
+    topology = glTools.utils.meshTopology.getMeshTopology(mesh)
 
     # Return Result
-    return vtxConnectDict
+    return dict([(vtxID, topology.getConnectedVertices(vtxID, faceConnectivity)) for vtxID in vtxIDs])
 
 
 def faceVertexList(mesh, showProgress=False):
@@ -1806,126 +1735,31 @@ def faceVertexList(mesh, showProgress=False):
     Return a list of mesh face vertex IDs for the specified mesh
     @param mesh: Polygon mesh to return face vertex list for
     @type mesh: str
-    @param showProgress: Show operation progress using the main progress bar
+    @param showProgress: Unused. Kept for backward compatibility.
     @type showProgress: bool
     """
-    # Check Mesh
-    if not glTools.utils.mesh.isMesh(mesh):
-        raise Exception('Object "' + mesh + '" is not a valid mesh!!')
-
-    # ======================
-    # - Iterate Over Faces -
-    # ======================
-
-    # Initialize Face Iterator
-    faceIter = getMeshFaceIter(mesh)
-
-    # Begin Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Building Face Vertex Array...'),
-                         maxValue=faceIter.count())
-
-    # Initialize Connectivity List
-    faceVertexList = []
-    faceVertexArray = OpenMaya.MIntArray()
-
-    # Face Iterator
-    faceIter.reset()
-    for i in range(faceIter.count()):
+    # Get Mesh Topology
+    topology = glTools.utils.meshTopology.getMeshTopology(mesh)
 
-        # Get Face Vertices
-        faceIter.getVertices(faceVertexArray)
-
-        # Append to Face Vertex List
-        faceVertexList.append(list(faceVertexArray))
-
-        # Increment Iterator
-        try:
-            faceIter.next()
-        except:
-            print('end of iter')
-            break
-        # if not faceIter.next():
-        #	print('end of iter')
-        #	break
-
-        # Update Progress Bar
-        if showProgress:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-    # End Current Progress Bar
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return faceVertexList
+    # Return Result
+    return topology.faceVertexList()
 
 
 def faceVertexDict(mesh, faceIDs, showProgress=False):
     """
     Return a dictionary of mesh face vertex IDs for the specified mesh and face IDs
-    @param faceIDs:
     @param mesh: Polygon mesh to return face vertex list for
     @type mesh: str
-    @param showProgress: Show operation progress using the main progress bar
+    @param faceIDs: Face IDs to get face vertex lists for
+    @type faceIDs: list
+    @param showProgress: Unused. Kept for backward compatibility.
     @type showProgress: bool
     """
-    # Check Mesh
-    if not glTools.utils.mesh.isMesh(mesh):
-        raise Exception('Object "' + mesh + '" is not a valid mesh!!')
+    # Get Mesh Topology
+    topology = glTools.utils.meshTopology.getMeshTopology(mesh)
 
-    # ======================
-    # - Iterate Over Faces -
-    # ======================
-
-    # Initialize Face Iterator
-    faceIter = getMeshFaceIter(mesh)
-
-    # Begin Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=('Building Face Vertex Array...'),
-                         maxValue=len(faceIDs))
-
-    # Initialize Connectivity List
-    faceVertexDict = {}
-    faceVertexArray = OpenMaya.MIntArray()
-
-    # Face Iterator
-    for i in faceIDs:
-
-        # Go to Face Index
-        faceIter.setIndex(i)
-
-        # Get Face Vertices
-        faceIter.getVertices(faceVertexArray)
-
-        # Append to Face Vertex List
-        faceVertexDict[i].append(list(faceVertexArray))
-
-        # Update Progress Bar
-        if showProgress:
-            if cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
-                cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-                raise UserInterupted('Operation cancelled by user!')
-            cmds.progressBar(gMainProgressBar, e=True, step=1)
-
-    # End Current Progress Bar
-    if showProgress:
-        cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return faceVertexDict
+    # Return Result
+    return dict([(faceID, topology.getFaceVertices(faceID)) for faceID in faceIDs])
 
 
 def uncombine(polyUnite):
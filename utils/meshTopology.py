@@ -0,0 +1,270 @@
+import array
+import collections
+
+# Maya modules are imported by the functions that need them, so MeshTopology can be built
+# from stored mesh data (see MeshTopology.fromMeshData()) without a Maya session.
+
+# Topology Cache - {connectivityChecksum: MeshTopology}
+CACHE_SIZE = 16
+_topologyCache = collections.OrderedDict()
+# Mesh Checksum Cache - {meshPath: ((vertexCount, faceCount, faceVertexCount), connectivityChecksum)}
+_checksumCache = collections.OrderedDict()
+
+
+class MeshTopology(object):
+    """
+    Mesh topology tables derived once from polygon counts/connects.
+    All tables are stored as compact CSR style (offsets + indices) int arrays:
+        Face     >> Vertex : faceOffsets / faceVertices
+        Vertex   >> Face   : vertexFaceOffsets / vertexFaces
+        Vertex   >> Vertex : edgeOffsets / edgeNeighbours (edge connectivity)
+                             faceNeighbourOffsets / faceNeighbours (face connectivity)
+        Edge     >> Vertex : edgeVertices (2 per edge)
+    Edge IDs are assigned in order of first occurance while walking the face vertex lists,
+    and do not match Maya edge indices. Face connectivity tables are built on first use.
+    """
+
+    def __init__(self, polyCounts, polyConnects, numVertices=None):
+        """
+        MeshTopology class initializer.
+        @param polyCounts: Vertex count per polygon. (MFnMesh.getVertices)
+        @type polyCounts: list
+        @param polyConnects: Polygon vertex IDs. (MFnMesh.getVertices)
+        @type polyConnects: list
+        @param numVertices: Number of mesh vertices. If None, derived from the polygon vertex IDs.
+        @type numVertices: int or None
+        """
+        # Face >> Vertex
+        self.faceVertices = array.array('i', polyConnects)
+        self.faceOffsets = array.array('i', [0]) * (len(polyCounts) + 1)
+        offset = 0
+        for i, count in enumerate(polyCounts):
+            offset += count
+            self.faceOffsets[i + 1] = offset
+        if offset != len(self.faceVertices):
+            raise Exception('Polygon counts do not match the polygon vertex list length!')
+
+        # Vertex Count
+        if numVertices is None: numVertices = (max(self.faceVertices) + 1) if self.faceVertices else 0
+        self.vertexCount = numVertices
+
+        # Build Vertex Tables
+        vtxFaces = [[] for i in xrange(numVertices)]
+        vtxEdgeNbrs = [[] for i in xrange(numVertices)]
+        edgeKeys = set()
+        edgeVertices = array.array('i')
+
+        faceVertices = self.faceVertices
+        faceOffsets = self.faceOffsets
+        for face in xrange(len(polyCounts)):
+            start = faceOffsets[face]
+            end = faceOffsets[face + 1]
+            prevVtx = faceVertices[end - 1]
+            for n in xrange(start, end):
+                vtx = faceVertices[n]
+
+                # Vertex >> Face
+                vtxFaces[vtx].append(face)
+
+                # Edges
+                key = (prevVtx, vtx) if prevVtx < vtx else (vtx, prevVtx)
+                if not key in edgeKeys:
+                    edgeKeys.add(key)
+                    edgeVertices.extend(key)
+                    vtxEdgeNbrs[vtx].append(prevVtx)
+                    vtxEdgeNbrs[prevVtx].append(vtx)
+                prevVtx = vtx
+
+        # Store Tables
+        self.edgeVertices = edgeVertices
+        self.vertexFaceOffsets, self.vertexFaces = _flatten(vtxFaces)
+        for nbrs in vtxEdgeNbrs: nbrs.sort()
+        self.edgeOffsets, self.edgeNeighbours = _flatten(vtxEdgeNbrs)
+
+        # Face connectivity tables are built on demand
+        self.faceNeighbourOffsets = None
+        self.faceNeighbours = None
+
+    def _buildFaceNeighbours(self):
+        """
+        Build the vertex >> vertex face connectivity table.
+        """
+        faceVertices = self.faceVertices
+        faceOffsets = self.faceOffsets
+        vertexFaces = self.vertexFaces
+        vertexFaceOffsets = self.vertexFaceOffsets
+        vtxFaceNbrs = []
+        for vtx in xrange(self.vertexCount):
+            nbrs = set()
+            for e in xrange(vertexFaceOffsets[vtx], vertexFaceOffsets[vtx + 1]):
+                face = vertexFaces[e]
+                nbrs.update(faceVertices[faceOffsets[face]:faceOffsets[face + 1]])
+            nbrs.discard(vtx)
+            vtxFaceNbrs.append(sorted(nbrs))
+        self.faceNeighbourOffsets, self.faceNeighbours = _flatten(vtxFaceNbrs)
+
+    @classmethod
+    def fromMesh(cls, mesh):
+        """
+        Build mesh topology from a polygon mesh.
+        @param mesh: Polygon mesh to build topology for.
+        @type mesh: str
+        """
+        import maya.OpenMaya as OpenMaya
+        import glTools.utils.mesh
+
+        meshFn = glTools.utils.mesh.getMeshFn(mesh)
+        polyCounts = OpenMaya.MIntArray()
+        polyConnects = OpenMaya.MIntArray()
+        meshFn.getVertices(polyCounts, polyConnects)
+        return cls(polyCounts, polyConnects, meshFn.numVertices())
+
+    @classmethod
+    def fromMeshData(cls, meshData):
+        """
+        Build mesh topology from stored mesh data. Does not require the mesh to exist in the scene.
+        @param meshData: Mesh data object to build topology from.
+        @type meshData: glTools.data.meshData.MeshData
+        """
+        return cls(meshData._data['polyCounts'],
+                   meshData._data['polyConnects'],
+                   len(meshData._data['vertexList']) // 3)
+
+    # =========
+    # - Query -
+    # =========
+
+    def numVertices(self):
+        return self.vertexCount
+
+    def numFaces(self):
+        return len(self.faceOffsets) - 1
+
+    def numEdges(self):
+        return len(self.edgeVertices) // 2
+
+    def getFaceVertices(self, face):
+        """
+        Return the ordered vertex IDs of the specified face.
+        @param face: Face ID.
+        @type face: int
+        """
+        return self.faceVertices[self.faceOffsets[face]:self.faceOffsets[face + 1]].tolist()
+
+    def getVertexFaces(self, vtx):
+        """
+        Return the IDs of the faces connected to the specified vertex.
+        @param vtx: Vertex ID.
+        @type vtx: int
+        """
+        return self.vertexFaces[self.vertexFaceOffsets[vtx]:self.vertexFaceOffsets[vtx + 1]].tolist()
+
+    def getEdgeVertices(self, edge):
+        """
+        Return the vertex IDs of the specified (topology) edge.
+        @param edge: Topology edge ID.
+        @type edge: int
+        """
+        return self.edgeVertices[edge * 2], self.edgeVertices[edge * 2 + 1]
+
+    def getConnectedVertices(self, vtx, faceConnectivity=False):
+        """
+        Return the sorted IDs of the vertices connected to the specified vertex.
+        @param vtx: Vertex ID.
+        @type vtx: int
+        @param faceConnectivity: Use face connectivity instead of edge connectivity.
+        @type faceConnectivity: bool
+        """
+        offsets, indices = self.getAdjacency(faceConnectivity)
+        return indices[offsets[vtx]:offsets[vtx + 1]].tolist()
+
+    def getAdjacency(self, faceConnectivity=False):
+        """
+        Return the vertex adjacency table as a pair of (offsets, indices) arrays.
+        The connected vertices of vertex "i" are indices[offsets[i]:offsets[i+1]].
+        @param faceConnectivity: Use face connectivity instead of edge connectivity.
+        @type faceConnectivity: bool
+        """
+        if faceConnectivity:
+            if self.faceNeighbours is None: self._buildFaceNeighbours()
+            return self.faceNeighbourOffsets, self.faceNeighbours
+        return self.edgeOffsets, self.edgeNeighbours
+
+    def vertexConnectivityList(self, faceConnectivity=False):
+        """
+        Return a list of connected vertex ID lists, one per vertex.
+        @param faceConnectivity: Use face connectivity instead of edge connectivity.
+        @type faceConnectivity: bool
+        """
+        return [self.getConnectedVertices(i, faceConnectivity) for i in xrange(self.vertexCount)]
+
+    def faceVertexList(self):
+        """
+        Return a list of face vertex ID lists, one per face.
+        """
+        return [self.getFaceVertices(i) for i in xrange(self.numFaces())]
+
+
+def getMeshTopology(mesh):
+    """
+    Return the (cached) topology for the specified mesh.
+    Topology is cached based on the mesh connectivity checksum (glTools.model.checksum.checksum_mesh),
+    so meshes with identical connectivity share the same topology object.
+    The checksum of each mesh is reused while its vertex, face and face vertex counts are unchanged.
+    Call clearCache() after connectivity edits that don't change these counts (ie. edge flips).
+    @param mesh: Polygon mesh to get topology for.
+    @type mesh: str
+    """
+    import glTools.model.checksum
+    import glTools.utils.mesh
+
+    # Check Mesh
+    if not glTools.utils.mesh.isMesh(mesh):
+        raise Exception('Object "' + mesh + '" is not a valid mesh!!')
+
+    # Get Mesh Checksum (counts pre-check)
+    meshFn = glTools.utils.mesh.getMeshFn(mesh)
+    meshPath = meshFn.fullPathName()
+    counts = (meshFn.numVertices(), meshFn.numPolygons(), meshFn.numFaceVertices())
+    cached = _checksumCache.pop(meshPath, None)
+    if cached and cached[0] == counts:
+        checksum = cached[1]
+    else:
+        checksum = glTools.model.checksum.checksum_mesh(mesh)
+    _checksumCache[meshPath] = (counts, checksum)
+    while len(_checksumCache) > CACHE_SIZE * 4: _checksumCache.popitem(last=False)
+
+    # Check Cache
+    if checksum in _topologyCache:
+        _topologyCache[checksum] = _topologyCache.pop(checksum)
+        return _topologyCache[checksum]
+
+    # Build Topology
+    topology = MeshTopology.fromMesh(mesh)
+    _topologyCache[checksum] = topology
+    while len(_topologyCache) > CACHE_SIZE: _topologyCache.popitem(last=False)
+
+    # Return Result
+    return topology
+
+
+def clearCache():
+    """
+    Clear all cached mesh topology.
+    """
+    _topologyCache.clear()
+    _checksumCache.clear()
+
+
+def _flatten(lists):
+    """
+    Flatten a list of lists into CSR style (offsets, indices) int arrays.
+    @param lists: List of int lists.
+    @type lists: list
+    """
+    offsets = array.array('i', [0]) * (len(lists) + 1)
+    indices = array.array('i')
+    for i, items in enumerate(lists):
+        indices.extend(items)
+        offsets[i + 1] = len(indices)
+    return offsets, indices
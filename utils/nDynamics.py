@@ -4,7 +4,7 @@ import glTools.utils.attribute
 import glTools.utils.base
 import glTools.utils.mesh
 import glTools.utils.stringUtils
-from glTools.utils.weightList import WeightList
+from glTools.utils.weightList import WeightArray
 import os.path
 
 
@@ -640,11 +640,11 @@ def saveWeightList(nCloth, attr, filePath=None, force=False):
     """
     # Build Weight List
     wt = getVertexWeights(nCloth, attr)
-    wtList = WeightList(wt)
+    wtList = WeightArray(wt)
 
     # Save Weight List
     if filePath:
-        filePath = wtList.saveAs(filePath, force)
+        filePath = wtList.save(filePath, force)
     else:
         filePath = wtList.saveAs()
 
@@ -656,7 +656,7 @@ def loadWeightList(nCloth, attr, filePath=None, apply=True):
     """
     """
     # Load Weight List
-    wt = WeightList()
+    wt = WeightArray()
     wt = wt.load(filePath)
 
     # Apply Weight List
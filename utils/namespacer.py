@@ -1,10 +1,13 @@
 import os, sys
 import collections
+import logging
 import types
 import maya.cmds as cmds
 import maya.mel as mel
 import maya.utils as mu
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_NODES = [u'characterPartition', u'defaultHardwareRenderGlobals', u'defaultLayer', u'defaultLightList1',
                  u'defaultLightSet',
                  u'defaultObjectSet', u'defaultRenderGlobals', u'defaultRenderLayer', u'defaultRenderLayerFilter',
@@ -98,7 +101,7 @@ def getAllNS():
     # END
 
 
-def getRelatedNS(ns, mode='children'):
+def getRelatedNS(ns, mode='children', index=None):
     """
     Find the namespaces that are part of a namespace provieded. You can use this function to find all the namespaces that are children
     of a given namespace, all the namespaces that are parents of a given namespace.
@@ -112,10 +115,16 @@ def getRelatedNS(ns, mode='children'):
     @type ns: str
     @param mode: the type of relatives to locate, options are "children", "parents", "both"
     @type mode: str
+    @param index: namespace index to query. If None, the scene is queried directly.
+    @type index: NamespaceIndex
     
     @return: a list of namespaces
     @rtype: list(str)
     """
+    # query the index
+    if index:
+        return index.related(ns, mode)
+
     # check the mode
     mode = mode.lower()
     vaildModes = ['children', 'parents', 'both']
@@ -202,29 +211,181 @@ def splitNS(name):
         return (':'.join(stack[:-1]), stack[-1])
 
 
-def getObjectsOfNS(namespace, filterOut=None, recursive=False):
+class NamespaceIndex(object):
     """
+    Snapshot of the scene namespace tree and namespace node membership.
+    The tree and membership are collected once (a single ls of the scene), and recursive or filtered
+    membership and relative queries are answered from memory. Node type filters are collected with one
+    scene wide ls per type, and cached.
+    The index is not updated automatically. Call refresh() (or invalidate(), to refresh on the next query)
+    after changing scene namespaces or node names. retargetNS() invalidates the index it is passed.
+    Usage:
+        index = NamespaceIndex()
+        for ns in index.children('set'):
+            nodes = index.nodes(ns, filterOut=['mesh'])
     """
-    filterOut = filterOut if filterOut else []
 
-    # create a set for the objects
-    objects = set()
+    def __init__(self):
+        """
+        NamespaceIndex class initializer.
+        """
+        self._namespaces = None
+        self._members = None
+        self._typeNodes = {}
+
+    def refresh(self):
+        """
+        Collect the scene namespace tree and node membership.
+        """
+        # Namespace Tree
+        self._namespaces = set(getAllNS())
+
+        # Node Membership
+        members = {}
+        for node in cmds.ls() or []:
+            ns = node.rpartition('|')[2].rpartition(':')[0].lstrip(':') or ':'
+            members.setdefault(ns, []).append(node)
+        self._members = members
+        self._typeNodes = {}
+
+    def invalidate(self):
+        """
+        Mark the index as out of date. The index is refreshed on the next query.
+        """
+        self._namespaces = None
+        self._members = None
+        self._typeNodes = {}
+
+    def _check(self):
+        """
+        Refresh the index if it is out of date.
+        """
+        if self._members is None: self.refresh()
+
+    def namespaces(self):
+        """
+        Return a sorted list of all scene namespaces.
+        """
+        self._check()
+        return sorted(self._namespaces)
+
+    def exists(self, namespace):
+        """
+        Check if the specified namespace exists.
+        @param namespace: The namespace to check
+        @type namespace: str
+        """
+        self._check()
+        namespace = cleanNS(namespace)
+        return namespace == ':' or namespace in self._namespaces
+
+    def children(self, namespace, recursive=True):
+        """
+        Return a sorted list of the child namespaces of the specified namespace.
+        @param namespace: The namespace to return the children of
+        @type namespace: str
+        @param recursive: Include all descendant namespaces. If False, only return the immediate children.
+        @type recursive: bool
+        """
+        self._check()
+        namespace = cleanNS(namespace)
+        prefix = '' if namespace == ':' else namespace + ':'
+        children = [ns for ns in self._namespaces if ns.startswith(prefix)]
+        if not recursive: children = [ns for ns in children if not ':' in ns[len(prefix):]]
+        return sorted(children)
+
+    def related(self, namespace, mode='children'):
+        """
+        Return the specified namespace and its relatives. See getRelatedNS().
+        @param namespace: The namespace to find relatives for
+        @type namespace: str
+        @param mode: The type of relatives to locate, options are "children", "parents", "both"
+        @type mode: str
+        """
+        # Check Mode
+        mode = mode.lower()
+        vaildModes = ['children', 'parents', 'both']
+        if not mode in vaildModes:
+            raise Exception('The mode specified "%s" is not a valid choice %s' % (mode, vaildModes))
+
+        # Check Namespace
+        namespace = cleanNS(namespace)
+        if not self.exists(namespace):
+            raise InvalidNamespaceError('The namespace "%s" does not exist, unable to locate relatives' % namespace)
+
+        relatives = [namespace]
+        if mode == 'parents' or mode == 'both':
+            parts = namespace.split(':')
+            relatives.extend([':'.join(parts[:i]) for i in range(1, len(parts))])
+        if mode == 'children' or mode == 'both':
+            relatives.extend(self.children(namespace))
+
+        # Return Result
+        return relatives
+
+    def nodes(self, namespace, recursive=False, filterOut=None):
+        """
+        Return the set of nodes in the specified namespace.
+        @param namespace: The namespace to return the nodes of
+        @type namespace: str
+        @param recursive: Include the nodes of all child namespaces
+        @type recursive: bool
+        @param filterOut: List of node types to exclude. Derived node types are also excluded.
+        @type filterOut: list
+        """
+        self._check()
+        namespace = cleanNS(namespace)
+        namespaces = [namespace]
+        if recursive: namespaces.extend(self.children(namespace))
+
+        # Collect Nodes
+        objects = set()
+        for ns in namespaces: objects.update(self._members.get(ns, []))
+
+        # Filter Node Types
+        for nodeType in filterOut or []:
+            if not objects: break
+            if not self._typeNodes.has_key(nodeType):
+                self._typeNodes[nodeType] = set(cmds.ls(type=nodeType) or [])
+            objects.difference_update(self._typeNodes[nodeType])
+
+        # Return Result
+        return objects
+
+    def namespaceOf(self, node):
+        """
+        Return the namespace of the specified node name. World namespace nodes return ":".
+        @param node: The node name to return the namespace of
+        @type node: str
+        """
+        return splitNS(node)[0] or ':'
+
+
+def getObjectsOfNS(namespace, filterOut=None, recursive=False, index=None):
+    """
+    Return the set of nodes in the specified namespace.
+    @param namespace: The namespace to return the nodes of
+    @type namespace: str
+    @param filterOut: List of node types to exclude
+    @type filterOut: list
+    @param recursive: Include the nodes of all child namespaces
+    @type recursive: bool
+    @param index: Namespace index to query. If None, the scene is queried directly.
+    @type index: NamespaceIndex
+    """
+    # Query Index
+    if index: return index.nodes(namespace, recursive=recursive, filterOut=filterOut)
 
     # handle recursive
     namespaces = [cleanNS(namespace)]
     if recursive:
-        namespaces.extend(getRelatedNS(namespace))
+        namespaces.extend(getRelatedNS(namespace)[1:])
 
-    # cycle through the objects
-    for ns in namespaces:
-        # get the objects in that namespace
-        allObjects = set(cmds.ls(':%s:*' % ns))
-        # get the filter objects (objects of type that we dont want)
-        filterObjects = set()
-        for filterItem in filterOut:
-            filterObjects.update(set(cmds.ls(':%s:*' % ns, type=filterItem)))
-        # remove the filterObjects from allObjects and push them into the objects set
-        objects.update(allObjects.difference(filterObjects))
+    # get the objects in all namespaces (and the filter objects - objects of type that we dont want) in one query each
+    patterns = [':%s:*' % ns for ns in namespaces]
+    objects = set(cmds.ls(patterns) or [])
+    if filterOut and objects:
+        objects.difference_update(cmds.ls(patterns, type=filterOut) or [])
 
     return objects
 
@@ -502,6 +663,17 @@ def deleteNS(namespace):
 
 def stripNS(nodes, force=True, autoExpandShapes=True):
     """
+    Strip the namespace from the list of nodes provided. Nodes are renamed in a single batch (see _batchRename()).
+    
+    @param nodes: a list of nodes to strip the namespace from
+    @type nodes: list(str)
+    @param force: whether or not to strip the namespace in the event it will result in a name conflict
+    @type force: bool
+    @param autoExpandShapes: include the shapes of the nodes provided
+    @type autoExpandShapes: bool
+    
+    @return: dictionary of origional nodes to new names
+    @rtype: dict
     """
     if not nodes:
         return {}
@@ -510,6 +682,7 @@ def stripNS(nodes, force=True, autoExpandShapes=True):
     setLiveNS(":")
 
     mapping = {}
+    renames = []
 
     # process the nodes
     nodes = _processNodes(nodes, autoExpandShapes)
@@ -529,12 +702,10 @@ def stripNS(nodes, force=True, autoExpandShapes=True):
             mapping[node] = node
             continue
 
-        # see if the non-namespaced node exists
-        if cmds.objExists(baseNode) and not force:
-            continue
+        renames.append((node, baseNode))
 
-        newName = cmds.rename(node, baseNode)
-        mapping[node] = newName
+    # rename
+    mapping.update(_batchRename(renames, force=force))
 
     setLiveNS(curNS)
     return mapping
@@ -572,6 +743,7 @@ def setNS(nodes, namespace, force=True, autoExpandShapes=True, prefix=False):
     provided. It will detect whether or not a name conflict will result. If the
     force flag is set to true, it will rename the object and allow maya to number
     it to resolve the conflict. If false, it will not change the namespace.
+    Nodes are renamed in a single batch (see _batchRename()).
     
     @param objList: a list of objects to have their namespace altered
     @type objList: list(str)
@@ -592,7 +764,7 @@ def setNS(nodes, namespace, force=True, autoExpandShapes=True, prefix=False):
     curNS = cmds.namespaceInfo(cur=True)
     setLiveNS(":")
 
-    mapping = {}
+    renames = []
 
     # process the nodes
     nodes = _processNodes(nodes, autoExpandShapes)
@@ -607,27 +779,15 @@ def setNS(nodes, namespace, force=True, autoExpandShapes=True, prefix=False):
         ns, baseNode = splitNS(node)
 
         if prefix:
-            applyNamespace = namespace + ":" + ns
-            applyNamespace = addNS(applyNamespace)
+            applyNamespace = cleanNS(namespace + ":" + ns)
         else:
             applyNamespace = namespace
 
         # generate the new name
-        newNode = applyNamespace + ":" + baseNode
-
-        # see if the non-namespaced node exists
-        if cmds.objExists(newNode) and not force:
-            logger.warning(
-                'namespacer.setNS(): skipping renaming "%s" to "%s" because a name conflict will result, use force flag to apply change'
-                % (node, newNode))
-            continue
+        renames.append((node, applyNamespace + ":" + baseNode))
 
-        try:
-            newNode = cmds.rename(node, newNode)
-        except Exception, e:
-            logger.warning('unable to change namespace on %s to %s: %s' % (node, namespace, e))
-            continue
-        mapping[node] = newNode
+    # rename
+    mapping = _batchRename(renames, force=force)
 
     setLiveNS(curNS)
     return mapping
@@ -642,12 +802,22 @@ def prefixNS(nodes, namespace, force=True, autoExpandShapes=True):
 
 def searchReplaceNS(nodes, search, replace, force=True, autoExpandShapes=True):
     """
+    Search and replace the namespace of the list of nodes provided. Nodes are renamed in a single batch (see _batchRename()).
+    
+    @param nodes: a list of nodes to search and replace the namespace of
+    @type nodes: list(str)
+    @param search: the namespace string to search for
+    @type search: str
+    @param replace: the namespace string to replace the search string with
+    @type replace: str
+    @param force: whether or not to rename nodes in the event it will result in a name conflict
+    @type force: bool
+    @param autoExpandShapes: include the shapes of the nodes provided
+    @type autoExpandShapes: bool
+    
+    @return: dictionary of origional nodes to new names
+    @rtype: dict
     """
-    curNS = cmds.namespaceInfo(cur=True)
-    setLiveNS(":")
-
-    mapping = {}
-
     search = cleanNS(search)
     replace = cleanNS(replace)
 
@@ -656,6 +826,11 @@ def searchReplaceNS(nodes, search, replace, force=True, autoExpandShapes=True):
             'You are attempting to searchReplaceNS without any search string.. use appendNS for this functionality')
         return {}
 
+    curNS = cmds.namespaceInfo(cur=True)
+    setLiveNS(":")
+
+    renames = []
+
     # process the nodes
     nodes = _processNodes(nodes, autoExpandShapes)
 
@@ -669,42 +844,187 @@ def searchReplaceNS(nodes, search, replace, force=True, autoExpandShapes=True):
 
         if ns.count(search):
             newNS = cleanNS(ns.replace(search, replace))
-            newNode = newNS + ":" + baseNode
-            if cmds.objExists(newNode) and not force:
-                continue
-            addNS(newNS)
-            newNode = cmds.rename(node, newNode)
-            mapping[node] = newNode
+            if newNS == ":":
+                renames.append((node, baseNode))
+            else:
+                renames.append((node, newNS + ":" + baseNode))
 
+    # rename
+    mapping = _batchRename(renames, force=force)
+
+    setLiveNS(curNS)
     return mapping
 
 
-def _processNodes(nodes, autoExpandShapes=True):
-    newNodes = set()
-    # if expanding to shapes
-    for node in nodes:
-        # check
-        if not cmds.objExists(node):
-            logger.warning('Unable to process the namespace on "' + node + '" since it does not exist')
+def retargetNS(namespaceMap, force=True, removeEmpty=False, index=None):
+    """
+    Move the nodes of several namespaces (and their child namespaces) to new namespaces in a single batched rename.
+    Child namespaces are kept below the target namespace ({"char": "hero"} moves "char:geo:body" to "hero:geo:body").
+    Where source namespaces are nested, nodes follow the deepest source namespace they belong to.
+    Referenced nodes can not be renamed, and are skipped.
+    
+    @param namespaceMap: dictionary of source namespaces to target namespaces
+    @type namespaceMap: dict
+    @param force: whether or not to rename nodes in the event it will result in a name conflict
+    @type force: bool
+    @param removeEmpty: remove the source namespaces that are left empty after the move
+    @type removeEmpty: bool
+    @param index: namespace index used to collect the source namespace nodes. The index is invalidated after the move.
+    @type index: NamespaceIndex
+    
+    @return: dictionary of origional nodes to new names
+    @rtype: dict
+    """
+    index = index or NamespaceIndex()
+
+    # clean the namespaces - deepest source namespaces first
+    retarget = {}
+    for src, dst in namespaceMap.items():
+        src = cleanNS(src)
+        if src == ":":
+            raise NamespacerError('You can not retarget the world ":" namespace, use renameNS() instead!')
+        if not index.exists(src):
+            logger.warning('namespacer.retargetNS(): the namespace "%s" does not exist, skipping' % src)
             continue
-        if cmds.referenceQuery(node, isNodeReferenced=True):
-            logger.warning('Unable to process the namespace "' + node + '" since it is referenced')
+        retarget[src] = cleanNS(dst)
+    sources = sorted(retarget.keys(), key=lambda x: x.count(':'), reverse=True)
+    if not sources:
+        return {}
+
+    # collect the nodes of all source namespaces
+    nodes = set()
+    for src in sources:
+        nodes.update(index.nodes(src, recursive=True))
+
+    curNS = cmds.namespaceInfo(cur=True)
+    setLiveNS(":")
+
+    renames = []
+
+    # process the nodes
+    nodes = _processNodes(list(nodes), autoExpandShapes=False, checkExists=False)
+
+    for node in nodes:
+        # split the namespace
+        ns, baseNode = splitNS(node)
+
+        # find the deepest source namespace
+        for src in sources:
+            if ns == src or ns.startswith(src + ":"):
+                newNS = cleanNS(retarget[src] + ":" + ns[len(src):])
+                break
+        else:
             continue
-        # add the node
-        newNodes.add(node)
 
-        # handle shapes
-        if autoExpandShapes:
-            shapes = cmds.listRelatives(node, shapes=True, pa=True)
-            if shapes:
-                newNodes.update(set(shapes))
+        if newNS == ":":
+            renames.append((node, baseNode))
+        else:
+            renames.append((node, newNS + ":" + baseNode))
+
+    # rename
+    mapping = _batchRename(renames, force=force)
+    index.invalidate()
+
+    # remove the empty source namespaces
+    if removeEmpty:
+        for src in sources:
+            if cmds.namespace(exists=":%s" % src):
+                removeUnusedNS(src)
+        index.invalidate()
+
+    if cmds.namespace(exists=":%s" % cleanNS(curNS)):
+        setLiveNS(curNS)
+    return mapping
+
+
+def _processNodes(nodes, autoExpandShapes=True, checkExists=True):
+    """
+    Return the nodes provided that can be renamed, as long names sorted in rename order (children before parents).
+    Nodes that don't exist or are referenced are skipped. The long names, shapes and referenced nodes are each
+    collected in a single query for all nodes. Pass checkExists=False for nodes that are known to exist
+    (ie. from the namespace index) to skip counting the missing nodes.
+    """
+    if isinstance(nodes, types.StringTypes):
+        nodes = [nodes]
+    nodes = list(set(nodes))
+    if not nodes:
+        return []
+
+    # check
+    newNodes = set(cmds.ls(nodes, long=True) or [])
+    if checkExists:
+        # a short name can match several nodes, so only the inputs that don't match a listed name are checked one
+        # at a time (ie. non unique short names and missing nodes)
+        found = newNodes.union(cmds.ls(nodes) or [])
+        missing = [node for node in nodes if not node in found and not cmds.ls(node)]
+        if missing:
+            logger.warning('Unable to process the namespace on %s nodes since they do not exist' % len(missing))
+    if not newNodes:
+        return []
+
+    # handle shapes
+    if autoExpandShapes:
+        transforms = cmds.ls(list(newNodes), transforms=True, long=True)
+        if transforms:
+            newNodes.update(cmds.listRelatives(transforms, shapes=True, fullPath=True) or [])
+
+    # skip referenced nodes
+    referenced = set(cmds.ls(list(newNodes), referencedNodes=True, long=True) or [])
+    if referenced:
+        logger.warning('Unable to process the namespace on %s nodes since they are referenced' % len(referenced))
+        newNodes.difference_update(referenced)
 
     # sort the nodes so we rename them in the right order
-    nodes = sorted(cmds.ls(list(newNodes), long=True))
+    nodes = sorted(newNodes)
     nodes.reverse()
     return nodes
 
 
+def _batchRename(renames, force=True):
+    """
+    Rename a list of nodes in a single batch. The target namespaces are created once each, and name conflicts
+    are checked with a single query for all nodes (and against the names already applied by the batch).
+    
+    @param renames: list of (node, newName) pairs, in rename order (children before parents - see _processNodes())
+    @type renames: list(tuple)
+    @param force: whether or not to rename nodes in the event it will result in a name conflict
+    @type force: bool
+    
+    @return: dictionary of origional nodes to new names
+    @rtype: dict
+    """
+    mapping = {}
+    if not renames:
+        return mapping
+
+    # create the target namespaces
+    for ns in set([splitNS(newName)[0] for node, newName in renames]):
+        if ns: addNS(ns)
+
+    # get the name conflicts
+    conflicts = set()
+    if not force:
+        conflicts.update([x.split('|')[-1] for x in cmds.ls([newName for node, newName in renames]) or []])
+
+    for node, newName in renames:
+        if newName in conflicts:
+            logger.warning(
+                'namespacer: skipping renaming "%s" to "%s" because a name conflict will result, use force flag to apply change'
+                % (node, newName))
+            continue
+
+        try:
+            newNode = cmds.rename(node, newName)
+        except Exception, e:
+            logger.warning('unable to rename %s to %s: %s' % (node, newName, e))
+            continue
+        mapping[node] = newNode
+        if not force:
+            conflicts.add(newName)
+
+    return mapping
+
+
 # This converts a namespace to a list (removes empty spots that a split might leave behind) (":set:asset:" >> ['set', 'asset'])
 def namespaceToList(namespace):
     """
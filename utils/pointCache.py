@@ -0,0 +1,334 @@
+import array
+import json
+import struct
+import sys
+import zlib
+
+# ==========
+# - Format -
+# ==========
+#
+# Binary point cache file layout (all values little-endian):
+#   Header   : magic(8s), version(H), flags(H), encoding(H), reserved(H), point count(I), frame count(I),
+#              topology offset(Q), frame index offset(Q)
+#   Topology : metadata size(I), UTF-8 JSON metadata, face count(I), face vertex count(I),
+#              polyCounts(int32 * face count), polyConnects(int32 * face vertex count)
+#   Frames   : One chunk per frame - [quantize bounds] + positions + [normals], optionally zlib compressed
+#   Index    : One entry per frame - time(d), chunk offset(Q), chunk size(I), uncompressed size(I)
+#
+# The frame index is written when the cache is closed, so frames can be streamed without knowing the frame count.
+
+MAGIC = 'GLTPCACH'
+VERSION = 1
+HEADER = struct.Struct('<8sHHHHIIQQ')
+INDEX_ENTRY = struct.Struct('<dQII')
+QUANTIZE_BOUNDS = struct.Struct('<6d')
+
+# Flags
+FLAG_NORMALS = 1
+FLAG_COMPRESS = 2
+
+# Encodings - {name: (code, positionTypecode, normalTypecode)}
+ENCODINGS = {'float32': (0, 'f', 'f'),
+             'quantized': (1, 'H', 'h')}
+
+# Quantized value ranges
+QUANTIZE_MAX = 65535
+NORMAL_SCALE = 32767.0
+
+
+class PointCacheWriter(object):
+    """
+    Streaming writer for binary multi-frame point caches.
+    Topology is written once, then point positions (and optional normals) are appended per frame.
+    """
+
+    def __init__(self,
+                 filePath,
+                 pointCount,
+                 polyCounts=None,
+                 polyConnects=None,
+                 normals=False,
+                 compress=False,
+                 encoding='float32',
+                 metadata=None):
+        """
+        PointCacheWriter class initializer.
+        @param filePath: Cache file path.
+        @type filePath: str
+        @param pointCount: Number of points per frame.
+        @type pointCount: int
+        @param polyCounts: Vertex count per polygon. Optional.
+        @type polyCounts: list or None
+        @param polyConnects: Polygon vertex IDs. Optional.
+        @type polyConnects: list or None
+        @param normals: Store per point normals for each frame.
+        @type normals: bool
+        @param compress: Compress each frame chunk using zlib.
+        @type compress: bool
+        @param encoding: Position encoding. "float32" or "quantized" (16 bit per component, relative to the frame bounds).
+        @type encoding: str
+        @param metadata: Additional JSON serializable metadata to store with the cache.
+        @type metadata: dict or None
+        """
+        # Check Encoding
+        if not encoding in ENCODINGS:
+            raise Exception('Invalid point cache encoding ("' + encoding + '")! Accepted values - ' + str(sorted(ENCODINGS.keys())))
+
+        self.filePath = filePath
+        self.pointCount = pointCount
+        self.normals = normals
+        self.compress = compress
+        self.encoding = encoding
+        self.index = []
+
+        # Open File and Reserve Header
+        self._file = open(filePath, 'wb')
+        self._file.write('\x00' * HEADER.size)
+
+        # Write Topology
+        meta = json.dumps(metadata or {})
+        polyCounts = array.array('i', polyCounts or [])
+        polyConnects = array.array('i', polyConnects or [])
+        if sys.byteorder == 'big':
+            polyCounts.byteswap()
+            polyConnects.byteswap()
+        self._file.write(struct.pack('<I', len(meta)))
+        self._file.write(meta)
+        self._file.write(struct.pack('<II', len(polyCounts), len(polyConnects)))
+        self._file.write(polyCounts.tostring())
+        self._file.write(polyConnects.tostring())
+
+    def writeFrame(self, time, points, normals=None):
+        """
+        Append a frame to the cache.
+        @param time: Frame time.
+        @type time: float
+        @param points: Flat (x, y, z per point) position list.
+        @type points: list
+        @param normals: Flat (x, y, z per point) normal list. Required if the cache stores normals.
+        @type normals: list or None
+        """
+        # Check Data
+        if len(points) != self.pointCount * 3:
+            raise Exception('Frame point count (' + str(len(points) // 3) + ') does not match cache point count (' + str(self.pointCount) + ')!')
+        if self.normals and (normals is None or len(normals) != len(points)):
+            raise Exception('Normals are required for every frame of this cache!')
+
+        # Encode Frame
+        code, posType, nrmType = ENCODINGS[self.encoding]
+        chunk = []
+        if self.encoding == 'quantized':
+            bounds, posArray = _quantize(points)
+            chunk.append(QUANTIZE_BOUNDS.pack(*bounds))
+        else:
+            posArray = array.array(posType, points)
+        chunk.append(posArray)
+        if self.normals:
+            if self.encoding == 'quantized':
+                chunk.append(array.array(nrmType, [int(round(max(-1.0, min(1.0, n)) * NORMAL_SCALE)) for n in normals]))
+            else:
+                chunk.append(array.array(nrmType, normals))
+
+        # Serialize Chunk
+        data = []
+        for item in chunk:
+            if isinstance(item, array.array):
+                if sys.byteorder == 'big': item.byteswap()
+                item = item.tostring()
+            data.append(item)
+        data = ''.join(data)
+        rawSize = len(data)
+        if self.compress: data = zlib.compress(data)
+
+        # Write Chunk
+        offset = self._file.tell()
+        self._file.write(data)
+        self.index.append((float(time), offset, len(data), rawSize))
+
+    def close(self):
+        """
+        Write the frame index and finalize the cache header.
+        """
+        if self._file is None: return
+
+        # Write Index
+        indexOffset = self._file.tell()
+        for entry in self.index: self._file.write(INDEX_ENTRY.pack(*entry))
+
+        # Write Header
+        flags = (FLAG_NORMALS if self.normals else 0) | (FLAG_COMPRESS if self.compress else 0)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, flags, ENCODINGS[self.encoding][0], 0,
+                                     self.pointCount, len(self.index), HEADER.size, indexOffset))
+        self._file.close()
+        self._file = None
+
+
+class PointCacheReader(object):
+    """
+    Random access reader for binary multi-frame point caches.
+    The frame index is read on open, so any frame can be loaded with a single seek and read.
+    """
+
+    def __init__(self, filePath):
+        """
+        PointCacheReader class initializer.
+        @param filePath: Cache file path.
+        @type filePath: str
+        """
+        self.filePath = filePath
+        self._file = open(filePath, 'rb')
+
+        # Read Header
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise Exception('File "' + filePath + '" is not a valid point cache file!')
+        magic, version, flags, code, reserved, pointCount, frameCount, topologyOffset, indexOffset = HEADER.unpack(header)
+        if version > VERSION:
+            raise Exception('Unsupported point cache file version (' + str(version) + ')!')
+        self.pointCount = pointCount
+        self.normals = bool(flags & FLAG_NORMALS)
+        self.compress = bool(flags & FLAG_COMPRESS)
+        self.encoding = [name for name, enc in ENCODINGS.items() if enc[0] == code][0]
+
+        # Read Topology
+        self._file.seek(topologyOffset)
+        metaSize = struct.unpack('<I', self._file.read(4))[0]
+        self.metadata = json.loads(self._file.read(metaSize))
+        faceCount, connectCount = struct.unpack('<II', self._file.read(8))
+        self.polyCounts = _readArray(self._file, 'i', faceCount)
+        self.polyConnects = _readArray(self._file, 'i', connectCount)
+
+        # Read Frame Index
+        self._file.seek(indexOffset)
+        indexData = self._file.read(INDEX_ENTRY.size * frameCount)
+        self.index = [INDEX_ENTRY.unpack_from(indexData, i * INDEX_ENTRY.size) for i in xrange(frameCount)]
+        self.frameTimes = array.array('d', [entry[0] for entry in self.index])
+        self._frameIndex = dict([(t, i) for i, t in enumerate(self.frameTimes)])
+
+    def frameCount(self):
+        """
+        Return the number of frames stored in the cache.
+        """
+        return len(self.index)
+
+    def getFrameIndex(self, time):
+        """
+        Return the frame index for the specified frame time.
+        @param time: Frame time.
+        @type time: float
+        """
+        time = float(time)
+        if not time in self._frameIndex:
+            raise Exception('No cached frame at time ' + str(time) + '!')
+        return self._frameIndex[time]
+
+    def getPoints(self, frame):
+        """
+        Return the flat (x, y, z per point) positions for the specified frame index.
+        @param frame: Frame index.
+        @type frame: int
+        """
+        return self._readFrame(frame)[0]
+
+    def getNormals(self, frame):
+        """
+        Return the flat (x, y, z per point) normals for the specified frame index.
+        @param frame: Frame index.
+        @type frame: int
+        """
+        if not self.normals: raise Exception('Point cache "' + self.filePath + '" does not store normals!')
+        return self._readFrame(frame)[1]
+
+    def close(self):
+        """
+        Close the cache file.
+        """
+        if self._file is not None: self._file.close()
+        self._file = None
+
+    def _readFrame(self, frame):
+        """
+        Read and decode a single frame chunk. Returns (points, normals).
+        """
+        # Read Chunk
+        time, offset, size, rawSize = self.index[frame]
+        self._file.seek(offset)
+        data = self._file.read(size)
+        if self.compress: data = zlib.decompress(data)
+
+        # Decode Positions
+        code, posType, nrmType = ENCODINGS[self.encoding]
+        count = self.pointCount * 3
+        pos = 0
+        bounds = None
+        if self.encoding == 'quantized':
+            bounds = QUANTIZE_BOUNDS.unpack_from(data, 0)
+            pos = QUANTIZE_BOUNDS.size
+        points = array.array(posType)
+        points.fromstring(data[pos:pos + count * points.itemsize])
+        if sys.byteorder == 'big': points.byteswap()
+        pos += count * points.itemsize
+        if bounds: points = _dequantize(bounds, points)
+
+        # Decode Normals
+        normals = None
+        if self.normals:
+            normals = array.array(nrmType)
+            normals.fromstring(data[pos:pos + count * normals.itemsize])
+            if sys.byteorder == 'big': normals.byteswap()
+            if self.encoding == 'quantized':
+                normals = array.array('f', [n / NORMAL_SCALE for n in normals])
+
+        # Return Result
+        return points, normals
+
+
+def isPointCacheFile(filePath):
+    """
+    Check if the specified file is a binary point cache file.
+    @param filePath: File path to check.
+    @type filePath: str
+    """
+    try:
+        f = open(filePath, 'rb')
+    except IOError:
+        return False
+    magic = f.read(len(MAGIC))
+    f.close()
+    return magic == MAGIC
+
+
+def _readArray(f, typecode, count):
+    """
+    Read a little-endian typed array from a file.
+    """
+    result = array.array(typecode)
+    result.fromstring(f.read(count * result.itemsize))
+    if sys.byteorder == 'big': result.byteswap()
+    return result
+
+
+def _quantize(points):
+    """
+    Quantize flat point positions to 16 bit per component, relative to the point bounds.
+    Returns the bounds (minX, minY, minZ, stepX, stepY, stepZ) and the quantized array.
+    """
+    bounds = []
+    for axis in xrange(3):
+        values = points[axis::3]
+        bounds.append(min(values) if len(values) else 0.0)
+    for axis in xrange(3):
+        values = points[axis::3]
+        bounds.append(((max(values) - bounds[axis]) / float(QUANTIZE_MAX)) if len(values) else 0.0)
+    scale = [(1.0 / step) if step else 0.0 for step in bounds[3:]]
+    result = array.array('H', [int((v - bounds[i % 3]) * scale[i % 3] + 0.5) for i, v in enumerate(points)])
+    return bounds, result
+
+
+def _dequantize(bounds, values):
+    """
+    Convert 16 bit quantized positions back to float positions.
+    """
+    return array.array('f', [bounds[i % 3] + v * bounds[3 + i % 3] for i, v in enumerate(values)])
@@ -1,11 +1,24 @@
 import maya.mel as mel
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
+import time
 
 
 class UserInterupted(Exception): pass
 
 
+# Main progress bar control name (cached)
+_MAIN_PROGRESS_BAR = []
+
+
+def mainProgressBar():
+    """
+    Return the main progress bar control name
+    """
+    if not _MAIN_PROGRESS_BAR: _MAIN_PROGRESS_BAR.append(mel.eval('$tmp = $gMainProgressBar'))
+    return _MAIN_PROGRESS_BAR[0]
+
+
 def init(status, maxValue):
     """
     Initialize Progress Bar
@@ -14,7 +27,7 @@ def init(status, maxValue):
     if OpenMaya.MGlobal.mayaState(): return
 
     # Initialize Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
+    gMainProgressBar = mainProgressBar()
     cmds.progressBar(gMainProgressBar, e=True, bp=True, ii=True, status=status, maxValue=maxValue)
 
 
@@ -26,7 +39,7 @@ def update(step=0, status='', enableUserInterupt=False):
     if OpenMaya.MGlobal.mayaState(): return
 
     # Update Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
+    gMainProgressBar = mainProgressBar()
 
     # Check User Interuption
     if enableUserInterupt:
@@ -49,7 +62,179 @@ def end():
     if OpenMaya.MGlobal.mayaState(): return
 
     # Update Progress Bar
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
+    gMainProgressBar = mainProgressBar()
 
     # End Progress
     cmds.progressBar(gMainProgressBar, e=True, endProgress=True)
+
+
+class Progress(object):
+    """
+    Throttled main progress bar context manager.
+    step() only counts steps. The progress bar is stepped (and user cancellation is polled) at most once per
+    update interval. The clock is only checked every few steps, with the step stride set from the measured
+    step rate at each check (about half an update interval of steps, capped at maxStride), so polls stay
+    close to the update interval as the loop rate changes. In batch mode the progress bar is skipped, and
+    progress is optionally printed as log lines.
+    Usage:
+        with glTools.utils.progressBar.Progress('Smoothing Weights...', len(vtxList)) as progress:
+            for vtx in vtxList:
+                ...
+                progress.step()
+    """
+
+    # Maximum number of steps between clock checks
+    maxStride = 32
+
+    def __init__(self, status='', maxValue=100, interval=0.1, enableUserInterupt=True, raiseOnCancel=True,
+                 show=True, log=False, logInterval=5.0):
+        """
+        Progress class initializer.
+        @param status: Progress status message
+        @type status: str
+        @param maxValue: Total number of steps
+        @type maxValue: int
+        @param interval: Minimum time (in seconds) between progress bar updates
+        @type interval: float
+        @param enableUserInterupt: Poll the progress bar for user cancellation
+        @type enableUserInterupt: bool
+        @param raiseOnCancel: Raise UserInterupted on user cancellation. If False, set the cancelled flag instead.
+        @type raiseOnCancel: bool
+        @param show: Show the main progress bar. If False, progress is not displayed (and can't be cancelled).
+        @type show: bool
+        @param log: Print progress log lines in batch mode (or if show is False)
+        @type log: bool
+        @param logInterval: Minimum time (in seconds) between progress log lines
+        @type logInterval: float
+        """
+        self.status = status
+        self.maxValue = max(int(maxValue), 1)
+        self.interval = interval
+        self.enableUserInterupt = enableUserInterupt
+        self.raiseOnCancel = raiseOnCancel
+        self.interactive = bool(show) and not OpenMaya.MGlobal.mayaState()
+        self.log = log and not self.interactive
+        self.logInterval = logInterval
+
+        self.count = 0
+        self.cancelled = False
+
+        self._active = False
+        self._shown = 0
+        self._stride = 1
+        self._nextCheck = 1
+        self._statusChanged = False
+        self._startTime = 0.0
+        self._lastUpdate = 0.0
+        self._lastCheck = 0.0
+        self._lastCheckCount = 0
+        self._lastLog = 0.0
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.end()
+        return False
+
+    def begin(self):
+        """
+        Begin progress display
+        """
+        self._startTime = self._lastUpdate = self._lastLog = self._lastCheck = time.time()
+        self._lastCheckCount = self.count
+        self._active = True
+        if self.interactive:
+            cmds.progressBar(mainProgressBar(), e=True, bp=True, ii=self.enableUserInterupt,
+                             status=self.status, maxValue=self.maxValue)
+        elif self.log:
+            print('# ' + self.status)
+
+    def step(self, count=1):
+        """
+        Add steps to the progress count. This is cheap enough to be called from hot loops.
+        @param count: Number of steps
+        @type count: int
+        """
+        self.count += count
+        if self.count < self._nextCheck: return
+        self._check()
+
+    def setStatus(self, status, force=False):
+        """
+        Set the progress status message. The progress bar is updated at the next update interval.
+        @param status: Progress status message
+        @type status: str
+        @param force: Update the progress bar immediately
+        @type force: bool
+        """
+        self.status = status
+        self._statusChanged = True
+        if force: self._update(time.time())
+
+    def end(self):
+        """
+        End progress display
+        """
+        if not self._active: return
+        self._active = False
+        if self.interactive:
+            cmds.progressBar(mainProgressBar(), e=True, endProgress=True)
+        elif self.log:
+            print('# ' + self.status + ' - ' + str(self.count) + '/' + str(self.maxValue) +
+                  ' (' + ('%.2f' % (time.time() - self._startTime)) + 's)')
+
+    def _check(self):
+        """
+        Check the clock, and update the progress display if the update interval has elapsed.
+        The step stride is set from the step rate measured since the last check, so the clock is checked about
+        twice per update interval. After an update, the stride is reset to a single step.
+        """
+        now = time.time()
+        steps = self.count - self._lastCheckCount
+        checkTime = now - self._lastCheck
+        self._lastCheck = now
+        self._lastCheckCount = self.count
+
+        if now - self._lastUpdate >= self.interval:
+            self._stride = 1
+            self._update(now)
+        elif checkTime > 0.0:
+            self._stride = max(1, min(int(steps / checkTime * self.interval * 0.5), self.maxStride))
+        else:
+            self._stride = min(self._stride * 2, self.maxStride)
+        self._nextCheck = self.count + self._stride
+
+    def _update(self, now):
+        """
+        Update the progress display and poll for user cancellation.
+        """
+        self._lastUpdate = now
+        if not self._active: return
+
+        if self.interactive:
+
+            # Check User Interuption
+            gMainProgressBar = mainProgressBar()
+            if self.enableUserInterupt and cmds.progressBar(gMainProgressBar, q=True, isCancelled=True):
+                self.cancelled = True
+                if self.raiseOnCancel:
+                    self.end()
+                    raise UserInterupted('Operation cancelled by user!')
+
+            # Update Progress Bar
+            if self._statusChanged:
+                cmds.progressBar(gMainProgressBar, e=True, status=self.status)
+            if self.count > self._shown:
+                cmds.progressBar(gMainProgressBar, e=True, step=self.count - self._shown)
+
+        elif self.log and now - self._lastLog >= self.logInterval:
+
+            # Print Progress
+            self._lastLog = now
+            print('# ' + self.status + ' - ' + str(self.count) + '/' + str(self.maxValue) +
+                  ' (' + str(int(100.0 * self.count / self.maxValue)) + '%)')
+
+        self._shown = self.count
+        self._statusChanged = False
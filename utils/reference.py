@@ -1,6 +1,22 @@
 import maya.mel as mel
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
 import os.path
+import re
+
+# Reference edit commands
+EDIT_COMMANDS = ('parent', 'setAttr', 'addAttr', 'deleteAttr', 'connectAttr', 'disconnectAttr')
+
+# Edit string token - quoted string or unquoted word
+_EDIT_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[^\s;]+')
+
+# setAttr flags that take an argument
+_SETATTR_ARG_FLAGS = ('-k', '-keyable', '-l', '-lock', '-cb', '-channelBox', '-ca', '-caching',
+                      '-type', '-typ', '-s', '-size')
+
+# Reference edit index cache - {refNode: ReferenceEditIndex}
+_EDIT_INDEX = {}
+_EDIT_INDEX_CALLBACKS = []
 
 
 def listReferences(parentNS=None):
@@ -528,6 +544,258 @@ def removeUnloadedReferences():
             cmds.file(referenceNode=refNode, removeReference=True)
 
 
+class ReferenceEditIndex(object):
+    """
+    In-memory table of the edits of a reference node.
+    All edit strings are fetched once (with full node names) and parsed to (command, successful, nodeAttrs, editString)
+    records, so node/attr/command queries with any combination of filters don't need to query the reference again.
+    Use getEditIndex() to get a cached index, which is invalidated when references are loaded, unloaded or removed,
+    or when edits are removed using removeReferenceEdits(). The cache is not updated by edits made during the session
+    (setAttr, connectAttr etc. on referenced nodes), so refresh the index before querying after editing the scene.
+    """
+
+    def __init__(self, refNode):
+        """
+        ReferenceEditIndex class initializer.
+        @param refNode: Reference node to index edits for
+        @type refNode: str
+        """
+        # Check Reference Node
+        if not isReference(refNode):
+            raise Exception('Object "' + refNode + '" is not a valid reference node!')
+
+        self.refNode = refNode
+        self.edits = []
+        self._nodeEdits = {}
+        self._nameCache = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Fetch and parse all edits of the reference node.
+        """
+        self.edits = []
+        self._nodeEdits = {}
+        self._nameCache = {}
+
+        refQueryCmd = 'referenceQuery -showNamespace true -showDagPath true'
+        for successful in (True, False):
+            editQueryCmd = refQueryCmd + ' -successfulEdits ' + str(successful).lower()
+            editQueryCmd += ' -failedEdits ' + str(not successful).lower()
+            for editStr in mel.eval(editQueryCmd + ' -editStrings ' + self.refNode) or []:
+                command, nodeAttrs = parseEditString(editStr)
+                editId = len(self.edits)
+                self.edits.append((command, successful, nodeAttrs, editStr))
+                for node, attr in nodeAttrs:
+                    for key in _editNodeKeys(node):
+                        self._nodeEdits.setdefault(key, set()).add(editId)
+
+    def query(self, node='', successfulEdits=True, failedEdits=True, commands=EDIT_COMMANDS):
+        """
+        Return the (sorted) ids of all edits matching the specified filters.
+        @param node: Edit node name (full path, short name, or name without namespace). If empty, match all nodes.
+        @type node: str
+        @param successfulEdits: Include successful edits
+        @type successfulEdits: bool
+        @param failedEdits: Include failed edits
+        @type failedEdits: bool
+        @param commands: Edit commands to include
+        @type commands: list
+        """
+        if node:
+            editIds = self._nodeEdits.get(node)
+            if editIds is None: editIds = self._nodeEdits.get(node.split('|')[-1], ())
+            editIds = sorted(editIds)
+        else:
+            editIds = xrange(len(self.edits))
+        commands = set(commands)
+        edits = self.edits
+        return [i for i in editIds if edits[i][0] in commands and (successfulEdits if edits[i][1] else failedEdits)]
+
+    def nodes(self, showNamespace=False, showDagPath=False, successfulEdits=True, failedEdits=True,
+              commands=EDIT_COMMANDS):
+        """
+        Return a sorted list of edited nodes.
+        @param showNamespace: Return node names including namespace
+        @type showNamespace: bool
+        @param showDagPath: Return node names with full dag path
+        @type showDagPath: bool
+        @param successfulEdits: Include successful edits
+        @type successfulEdits: bool
+        @param failedEdits: Include failed edits
+        @type failedEdits: bool
+        @param commands: Edit commands to include
+        @type commands: list
+        """
+        nodeList = set()
+        for editId in self.query(successfulEdits=successfulEdits, failedEdits=failedEdits, commands=commands):
+            for node, attr in self.edits[editId][2]:
+                nodeList.add(self._displayName(node, showNamespace, showDagPath))
+        return sorted(nodeList)
+
+    def attrs(self, node='', successfulEdits=True, failedEdits=True, commands=EDIT_COMMANDS):
+        """
+        Return a sorted list of edited attributes.
+        @param node: Edit node to return attributes for. If empty, return the edited attributes of all nodes.
+        @type node: str
+        @param successfulEdits: Include successful edits
+        @type successfulEdits: bool
+        @param failedEdits: Include failed edits
+        @type failedEdits: bool
+        @param commands: Edit commands to include
+        @type commands: list
+        """
+        nodeKeys = node and set(_editNodeKeys(node))
+        attrList = set()
+        for editId in self.query(node, successfulEdits=successfulEdits, failedEdits=failedEdits, commands=commands):
+            for editNode, attr in self.edits[editId][2]:
+                if not attr: continue
+                if nodeKeys and nodeKeys.isdisjoint(_editNodeKeys(editNode)): continue
+                attrList.add(attr)
+        return sorted(attrList)
+
+    def editStrings(self, node='', showNamespace=True, showDagPath=True, successfulEdits=True, failedEdits=True,
+                    commands=EDIT_COMMANDS):
+        """
+        Return a list of edit strings (successful edits first).
+        @param node: Edit node to return edit strings for. If empty, return the edit strings of all nodes.
+        @type node: str
+        @param showNamespace: Return node names including namespace
+        @type showNamespace: bool
+        @param showDagPath: Return node names with full dag path
+        @type showDagPath: bool
+        @param successfulEdits: Include successful edits
+        @type successfulEdits: bool
+        @param failedEdits: Include failed edits
+        @type failedEdits: bool
+        @param commands: Edit commands to include
+        @type commands: list
+        """
+        editIds = self.query(node, successfulEdits=successfulEdits, failedEdits=failedEdits, commands=commands)
+        if showNamespace and showDagPath: return [self.edits[i][3] for i in editIds]
+        return [self._displayEditString(self.edits[i], showNamespace, showDagPath) for i in editIds]
+
+    def _displayEditString(self, edit, showNamespace, showDagPath):
+        """
+        Return an edit string with the (full) edit node names replaced by their display names.
+        """
+        editStr = edit[3]
+        for node in sorted(set([n for n, attr in edit[2]]), key=len, reverse=True):
+            name = self._displayName(node, showNamespace, showDagPath)
+            if name == node: continue
+            editStr = re.sub(r'(?<![\w:|])' + re.escape(node) + r'(?=[."\s;]|$)', lambda m: name, editStr)
+        return editStr
+
+    def _displayName(self, node, showNamespace, showDagPath):
+        """
+        Return the display name of an edit node (cached).
+        """
+        key = (node, showNamespace, showDagPath)
+        name = self._nameCache.get(key)
+        if name is None:
+            name = node if showDagPath else node.split('|')[-1]
+            if not showNamespace: name = '|'.join([i.split(':')[-1] for i in name.split('|')])
+            self._nameCache[key] = name
+        return name
+
+
+def parseEditString(editStr):
+    """
+    Parse a reference edit string to its edit command and a list of edited (node, attr) pairs.
+    The attr is empty for edits that don't target an attribute (parent).
+    @param editStr: Reference edit string to parse
+    @type editStr: str
+    """
+    # Get Command
+    tokenIter = _EDIT_TOKEN_RE.finditer(editStr)
+    command = next(tokenIter).group()
+
+    # setAttr - Only parse the target plug (skip flag arguments and the attribute value)
+    if command == 'setAttr':
+        skipArg = False
+        for token in tokenIter:
+            token = token.group()
+            if token.startswith('"'): return command, [_splitPlug(_unquote(token))]
+            if skipArg:
+                skipArg = False
+                continue
+            if token.startswith('-'):
+                skipArg = token in _SETATTR_ARG_FLAGS
+                continue
+            return command, [_splitPlug(token)]
+        return command, []
+
+    # Get Flags and Arguments
+    tokens = [_unquote(i.group()) for i in tokenIter]
+    args = [i for i in tokens if not i.startswith('-')]
+
+    # Parse Arguments
+    nodeAttrs = []
+    if command == 'addAttr' or command == 'deleteAttr':
+        if args:
+            node, attr = _splitPlug(args[-1])
+            for flag in ('-ln', '-longName', '-at', '-attribute', '-sn', '-shortName'):
+                if attr: break
+                if flag in tokens[:-1]: attr = tokens[tokens.index(flag) + 1]
+            nodeAttrs.append((node, attr))
+    elif command == 'connectAttr' or command == 'disconnectAttr':
+        nodeAttrs = [_splitPlug(i) for i in args[-2:]]
+    elif command == 'parent':
+        nodeAttrs = [(i, '') for i in args]
+
+    # Return Result
+    return command, nodeAttrs
+
+
+def getEditIndex(refNode, refresh=False):
+    """
+    Return the cached edit index for the specified reference node. See ReferenceEditIndex.
+    @param refNode: Reference node to get the edit index for
+    @type refNode: str
+    @param refresh: Re-fetch the reference edits, even if the index is cached
+    @type refresh: bool
+    """
+    # Register Invalidation Callbacks
+    if not _EDIT_INDEX_CALLBACKS:
+        for msg in (OpenMaya.MSceneMessage.kAfterLoadReference,
+                    OpenMaya.MSceneMessage.kAfterUnloadReference,
+                    OpenMaya.MSceneMessage.kAfterRemoveReference,
+                    OpenMaya.MSceneMessage.kAfterImportReference,
+                    OpenMaya.MSceneMessage.kAfterOpen,
+                    OpenMaya.MSceneMessage.kAfterNew):
+            _EDIT_INDEX_CALLBACKS.append(OpenMaya.MSceneMessage.addCallback(msg, _clearEditIndex))
+
+    # Get Edit Index
+    editIndex = _EDIT_INDEX.get(refNode)
+    if editIndex is None:
+        editIndex = _EDIT_INDEX[refNode] = ReferenceEditIndex(refNode)
+    elif refresh:
+        editIndex.refresh()
+
+    # Return Result
+    return editIndex
+
+
+def invalidateEditIndex(refNode=''):
+    """
+    Remove the cached edit index of the specified reference node.
+    @param refNode: Reference node to invalidate the edit index for. If empty, invalidate all edit indices.
+    @type refNode: str
+    """
+    if refNode:
+        _EDIT_INDEX.pop(refNode, None)
+    else:
+        _EDIT_INDEX.clear()
+
+
+def editCommandList(parent=True, setAttr=True, addAttr=True, deleteAttr=True, connectAttr=True, disconnectAttr=True):
+    """
+    Return the list of enabled edit commands.
+    """
+    enabled = (parent, setAttr, addAttr, deleteAttr, connectAttr, disconnectAttr)
+    return [cmd for cmd, state in zip(EDIT_COMMANDS, enabled) if state]
+
+
 def getEditNodes(refNode,
                  showNamespace=False,
                  showDagPath=False,
@@ -538,7 +806,8 @@ def getEditNodes(refNode,
                  addAttr=True,
                  deleteAttr=True,
                  connectAttr=True,
-                 disconnectAttr=True):
+                 disconnectAttr=True,
+                 refresh=True):
     """
     List nodes with reference edits from a specified reference node
     @param refNode: Reference node to get editted nodes from
@@ -563,42 +832,15 @@ def getEditNodes(refNode,
     @type connectAttr: bool
     @param disconnectAttr: Return disconnectAttr command edits
     @type disconnectAttr: bool
+    @param refresh: Re-fetch the reference edits. If False, use the cached edit index (see getEditIndex()).
+    @type refresh: bool
     """
-    # ================================
-    # - Build ReferenceQuery Command -
-    # ================================
-
-    refQueryCmd = 'referenceQuery '
-    refQueryCmd += ' -showNamespace ' + str(showNamespace).lower()
-    refQueryCmd += ' -showDagPath ' + str(showDagPath).lower()
-    refQueryCmd += ' -successfulEdits ' + str(successfulEdits).lower()
-    refQueryCmd += ' -failedEdits ' + str(failedEdits).lower()
-
-    nodeList = []
-    if parent and setAttr and addAttr and deleteAttr and connectAttr and disconnectAttr:
-        nodeList.extend(mel.eval(refQueryCmd + ' -editNodes ' + refNode) or [])
-    else:
-        if parent: nodeList.extend(mel.eval(refQueryCmd + ' -editCommand parent -editNodes ' + refNode) or [])
-        if setAttr: nodeList.extend(mel.eval(refQueryCmd + ' -editCommand setAttr -editNodes ' + refNode) or [])
-        if addAttr: nodeList.extend(mel.eval(refQueryCmd + ' -editCommand addAttr -editNodes ' + refNode) or [])
-        if deleteAttr: nodeList.extend(mel.eval(refQueryCmd + ' -editCommand deleteAttr -editNodes ' + refNode) or [])
-        if connectAttr: nodeList.extend(mel.eval(refQueryCmd + ' -editCommand connectAttr -editNodes ' + refNode) or [])
-        if disconnectAttr: nodeList.extend(
-            mel.eval(refQueryCmd + ' -editCommand disconnectAttr -editNodes ' + refNode) or [])
-
-    # Remove Duplicates and Sort
-    if nodeList:
-        nodeList = list(set(nodeList))
-        nodeList.sort()
-
-    # Clean Node Names
-    if not showDagPath: nodeList = [i.split('|')[-1] for i in nodeList]
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return nodeList
+    commands = editCommandList(parent, setAttr, addAttr, deleteAttr, connectAttr, disconnectAttr)
+    return getEditIndex(refNode, refresh).nodes(showNamespace=showNamespace,
+                                       showDagPath=showDagPath,
+                                       successfulEdits=successfulEdits,
+                                       failedEdits=failedEdits,
+                                       commands=commands)
 
 
 def getEditAttrs(refNode,
@@ -612,7 +854,8 @@ def getEditAttrs(refNode,
                  addAttr=True,
                  deleteAttr=True,
                  connectAttr=True,
-                 disconnectAttr=True):
+                 disconnectAttr=True,
+                 refresh=True):
     """
     List nodes with reference edits from a specified reference node
     @param refNode: Reference node to get editted nodes from
@@ -639,54 +882,14 @@ def getEditAttrs(refNode,
     @type connectAttr: bool
     @param disconnectAttr: Return disconnectAttr command edits
     @type disconnectAttr: bool
+    @param refresh: Re-fetch the reference edits. If False, use the cached edit index (see getEditIndex()).
+    @type refresh: bool
     """
-    # ==============
-    # - Check Node -
-    # ==============
-
-    refNS = getNamespace(refNode) + ':'
-    editNode = node
-
-    # Check Short Name
-    # if not cmds.objExists(node): node = node.split('|')[-1]
-    # Check Append NS
-    # if not cmds.objExists(node): node = refNS+node
-    node = refNS + node
-    # Unable to Determine Node
-    # if not cmds.objExists(node): raise Exception('Reference edit node "'+editNode+'" not found!')
-
-    # ================================
-    # - Build ReferenceQuery Command -
-    # ================================
-
-    refQueryCmd = 'referenceQuery '
-    refQueryCmd += ' -showNamespace ' + str(showNamespace).lower()
-    refQueryCmd += ' -showDagPath ' + str(showDagPath).lower()
-    refQueryCmd += ' -successfulEdits ' + str(successfulEdits).lower()
-    refQueryCmd += ' -failedEdits ' + str(failedEdits).lower()
-
-    attrList = []
-    if parent and setAttr and addAttr and deleteAttr and connectAttr and disconnectAttr:
-        attrList.extend(mel.eval(refQueryCmd + ' -editAttrs ' + node) or [])
-    else:
-        if parent: attrList.extend(mel.eval(refQueryCmd + ' -editCommand parent -editAttrs ' + node) or [])
-        if setAttr: attrList.extend(mel.eval(refQueryCmd + ' -editCommand setAttr -editAttrs ' + node) or [])
-        if addAttr: attrList.extend(mel.eval(refQueryCmd + ' -editCommand addAttr -editAttrs ' + node) or [])
-        if deleteAttr: attrList.extend(mel.eval(refQueryCmd + ' -editCommand deleteAttr -editAttrs ' + node) or [])
-        if connectAttr: attrList.extend(mel.eval(refQueryCmd + ' -editCommand connectAttr -editAttrs ' + node) or [])
-        if disconnectAttr: attrList.extend(
-            mel.eval(refQueryCmd + ' -editCommand disconnectAttr -editAttrs ' + node) or [])
-
-    # Remove Duplicates and Sort
-    if attrList:
-        attrList = list(set(attrList))
-        attrList.sort()
-
-    # =================
-    # - Return Result -
-    # =================
-
-    return attrList
+    commands = editCommandList(parent, setAttr, addAttr, deleteAttr, connectAttr, disconnectAttr)
+    return getEditIndex(refNode, refresh).attrs(node,
+                                       successfulEdits=successfulEdits,
+                                       failedEdits=failedEdits,
+                                       commands=commands)
 
 
 def getEditCommands(refNode,
@@ -700,7 +903,8 @@ def getEditCommands(refNode,
                     addAttr=True,
                     deleteAttr=True,
                     connectAttr=True,
-                    disconnectAttr=True):
+                    disconnectAttr=True,
+                    refresh=True):
     """
     Remove reference edits from a specified list of nodes
     @param refNode: Reference node to get editted nodes from
@@ -727,56 +931,54 @@ def getEditCommands(refNode,
     @type connectAttr: bool
     @param disconnectAttr: Return disconnectAttr command edits
     @type disconnectAttr: bool
+    @param refresh: Re-fetch the reference edits. If False, use the cached edit index (see getEditIndex()).
+    @type refresh: bool
     """
-    # ==============
-    # - Check Node -
-    # ==============
+    commands = editCommandList(parent, setAttr, addAttr, deleteAttr, connectAttr, disconnectAttr)
+    cmdList = getEditIndex(refNode, refresh).editStrings(node,
+                                                         showNamespace=showNamespace,
+                                                         showDagPath=showDagPath,
+                                                         successfulEdits=successfulEdits,
+                                                         failedEdits=failedEdits,
+                                                         commands=commands)
+
+    # Remove Duplicates
+    cmdSet = set()
+    cmdList = [i for i in cmdList if not (i in cmdSet or cmdSet.add(i))]
 
-    refNS = getNamespace(refNode) + ':'
-    editNode = node
+    # Return Result
+    return cmdList
 
-    if not node:
-        node = refNode
-    else:
-        node = refNS + node
-
-    # Check Short Name
-    # if not cmds.objExists(node): node = node.split('|')[-1]
-    # Check Append NS
-    # if not cmds.objExists(node): node = refNS+node
-    # node = refNS+node
-    # Unable to Determine Node
-    # if not cmds.objExists(node): raise Exception('Reference edit node "'+editNode+'" not found!')
-
-    # ================================
-    # - Build ReferenceQuery Command -
-    # ================================
-
-    refQueryCmd = 'referenceQuery '
-    refQueryCmd += ' -showNamespace ' + str(showNamespace).lower()
-    refQueryCmd += ' -showDagPath ' + str(showDagPath).lower()
-    refQueryCmd += ' -successfulEdits ' + str(successfulEdits).lower()
-    refQueryCmd += ' -failedEdits ' + str(failedEdits).lower()
 
-    cmdList = []
-    if parent and setAttr and addAttr and deleteAttr and connectAttr and disconnectAttr:
-        cmdList.extend(mel.eval(refQueryCmd + ' -editStrings ' + node) or [])
-    else:
-        if parent: cmdList.extend(mel.eval(refQueryCmd + ' -editCommand parent -editStrings ' + node) or [])
-        if setAttr: cmdList.extend(mel.eval(refQueryCmd + ' -editCommand setAttr -editStrings ' + node) or [])
-        if addAttr: cmdList.extend(mel.eval(refQueryCmd + ' -editCommand addAttr -editStrings ' + node) or [])
-        if deleteAttr: cmdList.extend(mel.eval(refQueryCmd + ' -editCommand deleteAttr -editStrings ' + node) or [])
-        if connectAttr: cmdList.extend(mel.eval(refQueryCmd + ' -editCommand connectAttr -editStrings ' + node) or [])
-        if disconnectAttr: cmdList.extend(
-            mel.eval(refQueryCmd + ' -editCommand disconnectAttr -editStrings ' + node) or [])
-
-    # Remove Duplicates and Sort
-    if cmdList:
-        cmdList = list(set(cmdList))
-    # cmdList.sort()
+def _editNodeKeys(node):
+    """
+    Return the lookup keys of an edit node name - full name, short name and short name without namespace.
+    """
+    shortName = node.split('|')[-1]
+    return (node, shortName, shortName.split(':')[-1])
 
-    # Return Result
-    return cmdList
+
+def _unquote(token):
+    """
+    Remove the quotes from a quoted edit string token.
+    """
+    if len(token) > 1 and token[0] == '"' and token[-1] == '"': return token[1:-1]
+    return token
+
+
+def _splitPlug(plug):
+    """
+    Split a plug name to a (node, attr) pair.
+    """
+    if '.' in plug: return tuple(plug.split('.', 1))
+    return plug, ''
+
+
+def _clearEditIndex(*args):
+    """
+    Scene message callback - Clear the edit index cache.
+    """
+    _EDIT_INDEX.clear()
 
 
 def removeReferenceEdits(refNode,
@@ -852,6 +1054,9 @@ def removeReferenceEdits(refNode,
         if connectAttr: mel.eval(refQueryCmd + '-editCommand connectAttr -removeEdits ' + node)
         if disconnectAttr: mel.eval(refQueryCmd + '-editCommand disconnectAttr -removeEdits ' + node)
 
+    # Invalidate Edit Index
+    invalidateEditIndex(refNode)
+
     # Reload Reference
     if refLoaded: cmds.file(loadReference=refNode)
 
@@ -873,6 +1078,9 @@ def removeParentEdits(node=''):
     # Remove Edits - referenceEdit command not working correctly using python WTF??
     mel.eval('referenceEdit -removeEdits -failedEdits true -successfulEdits true -editCommand parent ' + refNode)
 
+    # Invalidate Edit Index
+    invalidateEditIndex(refNode)
+
     # Reload Reference
     if refLoaded: cmds.file(loadReference=refNode)
 
@@ -890,6 +1098,9 @@ def removeSetAttrEdits(node='', refFile=''):
     # Remove Edits - referenceEdit command not working correctly using python WTF??
     mel.eval('referenceEdit -removeEdits -failedEdits true -successfulEdits true -editCommand setAttr "' + refFile + '"')
 
+    # Invalidate Edit Index
+    invalidateEditIndex(refNode)
+
     # Reload Reference
     if refLoaded: cmds.file(loadReference=refNode)
 
@@ -910,5 +1121,8 @@ def removeConnectAttrEdits(nodeList=''):
         mel.eval(
             'referenceEdit -failedEdits true -successfulEdits true -editCommand disconnectAttr -removeEdits ' + node)
 
+    # Invalidate Edit Index
+    invalidateEditIndex(refNode)
+
     # Reload Reference
     if refLoaded: cmds.file(loadReference=refNode)
@@ -8,6 +8,7 @@ import glTools.utils.joint
 import glTools.utils.mesh
 import glTools.utils.selection
 import glTools.utils.stringUtils
+import glTools.utils.weightList
 import glTools.utils.mathUtils
 
 
@@ -315,9 +316,8 @@ def setInfluenceWeights(skinCluster, influence, weightList, normalize=True, comp
     infIndexArray = OpenMaya.MIntArray()
     infIndexArray.append(influenceIndex)
 
-    wtArray = OpenMaya.MDoubleArray()
+    wtArray = glTools.utils.weightList.WeightArray(weightList).toMDoubleArray()
     oldWtArray = OpenMaya.MDoubleArray()
-    [wtArray.append(i) for i in weightList]
 
     # Set skinCluster weight values
     skinFn.setWeights(componentSel[0], componentSel[1], infIndexArray, wtArray, normalize, oldWtArray)
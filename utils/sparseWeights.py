@@ -0,0 +1,414 @@
+import array
+import bisect
+import itertools
+
+
+class SparseWeights(object):
+    """
+    Sparse (CSR) weight storage for multi-influence deformers.
+    Each point stores only its non-zero influence weights:
+        offsets[pt]:offsets[pt+1] - Entry range for point "pt"
+        indices[entry]            - Influence index (into influenceList)
+        values[entry]             - Weight value
+    """
+
+    def __init__(self, influenceList=None, pointCount=0):
+        """
+        SparseWeights class initializer.
+        @param influenceList: Ordered list of influences (weight columns).
+        @type influenceList: list
+        @param pointCount: Number of points (weight rows).
+        @type pointCount: int
+        """
+        self.influenceList = list(influenceList or [])
+        self.offsets = array.array('i', [0]) * (pointCount + 1)
+        self.indices = array.array('i')
+        self.values = array.array('d')
+
+    # ================
+    # - Construction -
+    # ================
+
+    @classmethod
+    def fromWeightArray(cls, weights, influenceList, tolerance=0.0):
+        """
+        Build sparse weights from a flat (point major) weight array, as returned by MFnSkinCluster.getWeights().
+        @param weights: Flat weight list. [pt0inf0, pt0inf1, ..., pt1inf0, pt1inf1, ...]
+        @type weights: list or OpenMaya.MDoubleArray
+        @param influenceList: Ordered list of influences matching the weight array layout.
+        @type influenceList: list
+        @param tolerance: Weight values with an absolute value less than or equal to this are discarded.
+        @type tolerance: float
+        """
+        # Check Influence List
+        infCount = len(influenceList)
+        if not infCount: return cls(influenceList, 0)
+        if len(weights) % infCount:
+            raise Exception('Weight array length (' + str(len(weights)) + ') is not a multiple of the influence count (' + str(infCount) + ')!')
+
+        # Get Non-Zero Entries
+        entries = _nonZero(weights, tolerance)
+        rows = [i // infCount for i in entries]
+        cols = [i % infCount for i in entries]
+        values = [weights[i] for i in entries]
+
+        # Return Result
+        return cls._fromEntries(influenceList, len(weights) // infCount, rows, cols, values)
+
+    @classmethod
+    def fromInfluenceWeights(cls, influenceWeights, influenceList, tolerance=0.0):
+        """
+        Build sparse weights from a list of dense per influence weight lists.
+        @param influenceWeights: List of dense weight lists, one per influence.
+        @type influenceWeights: list
+        @param influenceList: Ordered list of influences matching the weight lists.
+        @type influenceList: list
+        @param tolerance: Weight values with an absolute value less than or equal to this are discarded.
+        @type tolerance: float
+        """
+        # Check Influence List
+        if len(influenceWeights) != len(influenceList):
+            raise Exception('Influence weight list count does not match the influence list length!')
+        pointCount = max([len(wt) for wt in influenceWeights] or [0])
+
+        # Get Non-Zero Entries (point major order)
+        infCount = len(influenceList)
+        keys = []
+        values = []
+        for col, wt in enumerate(influenceWeights):
+            entries = _nonZero(wt, tolerance)
+            keys.extend([i * infCount + col for i in entries])
+            values.extend([wt[i] for i in entries])
+        order = sorted(xrange(len(keys)), key=keys.__getitem__)
+
+        rows = [keys[i] // infCount for i in order]
+        cols = [keys[i] % infCount for i in order]
+        values = [values[i] for i in order]
+
+        # Return Result
+        return cls._fromEntries(influenceList, pointCount, rows, cols, values)
+
+    @classmethod
+    def fromRows(cls, rows, influenceList):
+        """
+        Build sparse weights from a list of {column: value} dictionaries, one per point.
+        Zero weight values are discarded.
+        @param rows: List of point weight dictionaries, keyed by influence column index.
+        @type rows: list
+        @param influenceList: Ordered list of influences (weight columns).
+        @type influenceList: list
+        """
+        result = cls(influenceList, 0)
+        result.setRows(rows)
+        return result
+
+    @classmethod
+    def _fromEntries(cls, influenceList, pointCount, rows, cols, values):
+        """
+        Build sparse weights from per entry row, column and value lists. Rows must be sorted.
+        """
+        result = cls(influenceList, 0)
+        result.offsets = array.array('i', [bisect.bisect_left(rows, pt) for pt in xrange(pointCount + 1)])
+        result.indices = array.array('i', cols)
+        result.values = array.array('d', values)
+        return result
+
+    # =========
+    # - Query -
+    # =========
+
+    def pointCount(self):
+        """
+        Return the number of points (weight rows).
+        """
+        return len(self.offsets) - 1
+
+    def entryCount(self):
+        """
+        Return the number of stored (non-zero) weight values.
+        """
+        return len(self.values)
+
+    def hasInfluence(self, influence):
+        """
+        Check if the specified influence has a weight column.
+        @param influence: Influence to check.
+        @type influence: str
+        """
+        return influence in self.influenceList
+
+    def getInfluenceIndex(self, influence):
+        """
+        Return the weight column index of the specified influence.
+        @param influence: Influence to get the index for.
+        @type influence: str
+        """
+        if not influence in self.influenceList:
+            raise Exception('No weight data stored for influence "' + influence + '"!')
+        return self.influenceList.index(influence)
+
+    def getPointWeights(self, point):
+        """
+        Return the non-zero influence weights of a single point as a dictionary.
+        @param point: Point index.
+        @type point: int
+        """
+        start, end = self.offsets[point], self.offsets[point + 1]
+        return dict([(self.influenceList[self.indices[e]], self.values[e]) for e in xrange(start, end)])
+
+    def getInfluenceWeights(self, influence):
+        """
+        Return a dense weight list (one value per point) for the specified influence.
+        @param influence: Influence to get weights for.
+        @type influence: str
+        """
+        col = self.getInfluenceIndex(influence)
+        result = [0.0] * self.pointCount()
+        offsets = self.offsets
+        values = self.values
+        for e in [e for e, c in enumerate(self.indices) if c == col]:
+            result[bisect.bisect_right(offsets, e) - 1] = values[e]
+        return result
+
+    def getRows(self):
+        """
+        Return the weights as a list of {column: value} dictionaries, one per point.
+        """
+        offsets, indices, values = self.offsets, self.indices, self.values
+        return [dict(itertools.izip(indices[offsets[pt]:offsets[pt + 1]], values[offsets[pt]:offsets[pt + 1]]))
+                for pt in xrange(self.pointCount())]
+
+    def toWeightArray(self, influenceList=None, pointList=None):
+        """
+        Return a flat (point major) weight list for the specified influences and points.
+        The result is laid out as expected by MFnSkinCluster.setWeights().
+        @param influenceList: Ordered list of influences to return weights for. If None, use all influences.
+        @type influenceList: list or None
+        @param pointList: List of point indices to return weights for. If None, use all points.
+        @type pointList: list or None
+        """
+        if influenceList is None: influenceList = self.influenceList
+        if pointList is None: pointList = xrange(self.pointCount())
+
+        # Map Stored Columns to Output Columns
+        colMap = {}
+        for j, influence in enumerate(influenceList):
+            if influence in self.influenceList: colMap[self.influenceList.index(influence)] = j
+
+        # Build Weight Array
+        infCount = len(influenceList)
+        offsets = self.offsets
+        indices = self.indices
+        values = self.values
+        result = [0.0] * (len(pointList) * infCount)
+        for i, pt in enumerate(pointList):
+            base = i * infCount
+            for e in xrange(offsets[pt], offsets[pt + 1]):
+                j = colMap.get(indices[e])
+                if j is not None: result[base + j] = values[e]
+
+        # Return Result
+        return result
+
+    # ========
+    # - Edit -
+    # ========
+
+    def addInfluence(self, influence):
+        """
+        Add an (empty) weight column for the specified influence. Returns the influence column index.
+        @param influence: Influence to add.
+        @type influence: str
+        """
+        if not influence in self.influenceList: self.influenceList.append(influence)
+        return self.influenceList.index(influence)
+
+    def removeInfluence(self, influence):
+        """
+        Remove the weight column of the specified influence.
+        @param influence: Influence to remove.
+        @type influence: str
+        """
+        col = self.getInfluenceIndex(influence)
+        self._filterEntries(lambda c, wt: None if c == col else (c - 1 if c > col else c))
+        self.influenceList.pop(col)
+
+    def setInfluenceWeights(self, influence, weights):
+        """
+        Set the weights of an influence from a dense weight list (one value per point).
+        @param influence: Influence to set weights for.
+        @type influence: str
+        @param weights: Dense weight list.
+        @type weights: list
+        """
+        if len(weights) != self.pointCount():
+            raise Exception('Weight list length (' + str(len(weights)) + ') does not match point count (' + str(self.pointCount()) + ')!')
+        col = self.addInfluence(influence)
+        self._setColumn(col, lambda pt, start, end: weights[pt])
+
+    def swapInfluences(self, influence1, influence2):
+        """
+        Swap the weights of two influences.
+        @param influence1: First influence to swap weights for.
+        @type influence1: str
+        @param influence2: Second influence to swap weights for.
+        @type influence2: str
+        """
+        col1 = self.getInfluenceIndex(influence1)
+        col2 = self.getInfluenceIndex(influence2)
+        self.influenceList[col1], self.influenceList[col2] = influence2, influence1
+
+    def moveInfluence(self, sourceInfluence, targetInfluence, mode='add'):
+        """
+        Move the weights of one influence to another, leaving the source influence with zero weights.
+        @param sourceInfluence: Influence to move weights from.
+        @type sourceInfluence: str
+        @param targetInfluence: Influence to move weights to.
+        @type targetInfluence: str
+        @param mode: Move mode. "add" adds the source weights to the target, "replace" overwrites the target weights.
+        @type mode: str
+        """
+        if not mode in ['add', 'replace']:
+            raise Exception('Invalid mode value ("' + mode + '")!')
+        src = self.getInfluenceIndex(sourceInfluence)
+        tgt = self.addInfluence(targetInfluence)
+        if src == tgt: return
+
+        if mode == 'add':
+            move = lambda pt, start, end: self._getEntry(start, end, tgt) + self._getEntry(start, end, src)
+        else:
+            move = lambda pt, start, end: self._getEntry(start, end, src)
+        self._setColumn(tgt, move, removeCol=src)
+
+    def combineInfluences(self, sourceInfluenceList, targetInfluence, removeSource=False):
+        """
+        Set the weights of the target influence to the sum of the source influence weights.
+        @param sourceInfluenceList: List of influences to combine.
+        @type sourceInfluenceList: list
+        @param targetInfluence: Influence to assign the combined weights to.
+        @type targetInfluence: str
+        @param removeSource: Remove the source influence weight columns (other than the target).
+        @type removeSource: bool
+        """
+        srcList = [self.getInfluenceIndex(inf) for inf in sourceInfluenceList]
+        tgt = self.addInfluence(targetInfluence)
+        self._setColumn(tgt, lambda pt, start, end: sum([self._getEntry(start, end, src) for src in srcList]))
+
+        # Remove Source Influences
+        if removeSource:
+            for influence in sourceInfluenceList:
+                if influence != targetInfluence: self.removeInfluence(influence)
+
+    def renameInfluence(self, oldInfluence, newInfluence):
+        """
+        Rename an influence weight column. Any existing weights for the new influence name are replaced.
+        @param oldInfluence: Influence to rename.
+        @type oldInfluence: str
+        @param newInfluence: New influence name.
+        @type newInfluence: str
+        """
+        if oldInfluence == newInfluence: return
+        if newInfluence in self.influenceList:
+            self.moveInfluence(oldInfluence, newInfluence, mode='replace')
+            self.removeInfluence(oldInfluence)
+        else:
+            self.influenceList[self.getInfluenceIndex(oldInfluence)] = newInfluence
+
+    def prune(self, tolerance=0.0001):
+        """
+        Remove weight values with an absolute value less than or equal to the specified tolerance.
+        @param tolerance: Prune tolerance.
+        @type tolerance: float
+        """
+        self._filterEntries(lambda c, wt: c if abs(wt) > tolerance else None)
+
+    def setRows(self, rows):
+        """
+        Replace all weights from a list of {column: value} dictionaries, one per point.
+        Zero weight values are discarded.
+        @param rows: List of point weight dictionaries, keyed by influence column index.
+        @type rows: list
+        """
+        offsets = array.array('i', [0])
+        indices = array.array('i')
+        values = array.array('d')
+        for row in rows:
+            for col in sorted(row):
+                if row[col]:
+                    indices.append(col)
+                    values.append(row[col])
+            offsets.append(len(values))
+        self.offsets, self.indices, self.values = offsets, indices, values
+
+    def _getEntry(self, start, end, col):
+        """
+        Return the weight value of a column within the (sorted) entry range of a point, or 0.0 if not stored.
+        """
+        e = bisect.bisect_left(self.indices, col, start, end)
+        if e < end and self.indices[e] == col: return self.values[e]
+        return 0.0
+
+    def _filterEntries(self, func):
+        """
+        Rebuild the sparse arrays by mapping the column of each stored entry.
+        The function is called as func(col, value), and returns the new column or None to discard the entry.
+        The column order of each point must be preserved.
+        """
+        offsets, indices, values = self.offsets, self.indices, self.values
+        newOffsets = array.array('i', [0]) * len(offsets)
+        newIndices = array.array('i')
+        newValues = array.array('d')
+        for pt in xrange(self.pointCount()):
+            for e in xrange(offsets[pt], offsets[pt + 1]):
+                col = func(indices[e], values[e])
+                if col is None: continue
+                newIndices.append(col)
+                newValues.append(values[e])
+            newOffsets[pt + 1] = len(newValues)
+        self.offsets, self.indices, self.values = newOffsets, newIndices, newValues
+
+    def _setColumn(self, col, func, removeCol=None):
+        """
+        Rebuild the sparse arrays with new weight values for a single column, optionally removing the entries of
+        another column. The function is called as func(point, start, end) with the current entry range of the point,
+        and returns the new column weight. Zero weight values are discarded.
+        """
+        offsets, indices, values = self.offsets, self.indices, self.values
+        newOffsets = array.array('i', [0]) * len(offsets)
+        newIndices = array.array('i')
+        newValues = array.array('d')
+        for pt in xrange(self.pointCount()):
+            start, end = offsets[pt], offsets[pt + 1]
+            wt = func(pt, start, end)
+
+            # Copy Point Entries (without the edited columns)
+            rowIndices = indices[start:end]
+            rowValues = values[start:end]
+            for c in ([col] if removeCol is None else [col, removeCol]):
+                e = bisect.bisect_left(rowIndices, c)
+                if e < len(rowIndices) and rowIndices[e] == c:
+                    del rowIndices[e]
+                    del rowValues[e]
+
+            # Insert Column Weight
+            if wt:
+                e = bisect.bisect_left(rowIndices, col)
+                rowIndices.insert(e, col)
+                rowValues.insert(e, wt)
+
+            newIndices.extend(rowIndices)
+            newValues.extend(rowValues)
+            newOffsets[pt + 1] = len(newValues)
+        self.offsets, self.indices, self.values = newOffsets, newIndices, newValues
+
+
+def _nonZero(weights, tolerance=0.0):
+    """
+    Return the indices of all weight values with an absolute value greater than the specified tolerance.
+    @param weights: Weight list.
+    @type weights: list
+    @param tolerance: Zero tolerance.
+    @type tolerance: float
+    """
+    if tolerance: return [i for i, wt in enumerate(weights) if abs(wt) > tolerance]
+    return list(itertools.compress(xrange(len(weights)), weights))
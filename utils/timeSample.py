@@ -0,0 +1,461 @@
+import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import glTools.utils.matrix
+import array
+
+
+class TimeSampler(object):
+    """
+    Multi-frame sampling engine.
+    Sample targets (points, geometry, plug values and matrices) are registered once, then evaluated at a list of
+    times using a time context (MDGContext), without changing the current scene time.
+    All targets are evaluated together for each sample time, and geometry data is read once per frame no matter
+    how many components of it are sampled.
+    Results are stored as flat frame major double arrays:
+        points   : frames * pointCount * 3
+        normals  : frames * normalCount * 3
+        values   : frames * valueCount
+        matrices : frames * matrixCount * 16
+    NOTE: Nodes that rely on the current time being set (dynamics/simulation, some expressions) will not evaluate
+    correctly in a time context, and should still be sampled by changing the current time.
+    """
+
+    def __init__(self):
+        """
+        TimeSampler class initializer.
+        """
+        # Sample Targets
+        self._geometry = []  # [(plug, geometryType, [(column, index)], normalColumn)]
+        self._geometryIndex = {}  # {(shape, worldSpace): geometryID}
+        self._transforms = []  # [(column, worldMatrixPlug, rotatePivotPlug)]
+        self._static = []  # [(column, (x, y, z))]
+        self._values = []  # [(column, plug)]
+        self._matrices = []  # [(column, matrixPlug)]
+
+        # Target Counts
+        self.pointCount = 0
+        self.normalCount = 0
+        self.valueCount = 0
+        self.matrixCount = 0
+
+        # Sample Results
+        self.times = array.array('d')
+        self.points = array.array('d')
+        self.normals = array.array('d')
+        self.values = array.array('d')
+        self.matrices = array.array('d')
+
+    # ===============
+    # - Add Targets -
+    # ===============
+
+    def addPoint(self, point):
+        """
+        Add a world space point sample target. Returns the point column index.
+        @param point: Transform (world space rotate pivot), single component (mesh.vtx[#], curve.cv[#],
+        surface.cv[#][#]) or static (x, y, z) position.
+        @type point: str or list or tuple
+        """
+        # Static Point
+        if isinstance(point, (list, tuple)):
+            if len(point) < 3:
+                raise Exception('Invalid point value supplied! Not enough list/tuple elements!')
+            column = self._addPointColumn()
+            self._static.append((column, tuple(point[0:3])))
+            return column
+
+        # Get DagPath and Component
+        dagPath, component = _getDagPathComponent(point)
+
+        # Transform
+        if component.isNull():
+            if not dagPath.hasFn(OpenMaya.MFn.kTransform):
+                raise Exception('Invalid point "' + point + '"! Specify a transform, single component or position.')
+            depFn = OpenMaya.MFnDependencyNode(dagPath.node())
+            matrixPlug = depFn.findPlug('worldMatrix').elementByLogicalIndex(dagPath.instanceNumber())
+            column = self._addPointColumn()
+            self._transforms.append((column, matrixPlug, depFn.findPlug('rotatePivot')))
+            return column
+
+        # Component
+        indexList = _getComponentIndices(dagPath, component)
+        if len(indexList) != 1:
+            raise Exception('Invalid point "' + point + '"! Only single components can be added as points.')
+        geoID = self._getGeometry(dagPath, worldSpace=True)
+        column = self._addPointColumn()
+        self._geometry[geoID][2].append((column, indexList[0]))
+        return column
+
+    def addPoints(self, pointList):
+        """
+        Add a list of world space point sample targets. Returns the list of point column indices.
+        @param pointList: List of points to add. See addPoint().
+        @type pointList: list
+        """
+        return [self.addPoint(point) for point in pointList]
+
+    def addGeometry(self, geometry, worldSpace=True, normals=False):
+        """
+        Add all the points (vertices/CVs) of a geometry as sample targets. Returns the first point column index.
+        Point (and normal) columns are consecutive, in geometry point order.
+        @param geometry: Mesh, nurbsCurve or nurbsSurface to sample.
+        @type geometry: str
+        @param worldSpace: Sample world space positions instead of object space positions.
+        @type worldSpace: bool
+        @param normals: Sample per vertex normals. Mesh only. Normal columns are allocated consecutively, in the
+        order that geometry is added with normals.
+        @type normals: bool
+        """
+        # Get Geometry
+        dagPath, component = _getDagPathComponent(geometry)
+        if not component.isNull():
+            raise Exception('Invalid geometry "' + geometry + '"! Use addPoint() to add components.')
+        dagPath.extendToShape()
+        geoID = self._getGeometry(dagPath, worldSpace)
+        plug, geoType, items, normalColumn = self._geometry[geoID]
+
+        # Add Point Columns
+        pointCount = _getPointCount(dagPath, geoType)
+        start = self.pointCount
+        for i in xrange(pointCount):
+            items.append((self._addPointColumn(), i))
+
+        # Add Normal Columns
+        if normals and normalColumn < 0:
+            if geoType != 'mesh':
+                raise Exception('Normals can only be sampled for mesh geometry! ("' + geometry + '")')
+            self._geometry[geoID] = (plug, geoType, items, self.normalCount)
+            self.normalCount += pointCount
+
+        # Return Result
+        return start
+
+    def addPlug(self, attribute):
+        """
+        Add numeric plug value sample targets. Returns the list of value column indices.
+        Compound plugs (ie. translate) add one value column per child plug.
+        Angle and distance values are returned in UI units, to match getAttr.
+        @param attribute: Attribute to sample.
+        @type attribute: str
+        """
+        plug = _getPlug(attribute)
+        plugList = [plug.child(i) for i in xrange(plug.numChildren())] if plug.isCompound() else [plug]
+        columns = []
+        for childPlug in plugList:
+            columns.append(self.valueCount)
+            self._values.append((self.valueCount, childPlug))
+            self.valueCount += 1
+        return columns
+
+    def addMatrix(self, transform, local=False):
+        """
+        Add a transform matrix sample target. Returns the matrix column index.
+        @param transform: Transform to sample the matrix of.
+        @type transform: str
+        @param local: Sample the local matrix instead of the world matrix.
+        @type local: bool
+        """
+        dagPath, component = _getDagPathComponent(transform)
+        depFn = OpenMaya.MFnDependencyNode(dagPath.node())
+        if local:
+            plug = depFn.findPlug('matrix')
+        else:
+            plug = depFn.findPlug('worldMatrix').elementByLogicalIndex(dagPath.instanceNumber())
+        column = self.matrixCount
+        self._matrices.append((column, plug))
+        self.matrixCount += 1
+        return column
+
+    # ==========
+    # - Sample -
+    # ==========
+
+    def sample(self, times):
+        """
+        Evaluate all sample targets at the specified times. Results are stored to the points, normals,
+        values and matrices arrays of this sampler, one block per sample time.
+        @param times: List of times (UI units) to sample.
+        @type times: list
+        """
+        times = array.array('d', times)
+        frameCount = len(times)
+
+        # Allocate Results
+        self.times = times
+        self.points = array.array('d', [0.0]) * (frameCount * self.pointCount * 3)
+        self.normals = array.array('d', [0.0]) * (frameCount * self.normalCount * 3)
+        self.values = array.array('d', [0.0]) * (frameCount * self.valueCount)
+        self.matrices = array.array('d', [0.0]) * (frameCount * self.matrixCount * 16)
+
+        # Sample Frames
+        for f, (points, normals, values, matrices) in enumerate(self.iterSamples(times)):
+            self.points[f * len(points):(f + 1) * len(points)] = points
+            self.normals[f * len(normals):(f + 1) * len(normals)] = normals
+            self.values[f * len(values):(f + 1) * len(values)] = values
+            self.matrices[f * len(matrices):(f + 1) * len(matrices)] = matrices
+
+        # Return Result
+        return self
+
+    def iterSamples(self, times):
+        """
+        Evaluate all sample targets at the specified times, one time at a time.
+        Yields flat (points, normals, values, matrices) arrays per sample time.
+        Use this instead of sample() to stream large (ie. mesh cache) results.
+        @param times: List of times (UI units) to sample.
+        @type times: list
+        """
+        timeUnit = OpenMaya.MTime.uiUnit()
+        pointArray = OpenMaya.MPointArray()
+        normalArray = OpenMaya.MFloatVectorArray()
+
+        for t in times:
+
+            # Initialize Frame
+            ctx = OpenMaya.MDGContext(OpenMaya.MTime(t, timeUnit))
+            points = array.array('d', [0.0]) * (self.pointCount * 3)
+            normals = array.array('d', [0.0]) * (self.normalCount * 3)
+            values = array.array('d', [0.0]) * self.valueCount
+            matrices = array.array('d', [0.0]) * (self.matrixCount * 16)
+
+            # Static Points
+            for column, pt in self._static:
+                points[column * 3:column * 3 + 3] = array.array('d', pt)
+
+            # Geometry Points
+            for plug, geoType, items, normalColumn in self._geometry:
+                if not items: continue
+                data = plug.asMObject(ctx)
+                if geoType == 'mesh':
+                    meshFn = OpenMaya.MFnMesh(data)
+                    meshFn.getPoints(pointArray)
+                    if normalColumn >= 0:
+                        meshFn.getVertexNormals(False, normalArray)
+                        for i in xrange(normalArray.length()):
+                            n = (normalColumn + i) * 3
+                            nrm = normalArray[i]
+                            normals[n], normals[n + 1], normals[n + 2] = nrm.x, nrm.y, nrm.z
+                elif geoType == 'nurbsCurve':
+                    OpenMaya.MFnNurbsCurve(data).getCVs(pointArray)
+                else:
+                    OpenMaya.MFnNurbsSurface(data).getCVs(pointArray)
+                for column, i in items:
+                    pt = pointArray[i]
+                    points[column * 3], points[column * 3 + 1], points[column * 3 + 2] = pt.x, pt.y, pt.z
+
+            # Transform Points
+            for column, matrixPlug, pivotPlug in self._transforms:
+                mat = OpenMaya.MFnMatrixData(matrixPlug.asMObject(ctx)).matrix()
+                pt = OpenMaya.MPoint(pivotPlug.child(0).asDouble(ctx),
+                                     pivotPlug.child(1).asDouble(ctx),
+                                     pivotPlug.child(2).asDouble(ctx)) * mat
+                points[column * 3], points[column * 3 + 1], points[column * 3 + 2] = pt.x, pt.y, pt.z
+
+            # Plug Values
+            for column, plug in self._values:
+                values[column] = _getPlugValue(plug, ctx)
+
+            # Matrices
+            for column, plug in self._matrices:
+                mat = OpenMaya.MFnMatrixData(plug.asMObject(ctx)).matrix()
+                matrices[column * 16:column * 16 + 16] = array.array('d', glTools.utils.matrix.asList(mat))
+
+            yield points, normals, values, matrices
+
+    # =================
+    # - Query Results -
+    # =================
+
+    def frameCount(self):
+        return len(self.times)
+
+    def getPoint(self, frame, column):
+        """
+        Return the sampled (x, y, z) position of a point target for the specified frame index.
+        @param frame: Sample frame index.
+        @type frame: int
+        @param column: Point column index.
+        @type column: int
+        """
+        i = (frame * self.pointCount + column) * 3
+        return self.points[i], self.points[i + 1], self.points[i + 2]
+
+    def getPointTrack(self, column):
+        """
+        Return the list of sampled (x, y, z) positions of a point target, one per sample time.
+        @param column: Point column index.
+        @type column: int
+        """
+        return [self.getPoint(f, column) for f in xrange(self.frameCount())]
+
+    def getValue(self, frame, column):
+        """
+        Return the sampled plug value for the specified frame index.
+        @param frame: Sample frame index.
+        @type frame: int
+        @param column: Value column index.
+        @type column: int
+        """
+        return self.values[frame * self.valueCount + column]
+
+    def getMatrix(self, frame, column):
+        """
+        Return the sampled matrix for the specified frame index.
+        @param frame: Sample frame index.
+        @type frame: int
+        @param column: Matrix column index.
+        @type column: int
+        """
+        i = (frame * self.matrixCount + column) * 16
+        return glTools.utils.matrix.fromList(self.matrices[i:i + 16].tolist())
+
+    # ===========
+    # - Private -
+    # ===========
+
+    def _addPointColumn(self):
+        """
+        Reserve and return the next point column index.
+        """
+        column = self.pointCount
+        self.pointCount += 1
+        return column
+
+    def _getGeometry(self, dagPath, worldSpace):
+        """
+        Return the geometry ID for the specified shape, adding it if it has not been added already.
+        """
+        shapePath = OpenMaya.MDagPath(dagPath)
+        shapePath.extendToShape()
+        key = (shapePath.fullPathName(), worldSpace)
+        if key in self._geometryIndex: return self._geometryIndex[key]
+
+        # Get Geometry Plug
+        depFn = OpenMaya.MFnDependencyNode(shapePath.node())
+        if shapePath.hasFn(OpenMaya.MFn.kMesh):
+            geoType = 'mesh'
+            worldAttr, localAttr = 'worldMesh', 'outMesh'
+        elif shapePath.hasFn(OpenMaya.MFn.kNurbsCurve):
+            geoType = 'nurbsCurve'
+            worldAttr, localAttr = 'worldSpace', 'local'
+        elif shapePath.hasFn(OpenMaya.MFn.kNurbsSurface):
+            geoType = 'nurbsSurface'
+            worldAttr, localAttr = 'worldSpace', 'local'
+        else:
+            raise Exception('Unsupported geometry type for "' + shapePath.partialPathName() + '"!')
+        if worldSpace:
+            plug = depFn.findPlug(worldAttr).elementByLogicalIndex(shapePath.instanceNumber())
+        else:
+            plug = depFn.findPlug(localAttr)
+
+        # Add Geometry
+        self._geometry.append((plug, geoType, [], -1))
+        self._geometryIndex[key] = len(self._geometry) - 1
+
+        # Return Result
+        return self._geometryIndex[key]
+
+
+def frameRange(start, end, inc=1):
+    """
+    Return a list of sample times from start to end (inclusive) at the specified increment.
+    The end time is always included, even if it does not fall on an increment.
+    @param start: First sample time.
+    @type start: int or float
+    @param end: Last sample time.
+    @type end: int or float
+    @param inc: Sample time increment.
+    @type inc: int or float
+    """
+    if inc <= 0: raise Exception('Invalid frame increment (' + str(inc) + ')! Must be greater than 0.')
+    times = []
+    t = start
+    while t < end:
+        times.append(t)
+        t = start + len(times) * inc
+    times.append(end)
+    return times
+
+
+def samplePoints(pointList, times):
+    """
+    Sample the world space positions of a list of points at the specified times, without changing the current time.
+    Returns a flat (frames * points * 3) double array.
+    @param pointList: List of points to sample. See TimeSampler.addPoint().
+    @type pointList: list
+    @param times: List of times (UI units) to sample.
+    @type times: list
+    """
+    sampler = TimeSampler()
+    sampler.addPoints(pointList)
+    return sampler.sample(times).points
+
+
+def _getDagPathComponent(obj):
+    """
+    Return the (MDagPath, component MObject) pair for the specified object or component.
+    """
+    if not cmds.objExists(obj):
+        raise Exception('Object "' + obj + '" does not exist!')
+    sel = OpenMaya.MSelectionList()
+    sel.add(obj)
+    dagPath = OpenMaya.MDagPath()
+    component = OpenMaya.MObject()
+    sel.getDagPath(0, dagPath, component)
+    return dagPath, component
+
+
+def _getComponentIndices(dagPath, component):
+    """
+    Return the geometry point indices for the specified component.
+    Double indexed (surface CV) components are converted to getCVs() point indices.
+    """
+    if component.hasFn(OpenMaya.MFn.kSingleIndexedComponent):
+        indices = OpenMaya.MIntArray()
+        OpenMaya.MFnSingleIndexedComponent(component).getElements(indices)
+        return list(indices)
+    if component.hasFn(OpenMaya.MFn.kDoubleIndexedComponent):
+        uIndices = OpenMaya.MIntArray()
+        vIndices = OpenMaya.MIntArray()
+        OpenMaya.MFnDoubleIndexedComponent(component).getElements(uIndices, vIndices)
+        numV = OpenMaya.MFnNurbsSurface(dagPath).numCVsInV()
+        return [uIndices[i] * numV + vIndices[i] for i in xrange(uIndices.length())]
+    raise Exception('Unsupported component type for "' + dagPath.partialPathName() + '"!')
+
+
+def _getPointCount(dagPath, geoType):
+    """
+    Return the number of points (vertices/CVs) of the specified geometry.
+    """
+    if geoType == 'mesh': return OpenMaya.MFnMesh(dagPath).numVertices()
+    if geoType == 'nurbsCurve': return OpenMaya.MFnNurbsCurve(dagPath).numCVs()
+    surfaceFn = OpenMaya.MFnNurbsSurface(dagPath)
+    return surfaceFn.numCVsInU() * surfaceFn.numCVsInV()
+
+
+def _getPlug(attribute):
+    """
+    Return the MPlug for the specified attribute.
+    """
+    if not cmds.objExists(attribute):
+        raise Exception('Attribute "' + attribute + '" does not exist!')
+    sel = OpenMaya.MSelectionList()
+    sel.add(attribute)
+    plug = OpenMaya.MPlug()
+    sel.getPlug(0, plug)
+    return plug
+
+
+def _getPlugValue(plug, ctx):
+    """
+    Return the numeric value of a plug evaluated in the specified context.
+    Angle and distance values are converted to UI units.
+    """
+    attr = plug.attribute()
+    if attr.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unitType = OpenMaya.MFnUnitAttribute(attr).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            return plug.asMAngle(ctx).asUnits(OpenMaya.MAngle.uiUnit())
+        if unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            return plug.asMDistance(ctx).asUnits(OpenMaya.MDistance.uiUnit())
+    return plug.asDouble(ctx)
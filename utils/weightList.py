@@ -1,4 +1,9 @@
 import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import glTools.data.fileFormat
+import array
+import itertools
+import operator
 import types
 import cPickle
 import os.path
@@ -191,3 +196,276 @@ class WeightList(list):
 
         # Return Result
         return self
+
+
+class WeightArray(array.array):
+    """
+    Array backed weight list. Weights are stored as a contiguous double (float64) buffer.
+    Supports the same operators and modifiers as WeightList, without per element python loops.
+    Operands of different lengths pass the extra elements of the longer operand through unchanged.
+    """
+
+    FILE_FILTER = "All Files (*.*)"
+    DATA_TYPE = 'WeightArray'
+
+    def __new__(cls, weights=()):
+        """
+        WeightArray class constructor.
+        @param weights: Initial weight values. Any sequence or iterable of numbers (list, array, MDoubleArray...)
+        @type weights: iterable
+        """
+        return array.array.__new__(cls, 'd', weights)
+
+    def __init__(self, weights=()):
+        pass
+
+    def __reduce__(self):
+        return (self.__class__, (self.tolist(),))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return WeightArray(array.array.__getitem__(self, index))
+        return array.array.__getitem__(self, index)
+
+    def __getslice__(self, start, end):
+        return WeightArray(array.array.__getslice__(self, start, end))
+
+    # =============
+    # - Operators -
+    # =============
+
+    def _binaryOp(self, other, op, reverse=False):
+        """
+        Apply a binary operator to each weight value.
+        @param other: Scalar or weight list operand.
+        @param op: Element wise operator, called as op(self[i], other[i]).
+        @param reverse: Swap the operator arguments, calling op(other[i], self[i]).
+        """
+        # Scalar
+        if isinstance(other, (int, long, float)):
+            if reverse: return WeightArray(map(op, itertools.repeat(float(other), len(self)), self))
+            return WeightArray(map(op, self, itertools.repeat(float(other), len(self))))
+
+        # Weight List
+        count = min(len(self), len(other))
+        if reverse:
+            result = WeightArray(itertools.imap(op, other, self))
+        else:
+            result = WeightArray(itertools.imap(op, self, other))
+        if len(self) > count:
+            result.extend(self[count:])
+        elif len(other) > count:
+            result.extend(other[count:])
+        return result
+
+    def __add__(self, other):
+        return self._binaryOp(other, operator.add)
+
+    def __sub__(self, other):
+        return self._binaryOp(other, operator.sub)
+
+    def __mul__(self, other):
+        return self._binaryOp(other, operator.mul)
+
+    def __div__(self, other):
+        try:
+            return self._binaryOp(other, operator.truediv)
+        except ZeroDivisionError:
+            return self._binaryOp(other, _safeDiv)
+
+    __truediv__ = __div__
+
+    def __radd__(self, other):
+        return self._binaryOp(other, operator.add, reverse=True)
+
+    def __rsub__(self, other):
+        return self._binaryOp(other, operator.sub, reverse=True)
+
+    def __rmul__(self, other):
+        return self._binaryOp(other, operator.mul, reverse=True)
+
+    def __rdiv__(self, other):
+        try:
+            return self._binaryOp(other, operator.truediv, reverse=True)
+        except ZeroDivisionError:
+            return self._binaryOp(other, _safeDiv, reverse=True)
+
+    __rtruediv__ = __rdiv__
+
+    def __iadd__(self, other):
+        return self.__add__(other)
+
+    def __isub__(self, other):
+        return self.__sub__(other)
+
+    def __imul__(self, other):
+        return self.__mul__(other)
+
+    def __idiv__(self, other):
+        return self.__div__(other)
+
+    __itruediv__ = __idiv__
+
+    # =============
+    # - Modifiers -
+    # =============
+
+    def clamp(self, clampMin=0, clampMax=1):
+        """
+        Return a new weight array with all values clamped to the specified range.
+        @param clampMin: Minimum weight value.
+        @type clampMin: float
+        @param clampMax: Maximum weight value.
+        @type clampMax: float
+        """
+        count = len(self)
+        return WeightArray(map(max, itertools.repeat(float(clampMin), count),
+                               map(min, itertools.repeat(float(clampMax), count), self)))
+
+    def normalize(self, normalizeMin=0, normalizeMax=1):
+        """
+        Return a new weight array with the values remapped to the specified range.
+        @param normalizeMin: Minimum weight value.
+        @type normalizeMin: float
+        @param normalizeMax: Maximum weight value.
+        @type normalizeMax: float
+        """
+        if not self: return WeightArray()
+        oldMin = min(self)
+        oldRange = max(self) - oldMin
+        if not oldRange: return WeightArray(itertools.repeat(float(normalizeMin), len(self)))
+        scale = (normalizeMax - normalizeMin) / float(oldRange)
+        return (self - oldMin) * scale + normalizeMin
+
+    def invert(self):
+        """
+        Return a new weight array with all values inverted (1.0 - value).
+        """
+        return 1.0 - self
+
+    # ===================
+    # - Maya Conversion -
+    # ===================
+
+    @classmethod
+    def fromMArray(cls, mArray):
+        """
+        Build a weight array from an MDoubleArray or MFloatArray (or any sequence of numbers).
+        @param mArray: Source array.
+        @type mArray: OpenMaya.MDoubleArray or OpenMaya.MFloatArray
+        """
+        return cls(mArray)
+
+    def _scriptUtilPtr(self):
+        """
+        Return an MScriptUtil double array pointer for the weight values.
+        The MScriptUtil object is returned with the pointer, and must be kept alive while the pointer is in use.
+        """
+        util = OpenMaya.MScriptUtil()
+        util.createFromList(self.tolist(), len(self))
+        return util, util.asDoublePtr()
+
+    def toMDoubleArray(self):
+        """
+        Return the weight values as an MDoubleArray.
+        """
+        if not self: return OpenMaya.MDoubleArray()
+        util, ptr = self._scriptUtilPtr()
+        return OpenMaya.MDoubleArray(ptr, len(self))
+
+    def toMFloatArray(self):
+        """
+        Return the weight values as an MFloatArray.
+        """
+        if not self: return OpenMaya.MFloatArray()
+        util, ptr = self._scriptUtilPtr()
+        return OpenMaya.MFloatArray(ptr, len(self))
+
+    # ===============
+    # - SAVE / LOAD -
+    # ===============
+
+    def save(self, filePath, force=False):
+        """
+        Save weight values to a binary data file (see glTools.data.fileFormat).
+        @param filePath: Target file path.
+        @type filePath: str
+        @param force: Force save if file already exists. (Overwrite).
+        @type force: bool
+        """
+        # Check Directory Path
+        dirpath = os.path.dirname(filePath)
+        if dirpath and not os.path.isdir(dirpath): os.makedirs(dirpath)
+
+        # Check File Path
+        if os.path.isfile(filePath) and not force:
+            raise Exception('File "' + filePath + '" already exists! Use "force=True" to overwrite the existing file.')
+
+        # Save File
+        glTools.data.fileFormat.writeFile(filePath, {'dataType': self.DATA_TYPE,
+                                                     'weights': array.array('d', self)})
+
+        # Print Message
+        print('Saved ' + self.__class__.__name__ + ': "' + filePath + '"')
+
+        # Return Result
+        return filePath
+
+    def saveAs(self):
+        """
+        Save weight values to file.
+        Opens a file dialog, to allow the user to specify a file path.
+        """
+        # Specify File Path
+        filePath = cmds.fileDialog2(fileFilter=self.FILE_FILTER, dialogStyle=2, fileMode=0, caption='Save As')
+
+        # Check Path
+        if not filePath: return
+        filePath = filePath[0]
+
+        # Save Data File
+        filePath = self.save(filePath, force=True)
+
+        # Return Result
+        return filePath
+
+    def load(self, filePath=''):
+        """
+        Load weight values from file. Returns a new WeightArray.
+        Pickled WeightList files are also supported.
+        @param filePath: Target file path
+        @type filePath: str
+        """
+        # Check File Path
+        if not filePath:
+            filePath = cmds.fileDialog2(fileFilter=self.FILE_FILTER, dialogStyle=2, fileMode=1, caption='Load Data File',
+                                        okCaption='Load')
+            if not filePath: return None
+            filePath = filePath[0]
+        else:
+            if not os.path.isfile(filePath):
+                raise Exception('File "' + filePath + '" does not exist!')
+
+        # Read File
+        if glTools.data.fileFormat.isBinaryFile(filePath):
+            data = glTools.data.fileFormat.readFile(filePath)
+            if not isinstance(data, dict) or data.get('dataType') != self.DATA_TYPE:
+                raise Exception('File "' + filePath + '" is not a valid ' + self.DATA_TYPE + ' file!')
+            weights = WeightArray(data['weights'])
+        else:
+            fileIn = open(filePath, 'rb')
+            weights = WeightArray(cPickle.load(fileIn))
+            fileIn.close()
+
+        # Print Message
+        print('Loaded ' + weights.__class__.__name__ + ': "' + filePath + '"')
+
+        # Return Result
+        return weights
+
+
+def _safeDiv(a, b):
+    """
+    Divide a by b, returning 0.0 for division by zero.
+    """
+    if not b: return 0.0
+    return a / b
@@ -0,0 +1,174 @@
+import array
+
+# OpenMaya is imported by the closest triangle query functions only, so the barycentric
+# blend functions can be used (and tested) without a Maya session.
+
+
+def getTriangleVertexArray(meshFn):
+    """
+    Return the triangle vertex array for a mesh and the first triangle index of each polygon.
+    Triangle vertex IDs for (face, triangle) are found at triVerts[(triOffsets[face] + triangle) * 3 + (0, 1, 2)].
+    @param meshFn: Mesh function set.
+    @type meshFn: OpenMaya.MFnMesh
+    """
+    import maya.OpenMaya as OpenMaya
+
+    # Get Mesh Triangles
+    triCounts = OpenMaya.MIntArray()
+    triVerts = OpenMaya.MIntArray()
+    meshFn.getTriangles(triCounts, triVerts)
+
+    # Build Face Triangle Offsets
+    triOffsets = [0] * triCounts.length()
+    offset = 0
+    for i, count in enumerate(triCounts):
+        triOffsets[i] = offset
+        offset += count
+
+    # Return Result
+    return triOffsets, array.array('i', triVerts)
+
+
+def getClosestTriangles(meshObj, targetPoints):
+    """
+    Find the closest triangle and barycentric coordinates on a mesh for a list of target points.
+    Returns flat (3 per target point) arrays of triangle vertex IDs and barycentric weights.
+    @param meshObj: Mesh (or mesh data) object to query closest points on.
+    @type meshObj: OpenMaya.MObject
+    @param targetPoints: Target points to find closest triangles for.
+    @type targetPoints: OpenMaya.MPointArray
+    """
+    import maya.OpenMaya as OpenMaya
+
+    # Build Mesh Triangle Table
+    meshFn = OpenMaya.MFnMesh(meshObj)
+    triOffsets, triVerts = getTriangleVertexArray(meshFn)
+
+    # Create Mesh Intersector
+    meshIntersector = OpenMaya.MMeshIntersector()
+    meshIntersector.create(meshObj)
+    meshPt = OpenMaya.MPointOnMesh()
+
+    # Initialize Float Pointers for Barycentric Coords
+    uUtil = OpenMaya.MScriptUtil(0.0)
+    vUtil = OpenMaya.MScriptUtil(0.0)
+    uPtr = uUtil.asFloatPtr()
+    vPtr = vUtil.asFloatPtr()
+    getFloat = OpenMaya.MScriptUtil.getFloat
+
+    # Initialize Result Arrays
+    numPts = targetPoints.length()
+    triVertexIds = array.array('i', [0]) * (numPts * 3)
+    baryCoords = array.array('d', [0.0]) * (numPts * 3)
+
+    # Find Closest Triangles
+    for i in xrange(numPts):
+        meshIntersector.getClosestPoint(targetPoints[i], meshPt)
+        meshPt.getBarycentricCoords(uPtr, vPtr)
+        u = getFloat(uPtr)
+        v = getFloat(vPtr)
+
+        # Store Triangle Vertex IDs and Weights
+        tri = (triOffsets[meshPt.faceIndex()] + meshPt.triangleIndex()) * 3
+        n = i * 3
+        triVertexIds[n], triVertexIds[n + 1], triVertexIds[n + 2] = triVerts[tri], triVerts[tri + 1], triVerts[tri + 2]
+        baryCoords[n], baryCoords[n + 1], baryCoords[n + 2] = u, v, 1.0 - (u + v)
+
+    # Return Result
+    return triVertexIds, baryCoords
+
+
+def buildMemberIndex(membership):
+    """
+    Build a lookup dictionary of {vertexId: memberIndex} from a membership list.
+    @param membership: Deformer set membership (vertex ID) list.
+    @type membership: list
+    """
+    return dict([(vtx, i) for i, vtx in enumerate(membership)])
+
+
+def blendWeights(triVertexIds, baryCoords, membership, weights):
+    """
+    Blend single influence (deformer) weights for target points using barycentric triangle weights.
+    Target points with no source member triangle vertices are excluded from the resulting membership.
+    Returns the target membership list and the matching weight list.
+    @param triVertexIds: Flat list of source triangle vertex IDs (3 per target point).
+    @type triVertexIds: list
+    @param baryCoords: Flat list of barycentric weights (3 per target point).
+    @type baryCoords: list
+    @param membership: Source membership (vertex ID) list.
+    @type membership: list
+    @param weights: Source weight list, matching the source membership.
+    @type weights: list
+    """
+    # Build Member Index
+    memberIndex = buildMemberIndex(membership)
+    getMember = memberIndex.get
+
+    # Blend Weights
+    newMembership = []
+    newWeights = []
+    for i in xrange(len(triVertexIds) // 3):
+        wt = 0.0
+        isMember = False
+        for n in xrange(i * 3, i * 3 + 3):
+            wtId = getMember(triVertexIds[n])
+            if wtId is not None:
+                wt += weights[wtId] * baryCoords[n]
+                isMember = True
+        if isMember:
+            newMembership.append(i)
+            newWeights.append(wt)
+
+    # Return Result
+    return newMembership, newWeights
+
+
+def blendSparseWeights(triVertexIds, baryCoords, membership, weights):
+    """
+    Blend multi influence (skinCluster) weights for target points using barycentric triangle weights.
+    All influences are blended in a single pass over the non-zero source weights.
+    Target points with no source member triangle vertices are excluded from the resulting membership.
+    Returns the target membership list and a SparseWeights object with one row per target member.
+    @param triVertexIds: Flat list of source triangle vertex IDs (3 per target point).
+    @type triVertexIds: list
+    @param baryCoords: Flat list of barycentric weights (3 per target point).
+    @type baryCoords: list
+    @param membership: Source membership (vertex ID) list.
+    @type membership: list
+    @param weights: Source sparse weights, with one row per source member.
+    @type weights: glTools.utils.sparseWeights.SparseWeights
+    """
+    # Build Member Index
+    memberIndex = buildMemberIndex(membership)
+
+    # Blend Weights
+    newMembership = []
+    offsets = array.array('i', [0])
+    indices = array.array('i')
+    values = array.array('d')
+    srcOffsets, srcIndices, srcValues = weights.offsets, weights.indices, weights.values
+    for i in xrange(len(triVertexIds) // 3):
+        row = {}
+        isMember = False
+        for n in xrange(i * 3, i * 3 + 3):
+            wtId = memberIndex.get(triVertexIds[n])
+            if wtId is None: continue
+            isMember = True
+            bary = baryCoords[n]
+            for e in xrange(srcOffsets[wtId], srcOffsets[wtId + 1]):
+                row[srcIndices[e]] = row.get(srcIndices[e], 0.0) + srcValues[e] * bary
+        if not isMember: continue
+        newMembership.append(i)
+        for col in sorted(row):
+            if row[col]:
+                indices.append(col)
+                values.append(row[col])
+        offsets.append(len(values))
+
+    # Build Sparse Weights
+    result = weights.__class__(weights.influenceList)
+    result.offsets, result.indices, result.values = offsets, indices, values
+
+    # Return Result
+    return newMembership, result